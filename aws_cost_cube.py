@@ -0,0 +1,509 @@
+"""
+AWS Cost Cube
+Daily cost by account, service, region and tags as a local columnar cube with rollups
+
+Features:
+- Fact table: date x account x service x region (plus derived service category)
+- Tag table: date x account x tag key x tag value (Cost Explorer groups by at most
+  two keys, so tags are allocated per account rather than per service/region)
+- Pre-aggregated rollups: monthly facts and monthly account x category
+- Queries pick the smallest table that can answer them (aggregate navigation)
+- Slice / dice filters, drill-down along category -> service -> region -> account
+- Incremental refresh: only the restatement window is re-fetched and only the
+  months it touches are re-aggregated; a failed refresh keeps serving the last
+  cube and is retried after a back-off
+- Parquet persistence when pyarrow is installed (pickle otherwise)
+"""
+
+import os
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+FACT_COLUMNS = ['date', 'account', 'service', 'region', 'cost']
+TAG_COLUMNS = ['date', 'account', 'tag_key', 'tag_value', 'cost']
+DIMENSIONS = ['account', 'service', 'region', 'category']
+TAG_DIMENSIONS = ['account', 'tag_key', 'tag_value']
+
+# Pre-aggregated rollups of the daily fact table: (attribute, time column, dimensions)
+ROLLUPS = [
+    ('category_daily', 'date', ['account', 'category']),
+    ('monthly', 'month', DIMENSIONS),
+    ('category_monthly', 'month', ['account', 'category']),
+]
+
+# Drill-down path
+HIERARCHY = ['category', 'service', 'region', 'account']
+
+# Cost Explorer keeps revising the last few days of usage
+RESTATEMENT_DAYS = 3
+UNTAGGED = '(untagged)'
+
+# Service -> category rollup; matched on the lower-cased Cost Explorer service name
+SERVICE_CATEGORIES = [
+    ('Compute', ['ec2', 'elastic compute', 'lambda', 'ecs', 'eks', 'fargate', 'lightsail', 'batch']),
+    ('Storage', ['s3', 'simple storage', 'ebs', 'efs', 'elastic file', 'glacier', 'backup', 'fsx']),
+    ('Database', ['rds', 'relational database', 'dynamodb', 'elasticache', 'redshift', 'aurora', 'documentdb', 'neptune']),
+    ('Networking', ['vpc', 'cloudfront', 'elb', 'load balancing', 'route 53', 'direct connect', 'data transfer',
+                    'transit gateway', 'api gateway']),
+    ('Management', ['cloudwatch', 'cloudtrail', 'config', 'systems manager', 'organizations', 'control tower']),
+    ('Security', ['guardduty', 'security hub', 'kms', 'key management', 'waf', 'shield', 'inspector', 'macie']),
+    ('Analytics', ['athena', 'glue', 'emr', 'kinesis', 'quicksight', 'opensearch', 'elasticsearch']),
+    ('AI/ML', ['sagemaker', 'bedrock', 'rekognition', 'comprehend', 'textract']),
+]
+
+
+def service_category(service: str) -> str:
+    """Category of a Cost Explorer service name ('Other' when unknown)"""
+    name = service.lower()
+    for category, keywords in SERVICE_CATEGORIES:
+        if any(keyword in name for keyword in keywords):
+            return category
+    return 'Other'
+
+
+class CostExplorerCubeTransport:
+    """Live transport: one account x service query per region, one account x tag query per tag key"""
+
+    def __init__(self, session, tag_keys: List[str], max_workers: int = 4):
+        """
+        Initialize transport
+
+        Args:
+            session: boto3 session for the management (payer) account
+            tag_keys: Cost allocation tag keys to load
+            max_workers: Concurrent Cost Explorer queries
+        """
+        from aws_cost_explorer import CostExplorerService
+        self.service = CostExplorerService(session)
+        self.tag_keys = tag_keys
+        self.max_workers = max_workers
+
+    def _rows(self, start: date, end: date, group_by: List[str], cost_filter: Optional[Dict] = None) -> List[Dict]:
+        result = self.service.get_daily_cost_by_group(start, end, group_by, cost_filter)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return result['rows']
+
+    def __call__(self, start: date, end: date) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fact and tag rows for [start, end)"""
+        regions = self.service.get_dimension_values(start, end, 'REGION')
+        if not regions['success']:
+            raise RuntimeError(regions['error'])
+
+        def region_rows(region: str) -> pd.DataFrame:
+            rows = self._rows(start, end, ['LINKED_ACCOUNT', 'SERVICE'],
+                              {'Dimensions': {'Key': 'REGION', 'Values': [region]}})
+            frame = pd.DataFrame(rows, columns=['date', 'LINKED_ACCOUNT', 'SERVICE', 'cost'])
+            return frame.rename(columns={'LINKED_ACCOUNT': 'account', 'SERVICE': 'service'}).assign(
+                region=region or 'global')
+
+        def tag_rows(tag_key: str) -> pd.DataFrame:
+            rows = self._rows(start, end, ['LINKED_ACCOUNT', f"TAG:{tag_key}"])
+            frame = pd.DataFrame(rows, columns=['date', 'LINKED_ACCOUNT', f"TAG:{tag_key}", 'cost'])
+            return frame.rename(columns={'LINKED_ACCOUNT': 'account', f"TAG:{tag_key}": 'tag_value'}).assign(
+                tag_key=tag_key)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            facts = list(pool.map(region_rows, regions['values']))
+            tags = list(pool.map(tag_rows, self.tag_keys))
+        facts = pd.concat(facts, ignore_index=True) if facts else pd.DataFrame(columns=FACT_COLUMNS)
+        tags = pd.concat(tags, ignore_index=True) if tags else pd.DataFrame(columns=TAG_COLUMNS)
+        return facts[FACT_COLUMNS], tags[TAG_COLUMNS]
+
+
+class DemoCubeTransport:
+    """Synthetic cube rows: demo account x service costs split over regions and tag values"""
+
+    REGIONS = ['us-east-1', 'us-west-2', 'eu-west-1']
+    TAGS = {
+        'Department': [('Engineering', 0.42), ('Data Science', 0.26), ('Marketing', 0.16), ('', 0.16)],
+        'Environment': [('prod', 0.55), ('staging', 0.2), ('dev', 0.15), ('', 0.1)],
+    }
+
+    def __init__(self, source=None):
+        from cost_anomaly_detector import DemoCostSource
+        self.source = source or DemoCostSource()
+
+    def __call__(self, start: date, end: date) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        base = self.source.fetch(start, end)
+        codes = base['service'].astype('category').cat.codes.to_numpy()
+        facts = []
+        for i, region in enumerate(self.REGIONS):
+            # Each service has a primary region carrying most of its spend
+            weight = np.where(codes % len(self.REGIONS) == i, 0.7, 0.15)
+            facts.append(base.assign(region=region, cost=base['cost'] * weight))
+        per_account = base.groupby(['date', 'account'], as_index=False)['cost'].sum()
+        tags = [per_account.assign(tag_key=key, tag_value=value, cost=per_account['cost'] * share)
+                for key, values in self.TAGS.items() for value, share in values]
+        return pd.concat(facts, ignore_index=True)[FACT_COLUMNS], pd.concat(tags, ignore_index=True)[TAG_COLUMNS]
+
+
+class AWSCostCube:
+    """
+    Columnar cost cube with pre-aggregated rollups.
+
+    Tables (all with categorical dimensions):
+        daily             date x account x service x region x category
+        category_daily    date x account x category
+        monthly           month x account x service x region x category
+        category_monthly  month x account x category
+        tags              date x account x tag_key x tag_value
+    """
+
+    def __init__(self, transport, path: Optional[str] = None, history_days: int = 400,
+                 ttl: timedelta = timedelta(hours=4), retry_after: timedelta = timedelta(minutes=15)):
+        """
+        Initialize cube
+
+        Args:
+            transport: Callable (start, end) -> (fact rows, tag rows) for [start, end)
+            path: Directory to persist the cube in (memory only if None)
+            history_days: Days of history kept
+            ttl: Age after which queries trigger an incremental refresh
+            retry_after: Wait after a failed refresh before queries try again
+        """
+        self.transport = transport
+        self.path = path
+        self.history_days = history_days
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[datetime] = None
+        self.lock = threading.RLock()
+        self.daily = self._compact(pd.DataFrame(columns=FACT_COLUMNS + ['category']), DIMENSIONS)
+        self.tags = self._compact(pd.DataFrame(columns=TAG_COLUMNS), TAG_DIMENSIONS)
+        self._build_rollups()
+        self.refreshed_at: Optional[datetime] = None
+        self._load()
+
+    @staticmethod
+    def _compact(frame: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+        """Typed, categorical layout"""
+        frame = frame.astype({'cost': 'float64'})
+        frame['date'] = pd.to_datetime(frame['date'])
+        for column in dimensions:
+            frame[column] = frame[column].astype('category').cat.remove_unused_categories()
+        return frame.reset_index(drop=True)
+
+    @staticmethod
+    def _aggregate(frame: pd.DataFrame, time_column: str, dimensions: List[str]) -> pd.DataFrame:
+        """Daily or monthly rollup of a daily table"""
+        time = frame['date'] if time_column == 'date' else frame['date'].dt.to_period('M').dt.to_timestamp().rename('month')
+        return frame.groupby([time] + dimensions, as_index=False, observed=True)['cost'].sum()
+
+    def _build_rollups(self):
+        """Rebuild every rollup from the daily table"""
+        for attribute, time_column, dimensions in ROLLUPS:
+            setattr(self, attribute, self._aggregate(self.daily, time_column, dimensions))
+
+    @staticmethod
+    def _concat(kept: pd.DataFrame, fresh: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+        """Concatenate categorical frames over the union of their categories"""
+        kept, fresh = kept.copy(), fresh.copy()
+        for column in dimensions:
+            categories = kept[column].cat.categories.union(fresh[column].cat.categories)
+            kept[column] = kept[column].cat.set_categories(categories)
+            fresh[column] = fresh[column].cat.set_categories(categories)
+        return pd.concat([kept, fresh], ignore_index=True)
+
+    # ============= REFRESH =============
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Re-fetch cost data and rebuild the affected rollup months
+
+        Full refresh loads history_days; otherwise only the restatement
+        window since the newest day already in the cube is replaced.
+
+        Returns:
+            Days fetched
+        """
+        today = datetime.now().date()
+        with self.lock:
+            if full or self.daily.empty:
+                start = today - timedelta(days=self.history_days)
+            else:
+                start = self.daily['date'].max().date() - timedelta(days=RESTATEMENT_DAYS)
+            facts, tags = self.transport(start, today)
+
+            facts = self._compact(facts, ['account', 'service', 'region'])
+            facts = facts.groupby(['date', 'account', 'service', 'region'], as_index=False, observed=True)['cost'].sum()
+            # Categorise each distinct service once rather than per row
+            categories = np.array([service_category(str(s)) for s in facts['service'].cat.categories] or ['Other'])
+            facts['category'] = pd.Categorical(categories[facts['service'].cat.codes.to_numpy()])
+            tags = self._compact(tags.assign(tag_value=tags['tag_value'].replace('', UNTAGGED)), TAG_DIMENSIONS)
+            tags = tags.groupby(['date'] + TAG_DIMENSIONS, as_index=False, observed=True)['cost'].sum()
+
+            horizon = pd.Timestamp(today - timedelta(days=self.history_days))
+            cutoff = pd.Timestamp(start)
+            keep = (self.daily['date'] < cutoff) & (self.daily['date'] >= horizon)
+            self.daily = self._compact(self._concat(self.daily[keep], facts, DIMENSIONS), DIMENSIONS)
+            keep = (self.tags['date'] < cutoff) & (self.tags['date'] >= horizon)
+            self.tags = self._compact(self._concat(self.tags[keep], tags, TAG_DIMENSIONS), TAG_DIMENSIONS)
+
+            # Only the days / months touched by the refresh are re-aggregated
+            for attribute, time_column, dimensions in ROLLUPS:
+                first, oldest = cutoff, horizon
+                if time_column == 'month':
+                    first, oldest = cutoff.to_period('M').to_timestamp(), horizon.to_period('M').to_timestamp()
+                current = getattr(self, attribute)
+                kept = current[(current[time_column] < first) & (current[time_column] >= oldest)]
+                fresh = self._aggregate(self.daily[self.daily['date'] >= first], time_column, dimensions)
+                setattr(self, attribute, self._concat(kept, fresh, dimensions))
+
+            self.refreshed_at = datetime.now()
+            self._save()
+            return (today - start).days
+
+    def _ensure_fresh(self):
+        """
+        Incremental refresh when the cube is empty or older than ttl
+
+        A failed refresh (e.g. a Cost Explorer error) is recorded in
+        last_error and not retried for retry_after; queries keep answering
+        from the current tables meanwhile.
+        """
+        now = datetime.now()
+        if self.refreshed_at is not None and now - self.refreshed_at <= self.ttl:
+            return
+        if self.failed_at is not None and now - self.failed_at < self.retry_after:
+            return
+        try:
+            self.refresh()
+            self.last_error, self.failed_at = None, None
+        except Exception as e:
+            self.last_error, self.failed_at = str(e), now
+
+    # ============= QUERIES =============
+
+    @staticmethod
+    def _mask(frame: pd.DataFrame, filters: Dict, time_column: str, start, end) -> np.ndarray:
+        """Boolean mask for dimension filters (value or list of values) and an inclusive date range"""
+        mask = np.ones(len(frame), dtype=bool)
+        for dimension, value in filters.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= frame[dimension].isin(values).to_numpy()
+        if start is not None:
+            mask &= (frame[time_column] >= pd.Timestamp(start)).to_numpy()
+        if end is not None:
+            mask &= (frame[time_column] <= pd.Timestamp(end)).to_numpy()
+        return mask
+
+    def _table(self, columns: set, grain: Optional[str], start, end) -> Tuple[pd.DataFrame, str]:
+        """Smallest table answering a query over columns at a grain"""
+        month_aligned = (start is None or pd.Timestamp(start).day == 1) and (
+            end is None or pd.Timestamp(end) >= self.daily['date'].max() or pd.Timestamp(end).is_month_end)
+        category_only = columns <= {'account', 'category'}
+        if grain != 'day' and month_aligned:
+            return (self.category_monthly if category_only else self.monthly), 'month'
+        return (self.category_daily if category_only else self.daily), 'date'
+
+    def rollup(self, by: List[str], start: Optional[date] = None, end: Optional[date] = None,
+               grain: Optional[str] = None, **filters) -> pd.DataFrame:
+        """
+        Aggregate cost by dimensions, optionally per day or month
+
+        Args:
+            by: Dimensions to group by (account, service, region, category)
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            grain: None (totals), 'day' or 'month'
+            **filters: Dimension -> value or list of values (slice / dice)
+
+        Returns:
+            DataFrame of by (+ date / month) and cost; sorted by cost when grain is None
+        """
+        self._ensure_fresh()
+        with self.lock:
+            table, time_column = self._table(set(by) | {k for k, v in filters.items() if v is not None},
+                                             grain, start, end)
+            frame = table[self._mask(table, filters, time_column, start, end)]
+        keys = list(by)
+        if grain == 'day':
+            keys = ['date'] + keys
+        elif grain == 'month':
+            if time_column == 'date':
+                frame = frame.assign(month=frame['date'].dt.to_period('M').dt.to_timestamp())
+            keys = ['month'] + keys
+        if not keys:
+            return pd.DataFrame({'cost': [float(frame['cost'].sum())]})
+        result = frame.groupby(keys, as_index=False, observed=True)['cost'].sum()
+        return result.sort_values('cost', ascending=False, ignore_index=True) if grain is None else result
+
+    def slice(self, start: Optional[date] = None, end: Optional[date] = None, **filters) -> pd.DataFrame:
+        """Daily fact rows matching the filters"""
+        self._ensure_fresh()
+        with self.lock:
+            return self.daily[self._mask(self.daily, filters, 'date', start, end)]
+
+    def total(self, start: Optional[date] = None, end: Optional[date] = None, **filters) -> float:
+        """Total cost matching the filters"""
+        return float(self.rollup([], start, end, **filters)['cost'].iloc[0])
+
+    def drill(self, start: Optional[date] = None, end: Optional[date] = None, **path) -> pd.DataFrame:
+        """
+        Breakdown one level below a drill path
+
+        Example: drill() -> by category; drill(category='Compute') -> by service;
+        drill(category='Compute', service='EC2') -> by region
+        """
+        depth = max((HIERARCHY.index(k) for k, v in path.items() if v is not None and k in HIERARCHY), default=-1)
+        level = HIERARCHY[min(depth + 1, len(HIERARCHY) - 1)]
+        return self.rollup([level], start, end, **path)
+
+    def tag_rollup(self, tag_key: str, start: Optional[date] = None, end: Optional[date] = None,
+                   by: Optional[List[str]] = None, **filters) -> pd.DataFrame:
+        """Cost by tag value for one tag key (optionally also by account)"""
+        self._ensure_fresh()
+        with self.lock:
+            frame = self.tags[self._mask(self.tags, dict(filters, tag_key=tag_key), 'date', start, end)]
+        result = frame.groupby(['tag_value'] + (by or []), as_index=False, observed=True)['cost'].sum()
+        return result.sort_values('cost', ascending=False, ignore_index=True)
+
+    def daily_series(self, days: int = 30, **filters) -> pd.Series:
+        """Daily cost for the last days of data (missing days as 0)"""
+        self._ensure_fresh()
+        last = self.daily['date'].max() if len(self.daily) else pd.Timestamp(datetime.now().date())
+        start = last - pd.Timedelta(days=days - 1)
+        series = self.rollup([], start, last, grain='day', **filters).set_index('date')['cost']
+        return series.reindex(pd.date_range(start, last, freq='D'), fill_value=0.0)
+
+    def forecast(self, days: int = 30, level: float = 0.95, lookback: int = 120) -> Dict:
+        """
+        Forecast total and per-service spend for the next days from the cube's daily history
+
+        The total and every service are fitted together in one batch.
+
+        Returns:
+            Dict with forecast (total), lower / upper (prediction interval of the
+            period total at level) and by_service forecast totals
+        """
+        from cost_forecaster import CostForecaster, wide_history
+
+        self._ensure_fresh()
+        last = self.daily['date'].max() if len(self.daily) else pd.Timestamp(datetime.now().date())
+        start = last - pd.Timedelta(days=lookback - 1)
+        frame = self.rollup(['service'], start, last, grain='day')
+        frame['service'] = frame['service'].astype(str)
+        wide = pd.concat([
+            wide_history(frame.assign(service='Total'), 'service', start, last).reindex(['Total'], fill_value=0.0),
+            wide_history(frame, 'service', start, last)
+        ])
+        totals = CostForecaster(history_days=lookback).forecast(wide, days, level).totals()
+        by_service = totals['forecast'].drop('Total').sort_values(ascending=False)
+        return {
+            'forecast': float(totals.loc['Total', 'forecast']),
+            'lower': float(totals.loc['Total', 'lower']),
+            'upper': float(totals.loc['Total', 'upper']),
+            'by_service': {str(k): float(v) for k, v in by_service.items()},
+            'level': level
+        }
+
+    def cost_data(self, days: int = 30) -> Dict:
+        """Legacy FinOps cost dict (total, services, daily_costs, by_account) over the last days"""
+        daily = self.daily_series(days)
+        start, end = daily.index.min(), daily.index.max()
+        services = self.rollup(['service'], start, end)
+        accounts = self.rollup(['account'], start, end)
+        return {
+            'total_cost': float(daily.sum()),
+            'services': dict(zip(services['service'].astype(str), services['cost'])),
+            'daily_costs': [{'date': d.strftime('%Y-%m-%d'), 'cost': float(c)} for d, c in daily.items()],
+            'by_account': dict(zip(accounts['account'].astype(str), accounts['cost']))
+        }
+
+    def summary(self) -> Dict:
+        """Table sizes and covered days"""
+        return {
+            'daily_rows': len(self.daily),
+            'monthly_rows': len(self.monthly),
+            'category_rows': len(self.category_daily) + len(self.category_monthly),
+            'tag_rows': len(self.tags),
+            'first_day': self.daily['date'].min().strftime('%Y-%m-%d') if len(self.daily) else None,
+            'last_day': self.daily['date'].max().strftime('%Y-%m-%d') if len(self.daily) else None,
+            'refreshed_at': self.refreshed_at,
+            'last_error': self.last_error
+        }
+
+    # ============= PERSISTENCE =============
+
+    def _file(self, table: str) -> Optional[str]:
+        """Table file path for the available format"""
+        if not self.path:
+            return None
+        return os.path.join(self.path, f"aws_cost_{table}.parquet" if PARQUET_AVAILABLE else f"aws_cost_{table}.pkl")
+
+    def _save(self):
+        """Persist daily and tag tables (caller holds the lock; rollups are rebuilt on load)"""
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for table in ('daily', 'tags'):
+            path = self._file(table)
+            tmp = path + '.tmp'
+            if PARQUET_AVAILABLE:
+                getattr(self, table).to_parquet(tmp)
+            else:
+                getattr(self, table).to_pickle(tmp)
+            os.replace(tmp, path)
+
+    def _load(self):
+        """Load persisted tables if present (refreshed incrementally on first use)"""
+        paths = [self._file(table) for table in ('daily', 'tags')]
+        if not self.path or not all(os.path.exists(p) for p in paths):
+            return
+        read = pd.read_parquet if PARQUET_AVAILABLE else pd.read_pickle
+        self.daily = self._compact(read(paths[0])[FACT_COLUMNS + ['category']], DIMENSIONS)
+        self.tags = self._compact(read(paths[1])[TAG_COLUMNS], TAG_DIMENSIONS)
+        self._build_rollups()
+
+
+def cost_tag_keys() -> List[str]:
+    """Cost allocation tag keys from [aws] cost_tag_keys in secrets"""
+    try:
+        return list(st.secrets['aws']['cost_tag_keys'])
+    except Exception:
+        return ['Department', 'Environment', 'CostCenter']
+
+
+def credential_scope(account_mgr) -> str:
+    """Cache scope of the management credentials ('demo' without live credentials)"""
+    if account_mgr is None or account_mgr.demo_mode:
+        return 'demo'
+    key = account_mgr.management_credentials['access_key_id']
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+@st.cache_resource
+def _aws_cost_cube(scope: str, _account_mgr) -> AWSCostCube:
+    """Cost cube for one credential scope (persisted under AWS_COST_CUBE_PATH/<scope>)"""
+    session = _account_mgr.get_management_session() if scope != 'demo' else None
+    transport = CostExplorerCubeTransport(session, cost_tag_keys()) if session else DemoCubeTransport()
+    base = os.environ.get('AWS_COST_CUBE_PATH')
+    return AWSCostCube(transport, os.path.join(base, scope) if base else None)
+
+
+def get_aws_cost_cube() -> AWSCostCube:
+    """
+    Get the AWS cost cube for the current management credentials (demo transport without them)
+
+    One cube per credential scope, so changed credentials get their own
+    cube. AWS_COST_CUBE_PATH persists cubes between restarts.
+    """
+    from core_account_manager import get_account_manager
+    account_mgr = get_account_manager()
+    return _aws_cost_cube(credential_scope(account_mgr), account_mgr)
@@ -126,6 +126,101 @@ class CostExplorerService:
                 'daily_costs': []
             }
     
+    def get_daily_cost_by_group(_self, start_date, end_date, group_by: List[str] = None,
+                                cost_filter: Optional[Dict] = None) -> Dict:
+        """
+        Get daily cost per group (e.g. account x service), following NextPageToken
+        
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (exclusive)
+            group_by: Up to two DIMENSION keys or 'TAG:<key>' (default LINKED_ACCOUNT, SERVICE)
+            cost_filter: Optional Cost Explorer Filter expression
+        
+        Returns:
+            Dict with 'rows' of {'date', <group key>..., 'cost'}; LINKED_ACCOUNT
+            is reported by account name when Cost Explorer provides one, tag
+            values without their 'key$' prefix ('' when untagged)
+        """
+        group_by = group_by or ['LINKED_ACCOUNT', 'SERVICE']
+        try:
+            rows = []
+            names = {}
+            kwargs = {
+                'TimePeriod': {
+                    'Start': start_date.isoformat(),
+                    'End': end_date.isoformat()
+                },
+                'Granularity': 'DAILY',
+                'Metrics': ['UnblendedCost'],
+                'GroupBy': [
+                    {'Type': 'TAG', 'Key': key[4:]} if key.startswith('TAG:') else {'Type': 'DIMENSION', 'Key': key}
+                    for key in group_by
+                ]
+            }
+            if cost_filter:
+                kwargs['Filter'] = cost_filter
+            while True:
+                response = _self.client.get_cost_and_usage(**kwargs)
+                for attribute in response.get('DimensionValueAttributes', []):
+                    names[attribute['Value']] = attribute.get('Attributes', {}).get('description', attribute['Value'])
+                for result in response['ResultsByTime']:
+                    for group in result['Groups']:
+                        row = {'date': result['TimePeriod']['Start']}
+                        for key, value in zip(group_by, group['Keys']):
+                            row[key] = value.split('$', 1)[-1] if key.startswith('TAG:') else value
+                        row['cost'] = float(group['Metrics']['UnblendedCost']['Amount'])
+                        rows.append(row)
+                if not response.get('NextPageToken'):
+                    break
+                kwargs['NextPageToken'] = response['NextPageToken']
+            
+            if 'LINKED_ACCOUNT' in group_by:
+                for row in rows:
+                    row['LINKED_ACCOUNT'] = names.get(row['LINKED_ACCOUNT'], row['LINKED_ACCOUNT'])
+            
+            return {
+                'success': True,
+                'rows': rows
+            }
+            
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'rows': []
+            }
+    
+    def get_dimension_values(_self, start_date, end_date, dimension: str) -> Dict:
+        """Get the values of a dimension (e.g. REGION) with cost in a period"""
+        try:
+            values = []
+            kwargs = {
+                'TimePeriod': {
+                    'Start': start_date.isoformat(),
+                    'End': end_date.isoformat()
+                },
+                'Dimension': dimension
+            }
+            while True:
+                response = _self.client.get_dimension_values(**kwargs)
+                values.extend(v['Value'] for v in response['DimensionValues'])
+                if not response.get('NextPageToken'):
+                    break
+                kwargs['NextPageToken'] = response['NextPageToken']
+            
+            return {
+                'success': True,
+                'values': values
+            }
+            
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'values': []
+            }
+    
     def get_cost_forecast(_self, days: int = 30) -> Dict:
         """Get cost forecast"""
         try:
@@ -167,20 +167,6 @@ class EC2Service:
             return []
     
     def get_cost_estimate(self, instance_type: str, hours_per_month: int = 730) -> float:
-        """Estimate monthly cost for instance type (simplified)"""
-        # Simplified pricing - in production, use AWS Pricing API
-        pricing = {
-            't2.micro': 0.0116,
-            't2.small': 0.023,
-            't2.medium': 0.0464,
-            't3.micro': 0.0104,
-            't3.small': 0.0208,
-            't3.medium': 0.0416,
-            'm5.large': 0.096,
-            'm5.xlarge': 0.192,
-            'c5.large': 0.085,
-            'r5.large': 0.126
-        }
-        
-        hourly_rate = pricing.get(instance_type, 0.10)  # Default to $0.10/hr
-        return hourly_rate * hours_per_month
+        """Estimate monthly on-demand cost for instance type (us-east-1 Linux list price)"""
+        from rightsizing_engine import hourly_price
+        return hourly_price(instance_type) * hours_per_month
@@ -56,21 +56,9 @@ class RDSService:
             }
     
     def get_cost_estimate(self, instance_class: str, storage_gb: int = 100, hours_per_month: int = 730) -> float:
-        """Estimate monthly cost for RDS instance"""
-        # Simplified pricing
-        pricing = {
-            'db.t3.micro': 0.017,
-            'db.t3.small': 0.034,
-            'db.t3.medium': 0.068,
-            'db.t3.large': 0.136,
-            'db.m5.large': 0.192,
-            'db.m5.xlarge': 0.384,
-            'db.r5.large': 0.24,
-            'db.r5.xlarge': 0.48
-        }
-        
-        hourly_rate = pricing.get(instance_class, 0.10)
-        instance_cost = hourly_rate * hours_per_month
+        """Estimate monthly cost for RDS instance (single-AZ list price plus gp2 storage)"""
+        from rightsizing_engine import hourly_price
+        instance_cost = hourly_price(instance_class) * hours_per_month
         storage_cost = storage_gb * 0.115  # $0.115/GB/month for gp2
         
         return instance_cost + storage_cost
@@ -7,40 +7,43 @@ import streamlit as st
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from core_account_manager import get_account_manager
+from ssm_fleet_dispatcher import chunk
+from ssm_parameter_store import ParameterStore, get_parameter_cache
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _account_id(access_key: str, _session) -> str:
+    """Account behind a set of credentials (one STS call per access key)"""
+    return _session.client('sts').get_caller_identity()['Account']
 
 class SystemsManagerManager:
     """AWS Systems Manager Management"""
     
-    def __init__(self, session):
-        """Initialize Systems Manager with boto3 session"""
-        self.ssm = session.client('ssm')
+    def __init__(self, session, region: Optional[str] = None):
+        """Initialize Systems Manager with boto3 session (region defaults to the session region)"""
+        self.session = session
+        self.ssm = session.client('ssm', region_name=region)
+        self._parameter_store = None
     
     # ============= PARAMETER STORE =============
     
     def list_parameters(self, path: Optional[str] = None, 
                        recursive: bool = False) -> List[Dict[str, Any]]:
-        """List parameters in Parameter Store"""
+        """List parameters in Parameter Store (path listings are served from the parameter cache)"""
         try:
             params_list = []
             
             if path:
-                # List parameters by path
-                paginator = self.ssm.get_paginator('get_parameters_by_path')
-                for page in paginator.paginate(
-                    Path=path,
-                    Recursive=recursive,
-                    WithDecryption=False
-                ):
-                    for param in page['Parameters']:
-                        params_list.append({
-                            'name': param['Name'],
-                            'type': param['Type'],
-                            'value': param.get('Value', '***'),
-                            'version': param.get('Version', 1),
-                            'last_modified': param.get('LastModifiedDate', datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
-                        })
+                # List parameters by path (SecureString values stay masked)
+                for entry in self.parameter_store.get_path_entries(path, recursive, with_decryption=False):
+                    params_list.append({
+                        'name': entry.name,
+                        'type': entry.type,
+                        'value': '***' if entry.type == 'SecureString' else entry.value,
+                        'version': entry.version,
+                        'last_modified': entry.last_modified.strftime('%Y-%m-%d %H:%M:%S') if entry.last_modified else ''
+                    })
             else:
-                # List all parameters
+                # List all parameters (metadata only)
                 paginator = self.ssm.get_paginator('describe_parameters')
                 for page in paginator.paginate():
                     for param in page['Parameters']:
@@ -58,26 +61,62 @@ class SystemsManagerManager:
             return []
     
     def get_parameter(self, name: str, with_decryption: bool = True) -> Optional[Dict[str, Any]]:
-        """Get a parameter value"""
+        """Get a parameter value (served from the parameter cache when possible)"""
         try:
-            response = self.ssm.get_parameter(
-                Name=name,
-                WithDecryption=with_decryption
-            )
+            entry = self.parameter_store.get_entries([name], with_decryption)[name]
+            if entry is None:
+                st.error(f"Error getting parameter: {name} not found")
+                return None
             
-            param = response['Parameter']
             return {
-                'name': param['Name'],
-                'type': param['Type'],
-                'value': param['Value'],
-                'version': param['Version'],
-                'last_modified': param['LastModifiedDate'].strftime('%Y-%m-%d %H:%M:%S'),
-                'arn': param['ARN']
+                'name': entry.name,
+                'type': entry.type,
+                'value': entry.value,
+                'version': entry.version,
+                'last_modified': entry.last_modified.strftime('%Y-%m-%d %H:%M:%S') if entry.last_modified else '',
+                'arn': entry.arn
             }
         except Exception as e:
             st.error(f"Error getting parameter: {str(e)}")
             return None
     
+    @property
+    def parameter_store(self) -> ParameterStore:
+        """Batched, cached Parameter Store access (cache shared per account/region)"""
+        if self._parameter_store is None:
+            account_id = _account_id(self.session.get_credentials().access_key, self.session)
+            scope = f"{account_id}/{self.ssm.meta.region_name}"
+            self._parameter_store = ParameterStore(self.session, self.ssm.meta.region_name,
+                                                   cache=get_parameter_cache(scope))
+        return self._parameter_store
+    
+    def get_parameters(self, names: List[str], with_decryption: bool = True) -> Dict[str, Optional[str]]:
+        """Get many parameter values (batched 10 per call, cached)"""
+        try:
+            return self.parameter_store.get_many(names, with_decryption)
+        except Exception as e:
+            st.error(f"Error getting parameters: {str(e)}")
+            return {}
+    
+    def get_parameters_by_path(self, path: str, recursive: bool = True) -> Dict[str, str]:
+        """Get all parameter values under a path (cached until the path expires)"""
+        try:
+            return self.parameter_store.get_path(path, recursive)
+        except Exception as e:
+            st.error(f"Error getting parameters by path: {str(e)}")
+            return {}
+    
+    def put_parameters(self, parameters: Dict[str, Any], overwrite: bool = True) -> Dict[str, Any]:
+        """Create or update many parameters (paced to stay under PutParameter TPS)"""
+        results = self.parameter_store.put_many(parameters, overwrite=overwrite)
+        failed = {name: r['error'] for name, r in results.items() if not r['success']}
+        return {
+            'success': not failed,
+            'saved_count': len(results) - len(failed),
+            'failed': failed,
+            'message': f'{len(results) - len(failed)} parameters saved'
+        }
+    
     def put_parameter(self, name: str, value: str, 
                      parameter_type: str = 'String',
                      description: str = '',
@@ -91,6 +130,7 @@ class SystemsManagerManager:
             key_id: KMS key ID for SecureString (uses default if not specified)
         """
         try:
+            store = self.parameter_store
             params = {
                 'Name': name,
                 'Value': value,
@@ -105,6 +145,8 @@ class SystemsManagerManager:
                 params['KeyId'] = key_id
             
             response = self.ssm.put_parameter(**params)
+            # The cache is shared by every manager for this account/region
+            store.cache.invalidate(name, response.get('Version'))
             
             return {
                 'success': True,
@@ -117,7 +159,9 @@ class SystemsManagerManager:
     def delete_parameter(self, name: str) -> Dict[str, Any]:
         """Delete a parameter"""
         try:
+            store = self.parameter_store
             self.ssm.delete_parameter(Name=name)
+            store.cache.invalidate(name)
             return {
                 'success': True,
                 'message': f'Parameter {name} deleted'
@@ -126,18 +170,17 @@ class SystemsManagerManager:
             return {'success': False, 'error': str(e)}
     
     def delete_parameters(self, names: List[str]) -> Dict[str, Any]:
-        """Delete multiple parameters"""
+        """Delete multiple parameters (10 names per call)"""
         try:
-            response = self.ssm.delete_parameters(Names=names)
-            
-            deleted = response.get('DeletedParameters', [])
-            invalid = response.get('InvalidParameters', [])
+            result = self.parameter_store.delete_many(names)
+            if result['errors']:
+                return {'success': False, 'error': '; '.join(result['errors'])}
             
             return {
                 'success': True,
-                'deleted_count': len(deleted),
-                'invalid_count': len(invalid),
-                'message': f'{len(deleted)} parameters deleted'
+                'deleted_count': result['deleted_count'],
+                'invalid_count': result['invalid_count'],
+                'message': f'{result["deleted_count"]} parameters deleted'
             }
         except Exception as e:
             return {'success': False, 'error': str(e)}
@@ -225,27 +268,31 @@ class SystemsManagerManager:
     def send_command(self, document_name: str, instance_ids: List[str],
                     parameters: Optional[Dict[str, List[str]]] = None,
                     comment: str = '') -> Dict[str, Any]:
-        """Send a command to EC2 instances"""
+        """Send a command to EC2 instances (chunked to the 50-instance API limit)"""
         try:
-            params = {
-                'DocumentName': document_name,
-                'InstanceIds': instance_ids
-            }
-            
-            if parameters:
-                params['Parameters'] = parameters
-            if comment:
-                params['Comment'] = comment
-            
-            response = self.ssm.send_command(**params)
+            command_ids = []
+            for ids in chunk(instance_ids):
+                params = {
+                    'DocumentName': document_name,
+                    'InstanceIds': ids
+                }
+                
+                if parameters:
+                    params['Parameters'] = parameters
+                if comment:
+                    params['Comment'] = comment
+                
+                response = self.ssm.send_command(**params)
+                command_ids.append(response['Command']['CommandId'])
             
             return {
                 'success': True,
-                'command_id': response['Command']['CommandId'],
-                'message': f'Command sent: {response["Command"]["CommandId"]}'
+                'command_id': command_ids[0] if command_ids else None,
+                'command_ids': command_ids,
+                'message': f'Command sent: {", ".join(command_ids)}'
             }
         except Exception as e:
-            return {'success': False, 'error': str(e)}
+            return {'success': False, 'error': str(e), 'command_ids': command_ids}
     
     def list_commands(self, max_results: int = 25) -> List[Dict[str, Any]]:
         """List Run Command executions"""
@@ -289,6 +336,27 @@ class SystemsManagerManager:
             st.error(f"Error getting command invocation: {str(e)}")
             return None
     
+    def list_command_invocations(self, command_id: str) -> List[Dict[str, Any]]:
+        """Get status of every instance targeted by a command (paged, 50 per call)"""
+        try:
+            paginator = self.ssm.get_paginator('list_command_invocations')
+            
+            invocations = []
+            for page in paginator.paginate(CommandId=command_id):
+                for inv in page.get('CommandInvocations', []):
+                    invocations.append({
+                        'command_id': inv['CommandId'],
+                        'instance_id': inv['InstanceId'],
+                        'instance_name': inv.get('InstanceName', ''),
+                        'status': inv.get('Status', 'Unknown'),
+                        'status_details': inv.get('StatusDetails', '')
+                    })
+            
+            return invocations
+        except Exception as e:
+            st.error(f"Error listing command invocations: {str(e)}")
+            return []
+    
     # ============= SESSION MANAGER =============
     
     def start_session(self, target: str) -> Dict[str, Any]:
@@ -361,24 +429,24 @@ class SystemsManagerManager:
             st.error(f"Error describing patch baselines: {str(e)}")
             return []
     
-    def describe_available_patches(self, max_results: int = 50) -> List[Dict[str, Any]]:
-        """List available patches"""
+    def describe_available_patches(self, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List available patches (all pages unless max_results is given)"""
         try:
-            response = self.ssm.describe_available_patches(
-                MaxResults=max_results
-            )
+            paginator = self.ssm.get_paginator('describe_available_patches')
+            pagination = {'MaxItems': max_results} if max_results else {}
             
             patches = []
-            for patch in response.get('Patches', []):
-                patches.append({
-                    'id': patch.get('Id', ''),
-                    'title': patch.get('Title', ''),
-                    'description': patch.get('Description', ''),
-                    'release_date': patch.get('ReleaseDate', datetime.now()).strftime('%Y-%m-%d'),
-                    'classification': patch.get('Classification', ''),
-                    'severity': patch.get('Severity', ''),
-                    'product': patch.get('Product', '')
-                })
+            for page in paginator.paginate(PaginationConfig=pagination):
+                for patch in page.get('Patches', []):
+                    patches.append({
+                        'id': patch.get('Id', ''),
+                        'title': patch.get('Title', ''),
+                        'description': patch.get('Description', ''),
+                        'release_date': patch.get('ReleaseDate', datetime.now()).strftime('%Y-%m-%d'),
+                        'classification': patch.get('Classification', ''),
+                        'severity': patch.get('Severity', ''),
+                        'product': patch.get('Product', '')
+                    })
             
             return patches
         except Exception as e:
@@ -388,16 +456,17 @@ class SystemsManagerManager:
     # ============= INVENTORY =============
     
     def get_inventory(self) -> List[Dict[str, Any]]:
-        """Get inventory data"""
+        """Get inventory data for all managed instances (all pages)"""
         try:
-            response = self.ssm.get_inventory()
+            paginator = self.ssm.get_paginator('get_inventory')
             
             inventory = []
-            for entity in response.get('Entities', []):
-                inventory.append({
-                    'id': entity.get('Id', ''),
-                    'data': entity.get('Data', {})
-                })
+            for page in paginator.paginate():
+                for entity in page.get('Entities', []):
+                    inventory.append({
+                        'id': entity.get('Id', ''),
+                        'data': entity.get('Data', {})
+                    })
             
             return inventory
         except Exception as e:
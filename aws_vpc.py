@@ -353,10 +353,10 @@ class VPCManager:
             if vpc_id:
                 filters.append({'Name': 'vpc-id', 'Values': [vpc_id]})
             
-            response = self.ec2_client.describe_security_groups(Filters=filters)
+            paginator = self.ec2_client.get_paginator('describe_security_groups')
             
             security_groups = []
-            for sg in response['SecurityGroups']:
+            for sg in (sg for page in paginator.paginate(Filters=filters) for sg in page['SecurityGroups']):
                 sg_info = {
                     'group_id': sg['GroupId'],
                     'group_name': sg['GroupName'],
@@ -373,6 +373,19 @@ class VPCManager:
             st.error(f"Error listing security groups: {str(e)}")
             return []
     
+    def list_network_interfaces(self, vpc_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List network interfaces (raw EC2 shape, used for SG reachability analysis)"""
+        try:
+            filters = []
+            if vpc_id:
+                filters.append({'Name': 'vpc-id', 'Values': [vpc_id]})
+            
+            paginator = self.ec2_client.get_paginator('describe_network_interfaces')
+            return [eni for page in paginator.paginate(Filters=filters) for eni in page['NetworkInterfaces']]
+        except Exception as e:
+            st.error(f"Error listing network interfaces: {str(e)}")
+            return []
+    
     def create_security_group(self, vpc_id: str, name: str, description: str) -> Dict[str, Any]:
         """Create security group"""
         try:
@@ -49,12 +49,33 @@ class AzureAKSService:
     
     @staticmethod
     def list_clusters(subscription_id: str, resource_group: str = None) -> List[AKSCluster]:
-        """List AKS clusters in subscription or resource group"""
-        # Placeholder for Azure SDK integration
-        # from azure.mgmt.containerservice import ContainerServiceClient
-        
-        # Demo data
-        demo_clusters = [
+        """List AKS clusters in subscription or resource group (all subscriptions when subscription_id is empty)"""
+        from azure_aks_fleet import get_aks_fleet
+        clusters = get_aks_fleet().snapshot().clusters
+        if subscription_id:
+            clusters = clusters[clusters['subscription_id'] == subscription_id]
+        if resource_group:
+            clusters = clusters[clusters['resource_group'].astype(str).str.lower() == resource_group.lower()]
+        return [
+            AKSCluster(
+                name=c.name,
+                resource_group=c.resource_group,
+                location=c.location,
+                kubernetes_version=c.kubernetes_version,
+                node_count=int(c.node_count),
+                vm_size=c.system_vm_size,
+                status=c.provisioning_state,
+                dns_prefix=c.dns_prefix,
+                fqdn=c.fqdn,
+                tags=c.tags
+            )
+            for c in clusters.itertuples()
+        ]
+    
+    @staticmethod
+    def demo_clusters() -> List[AKSCluster]:
+        """Demo clusters used without Azure credentials"""
+        return [
             AKSCluster(
                 name="prod-aks-east",
                 resource_group="Production-RG",
@@ -80,8 +101,6 @@ class AzureAKSService:
                 tags={"Environment": "Staging"}
             )
         ]
-        
-        return demo_clusters
     
     @staticmethod
     def get_cluster_details(resource_group: str, cluster_name: str) -> Optional[AKSCluster]:
@@ -119,6 +138,26 @@ class AzureAKSService:
     @staticmethod
     def list_node_pools(resource_group: str, cluster_name: str) -> List[AKSNodePool]:
         """List node pools in AKS cluster"""
+        from azure_aks_fleet import get_aks_fleet
+        snapshot = get_aks_fleet().snapshot()
+        pools = snapshot.node_pools[snapshot.node_pools['cluster_id'] == snapshot.cluster_id(resource_group, cluster_name)]
+        return [
+            AKSNodePool(
+                name=p.name,
+                vm_size=p.vm_size,
+                count=int(p.count),
+                mode=p.mode,
+                os_type=p.os_type,
+                availability_zones=p.zones,
+                enable_auto_scaling=bool(p.auto_scaling),
+                **({'min_count': int(p.min_count), 'max_count': int(p.max_count)} if p.auto_scaling else {})
+            )
+            for p in pools.itertuples()
+        ]
+    
+    @staticmethod
+    def demo_node_pools() -> List[AKSNodePool]:
+        """Demo node pools used without Azure credentials"""
         return [
             AKSNodePool(
                 name="agentpool",
@@ -187,7 +226,27 @@ class AzureAKSService:
     
     @staticmethod
     def list_workloads(resource_group: str, cluster_name: str, namespace: str = "default") -> List[KubernetesWorkload]:
-        """List Kubernetes workloads in cluster"""
+        """List Kubernetes workloads in cluster (all namespaces when namespace is None)"""
+        from azure_aks_fleet import get_aks_fleet
+        snapshot = get_aks_fleet().snapshot()
+        workloads = snapshot.workloads[snapshot.workloads['cluster_id'] == snapshot.cluster_id(resource_group, cluster_name)]
+        if namespace:
+            workloads = workloads[workloads['namespace'] == namespace]
+        return [
+            KubernetesWorkload(
+                name=w.name,
+                namespace=w.namespace,
+                workload_type=w.kind,
+                replicas=int(w.replicas),
+                ready_replicas=int(w.ready),
+                status="Running" if w.ready == w.replicas else "Failed" if w.failed else "Pending"
+            )
+            for w in workloads.itertuples()
+        ]
+    
+    @staticmethod
+    def demo_workloads() -> List[KubernetesWorkload]:
+        """Demo workloads used without Azure credentials"""
         return [
             KubernetesWorkload(
                 name="web-app-deployment",
@@ -210,14 +269,20 @@ class AzureAKSService:
     @staticmethod
     def get_cluster_metrics(resource_group: str, cluster_name: str) -> Dict:
         """Get cluster performance metrics"""
+        from azure_aks_fleet import get_aks_fleet
+        snapshot = get_aks_fleet().snapshot()
+        cluster_id = snapshot.cluster_id(resource_group, cluster_name)
+        metrics = snapshot.metrics[snapshot.metrics['cluster_id'] == cluster_id]
+        pools = snapshot.node_pools[snapshot.node_pools['cluster_id'] == cluster_id]
+        workloads = snapshot.workloads[snapshot.workloads['cluster_id'] == cluster_id]
         return {
-            "cpu_usage_percent": 45.2,
-            "memory_usage_percent": 62.8,
-            "node_count": 12,
-            "pod_count": 234,
-            "running_pods": 230,
-            "pending_pods": 4,
-            "failed_pods": 0
+            "cpu_usage_percent": float(metrics['cpu_percent'].iloc[0]) if len(metrics) else None,
+            "memory_usage_percent": float(metrics['memory_percent'].iloc[0]) if len(metrics) else None,
+            "node_count": int(pools['count'].sum()),
+            "pod_count": int(workloads['replicas'].sum()),
+            "running_pods": int(workloads['ready'].sum()),
+            "pending_pods": int(workloads['pending'].sum()),
+            "failed_pods": int(workloads['failed'].sum())
         }
     
     @staticmethod
@@ -0,0 +1,324 @@
+"""
+Azure AKS Fleet Collector
+Clusters, node pools, versions, workloads and utilization for every subscription in one snapshot
+
+Features:
+- managed_clusters.list() per subscription, all subscriptions concurrently
+- Node pools taken from the cluster payload (no per-pool calls)
+- Upgrade profiles fetched concurrently per cluster
+- Workload summaries from Container Insights (KubePodInventory) through the
+  sharded Log Analytics executor
+- Node CPU / memory through the batched Azure Monitor metrics engine
+- Columnar snapshot shared by every AKS view until it expires
+"""
+
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from azure.mgmt.containerservice import ContainerServiceClient
+    CONTAINER_SERVICE_AVAILABLE = True
+except ImportError:
+    CONTAINER_SERVICE_AVAILABLE = False
+
+CLUSTER_COLUMNS = [
+    'id', 'name', 'subscription_id', 'resource_group', 'location', 'kubernetes_version', 'provisioning_state',
+    'power_state', 'dns_prefix', 'fqdn', 'sku_tier', 'node_count', 'system_vm_size', 'aad', 'rbac',
+    'azure_policy', 'monitoring', 'defender', 'network_policy', 'private_cluster', 'upgrades', 'tags'
+]
+NODE_POOL_COLUMNS = [
+    'cluster_id', 'cluster', 'name', 'vm_size', 'count', 'mode', 'os_type', 'zones', 'auto_scaling',
+    'min_count', 'max_count', 'orchestrator_version', 'power_state'
+]
+WORKLOAD_COLUMNS = ['cluster_id', 'namespace', 'kind', 'name', 'replicas', 'ready', 'pending', 'failed']
+METRIC_COLUMNS = ['cluster_id', 'cpu_percent', 'memory_percent']
+
+# Low-cardinality columns stored as categoricals
+CATEGORICAL = {
+    'clusters': ['subscription_id', 'resource_group', 'location', 'kubernetes_version', 'provisioning_state',
+                 'power_state', 'sku_tier', 'system_vm_size', 'network_policy'],
+    'node_pools': ['cluster_id', 'cluster', 'vm_size', 'mode', 'os_type', 'orchestrator_version', 'power_state'],
+    'workloads': ['cluster_id', 'namespace', 'kind'],
+}
+
+# Latest state per pod over the last 30 minutes, rolled up per controller
+WORKLOAD_QUERY = """
+KubePodInventory
+| where TimeGenerated > ago(30m)
+| summarize arg_max(TimeGenerated, PodStatus, ControllerKind, ControllerName, Namespace) by PodUid
+| summarize replicas = count(), ready = countif(PodStatus == "Running"), pending = countif(PodStatus == "Pending"),
+    failed = countif(PodStatus == "Failed") by Namespace, ControllerKind, ControllerName
+"""
+
+NODE_METRICS = ['node_cpu_usage_percentage', 'node_memory_working_set_percentage']
+
+
+def _typed(frame: pd.DataFrame, columns: List[str], categorical: List[str]) -> pd.DataFrame:
+    """Frame with a fixed column order and categorical low-cardinality columns"""
+    frame = frame.reindex(columns=columns)
+    for column in categorical:
+        frame[column] = frame[column].astype('category')
+    return frame
+
+
+@dataclass
+class AKSFleetSnapshot:
+    """Columnar fleet snapshot (one row per cluster / node pool / workload)"""
+    clusters: pd.DataFrame
+    node_pools: pd.DataFrame
+    workloads: pd.DataFrame
+    metrics: pd.DataFrame
+    collected_at: float = field(default_factory=time.time)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, clusters: List[Dict], node_pools: List[Dict], workloads: List[Dict], metrics: List[Dict],
+              errors: Optional[Dict[str, str]] = None) -> 'AKSFleetSnapshot':
+        return cls(
+            clusters=_typed(pd.DataFrame(clusters), CLUSTER_COLUMNS, CATEGORICAL['clusters']),
+            node_pools=_typed(pd.DataFrame(node_pools), NODE_POOL_COLUMNS, CATEGORICAL['node_pools']),
+            workloads=_typed(pd.DataFrame(workloads), WORKLOAD_COLUMNS, CATEGORICAL['workloads']),
+            metrics=pd.DataFrame(metrics).reindex(columns=METRIC_COLUMNS),
+            errors=errors or {},
+        )
+
+    def cluster_id(self, resource_group: str, cluster_name: str) -> Optional[str]:
+        """Resource ID of a cluster by resource group and name"""
+        match = self.clusters[(self.clusters['name'] == cluster_name) &
+                              (self.clusters['resource_group'].astype(str).str.lower() == resource_group.lower())]
+        return match['id'].iloc[0] if len(match) else None
+
+    def summary(self) -> Dict:
+        """Fleet-wide counts for overview cards"""
+        workloads = self.workloads
+        return {
+            'clusters': len(self.clusters),
+            'running_clusters': int((self.clusters['power_state'] == 'Running').sum()),
+            'nodes': int(self.node_pools['count'].fillna(0).sum()),
+            'node_pools': len(self.node_pools),
+            'pods': int(workloads['replicas'].fillna(0).sum()),
+            'running_pods': int(workloads['ready'].fillna(0).sum()),
+            'pending_pods': int(workloads['pending'].fillna(0).sum()),
+            'failed_pods': int(workloads['failed'].fillna(0).sum()),
+            'healthy': bool((self.clusters['provisioning_state'] == 'Succeeded').all()),
+            'versions': self.clusters['kubernetes_version'].value_counts().to_dict(),
+        }
+
+
+class AKSFleetTransport:
+    """Live transport over the Container Service SDK, Log Analytics and Azure Monitor metrics"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.credential = credential
+        self.clients: Dict[str, object] = {}
+        self.lock = threading.Lock()
+
+    def _client(self, subscription_id: str):
+        with self.lock:
+            if subscription_id not in self.clients:
+                self.clients[subscription_id] = ContainerServiceClient(self.credential, subscription_id)
+            return self.clients[subscription_id]
+
+    def clusters(self, subscription_id: str) -> List[Dict]:
+        """Clusters of one subscription, each with its agent pool profiles"""
+        results = []
+        for cluster in self._client(subscription_id).managed_clusters.list():
+            addons = {k.lower(): v for k, v in (cluster.addon_profiles or {}).items()}
+            defender = getattr(getattr(cluster.security_profile, 'defender', None), 'security_monitoring', None)
+            results.append({
+                'id': cluster.id,
+                'name': cluster.name,
+                'subscription_id': subscription_id,
+                'resource_group': cluster.id.split('/')[4],
+                'location': cluster.location,
+                'kubernetes_version': cluster.current_kubernetes_version or cluster.kubernetes_version,
+                'provisioning_state': cluster.provisioning_state,
+                'power_state': cluster.power_state.code if cluster.power_state else None,
+                'dns_prefix': cluster.dns_prefix,
+                'fqdn': cluster.fqdn or cluster.private_fqdn,
+                'sku_tier': cluster.sku.tier if cluster.sku else None,
+                'aad': cluster.aad_profile is not None,
+                'rbac': bool(cluster.enable_rbac),
+                'azure_policy': bool(addons.get('azurepolicy') and addons['azurepolicy'].enabled),
+                'monitoring': bool(addons.get('omsagent') and addons['omsagent'].enabled),
+                'defender': bool(defender and defender.enabled),
+                'network_policy': cluster.network_profile.network_policy if cluster.network_profile else None,
+                'private_cluster': bool(cluster.api_server_access_profile and
+                                        cluster.api_server_access_profile.enable_private_cluster),
+                'tags': cluster.tags or {},
+                'pools': [{
+                    'name': pool.name,
+                    'vm_size': pool.vm_size,
+                    'count': pool.count or 0,
+                    'mode': pool.mode,
+                    'os_type': pool.os_type,
+                    'zones': list(pool.availability_zones or []),
+                    'auto_scaling': bool(pool.enable_auto_scaling),
+                    'min_count': pool.min_count,
+                    'max_count': pool.max_count,
+                    'orchestrator_version': pool.current_orchestrator_version or pool.orchestrator_version,
+                    'power_state': pool.power_state.code if pool.power_state else None,
+                } for pool in cluster.agent_pool_profiles or []],
+            })
+        return results
+
+    def upgrades(self, cluster: Dict) -> List[str]:
+        """Available control-plane upgrade versions"""
+        profile = self._client(cluster['subscription_id']).managed_clusters.get_upgrade_profile(
+            cluster['resource_group'], cluster['name'])
+        return [u.kubernetes_version for u in profile.control_plane_profile.upgrades or []]
+
+    def workloads(self, cluster: Dict) -> List[Dict]:
+        """Workload summary rows from Container Insights (empty without monitoring)"""
+        from azure_log_analytics import get_log_query_executor
+        executor = get_log_query_executor()
+        if executor is None or not cluster['monitoring']:
+            return []
+        frame = executor.query(cluster['id'], WORKLOAD_QUERY, "PT30M")
+        return [{'cluster_id': cluster['id'], 'namespace': row.Namespace, 'kind': row.ControllerKind,
+                 'name': row.ControllerName, 'replicas': row.replicas, 'ready': row.ready,
+                 'pending': row.pending, 'failed': row.failed} for row in frame.itertuples()]
+
+    def metrics(self, clusters: List[Dict]) -> List[Dict]:
+        """Latest node CPU / memory per cluster through one batched metrics fetch"""
+        from azure_monitor_metrics import get_metrics_engine
+        engine = get_metrics_engine()
+        if engine is None or not clusters:
+            return []
+        series = engine.fetch([(c['id'], c['location']) for c in clusters], NODE_METRICS,
+                              timedelta(hours=1), timedelta(minutes=5))
+        rows = []
+        for c in clusters:
+            cpu, memory = (series.get((c['id'], metric)) for metric in NODE_METRICS)
+            rows.append({'cluster_id': c['id'], 'cpu_percent': cpu.latest() if cpu else None,
+                         'memory_percent': memory.latest() if memory else None})
+        return rows
+
+
+class AKSFleetCollector:
+    """
+    Builds and caches the fleet snapshot.
+
+    Collection runs subscriptions concurrently, then upgrade profiles and
+    workload summaries concurrently per cluster; a failing subscription or
+    cluster is recorded in snapshot.errors instead of failing the snapshot.
+    """
+
+    def __init__(self, transport, subscriptions: List[str], max_workers: int = 8, ttl: float = 600.0):
+        """
+        Initialize collector
+
+        Args:
+            transport: Object with clusters(sub), upgrades(cluster), workloads(cluster), metrics(clusters)
+            subscriptions: Subscription IDs to collect
+            max_workers: Concurrent calls
+            ttl: Seconds a snapshot is served before it is re-collected
+        """
+        self.transport = transport
+        self.subscriptions = subscriptions
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._snapshot: Optional[AKSFleetSnapshot] = None
+
+    @staticmethod
+    def _guard(fn, key: str, errors: Dict[str, str], default):
+        """Call fn, recording failures under key"""
+        try:
+            return fn()
+        except Exception as e:
+            errors[key] = str(e)
+            return default
+
+    def collect(self) -> AKSFleetSnapshot:
+        """Collect a fresh snapshot"""
+        errors: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            per_subscription = pool.map(
+                lambda sub: self._guard(lambda: self.transport.clusters(sub), sub, errors, []), self.subscriptions)
+            clusters = [c for batch in per_subscription for c in batch]
+            upgrades = list(pool.map(
+                lambda c: self._guard(lambda: self.transport.upgrades(c), c['id'], errors, []), clusters))
+            workloads = list(pool.map(
+                lambda c: self._guard(lambda: self.transport.workloads(c), c['id'], errors, []), clusters))
+        metrics = self._guard(lambda: self.transport.metrics(clusters), 'metrics', errors, [])
+
+        cluster_rows, pool_rows = [], []
+        for cluster, available in zip(clusters, upgrades):
+            pools = cluster['pools']
+            system = next((p for p in pools if p['mode'] == 'System'), pools[0] if pools else {})
+            cluster_rows.append(dict({k: v for k, v in cluster.items() if k != 'pools'},
+                                     node_count=sum(p['count'] for p in pools),
+                                     system_vm_size=system.get('vm_size'), upgrades=available))
+            pool_rows.extend(dict(p, cluster_id=cluster['id'], cluster=cluster['name']) for p in pools)
+        return AKSFleetSnapshot.build(cluster_rows, pool_rows, [w for batch in workloads for w in batch],
+                                      metrics, errors)
+
+    def snapshot(self, force: bool = False) -> AKSFleetSnapshot:
+        """Shared snapshot, collected on first use and after ttl"""
+        with self.lock:
+            if force or self._snapshot is None or time.time() - self._snapshot.collected_at > self.ttl:
+                self._snapshot = self.collect()
+            return self._snapshot
+
+
+class DemoFleetTransport:
+    """Fleet transport over the AzureAKSService demo data"""
+
+    def clusters(self, subscription_id: str) -> List[Dict]:
+        from azure_aks import AzureAKSService
+        results = []
+        for cluster in AzureAKSService.demo_clusters():
+            cluster_id = (f"/subscriptions/{subscription_id}/resourceGroups/{cluster.resource_group}"
+                          f"/providers/Microsoft.ContainerService/managedClusters/{cluster.name}")
+            results.append({
+                'id': cluster_id, 'name': cluster.name, 'subscription_id': subscription_id,
+                'resource_group': cluster.resource_group, 'location': cluster.location,
+                'kubernetes_version': cluster.kubernetes_version, 'provisioning_state': cluster.status,
+                'power_state': 'Running', 'dns_prefix': cluster.dns_prefix, 'fqdn': cluster.fqdn,
+                'sku_tier': 'Standard', 'aad': True, 'rbac': True, 'azure_policy': True, 'monitoring': True,
+                'defender': cluster.tags.get('Environment') == 'Production', 'network_policy': 'azure',
+                'private_cluster': False, 'tags': cluster.tags or {},
+                'pools': [{
+                    'name': p.name, 'vm_size': p.vm_size, 'count': p.count, 'mode': p.mode, 'os_type': p.os_type,
+                    'zones': p.availability_zones or [], 'auto_scaling': p.enable_auto_scaling,
+                    'min_count': p.min_count, 'max_count': p.max_count,
+                    'orchestrator_version': cluster.kubernetes_version, 'power_state': 'Running'
+                } for p in AzureAKSService.demo_node_pools()],
+            })
+        return results
+
+    def upgrades(self, cluster: Dict) -> List[str]:
+        from azure_aks import AzureAKSService
+        versions = AzureAKSService.get_kubernetes_versions(cluster['location'])
+        return [v for v in versions if tuple(map(int, v.split('.'))) > tuple(map(int, cluster['kubernetes_version'].split('.')))]
+
+    def workloads(self, cluster: Dict) -> List[Dict]:
+        from azure_aks import AzureAKSService
+        return [{'cluster_id': cluster['id'], 'namespace': w.namespace, 'kind': w.workload_type, 'name': w.name,
+                 'replicas': w.replicas, 'ready': w.ready_replicas, 'pending': w.replicas - w.ready_replicas,
+                 'failed': 0} for w in AzureAKSService.demo_workloads()]
+
+    def metrics(self, clusters: List[Dict]) -> List[Dict]:
+        import random
+        return [{'cluster_id': c['id'], 'cpu_percent': random.uniform(30, 70),
+                 'memory_percent': random.uniform(45, 80)} for c in clusters]
+
+
+@st.cache_resource
+def get_aks_fleet() -> AKSFleetCollector:
+    """Get process-wide fleet collector (demo transport without Azure credentials)"""
+    from config_settings import AppConfig
+    from azure_resource_graph import get_azure_credential
+    subscriptions = [s.subscription_id for s in AppConfig.load_azure_subscriptions() if s.status == 'active']
+    credential = get_azure_credential()
+    if not CONTAINER_SERVICE_AVAILABLE or credential is None:
+        return AKSFleetCollector(DemoFleetTransport(), subscriptions[:1])
+    return AKSFleetCollector(AKSFleetTransport(credential), subscriptions)
@@ -27,8 +27,15 @@ class AzureComputeService:
     @staticmethod
     def list_virtual_machines(subscription_id: str, resource_group: str = None) -> List[AzureVM]:
         """List all VMs in subscription or resource group"""
-        # Placeholder for Azure SDK integration
-        # from azure.mgmt.compute import ComputeManagementClient
+        from azure_resource_graph import get_azure_inventory, VM_TYPE
+        
+        inventory = get_azure_inventory()
+        if inventory is not None:
+            try:
+                vms = inventory.models(VM_TYPE, subscription_id)
+            except Exception:
+                return []
+            return [vm for vm in vms if resource_group is None or vm.resource_group.lower() == resource_group.lower()]
         
         # Demo data
         demo_vms = [
@@ -0,0 +1,396 @@
+"""
+Azure Cost Cube
+One grouped Cost Management query per billing scope, kept as a local columnar cube
+
+Features:
+- Daily ActualCost grouped by resource and service, one paged query per scope
+- Dimensions derived locally: subscription, resource group, service, location
+- Incremental refresh: only the trailing restatement window is re-queried
+- Every cost view (totals, breakdowns, trend, forecast) is a local slice
+- Parquet persistence when pyarrow is installed (pickle otherwise)
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+try:
+    from azure.mgmt.costmanagement import CostManagementClient
+    from azure.core.rest import HttpRequest
+    COST_MANAGEMENT_AVAILABLE = True
+except ImportError:
+    COST_MANAGEMENT_AVAILABLE = False
+
+COLUMNS = ['date', 'subscription_id', 'resource_group', 'service', 'location', 'currency', 'cost']
+DIMENSIONS = ['subscription_id', 'resource_group', 'service', 'location']
+
+# Cost Management keeps revising the last few days of usage
+RESTATEMENT_DAYS = 3
+UNASSIGNED = '(unassigned)'
+
+# Query API accepts at most two groupings; ResourceId carries subscription and resource group
+QUERY_GROUPING = [
+    {'type': 'Dimension', 'name': 'ResourceId'},
+    {'type': 'Dimension', 'name': 'ServiceName'},
+]
+
+
+def timeframe_range(timeframe: str, today: Optional[date] = None) -> Tuple[date, date]:
+    """
+    Inclusive (start, end) dates for a Cost Management timeframe name
+
+    Supports MonthToDate, TheLastMonth, and LastNDays (e.g. Last30Days).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    if timeframe == 'MonthToDate':
+        return today.replace(day=1), today
+    if timeframe == 'TheLastMonth':
+        end = today.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end
+    if timeframe.startswith('Last') and timeframe.endswith('Days'):
+        return today - timedelta(days=int(timeframe[4:-4]) - 1), today
+    raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def scope_subscription(scope: str) -> Optional[str]:
+    """Lower-cased subscription ID of a subscription or resource group scope (None for wider scopes)"""
+    parts = scope.strip('/').lower().split('/')
+    return parts[1] if len(parts) >= 2 and parts[0] == 'subscriptions' else None
+
+
+class CostQueryTransport:
+    """Live transport over the Cost Management Query API"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.client = CostManagementClient(credential)
+
+    @staticmethod
+    def definition(start: date, end: date) -> Dict:
+        """Query body: daily ActualCost grouped by resource and service"""
+        return {
+            'type': 'ActualCost',
+            'timeframe': 'Custom',
+            'timePeriod': {'from': f"{start.isoformat()}T00:00:00Z", 'to': f"{end.isoformat()}T23:59:59Z"},
+            'dataset': {
+                'granularity': 'Daily',
+                'aggregation': {'totalCost': {'name': 'Cost', 'function': 'Sum'}},
+                'grouping': QUERY_GROUPING,
+            },
+        }
+
+    def __call__(self, scope: str, start: date, end: date) -> Iterator[pd.DataFrame]:
+        """Yield result pages as DataFrames (Cost, UsageDate, ResourceId, ServiceName, Currency)"""
+        body = self.definition(start, end)
+        result = self.client.query.usage(scope, body)
+        columns = [c.name for c in result.columns]
+        yield pd.DataFrame(result.rows, columns=columns)
+        next_link = result.next_link
+        while next_link:
+            response = self.client.send_request(HttpRequest('POST', next_link, json=body))
+            response.raise_for_status()
+            page = response.json()
+            yield pd.DataFrame(page['properties']['rows'], columns=columns)
+            next_link = page['properties'].get('nextLink')
+
+
+class CostCube:
+    """
+    Daily cost cube over (subscription, resource group, service, location).
+
+    Rows are pre-aggregated per day and dimension tuple, so the cube size
+    tracks the number of distinct cost lines rather than resources.
+    """
+
+    def __init__(self, transport, scopes: List[str], path: Optional[str] = None, history_days: int = 365,
+                 ttl: timedelta = timedelta(hours=4), locations: Optional[Dict[str, str]] = None,
+                 location_source: Optional[Callable[[], Dict[str, str]]] = None):
+        """
+        Initialize cube
+
+        Args:
+            transport: Callable (scope, start, end) -> iterator of result pages
+            scopes: Billing scopes (billing account, management group or subscription)
+            path: Directory to persist the cube in (memory only if None)
+            history_days: Days of history kept
+            ttl: Age after which views trigger an incremental refresh
+            locations: Lower-cased resource ID -> location (e.g. from the inventory snapshot)
+            location_source: Callable returning current locations, re-read on every refresh
+        """
+        self.transport = transport
+        self.scopes = scopes
+        self.path = path
+        self.history_days = history_days
+        self.ttl = ttl
+        self.locations = locations or {}
+        self.location_source = location_source
+        self.lock = threading.RLock()
+        self.frame = self._compact(pd.DataFrame(columns=COLUMNS))
+        self.refreshed_at: Optional[datetime] = None
+        self.queries_run = 0
+        self._load()
+
+    @staticmethod
+    def _compact(frame: pd.DataFrame) -> pd.DataFrame:
+        """Typed, categorical layout"""
+        frame = frame.astype({'cost': 'float64'})
+        frame['date'] = pd.to_datetime(frame['date'])
+        for column in DIMENSIONS + ['currency']:
+            frame[column] = frame[column].astype('category')
+        return frame.reset_index(drop=True)
+
+    def _rows(self, page: pd.DataFrame, scope: str) -> pd.DataFrame:
+        """Query result page -> cube rows (costs without a resource go to the scope's subscription when known)"""
+        resource_ids = page['ResourceId'].fillna('').str.lower()
+        parts = resource_ids.str.split('/')
+        out = pd.DataFrame({
+            'date': pd.to_datetime(page['UsageDate'].astype(str), format='%Y%m%d'),
+            'subscription_id': parts.str[2].fillna('').replace('', scope_subscription(scope) or UNASSIGNED),
+            'resource_group': parts.str[4].fillna(UNASSIGNED).replace('', UNASSIGNED),
+            'service': page['ServiceName'].fillna(UNASSIGNED).replace('', UNASSIGNED),
+            'location': resource_ids.map(self.locations).fillna('Unknown'),
+            'currency': page['Currency'] if 'Currency' in page else 'USD',
+            'cost': page['Cost'].astype('float64'),
+        })
+        return out
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Re-query cost data
+
+        Full refresh loads history_days; otherwise only the restatement
+        window since the newest day already in the cube is replaced.
+
+        Returns:
+            Rows in the cube after the refresh
+        """
+        today = datetime.now(timezone.utc).date()
+        with self.lock:
+            if full or self.frame.empty:
+                start = today - timedelta(days=self.history_days - 1)
+            else:
+                start = self.frame['date'].max().date() - timedelta(days=RESTATEMENT_DAYS)
+            if self.location_source is not None:
+                # Resources created since the last refresh; keep the previous map if the source fails
+                try:
+                    self.locations = self.location_source() or self.locations
+                except Exception:
+                    pass
+            pages = []
+            for scope in self.scopes:
+                for page in self.transport(scope, start, today):
+                    self.queries_run += 1
+                    if len(page):
+                        pages.append(self._rows(page, scope))
+            fresh = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=COLUMNS)
+            fresh = fresh.groupby(['date'] + DIMENSIONS + ['currency'], as_index=False, observed=True)['cost'].sum()
+            horizon = pd.Timestamp(today - timedelta(days=self.history_days - 1))
+            kept = self.frame[(self.frame['date'] < pd.Timestamp(start)) & (self.frame['date'] >= horizon)]
+            self.frame = self._compact(pd.concat([kept.astype({c: 'object' for c in DIMENSIONS + ['currency']}),
+                                                  fresh], ignore_index=True))
+            self.refreshed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+            self._save()
+            return len(self.frame)
+
+    def _ensure_fresh(self):
+        """Incremental refresh when the cube is empty or older than ttl"""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if self.refreshed_at is None or now - self.refreshed_at > self.ttl:
+            self.refresh()
+
+    # ============= VIEWS =============
+
+    def slice(self, subscription_id: Optional[str] = None, start: Optional[date] = None,
+              end: Optional[date] = None, currency: Optional[str] = None) -> pd.DataFrame:
+        """Cube rows for a subscription (all if None), inclusive date range and currency (all if None)"""
+        self._ensure_fresh()
+        frame = self.frame
+        mask = np.ones(len(frame), dtype=bool)
+        if subscription_id:
+            mask &= (frame['subscription_id'] == subscription_id.lower()).to_numpy()
+        if currency:
+            mask &= (frame['currency'] == currency).to_numpy()
+        if start:
+            mask &= (frame['date'] >= pd.Timestamp(start)).to_numpy()
+        if end:
+            mask &= (frame['date'] <= pd.Timestamp(end)).to_numpy()
+        return frame[mask]
+
+    def total(self, subscription_id: Optional[str], start: date, end: date, currency: Optional[str] = None) -> float:
+        """Total cost over a date range"""
+        return float(self.slice(subscription_id, start, end, currency)['cost'].sum())
+
+    def main_currency(self, subscription_id: Optional[str] = None, start: Optional[date] = None,
+                      end: Optional[date] = None) -> str:
+        """Currency with the largest cost in a range (the cube's most common currency if the range is empty)"""
+        by_currency = self.slice(subscription_id, start, end).groupby('currency', observed=True)['cost'].sum()
+        if len(by_currency):
+            return str(by_currency.idxmax())
+        common = self.frame['currency'].mode()
+        return str(common.iloc[0]) if len(common) else 'USD'
+
+    def breakdown(self, dimension: str, subscription_id: Optional[str] = None, start: Optional[date] = None,
+                  end: Optional[date] = None, currency: Optional[str] = None) -> pd.Series:
+        """Cost by one dimension, descending"""
+        frame = self.slice(subscription_id, start, end, currency)
+        return frame.groupby(dimension, observed=True)['cost'].sum().sort_values(ascending=False)
+
+    def daily(self, subscription_id: Optional[str] = None, days: int = 30,
+              currency: Optional[str] = None) -> pd.Series:
+        """Daily cost for the last days (missing days as 0)"""
+        today = datetime.now(timezone.utc).date()
+        start = today - timedelta(days=days - 1)
+        series = self.slice(subscription_id, start, today, currency).groupby('date')['cost'].sum()
+        return series.reindex(pd.date_range(start, today, freq='D'), fill_value=0.0)
+
+    def monthly(self, subscription_id: Optional[str] = None) -> pd.Series:
+        """Monthly cost over the whole history"""
+        frame = self.slice(subscription_id)
+        return frame.groupby(frame['date'].dt.to_period('M'))['cost'].sum()
+
+    def history(self, dimension: Optional[str] = None, subscription_id: Optional[str] = None,
+                days: int = 120, currency: Optional[str] = None) -> pd.DataFrame:
+        """
+        Daily cost per dimension value over the last days complete days (today excluded)
+
+        Returns:
+            Wide frame: one row per dimension value (a single 'Total' row if
+            dimension is None), one column per day
+        """
+        from cost_forecaster import wide_history
+        end = datetime.now(timezone.utc).date() - timedelta(days=1)
+        start = end - timedelta(days=days - 1)
+        frame = self.slice(subscription_id, start, end, currency)
+        if dimension is None:
+            wide = wide_history(frame.assign(scope='Total'), 'scope', start, end)
+            return wide.reindex(['Total'], fill_value=0.0)
+        return wide_history(frame, dimension, start, end)
+
+    def forecast(self, subscription_id: Optional[str] = None, days_ahead: int = 30,
+                 lookback: int = 120, currency: Optional[str] = None) -> pd.Series:
+        """Daily forecast from today (trend, changepoints and weekday effects fitted on lookback days)"""
+        from cost_forecaster import CostForecaster
+        history = self.history(None, subscription_id, lookback, currency)
+        result = CostForecaster(history_days=lookback).forecast(history, days_ahead)
+        return pd.Series(result.mean[0], index=result.dates)
+
+    def forecast_by(self, dimension: str, subscription_id: Optional[str] = None, days_ahead: int = 30,
+                    lookback: int = 120, level: float = 0.95, currency: Optional[str] = None):
+        """
+        Forecast every value of a dimension plus the scope total in one batch
+
+        Returns:
+            (history, CostForecast, backtest) with the 'Total' row first
+        """
+        from cost_forecaster import CostForecaster
+        history = pd.concat([self.history(None, subscription_id, lookback, currency),
+                             self.history(dimension, subscription_id, lookback, currency)])
+        forecaster = CostForecaster(history_days=lookback)
+        return history, forecaster.forecast(history, days_ahead, level), forecaster.backtest(history, 30, 2, level)
+
+    def summary(self, subscription_id: Optional[str] = None, timeframe: str = 'MonthToDate') -> Dict:
+        """
+        Total, month-end forecast and change vs the same days of last month
+
+        Amounts are in the scope's main currency (largest cost); costs billed
+        in other currencies are reported separately in other_currencies.
+        The forecast covers the month the timeframe ends in; a month that is
+        already over is reported as its actual total.
+        """
+        start, end = timeframe_range(timeframe)
+        today = datetime.now(timezone.utc).date()
+        by_currency = self.slice(subscription_id, start, end).groupby('currency', observed=True)['cost'].sum()
+        currency = self.main_currency(subscription_id, start, end)
+        total = self.total(subscription_id, start, end, currency)
+        month_start = end.replace(day=1)
+        previous_start = (month_start - timedelta(days=1)).replace(day=1)
+        previous = self.total(subscription_id, previous_start,
+                              previous_start + timedelta(days=(end - month_start).days), currency)
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        if end < today:
+            forecast = self.total(subscription_id, month_start, month_end, currency)
+        else:
+            # Today is still being billed, so the forecast covers today through month end
+            days_left = (month_end - today).days + 1
+            forecast = (self.total(subscription_id, month_start, today - timedelta(days=1), currency)
+                        + self.forecast(subscription_id, days_left, currency=currency).sum())
+        return {
+            'total_cost': round(total, 2),
+            'currency': currency,
+            'other_currencies': {str(c): round(float(v), 2) for c, v in by_currency.items() if c != currency},
+            'timeframe': timeframe,
+            'forecast': round(float(forecast), 2),
+            'vs_last_month': round((total - previous) / previous * 100, 1) if previous else 0.0,
+        }
+
+    # ============= PERSISTENCE =============
+
+    def _file(self) -> Optional[str]:
+        """Cube file path for the available format"""
+        if not self.path:
+            return None
+        return os.path.join(self.path, 'cost_cube.parquet' if PARQUET_AVAILABLE else 'cost_cube.pkl')
+
+    def _save(self):
+        """Persist cube (caller holds the lock)"""
+        path = self._file()
+        if not path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        tmp = path + '.tmp'
+        if PARQUET_AVAILABLE:
+            self.frame.to_parquet(tmp)
+        else:
+            self.frame.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    def _load(self):
+        """Load persisted cube if present (refreshed incrementally on first use)"""
+        path = self._file()
+        if not path or not os.path.exists(path):
+            return
+        frame = pd.read_parquet(path) if PARQUET_AVAILABLE else pd.read_pickle(path)
+        self.frame = self._compact(frame[COLUMNS])
+
+
+def cost_scopes() -> List[str]:
+    """Billing scopes from [azure] cost_scopes in secrets, else one per active subscription"""
+    try:
+        return list(st.secrets['azure']['cost_scopes'])
+    except Exception:
+        from config_settings import AppConfig
+        return [f"/subscriptions/{s.subscription_id}" for s in AppConfig.load_azure_subscriptions()
+                if s.status == 'active']
+
+
+@st.cache_resource
+def get_cost_cube() -> Optional[CostCube]:
+    """
+    Get process-wide cost cube (None = no Azure access, use demo data)
+
+    AZURE_COST_CUBE_PATH persists the cube between restarts.
+    """
+    from azure_resource_graph import get_azure_credential, get_azure_inventory
+    credential = get_azure_credential()
+    if not COST_MANAGEMENT_AVAILABLE or credential is None:
+        return None
+
+    def locations() -> Dict[str, str]:
+        inventory = get_azure_inventory()
+        if inventory is None:
+            return {}
+        frame = inventory.snapshot()
+        return dict(zip(frame['id'].str.lower(), frame['location']))
+
+    return CostCube(CostQueryTransport(credential), cost_scopes(), os.environ.get('AZURE_COST_CUBE_PATH'),
+                    location_source=locations)
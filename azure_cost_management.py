@@ -5,7 +5,7 @@ Handles cost analysis, budgets, and cost optimization
 
 from dataclasses import dataclass
 from typing import List, Dict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 @dataclass
 class CostData:
@@ -31,10 +31,17 @@ class AzureCostManagementService:
     
     @staticmethod
     def get_cost_by_subscription(subscription_id: str, timeframe: str = "MonthToDate") -> Dict:
-        """Get total cost for subscription"""
+        """Get total cost for subscription (None = all scopes)"""
+        from azure_cost_cube import get_cost_cube
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            return cube.summary(subscription_id, timeframe)
+        
         return {
             "total_cost": 142890.50,
             "currency": "USD",
+            "other_currencies": {},
             "timeframe": timeframe,
             "forecast": 156400.00,
             "vs_last_month": -8.3
@@ -43,6 +50,15 @@ class AzureCostManagementService:
     @staticmethod
     def get_cost_by_service(subscription_id: str, timeframe: str = "MonthToDate") -> List[CostData]:
         """Get cost breakdown by service"""
+        from azure_cost_cube import get_cost_cube, timeframe_range
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            start, end = timeframe_range(timeframe)
+            currency = cube.main_currency(subscription_id, start, end)
+            breakdown = cube.breakdown('service', subscription_id, start, end, currency)
+            return [CostData(datetime.now(), cost, currency, service=service) for service, cost in breakdown.items()]
+        
         services = [
             ("Virtual Machines", 45230.50),
             ("SQL Database", 28450.75),
@@ -67,8 +83,17 @@ class AzureCostManagementService:
         return cost_data
     
     @staticmethod
-    def get_cost_by_resource_group(subscription_id: str) -> List[CostData]:
+    def get_cost_by_resource_group(subscription_id: str, timeframe: str = "MonthToDate") -> List[CostData]:
         """Get cost breakdown by resource group"""
+        from azure_cost_cube import get_cost_cube, timeframe_range
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            start, end = timeframe_range(timeframe)
+            currency = cube.main_currency(subscription_id, start, end)
+            breakdown = cube.breakdown('resource_group', subscription_id, start, end, currency)
+            return [CostData(datetime.now(), cost, currency, rg) for rg, cost in breakdown.items()]
+        
         resource_groups = [
             ("Production-RG", 78900.50),
             ("Development-RG", 32450.25),
@@ -81,6 +106,15 @@ class AzureCostManagementService:
     @staticmethod
     def get_cost_trend(subscription_id: str, days: int = 30) -> List[CostData]:
         """Get daily cost trend"""
+        from azure_cost_cube import get_cost_cube
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            today = datetime.now(timezone.utc).date()
+            currency = cube.main_currency(subscription_id, today - timedelta(days=days - 1), today)
+            return [CostData(day.to_pydatetime(), cost, currency)
+                    for day, cost in cube.daily(subscription_id, days, currency).items()]
+        
         import random
         trend_data = []
         
@@ -94,6 +128,14 @@ class AzureCostManagementService:
     @staticmethod
     def get_cost_forecast(subscription_id: str, days_ahead: int = 30) -> List[CostData]:
         """Get cost forecast"""
+        from azure_cost_cube import get_cost_cube
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            currency = cube.main_currency(subscription_id)
+            return [CostData(day.to_pydatetime(), cost, currency)
+                    for day, cost in cube.forecast(subscription_id, days_ahead, currency=currency).items()]
+        
         forecast_data = []
         current_daily_avg = 4750.00
         
@@ -104,6 +146,39 @@ class AzureCostManagementService:
         
         return forecast_data
     
+    @staticmethod
+    def get_service_forecast(subscription_id: str, days_ahead: int = 30, level: float = 0.95) -> Dict:
+        """
+        Forecast total and per-service daily cost in one batch, with prediction intervals
+        
+        Returns:
+            Dict with history (wide daily frame, 'Total' row first), forecast
+            (CostForecast) and backtest (per-series error over the last two 30-day folds)
+        """
+        from azure_cost_cube import get_cost_cube
+        
+        cube = get_cost_cube()
+        if cube is not None:
+            history, forecast, backtest = cube.forecast_by('service', subscription_id, days_ahead, level=level,
+                                                           currency=cube.main_currency(subscription_id))
+            return {"history": history, "forecast": forecast, "backtest": backtest}
+        
+        import pandas as pd
+        from cost_anomaly_detector import DemoCostSource
+        from cost_forecaster import CostForecaster, wide_history
+        
+        end = datetime.now().date()
+        services = ["Virtual Machines", "Storage", "SQL Database", "Azure Kubernetes Service",
+                    "Bandwidth", "Azure Monitor"]
+        frame = DemoCostSource(["Production", "Development"], services, seed=11).fetch(end - timedelta(days=120), end)
+        history = pd.concat([wide_history(frame.assign(service="Total"), "service"), wide_history(frame, "service")])
+        forecaster = CostForecaster(history_days=120)
+        return {
+            "history": history,
+            "forecast": forecaster.forecast(history, days_ahead, level),
+            "backtest": forecaster.backtest(history, 30, 2, level)
+        }
+    
     @staticmethod
     def list_budgets(subscription_id: str) -> List[Budget]:
         """List all budgets"""
@@ -151,16 +226,34 @@ class AzureCostManagementService:
     
     @staticmethod
     def get_cost_optimization_recommendations(subscription_id: str) -> List[Dict]:
-        """Get cost optimization recommendations"""
-        return [
-            {
-                "recommendation": "Right-size underutilized virtual machines",
-                "potential_savings": 8900.00,
-                "affected_resources": 23,
-                "effort": "Low",
-                "priority": "High",
-                "details": "23 VMs are running at <20% CPU utilization"
-            },
+        """Get cost optimization recommendations (VM sizing from the rightsizing engine)"""
+        from rightsizing_engine import get_rightsizing_service
+        
+        vms = get_rightsizing_service('azure').recommendations(subscription_id)
+        sizing = [
+            ("Downsize", "Right-size underutilized virtual machines", "Low",
+             "{count} VMs fit a smaller size at p95 CPU / memory"),
+            ("Change family", "Move virtual machines to a cheaper VM family", "Medium",
+             "{count} VMs are cheaper in another family (e.g. B-series for bursty load)"),
+            ("Upsize", "Upsize saturated virtual machines", "Medium",
+             "{count} VMs run above target utilization (adds cost)")
+        ]
+        recommendations = []
+        for action, title, effort, details in sizing:
+            group = vms[vms['action'] == action]
+            if group.empty:
+                continue
+            savings = float(group['monthly_savings'].sum())
+            recommendations.append({
+                "recommendation": title,
+                "potential_savings": savings,
+                "affected_resources": len(group),
+                "effort": effort,
+                "priority": "High" if action == "Upsize" or savings >= 1000 else "Medium",
+                "details": details.format(count=len(group))
+            })
+        
+        return recommendations + [
             {
                 "recommendation": "Purchase Reserved Instances for VMs",
                 "potential_savings": 7200.00,
@@ -22,6 +22,15 @@ class AzureDatabaseService:
     @staticmethod
     def list_sql_databases(subscription_id: str) -> List[AzureSQLDatabase]:
         """List SQL databases"""
+        from azure_resource_graph import get_azure_inventory, SQL_DB_TYPE
+        
+        inventory = get_azure_inventory()
+        if inventory is not None:
+            try:
+                return inventory.models(SQL_DB_TYPE, subscription_id)
+            except Exception:
+                return []
+        
         return [
             AzureSQLDatabase(
                 name="prod-sqldb-main",
@@ -0,0 +1,509 @@
+"""
+Microsoft Graph Directory Sync
+Local user / group / service principal directory kept current with Graph delta queries
+
+Features:
+- Delta queries for users, groups (with members@delta) and service principals;
+  the first sync enumerates everything, later syncs fetch only changes
+- Follow-up per-object calls (MFA methods) sent through JSON $batch, 20 per request,
+  with batches dispatched concurrently
+- Syncs run in a background thread; views read the directory as it fills in
+- 429 / 503 throttling honoured via Retry-After
+- Token index for instant prefix search; forward and reverse membership indexes
+  with transitive group expansion
+- JSON persistence of the directory and delta links between restarts
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+import requests
+import streamlit as st
+from typing import Dict, Iterator, List, Optional, Set
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+GRAPH_URL = 'https://graph.microsoft.com/v1.0'
+GRAPH_SCOPE = 'https://graph.microsoft.com/.default'
+
+# JSON batching limit per $batch request
+MAX_BATCH = 20
+
+# Seconds between search index rebuilds while a delta query is still paging
+REINDEX_INTERVAL = 5.0
+
+USERS = 'users'
+GROUPS = 'groups'
+SERVICE_PRINCIPALS = 'servicePrincipals'
+
+DELTA_SELECT = {
+    USERS: 'id,displayName,userPrincipalName,mail,department,accountEnabled',
+    GROUPS: 'id,displayName,description,groupTypes,securityEnabled,mailEnabled,members',
+    SERVICE_PRINCIPALS: 'id,appId,displayName,accountEnabled,createdDateTime',
+}
+
+MFA_METHOD_TYPES = {
+    '#microsoft.graph.microsoftAuthenticatorAuthenticationMethod': 'microsoft_authenticator',
+    '#microsoft.graph.phoneAuthenticationMethod': 'phone',
+    '#microsoft.graph.fido2AuthenticationMethod': 'fido2',
+    '#microsoft.graph.softwareOathAuthenticationMethod': 'software_oath',
+    '#microsoft.graph.windowsHelloForBusinessAuthenticationMethod': 'windows_hello',
+    '#microsoft.graph.emailAuthenticationMethod': 'email',
+}
+
+# Registered methods that do not make a second factor (email is self-service password reset only)
+NON_MFA_METHODS = {'password', 'email'}
+
+
+class GraphTransport:
+    """Thin Graph REST client with token refresh and throttling retries"""
+
+    def __init__(self, credential, max_retries: int = 5):
+        """Initialize with an azure-identity credential"""
+        self.credential = credential
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.token = None
+
+    def _headers(self) -> Dict[str, str]:
+        with self.lock:
+            if self.token is None or self.token.expires_on - 300 < time.time():
+                self.token = self.credential.get_token(GRAPH_SCOPE)
+            return {'Authorization': f"Bearer {self.token.token}"}
+
+    def request(self, method: str, url: str, body: Optional[Dict] = None) -> Dict:
+        """Send one request (absolute URL or path relative to v1.0)"""
+        if not url.startswith('https://'):
+            url = GRAPH_URL + url
+        for attempt in range(self.max_retries + 1):
+            response = self.session.request(method, url, json=body, headers=self._headers(), timeout=60)
+            if response.status_code in (429, 503, 504) and attempt < self.max_retries:
+                time.sleep(float(response.headers.get('Retry-After', 2 ** attempt)))
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise RuntimeError(f"Graph request kept throttling: {url}")
+
+    def pages(self, url: str) -> Iterator[Dict]:
+        """Follow @odata.nextLink; the last page carries @odata.deltaLink for delta queries"""
+        while url:
+            page = self.request('GET', url)
+            yield page
+            url = page.get('@odata.nextLink')
+
+    def batch(self, paths: List[str]) -> Dict[str, Dict]:
+        """
+        GET up to MAX_BATCH relative paths in one $batch call
+
+        Returns:
+            path -> response body (throttled sub-requests are retried)
+        """
+        pending = dict(enumerate(paths))
+        results: Dict[str, Dict] = {}
+        for attempt in range(self.max_retries + 1):
+            if not pending:
+                break
+            body = {'requests': [{'id': str(i), 'method': 'GET', 'url': path} for i, path in pending.items()]}
+            retry_after = 0.0
+            for item in self.request('POST', '/$batch', body)['responses']:
+                i = int(item['id'])
+                if item['status'] == 429 and attempt < self.max_retries:
+                    retry_after = max(retry_after, float((item.get('headers') or {}).get('Retry-After', 1)))
+                    continue
+                results[pending.pop(i)] = item.get('body') if item['status'] < 400 else None
+            if pending:
+                time.sleep(retry_after)
+        return results
+
+
+class GraphDirectory:
+    """
+    Directory snapshot: objects by kind, membership indexes, token search index.
+
+    objects[kind][id] holds the raw Graph properties; members maps a group to
+    its direct member IDs and member_of is the reverse index.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize directory
+
+        Args:
+            path: JSON snapshot file (None = in-memory only)
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self.objects: Dict[str, Dict[str, Dict]] = {USERS: {}, GROUPS: {}, SERVICE_PRINCIPALS: {}}
+        self.members: Dict[str, Set[str]] = {}
+        self.member_of: Dict[str, Set[str]] = {}
+        self.mfa: Dict[str, Dict] = {}
+        self.delta_links: Dict[str, str] = {}
+        self.synced_at: Optional[float] = None
+        self._tokens: List[tuple] = []
+        self._load()
+
+    # ============= MUTATION =============
+
+    def upsert(self, kind: str, item: Dict):
+        """Merge a delta item into the directory (delta items may be partial)"""
+        with self.lock:
+            current = self.objects[kind].setdefault(item['id'], {})
+            current.update({k: v for k, v in item.items() if not k.startswith('@') and k != 'members@delta'})
+
+    def remove(self, kind: str, object_id: str):
+        """Drop an object and its memberships"""
+        with self.lock:
+            self.objects[kind].pop(object_id, None)
+            self.mfa.pop(object_id, None)
+            for group_id in self.member_of.pop(object_id, set()):
+                self.members.get(group_id, set()).discard(object_id)
+            for member_id in self.members.pop(object_id, set()):
+                self.member_of.get(member_id, set()).discard(object_id)
+
+    def apply_members(self, group_id: str, changes: List[Dict]):
+        """Apply a members@delta list"""
+        with self.lock:
+            members = self.members.setdefault(group_id, set())
+            for change in changes:
+                if '@removed' in change:
+                    members.discard(change['id'])
+                    self.member_of.get(change['id'], set()).discard(group_id)
+                else:
+                    members.add(change['id'])
+                    self.member_of.setdefault(change['id'], set()).add(group_id)
+
+    def reset(self, kind: str):
+        """
+        Forget one kind before a full (non-incremental) enumeration
+
+        Memberships only arrive through the groups delta, so they are
+        dropped with the groups and kept when users are re-enumerated.
+        """
+        with self.lock:
+            if kind == GROUPS:
+                self.members.clear()
+                self.member_of.clear()
+            if kind == USERS:
+                self.mfa.clear()
+            self.objects[kind] = {}
+            self.delta_links.pop(kind, None)
+
+    def swap(self, kind: str, staged: 'GraphDirectory'):
+        """
+        Replace one kind with a complete enumeration built in a staging directory
+
+        Memberships arrive with the groups, so they are swapped with them;
+        objects that disappeared drop out of memberships and MFA state.
+        """
+        with self.lock:
+            gone = set(self.objects[kind]) - set(staged.objects[kind])
+            self.objects[kind] = staged.objects[kind]
+            if kind == GROUPS:
+                self.members, self.member_of = staged.members, staged.member_of
+            for object_id in gone:
+                self.remove(kind, object_id)
+
+    def reindex(self):
+        """Rebuild the token search index"""
+        with self.lock:
+            tokens = []
+            for kind, objects in self.objects.items():
+                for object_id, item in objects.items():
+                    text = ' '.join(str(item.get(k) or '') for k in ('displayName', 'userPrincipalName', 'mail', 'appId'))
+                    for token in set(text.lower().replace('@', ' ').replace('.', ' ').replace('-', ' ')
+                                     .replace('_', ' ').split()):
+                        tokens.append((token, kind, object_id))
+            tokens.sort()
+            self._tokens = tokens
+
+    # ============= QUERIES =============
+
+    def search(self, text: str, kind: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Objects matching every word of text as a token prefix
+
+        Args:
+            text: Search text (e.g. "jane sm", "finance")
+            kind: Restrict to users, groups or servicePrincipals
+            limit: Maximum results
+        """
+        words = text.lower().replace('@', ' ').replace('.', ' ').split()
+        if not words:
+            return []
+        tokens = self._tokens
+        matched: Optional[Set[tuple]] = None
+        for word in words:
+            hits = set()
+            start = bisect.bisect_left(tokens, (word,))
+            for token, k, object_id in tokens[start:]:
+                if not token.startswith(word):
+                    break
+                if kind is None or k == kind:
+                    hits.add((k, object_id))
+            matched = hits if matched is None else matched & hits
+            if not matched:
+                return []
+        with self.lock:
+            results = [self.objects[k][object_id] for k, object_id in sorted(matched) if object_id in self.objects[k]]
+        results.sort(key=lambda item: (item.get('displayName') or '').lower())
+        return results[:limit] if limit else results
+
+    def list(self, kind: str) -> List[Dict]:
+        """Snapshot of all objects of one kind (safe while a sync is writing)"""
+        with self.lock:
+            return list(self.objects[kind].values())
+
+    def get(self, kind: str, object_id: str) -> Optional[Dict]:
+        """One object by ID"""
+        with self.lock:
+            return self.objects[kind].get(object_id)
+
+    def expand_members(self, group_id: str, transitive: bool = True) -> Set[str]:
+        """Member IDs of a group, optionally through nested groups"""
+        with self.lock:
+            direct = self.members.get(group_id, set())
+            if not transitive:
+                return set(direct)
+            seen_groups, result, queue = {group_id}, set(), list(direct)
+            while queue:
+                member = queue.pop()
+                if member in self.objects[GROUPS]:
+                    if member not in seen_groups:
+                        seen_groups.add(member)
+                        queue.extend(self.members.get(member, ()))
+                else:
+                    result.add(member)
+            return result
+
+    def groups_of(self, object_id: str, transitive: bool = True) -> Set[str]:
+        """Group IDs an object belongs to, optionally through nested groups"""
+        with self.lock:
+            result, queue = set(), list(self.member_of.get(object_id, ()))
+            while queue:
+                group_id = queue.pop()
+                if group_id not in result:
+                    result.add(group_id)
+                    if transitive:
+                        queue.extend(self.member_of.get(group_id, ()))
+            return result
+
+    def is_empty(self) -> bool:
+        """True if nothing has been synced"""
+        return not any(self.objects.values())
+
+    # ============= PERSISTENCE =============
+
+    def save(self):
+        """Persist the directory and delta links"""
+        if not self.path:
+            return
+        with self.lock:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as fp:
+                json.dump({
+                    'synced_at': self.synced_at,
+                    'delta_links': self.delta_links,
+                    'objects': self.objects,
+                    'members': {g: sorted(m) for g, m in self.members.items()},
+                    'mfa': self.mfa,
+                }, fp)
+            os.replace(tmp, self.path)
+
+    def _load(self):
+        """Load a persisted directory if present"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as fp:
+            snapshot = json.load(fp)
+        self.objects.update(snapshot['objects'])
+        self.delta_links = snapshot.get('delta_links', {})
+        self.synced_at = snapshot.get('synced_at')
+        self.mfa = snapshot.get('mfa', {})
+        for group_id, members in snapshot.get('members', {}).items():
+            self.apply_members(group_id, [{'id': m} for m in members])
+        self.reindex()
+
+
+class DirectorySync:
+    """
+    Keeps a GraphDirectory current.
+
+    sync() runs the three delta queries (from the stored delta links when
+    present), then fetches MFA methods for new or changed users through
+    $batch, MAX_BATCH paths per call, several calls in flight. Views call
+    ensure_fresh(), which starts sync() in a background thread and returns
+    the directory as it stands.
+    """
+
+    def __init__(self, transport: GraphTransport, directory: GraphDirectory, max_workers: int = 4,
+                 ttl: float = 900.0, sync_mfa: bool = True, retry_after: float = 300.0):
+        """
+        Initialize sync engine
+
+        Args:
+            transport: Graph transport
+            directory: Directory snapshot
+            max_workers: Concurrent $batch calls
+            ttl: Seconds before views trigger an incremental sync
+            sync_mfa: Fetch MFA methods for changed users
+            retry_after: Seconds before a failed background sync is retried
+        """
+        self.transport = transport
+        self.directory = directory
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.sync_mfa = sync_mfa
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _delta(self, kind: str) -> Dict[str, int]:
+        """Run one delta query; returns counts and the IDs of changed objects"""
+        link = self.directory.delta_links.get(kind)
+        target = self.directory
+        if link is None:
+            link = f"/{kind}/delta?$select={DELTA_SELECT[kind]}"
+            if self.directory.objects[kind]:
+                # Re-enumeration (expired token): readers keep the current objects until it completes
+                target = GraphDirectory()
+            else:
+                self.directory.reset(kind)
+        changed, removed, last = [], 0, None
+        indexed_at = time.time()
+        try:
+            # A first enumeration is applied page by page so readers see it fill in
+            for page in self.transport.pages(link):
+                for item in page.get('value', []):
+                    if '@removed' in item:
+                        target.remove(kind, item['id'])
+                        removed += 1
+                        continue
+                    target.upsert(kind, item)
+                    if 'members@delta' in item:
+                        target.apply_members(item['id'], item['members@delta'])
+                    changed.append(item['id'])
+                last = page
+                if target is self.directory and time.time() - indexed_at > REINDEX_INTERVAL:
+                    self.directory.reindex()
+                    indexed_at = time.time()
+        except requests.HTTPError as e:
+            # Expired delta token: start a full enumeration
+            if e.response is not None and e.response.status_code == 410:
+                self.directory.delta_links.pop(kind, None)
+                return self._delta(kind)
+            raise
+        if target is not self.directory:
+            self.directory.swap(kind, target)
+        if last is not None and last.get('@odata.deltaLink'):
+            self.directory.delta_links[kind] = last['@odata.deltaLink']
+        return {'changed': changed, 'removed': removed}
+
+    def fetch_mfa(self, user_ids: List[str]) -> int:
+        """Fetch authentication methods for users via concurrent $batch calls"""
+        paths = [f"/users/{user_id}/authentication/methods" for user_id in user_ids]
+        chunks = [paths[i:i + MAX_BATCH] for i in range(0, len(paths), MAX_BATCH)]
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for results in pool.map(self.transport.batch, chunks):
+                for path, body in results.items():
+                    if body is None:
+                        continue
+                    methods = [MFA_METHOD_TYPES.get(m.get('@odata.type'), 'password') for m in body.get('value', [])]
+                    strong = [m for m in methods if m not in NON_MFA_METHODS]
+                    phone = next((m.get('phoneNumber') for m in body.get('value', []) if m.get('phoneNumber')), None)
+                    with self.directory.lock:
+                        self.directory.mfa[path.split('/')[2]] = {
+                            'enabled': bool(strong),
+                            'default_method': strong[0] if strong else None,
+                            'methods': methods,
+                            'phone_number': phone,
+                        }
+                    fetched += 1
+        return fetched
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Incremental sync of all kinds (full on first run or expired delta token)
+
+        Returns:
+            Per-kind changed/removed counts and MFA lookups performed
+        """
+        with self.lock:
+            stats = {}
+            changed_users: List[str] = []
+            for kind in (USERS, GROUPS, SERVICE_PRINCIPALS):
+                result = self._delta(kind)
+                stats[f"{kind}_changed"] = len(result['changed'])
+                stats[f"{kind}_removed"] = result['removed']
+                if kind == USERS:
+                    changed_users = result['changed']
+                self.directory.reindex()
+            stats['mfa_fetched'] = self.fetch_mfa(changed_users) if self.sync_mfa and changed_users else 0
+            self.directory.synced_at = time.time()
+            self.directory.save()
+            return stats
+
+    @property
+    def syncing(self) -> bool:
+        """True while a background sync is running"""
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
+    def _background_sync(self):
+        """sync() for the worker thread; failures are kept for views and retried after retry_after"""
+        try:
+            self.sync()
+            self.last_error, self.failed_at = None, None
+        except Exception as e:
+            self.last_error, self.failed_at = str(e), time.time()
+
+    def ensure_fresh(self) -> GraphDirectory:
+        """
+        Directory as it stands; a background sync starts if it is empty or older than ttl
+
+        Views never wait on Graph: a first enumeration (and its MFA lookups)
+        fills the directory progressively, later syncs keep serving the
+        previous snapshot until they finish.
+        """
+        now = time.time()
+        synced_at = self.directory.synced_at
+        stale = synced_at is None or now - synced_at > self.ttl
+        backing_off = self.failed_at is not None and now - self.failed_at < self.retry_after
+        if stale and not backing_off:
+            with self._start_lock:
+                if not self.syncing:
+                    self._worker = threading.Thread(target=self._background_sync, name='graph-directory-sync',
+                                                    daemon=True)
+                    self._worker.start()
+        return self.directory
+
+    def sign_ins(self, user_id: Optional[str] = None, days: int = 7, limit: int = 5000) -> List[Dict]:
+        """Sign-in log entries (paged, newest first; not part of the directory snapshot)"""
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        query = f"createdDateTime ge {since}" + (f" and userId eq '{user_id}'" if user_id else '')
+        entries: List[Dict] = []
+        for page in self.transport.pages(f"/auditLogs/signIns?$filter={query}&$top=1000"):
+            entries.extend(page.get('value', []))
+            if len(entries) >= limit:
+                break
+        return entries[:limit]
+
+
+@st.cache_resource
+def get_directory_sync() -> Optional[DirectorySync]:
+    """
+    Get process-wide directory sync engine (None = no Azure access, use demo data)
+
+    AZURE_DIRECTORY_PATH persists the directory and delta links between restarts.
+    """
+    from azure_resource_graph import get_azure_credential
+    credential = get_azure_credential()
+    if credential is None:
+        return None
+    return DirectorySync(GraphTransport(credential), GraphDirectory(os.environ.get('AZURE_DIRECTORY_PATH')))
@@ -5,7 +5,7 @@ Handles Azure AD, RBAC, Service Principals, and Managed Identities
 
 from dataclasses import dataclass
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
 @dataclass
 class User:
@@ -58,10 +58,16 @@ class AzureIdentityService:
     """Azure Identity and Access Management Service operations"""
     
     @staticmethod
-    def list_users(filter_query: str = None, top: int = 100) -> List[User]:
-        """List Azure AD users"""
-        # from azure.identity import DefaultAzureCredential
-        # from msgraph import GraphServiceClient
+    def list_users(filter_query: str = None, top: Optional[int] = 100) -> List[User]:
+        """List Azure AD users (filter_query = search text; top=None returns every match)"""
+        from azure_graph_directory import get_directory_sync, USERS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            directory = sync.ensure_fresh()
+            items = directory.search(filter_query, USERS, top) if filter_query else \
+                sorted(directory.list(USERS), key=lambda u: (u.get('displayName') or '').lower())[:top]
+            return [AzureIdentityService._to_user(item) for item in items]
         
         # Demo data
         return [
@@ -94,9 +100,28 @@ class AzureIdentityService:
     @staticmethod
     def get_user(user_id: str) -> Optional[User]:
         """Get user by ID"""
+        from azure_graph_directory import get_directory_sync, USERS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            item = sync.ensure_fresh().get(USERS, user_id)
+            return AzureIdentityService._to_user(item) if item else None
+        
         users = AzureIdentityService.list_users()
         return next((u for u in users if u.user_id == user_id), None)
     
+    @staticmethod
+    def _to_user(item: Dict) -> User:
+        """Graph user properties -> User"""
+        return User(
+            user_id=item['id'],
+            display_name=item.get('displayName') or '',
+            user_principal_name=item.get('userPrincipalName') or '',
+            mail=item.get('mail') or '',
+            department=item.get('department') or '',
+            enabled=bool(item.get('accountEnabled', True))
+        )
+    
     @staticmethod
     def create_user(user_config: Dict) -> bool:
         """Create new Azure AD user"""
@@ -119,7 +144,25 @@ class AzureIdentityService:
     
     @staticmethod
     def list_groups(filter_query: str = None) -> List[Group]:
-        """List Azure AD groups"""
+        """List Azure AD groups (filter_query = search text)"""
+        from azure_graph_directory import get_directory_sync, GROUPS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            directory = sync.ensure_fresh()
+            items = directory.search(filter_query, GROUPS) if filter_query else directory.list(GROUPS)
+            return [
+                Group(
+                    group_id=item['id'],
+                    display_name=item.get('displayName') or '',
+                    description=item.get('description') or '',
+                    members_count=len(directory.members.get(item['id'], ())),
+                    group_type="Microsoft 365" if 'Unified' in (item.get('groupTypes') or []) else
+                    ("Security" if item.get('securityEnabled') else "Distribution")
+                )
+                for item in items
+            ]
+        
         return [
             Group(
                 group_id="aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee",
@@ -149,6 +192,19 @@ class AzureIdentityService:
         """Create new Azure AD group"""
         return True
     
+    @staticmethod
+    def list_group_members(group_id: str, transitive: bool = True) -> List[User]:
+        """List users in a group, including nested groups when transitive"""
+        from azure_graph_directory import get_directory_sync, USERS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            directory = sync.ensure_fresh()
+            members = (directory.get(USERS, m) for m in directory.expand_members(group_id, transitive))
+            return [AzureIdentityService._to_user(item) for item in members if item]
+        
+        return AzureIdentityService.list_users()
+    
     @staticmethod
     def add_group_member(group_id: str, user_id: str) -> bool:
         """Add user to group"""
@@ -162,6 +218,22 @@ class AzureIdentityService:
     @staticmethod
     def list_service_principals() -> List[ServicePrincipal]:
         """List service principals"""
+        from azure_graph_directory import get_directory_sync, SERVICE_PRINCIPALS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            return [
+                ServicePrincipal(
+                    app_id=item.get('appId') or '',
+                    display_name=item.get('displayName') or '',
+                    object_id=item['id'],
+                    enabled=bool(item.get('accountEnabled', True)),
+                    created=datetime.fromisoformat(item['createdDateTime'].replace('Z', '+00:00'))
+                    if item.get('createdDateTime') else None
+                )
+                for item in sync.ensure_fresh().list(SERVICE_PRINCIPALS)
+            ]
+        
         return [
             ServicePrincipal(
                 app_id="11111111-1111-1111-1111-111111111111",
@@ -302,6 +374,22 @@ class AzureIdentityService:
     @staticmethod
     def get_mfa_status(user_id: str) -> Dict:
         """Get MFA status for user"""
+        from azure_graph_directory import get_directory_sync, USERS
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            directory = sync.ensure_fresh()
+            if user_id not in directory.mfa:
+                sync.fetch_mfa([user_id])
+            status = directory.mfa.get(user_id, {})
+            user = directory.get(USERS, user_id) or {}
+            return {
+                "enabled": status.get('enabled', False),
+                "default_method": status.get('default_method'),
+                "phone_number": status.get('phone_number'),
+                "email": user.get('mail')
+            }
+        
         return {
             "enabled": True,
             "default_method": "microsoft_authenticator",
@@ -357,6 +445,24 @@ class AzureIdentityService:
     @staticmethod
     def get_sign_in_logs(user_id: str = None, days: int = 7) -> List[Dict]:
         """Get sign-in logs"""
+        from azure_graph_directory import get_directory_sync
+        
+        sync = get_directory_sync()
+        if sync is not None:
+            return [
+                {
+                    "timestamp": datetime.fromisoformat(entry['createdDateTime'].replace('Z', '+00:00')),
+                    "user": entry.get('userPrincipalName'),
+                    "app": entry.get('appDisplayName'),
+                    "ip_address": entry.get('ipAddress'),
+                    "location": ", ".join(filter(None, [(entry.get('location') or {}).get('city'),
+                                                        (entry.get('location') or {}).get('state')])),
+                    "status": "Success" if (entry.get('status') or {}).get('errorCode') == 0 else "Failure",
+                    "mfa_required": entry.get('authenticationRequirement') == 'multiFactorAuthentication'
+                }
+                for entry in sync.sign_ins(user_id, days)
+            ]
+        
         return [
             {
                 "timestamp": datetime.now() - timedelta(hours=2),
@@ -0,0 +1,287 @@
+"""
+Azure Log Analytics Query Executor
+Sharded, concurrent KQL execution with columnar results and bucket-aware caching
+
+Features:
+- Long timespans split into time-aligned shards queried concurrently
+- Columnar results: pandas DataFrame batches, or Arrow tables when pyarrow is installed
+- Cache keyed on (workspace, normalized query, time bucket); closed buckets live
+  long, the open (current) bucket expires quickly
+- In-flight deduplication: identical panels share one running query
+"""
+
+import re
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from azure_monitor_metrics import parse_duration
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+try:
+    from azure.monitor.query import LogsQueryClient, LogsQueryStatus
+    LOGS_QUERY_AVAILABLE = True
+except ImportError:
+    LOGS_QUERY_AVAILABLE = False
+
+# Operators whose result over the whole window differs from the union of per-shard results
+_UNSHARDABLE = re.compile(r'\|\s*(take|limit|top|top-nested|top-hitters|sample|sample-distinct|distinct|count|'
+                          r'join|lookup|make-series|render|evaluate|sort|order|serialize|scan|partition|'
+                          r'reduce|fork|facet|getschema)\b', re.IGNORECASE)
+# Window functions that depend on row order across the whole (serialized) result
+_ROW_FUNCTIONS = re.compile(r'\b(row_number|row_cumsum|row_rank_dense|row_rank_min|row_window_session|'
+                            r'prev|next)\s*\(', re.IGNORECASE)
+_SUMMARIZE = re.compile(r'\|\s*summarize\b(?P<body>[^|]*)', re.IGNORECASE)
+_TIME_BIN = re.compile(r'\b(bin|floor)\s*\(\s*(TimeGenerated|timestamp)\s*,\s*(?P<size>[^)]+?)\s*\)', re.IGNORECASE)
+_TIMESPAN = re.compile(r'^(?:time\s*\(\s*)?(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>d|day|days|h|hr|hrs|hour|hours|'
+                       r'm|min|minute|minutes|s|sec|second|seconds|ms|milli|millisecond|milliseconds)(?:\s*\))?$',
+                       re.IGNORECASE)
+_TIMESPAN_UNITS = {'d': 86400, 'day': 86400, 'days': 86400, 'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600,
+                   'hours': 3600, 'm': 60, 'min': 60, 'minute': 60, 'minutes': 60, 's': 1, 'sec': 1, 'second': 1,
+                   'seconds': 1, 'ms': 0.001, 'milli': 0.001, 'millisecond': 0.001, 'milliseconds': 0.001}
+_COMMENT = re.compile(r'//[^\n]*')
+
+
+def normalize_query(query: str) -> str:
+    """Cache-key form of a KQL query (comments removed, whitespace collapsed)"""
+    return ' '.join(_COMMENT.sub('', query).split())
+
+
+def parse_timespan(literal: str) -> Optional[timedelta]:
+    """KQL timespan literal (e.g. 1d, 30m, time(6h)) as a timedelta, None if not a literal"""
+    match = _TIMESPAN.match(literal.strip())
+    if not match:
+        return None
+    return timedelta(seconds=float(match.group('value')) * _TIMESPAN_UNITS[match.group('unit').lower()])
+
+
+def is_shardable(query: str, shard: timedelta = timedelta(hours=6)) -> bool:
+    """
+    True if running the query per time shard and concatenating is exact
+
+    Row-level queries (where/project/extend) are; summarize only when it
+    groups by bin(TimeGenerated, size) with a size that divides the shard
+    length, so every group falls in one (epoch-aligned) shard.
+    """
+    query = _COMMENT.sub('', query)
+    if _UNSHARDABLE.search(query) or _ROW_FUNCTIONS.search(query):
+        return False
+    for match in _SUMMARIZE.finditer(query):
+        by = re.split(r'\bby\b', match.group('body'), maxsplit=1, flags=re.IGNORECASE)
+        time_bin = _TIME_BIN.search(by[1]) if len(by) > 1 else None
+        size = parse_timespan(time_bin.group('size')) if time_bin else None
+        if not size or shard.total_seconds() % size.total_seconds():
+            return False
+    return True
+
+
+# Transport: (target, query, start, end) -> DataFrame; target is a workspace ID or ARM resource ID
+Transport = Callable[[str, str, datetime, datetime], pd.DataFrame]
+
+
+class LogsQueryTransport:
+    """Live transport over azure-monitor-query LogsQueryClient"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.client = LogsQueryClient(credential)
+
+    def __call__(self, target: str, query: str, start: datetime, end: datetime) -> pd.DataFrame:
+        timespan = (start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc))
+        if target.startswith('/subscriptions/'):
+            response = self.client.query_resource(target, query, timespan=timespan)
+        else:
+            response = self.client.query_workspace(target, query, timespan=timespan)
+        if response.status == LogsQueryStatus.PARTIAL:
+            raise RuntimeError(f"Partial results: {response.partial_error}")
+        frames = [pd.DataFrame(table.rows, columns=table.columns) for table in response.tables]
+        return frames[0] if frames else pd.DataFrame()
+
+
+class LogResultCache:
+    """LRU cache of shard results with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize cache
+
+        Args:
+            max_entries: Shard results kept
+        """
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[pd.DataFrame]:
+        """Cached frame if present and not expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.time():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, frame: pd.DataFrame, ttl: float):
+        """Store a frame for ttl seconds"""
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, frame)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0}
+
+
+class LogQueryExecutor:
+    """
+    Sharded KQL executor.
+
+    Windows are cut on fixed bucket boundaries (multiples of the shard
+    size since the epoch), so consecutive refreshes reuse every closed
+    bucket and only re-run the open one. Buckets ending more than the
+    ingestion delay ago are immutable and cached for closed_ttl; the open
+    bucket is keyed by its start alone (its end moves with the clock) and
+    cached for open_ttl.
+    """
+
+    def __init__(self, transport: Transport, cache: Optional[LogResultCache] = None, max_workers: int = 8,
+                 shard: timedelta = timedelta(hours=6), ingestion_delay: timedelta = timedelta(minutes=10),
+                 closed_ttl: float = 86400.0, open_ttl: float = 60.0, align: timedelta = timedelta(minutes=1)):
+        """
+        Initialize executor
+
+        Args:
+            transport: Log query transport
+            cache: Shard result cache (private one if None)
+            max_workers: Concurrent shard queries
+            shard: Shard / bucket length
+            ingestion_delay: Late-arriving data allowance before a bucket counts as closed
+            closed_ttl: Seconds to keep closed-bucket results
+            open_ttl: Seconds to keep open-bucket results
+            align: Default window ends (now) are rounded up to this, so reruns share cache keys
+        """
+        self.transport = transport
+        self.cache = cache or LogResultCache()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.shard = shard
+        self.ingestion_delay = ingestion_delay
+        self.closed_ttl = closed_ttl
+        self.open_ttl = open_ttl
+        self.align = align
+        self.lock = threading.Lock()
+        self.in_flight: Dict[Tuple, Future] = {}
+        self.queries_run = 0
+
+    def shards(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Bucket-aligned shards covering [start, end)"""
+        step = int(self.shard.total_seconds())
+        epoch = datetime(1970, 1, 1)
+        edges = [start]
+        boundary = epoch + timedelta(seconds=((int((start - epoch).total_seconds()) // step) + 1) * step)
+        while boundary < end:
+            edges.append(boundary)
+            boundary += self.shard
+        edges.append(end)
+        return list(zip(edges, edges[1:]))
+
+    def _closed(self, end: datetime) -> bool:
+        """True if a bucket ending at end can no longer receive data"""
+        return end <= datetime.now(timezone.utc).replace(tzinfo=None) - self.ingestion_delay
+
+    def _aligned_now(self) -> datetime:
+        """Current naive UTC time rounded up to the alignment step"""
+        step = int(self.align.total_seconds())
+        seconds = int((datetime.now(timezone.utc).replace(tzinfo=None) - datetime(1970, 1, 1)).total_seconds())
+        return datetime(1970, 1, 1) + timedelta(seconds=-(-seconds // step) * step)
+
+    def _run_shard(self, key: Tuple, target: str, query: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Execute one shard and cache it"""
+        try:
+            frame = self.transport(target, query, start, end)
+            with self.lock:
+                self.queries_run += 1
+            self.cache.put(key, frame, self.closed_ttl if self._closed(end) else self.open_ttl)
+            return frame
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+
+    def _submit(self, target: str, query: str, start: datetime, end: datetime) -> Future:
+        """Cached result, an identical in-flight query, or a new shard query"""
+        # The open bucket's end moves with the clock: key it by its start
+        key = (target, normalize_query(query), start, end if self._closed(end) else None)
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                future: Future = Future()
+                future.set_result(cached)
+                return future
+            future = self.in_flight.get(key)
+            if future is None:
+                future = self.pool.submit(self._run_shard, key, target, query, start, end)
+                self.in_flight[key] = future
+            return future
+
+    def iter_batches(self, target: str, query: str, timespan: str = "P1D",
+                     end: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+        """
+        Stream shard results as they complete (columnar DataFrame batches)
+
+        Args:
+            target: Workspace ID, or ARM resource ID (e.g. Application Insights)
+            query: KQL query (time filtering comes from the timespan)
+            timespan: ISO 8601 duration ending at end
+            end: Window end as naive UTC (defaults to now, rounded up to the alignment step)
+
+        Yields:
+            One DataFrame per shard (completion order, not time order)
+        """
+        end = end or self._aligned_now()
+        start = end - parse_duration(timespan)
+        windows = self.shards(start, end) if is_shardable(query, self.shard) else [(start, end)]
+        futures = [self._submit(target, query, s, e) for s, e in windows]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def query(self, target: str, query: str, timespan: str = "P1D", end: Optional[datetime] = None) -> pd.DataFrame:
+        """Full result as one DataFrame"""
+        batches = [b for b in self.iter_batches(target, query, timespan, end) if len(b)]
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True)
+
+    def query_arrow(self, target: str, query: str, timespan: str = "P1D", end: Optional[datetime] = None):
+        """Full result as a pyarrow Table (requires pyarrow)"""
+        if not ARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for Arrow results")
+        batches = [pa.Table.from_pandas(b, preserve_index=False)
+                   for b in self.iter_batches(target, query, timespan, end) if len(b)]
+        return pa.concat_tables(batches, promote_options='default') if batches else pa.table({})
+
+
+@st.cache_resource
+def get_log_query_executor() -> Optional[LogQueryExecutor]:
+    """Get process-wide executor (None without Azure credentials - use demo data)"""
+    from azure_resource_graph import get_azure_credential
+    credential = get_azure_credential()
+    if not LOGS_QUERY_AVAILABLE or credential is None:
+        return None
+    return LogQueryExecutor(LogsQueryTransport(credential))
@@ -0,0 +1,295 @@
+"""
+Azure Management Group Hierarchy
+Whole-tenant management-group tree with effective policy / RBAC assignment resolution
+
+Features:
+- One expanded, recursive Get call loads every management group and subscription
+- Parent-pointer arrays with precomputed ancestor chains and depths
+- Rolled-up subscription / child-group counts per group
+- Policy and role assignments indexed by scope; effective assignments for any
+  scope resolved in O(depth) from memory
+"""
+
+import time
+import threading
+import numpy as np
+import streamlit as st
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from azure.mgmt.managementgroups import ManagementGroupsAPI
+    MANAGEMENT_GROUPS_AVAILABLE = True
+except ImportError:
+    MANAGEMENT_GROUPS_AVAILABLE = False
+
+MANAGEMENT_GROUP = 'managementGroup'
+SUBSCRIPTION = 'subscription'
+
+# Node: {'id', 'name', 'display_name', 'kind', 'children': [...]}
+DEMO_TREE = {
+    'id': '/providers/Microsoft.Management/managementGroups/tenant-root',
+    'name': 'tenant-root', 'display_name': 'Tenant Root Group', 'kind': MANAGEMENT_GROUP,
+    'children': [
+        {'id': '/providers/Microsoft.Management/managementGroups/production', 'name': 'production',
+         'display_name': 'Production', 'kind': MANAGEMENT_GROUP, 'children': [
+             {'id': '/providers/Microsoft.Management/managementGroups/prod-apps', 'name': 'prod-apps',
+              'display_name': 'Prod-Apps', 'kind': MANAGEMENT_GROUP, 'children': []},
+             {'id': '/providers/Microsoft.Management/managementGroups/prod-data', 'name': 'prod-data',
+              'display_name': 'Prod-Data', 'kind': MANAGEMENT_GROUP, 'children': []}]},
+        {'id': '/providers/Microsoft.Management/managementGroups/development', 'name': 'development',
+         'display_name': 'Development', 'kind': MANAGEMENT_GROUP, 'children': [
+             {'id': '/providers/Microsoft.Management/managementGroups/dev-team-a', 'name': 'dev-team-a',
+              'display_name': 'Dev-Team-A', 'kind': MANAGEMENT_GROUP, 'children': []},
+             {'id': '/providers/Microsoft.Management/managementGroups/dev-team-b', 'name': 'dev-team-b',
+              'display_name': 'Dev-Team-B', 'kind': MANAGEMENT_GROUP, 'children': []}]},
+        {'id': '/providers/Microsoft.Management/managementGroups/shared-services', 'name': 'shared-services',
+         'display_name': 'Shared-Services', 'kind': MANAGEMENT_GROUP, 'children': [
+             {'id': '/providers/Microsoft.Management/managementGroups/networking', 'name': 'networking',
+              'display_name': 'Networking', 'kind': MANAGEMENT_GROUP, 'children': []},
+             {'id': '/providers/Microsoft.Management/managementGroups/security', 'name': 'security',
+              'display_name': 'Security', 'kind': MANAGEMENT_GROUP, 'children': []}]}
+    ]
+}
+
+# Demo placement of configured subscriptions by environment
+DEMO_PLACEMENT = {'production': 'prod-apps', 'development': 'dev-team-a', 'staging': 'development'}
+
+
+class ManagementGroupsTransport:
+    """Live transport over the Management Groups SDK"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.client = ManagementGroupsAPI(credential)
+
+    def __call__(self, root_group: str) -> Dict:
+        """Whole tree below root_group in one expanded, recursive call"""
+        group = self.client.management_groups.get(group_id=root_group, expand='children', recurse=True)
+        return {'id': group.id, 'name': group.name, 'display_name': group.display_name, 'kind': MANAGEMENT_GROUP,
+                'children': [self._node(child) for child in group.children or []]}
+
+    def _node(self, child) -> Dict:
+        kind = SUBSCRIPTION if child.type.lower() == '/subscriptions' else MANAGEMENT_GROUP
+        return {'id': child.id, 'name': child.name, 'display_name': child.display_name, 'kind': kind,
+                'children': [self._node(c) for c in child.children or []]}
+
+
+class ManagementGroupHierarchy:
+    """
+    Tenant tree as parent-pointer arrays.
+
+    Node i has scope ids[i], parent[i] (-1 for the root) and a precomputed
+    ancestor chain (self first, root last). Assignments are indexed by
+    lower-cased scope, so effective assignments for a scope are the union
+    over its chain.
+    """
+
+    def __init__(self, tree: Dict):
+        """
+        Build arrays from a nested tree
+
+        Args:
+            tree: Root node {'id', 'name', 'display_name', 'kind', 'children'}
+        """
+        ids, names, kinds, parents = [], [], [], []
+        stack: List[Tuple[Dict, int]] = [(tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = len(ids)
+            ids.append(node['id'].lower())
+            names.append(node.get('display_name') or node['name'])
+            kinds.append(node['kind'])
+            parents.append(parent)
+            stack.extend((child, index) for child in reversed(node.get('children') or []))
+
+        self.ids = ids
+        self.names = names
+        self.kinds = np.array(kinds)
+        self.parent = np.array(parents, dtype=np.int32)
+        self.index = {scope: i for i, scope in enumerate(ids)}
+        self.depth = np.zeros(len(ids), dtype=np.int32)
+        self.chains: List[Tuple[int, ...]] = []
+        self.child_lists: List[List[int]] = [[] for _ in ids]
+        for i, parent in enumerate(parents):
+            if parent >= 0:
+                self.child_lists[parent].append(i)
+            # Pre-order: a parent always precedes its children
+            self.depth[i] = self.depth[parent] + 1 if parent >= 0 else 0
+            self.chains.append((i,) + (self.chains[parent] if parent >= 0 else ()))
+
+        is_subscription = (self.kinds == SUBSCRIPTION).astype(np.int64)
+        is_group = (self.kinds == MANAGEMENT_GROUP).astype(np.int64)
+        self.subscription_count = is_subscription.copy()
+        self.group_count = np.zeros(len(ids), dtype=np.int64)
+        for i in np.argsort(-self.depth, kind='stable'):
+            parent = self.parent[i]
+            if parent >= 0:
+                self.subscription_count[parent] += self.subscription_count[i]
+                self.group_count[parent] += self.group_count[i] + is_group[i]
+
+        self.assignments: Dict[str, Dict[str, List]] = {}
+        self.loaded_at = time.time()
+
+    # ============= TREE =============
+
+    def node(self, scope: str) -> Optional[int]:
+        """Node index for a management group or subscription scope"""
+        return self.index.get(scope.lower().rstrip('/'))
+
+    def children(self, i: int) -> List[int]:
+        """Direct child node indexes"""
+        return self.child_lists[i]
+
+    def groups(self) -> List[int]:
+        """Management group node indexes"""
+        return [int(i) for i in np.flatnonzero(self.kinds == MANAGEMENT_GROUP)]
+
+    def subscriptions(self) -> List[int]:
+        """Subscription node indexes"""
+        return [int(i) for i in np.flatnonzero(self.kinds == SUBSCRIPTION)]
+
+    def chain(self, scope: str) -> List[str]:
+        """
+        Scopes whose assignments apply to scope, nearest first
+
+        Resource and resource-group scopes contribute their ARM path prefixes
+        down to the subscription, then the subscription's ancestor chain.
+        """
+        scope = scope.lower().rstrip('/')
+        node = self.node(scope)
+        if node is not None:
+            return [self.ids[i] for i in self.chains[node]]
+        parts = scope.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'subscriptions':
+            return [scope]
+        subscription = '/' + '/'.join(parts[:2])
+        prefixes = [scope] if scope != subscription else []
+        if len(parts) > 4 and parts[2] == 'resourcegroups':
+            prefixes.append('/' + '/'.join(parts[:4]))
+        node = self.node(subscription)
+        return prefixes + ([self.ids[i] for i in self.chains[node]] if node is not None else [subscription])
+
+    def render_tree(self) -> str:
+        """Indented text tree of management groups (subscription counts in brackets)"""
+        lines: List[str] = []
+
+        def walk(i: int, prefix: str, last: bool, root: bool):
+            label = f"{self.names[i]} [{self.subscription_count[i]}]"
+            lines.append(label if root else f"{prefix}{'└── ' if last else '├── '}{label}")
+            kids = [c for c in self.children(i) if self.kinds[c] == MANAGEMENT_GROUP]
+            for n, child in enumerate(kids):
+                walk(child, prefix if root else prefix + ('    ' if last else '│   '), n == len(kids) - 1, False)
+
+        walk(0, '', True, True)
+        return '\n'.join(lines)
+
+    # ============= ASSIGNMENTS =============
+
+    def assign(self, kind: str, assignments: List) -> int:
+        """
+        Index assignments of one kind (e.g. 'policy', 'role') by scope
+
+        Args:
+            kind: Assignment kind label
+            assignments: Objects with a .scope attribute
+
+        Returns:
+            Number of assignments indexed
+        """
+        by_scope: Dict[str, List] = {}
+        for assignment in assignments:
+            by_scope.setdefault(assignment.scope.lower().rstrip('/'), []).append(assignment)
+        self.assignments[kind] = by_scope
+        return len(assignments)
+
+    def direct(self, kind: str, scope: str) -> List:
+        """Assignments made exactly at scope"""
+        return self.assignments.get(kind, {}).get(scope.lower().rstrip('/'), [])
+
+    def effective(self, scope: str, kind: Optional[str] = None) -> List[Dict]:
+        """
+        Assignments that apply at scope, direct or inherited
+
+        Returns:
+            Dicts with kind, assignment, source scope, source name and inherited flag (nearest first)
+        """
+        kinds = [kind] if kind else list(self.assignments)
+        chain = self.chain(scope)
+        results = []
+        for depth, source in enumerate(chain):
+            node = self.index.get(source)
+            for k in kinds:
+                for assignment in self.assignments.get(k, {}).get(source, []):
+                    results.append({
+                        'kind': k,
+                        'assignment': assignment,
+                        'source_scope': source,
+                        'source_name': self.names[node] if node is not None else source.split('/')[-1],
+                        'inherited': depth > 0,
+                    })
+        return results
+
+    def assignment_counts(self, kind: str) -> np.ndarray:
+        """Direct assignment count per node"""
+        by_scope = self.assignments.get(kind, {})
+        return np.array([len(by_scope.get(scope, [])) for scope in self.ids], dtype=np.int64)
+
+
+def demo_tree() -> Dict:
+    """Demo tree with the configured subscriptions placed by environment"""
+    import copy
+    from config_settings import AppConfig
+    tree = copy.deepcopy(DEMO_TREE)
+    groups = {}
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        groups[node['name']] = node
+        stack.extend(node['children'])
+    for sub in AppConfig.load_azure_subscriptions():
+        parent = groups.get(DEMO_PLACEMENT.get(sub.environment, ''), tree)
+        parent['children'].append({'id': f"/subscriptions/{sub.subscription_id}", 'name': sub.subscription_id,
+                                   'display_name': sub.subscription_name, 'kind': SUBSCRIPTION, 'children': []})
+    return tree
+
+
+class HierarchyCache:
+    """Loads the hierarchy and its assignment indexes, reloading after ttl"""
+
+    def __init__(self, transport=None, root_group: Optional[str] = None, ttl: float = 3600.0):
+        """
+        Initialize cache
+
+        Args:
+            transport: Callable root_group -> tree (None = demo tree)
+            root_group: Root management group name (the tenant ID for the tenant root group)
+            ttl: Seconds before the tree is reloaded
+        """
+        self.transport = transport
+        self.root_group = root_group
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.hierarchy: Optional[ManagementGroupHierarchy] = None
+
+    def get(self, force: bool = False) -> ManagementGroupHierarchy:
+        """Current hierarchy with policy and role assignments indexed"""
+        with self.lock:
+            if force or self.hierarchy is None or time.time() - self.hierarchy.loaded_at > self.ttl:
+                from azure_policy import AzurePolicyService
+                from azure_identity import AzureIdentityService
+                tree = self.transport(self.root_group) if self.transport else demo_tree()
+                hierarchy = ManagementGroupHierarchy(tree)
+                hierarchy.assign('policy', AzurePolicyService.list_policy_assignments())
+                hierarchy.assign('role', AzureIdentityService.list_role_assignments(hierarchy.ids[0]))
+                self.hierarchy = hierarchy
+            return self.hierarchy
+
+
+@st.cache_resource
+def get_hierarchy_cache() -> HierarchyCache:
+    """Get process-wide hierarchy cache (demo tree without Azure credentials)"""
+    from azure_resource_graph import get_azure_credential
+    credential = get_azure_credential()
+    if not MANAGEMENT_GROUPS_AVAILABLE or credential is None:
+        return HierarchyCache()
+    return HierarchyCache(ManagementGroupsTransport(credential), st.secrets['azure']['tenant_id'])
@@ -7,6 +7,7 @@ import streamlit as st
 import pandas as pd
 from azure_theme import AzureTheme
 import plotly.express as px
+from azure_aks_fleet import get_aks_fleet
 
 class AzureAKSManagementModule:
     """Azure AKS Management module"""
@@ -16,6 +17,14 @@ class AzureAKSManagementModule:
         st.markdown("## 📦 Azure Kubernetes Service (AKS)")
         st.caption("Manage AKS clusters, node pools, and Kubernetes workloads")
         
+        # One fleet snapshot shared by every tab
+        fleet = get_aks_fleet()
+        if st.button("🔄 Refresh Fleet"):
+            fleet.snapshot(force=True)
+        snapshot = fleet.snapshot()
+        for scope, error in snapshot.errors.items():
+            st.warning(f"⚠️ {scope}: {error}")
+        
         tabs = st.tabs([
             "📊 Overview",
             "🎛️ Clusters",
@@ -26,53 +35,55 @@ class AzureAKSManagementModule:
         ])
         
         with tabs[0]:
-            AzureAKSManagementModule._render_overview()
+            AzureAKSManagementModule._render_overview(snapshot)
         with tabs[1]:
-            AzureAKSManagementModule._render_clusters()
+            AzureAKSManagementModule._render_clusters(snapshot)
         with tabs[2]:
-            AzureAKSManagementModule._render_node_pools()
+            AzureAKSManagementModule._render_node_pools(snapshot)
         with tabs[3]:
-            AzureAKSManagementModule._render_workloads()
+            AzureAKSManagementModule._render_workloads(snapshot)
         with tabs[4]:
-            AzureAKSManagementModule._render_security()
+            AzureAKSManagementModule._render_security(snapshot)
         with tabs[5]:
-            AzureAKSManagementModule._render_monitoring()
+            AzureAKSManagementModule._render_monitoring(snapshot)
     
     @staticmethod
-    def _render_overview():
+    def _render_overview(snapshot):
         st.markdown("### 📊 AKS Overview")
         
+        summary = snapshot.summary()
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            AzureTheme.azure_metric_card("AKS Clusters", "8", "🎛️", "+1 this month")
+            AzureTheme.azure_metric_card("AKS Clusters", str(summary['clusters']), "🎛️", f"{summary['running_clusters']} running")
         with col2:
-            AzureTheme.azure_metric_card("Total Nodes", "45", "📦", "+5 this week")
+            AzureTheme.azure_metric_card("Total Nodes", str(summary['nodes']), "📦", f"{summary['node_pools']} node pools")
         with col3:
-            AzureTheme.azure_metric_card("Running Pods", "234", "🚀")
+            AzureTheme.azure_metric_card("Running Pods", str(summary['running_pods']), "🚀")
         with col4:
-            AzureTheme.azure_metric_card("Cluster Health", "✅ Healthy", "❤️")
+            AzureTheme.azure_metric_card("Cluster Health", "✅ Healthy" if summary['healthy'] else "⚠️ Degraded", "❤️")
         
         st.markdown("---")
         
         # Clusters table
         st.markdown("#### 🎛️ AKS Clusters")
         
-        clusters = [
-            {"Name": "prod-aks-east", "K8s Version": "1.28.3", "Nodes": 12, "Status": "✅ Running", "Location": "East US"},
-            {"Name": "staging-aks-west", "K8s Version": "1.28.3", "Nodes": 6, "Status": "✅ Running", "Location": "West US"},
-            {"Name": "dev-aks-central", "K8s Version": "1.27.8", "Nodes": 3, "Status": "✅ Running", "Location": "Central US"}
-        ]
-        
-        df = pd.DataFrame(clusters)
+        clusters = snapshot.clusters
+        df = pd.DataFrame({
+            "Name": clusters['name'],
+            "K8s Version": clusters['kubernetes_version'],
+            "Nodes": clusters['node_count'],
+            "Status": clusters['power_state'].astype(str).map(lambda s: f"✅ {s}" if s == "Running" else f"⏸️ {s}"),
+            "Location": clusters['location'],
+            "Upgrades": clusters['upgrades'].map(lambda u: ", ".join(u) if u else "Up to date")
+        })
         st.dataframe(df, use_container_width=True, hide_index=True)
     
     @staticmethod
-    def _render_clusters():
+    def _render_clusters(snapshot):
         st.markdown("### 🎛️ Manage Clusters")
         
         AzureTheme.azure_info_box(
-            "AKS Clusters",
             "Deploy and manage containerized applications with fully managed Kubernetes service.",
             "🎛️"
         )
@@ -83,8 +94,9 @@ class AzureAKSManagementModule:
             
             with col1:
                 st.text_input("Cluster Name", placeholder="my-aks-cluster")
-                st.selectbox("Kubernetes Version", ["1.28.3", "1.27.8", "1.26.10"])
-                st.selectbox("Resource Group", ["Production-RG", "Development-RG"])
+                st.selectbox("Kubernetes Version", sorted(set(snapshot.clusters['kubernetes_version'].dropna().astype(str)) |
+                                                          set(v for u in snapshot.clusters['upgrades'] for v in u or []), reverse=True))
+                st.selectbox("Resource Group", sorted(snapshot.clusters['resource_group'].dropna().astype(str).unique()))
             
             with col2:
                 st.selectbox("Location", ["East US", "West US", "Central US"])
@@ -119,14 +131,19 @@ class AzureAKSManagementModule:
                 st.error("⚠️ This action cannot be undone!")
     
     @staticmethod
-    def _render_node_pools():
+    def _render_node_pools(snapshot):
         st.markdown("### 📦 Node Pools")
         
-        node_pools = [
-            {"Pool": "agentpool", "Mode": "System", "Nodes": 3, "VM Size": "Standard_D2s_v3", "Auto-scale": "✅"},
-            {"Pool": "userpool1", "Mode": "User", "Nodes": 5, "VM Size": "Standard_D4s_v3", "Auto-scale": "✅"},
-            {"Pool": "gpupool", "Mode": "User", "Nodes": 2, "VM Size": "Standard_NC6s_v3", "Auto-scale": "❌"}
-        ]
+        pools = snapshot.node_pools
+        node_pools = pd.DataFrame({
+            "Cluster": pools['cluster'],
+            "Pool": pools['name'],
+            "Mode": pools['mode'],
+            "Nodes": pools['count'],
+            "VM Size": pools['vm_size'],
+            "Version": pools['orchestrator_version'],
+            "Auto-scale": pools['auto_scaling'].map(lambda a: "✅" if a else "❌")
+        })
         
         df = pd.DataFrame(node_pools)
         st.dataframe(df, use_container_width=True, hide_index=True)
@@ -137,17 +154,25 @@ class AzureAKSManagementModule:
             st.success("✅ Node pool creation wizard opened!")
     
     @staticmethod
-    def _render_workloads():
+    def _render_workloads(snapshot):
         st.markdown("### 🚀 Kubernetes Workloads")
         
         workload_type = st.selectbox("Workload Type", ["All", "Deployments", "StatefulSets", "DaemonSets", "Jobs"])
         
-        workloads = [
-            {"Name": "web-app-deployment", "Type": "Deployment", "Replicas": "3/3", "Status": "✅ Ready", "Namespace": "production"},
-            {"Name": "api-deployment", "Type": "Deployment", "Replicas": "5/5", "Status": "✅ Ready", "Namespace": "production"},
-            {"Name": "redis-statefulset", "Type": "StatefulSet", "Replicas": "3/3", "Status": "✅ Ready", "Namespace": "cache"},
-            {"Name": "log-collector", "Type": "DaemonSet", "Replicas": "12/12", "Status": "✅ Ready", "Namespace": "kube-system"}
-        ]
+        workloads = snapshot.workloads
+        if workload_type != "All":
+            workloads = workloads[workloads['kind'] == workload_type[:-1]]
+        cluster_names = snapshot.clusters.set_index('id')['name']
+        status = workloads['ready'].eq(workloads['replicas']).map({True: "✅ Ready", False: "⏳ Progressing"})
+        status[workloads['failed'] > 0] = "❌ Failed"
+        workloads = pd.DataFrame({
+            "Name": workloads['name'],
+            "Type": workloads['kind'],
+            "Replicas": workloads['ready'].astype(int).astype(str) + "/" + workloads['replicas'].astype(int).astype(str),
+            "Status": status,
+            "Namespace": workloads['namespace'],
+            "Cluster": workloads['cluster_id'].astype(str).map(cluster_names)
+        })
         
         df = pd.DataFrame(workloads)
         st.dataframe(df, use_container_width=True, hide_index=True)
@@ -167,57 +192,81 @@ class AzureAKSManagementModule:
                 st.warning("Rolling back deployment...")
     
     @staticmethod
-    def _render_security():
+    def _render_security(snapshot):
         st.markdown("### 🔐 AKS Security")
         
         AzureTheme.azure_info_box(
-            "AKS Security",
             "Implement security best practices for your Kubernetes clusters.",
             "🔐"
         )
         
+        clusters = snapshot.clusters
+        total = max(len(clusters), 1)
+        
+        def coverage(column):
+            return f"{int(clusters[column].fillna(False).astype(bool).sum())}/{len(clusters)} clusters"
+        
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("#### 🔐 Authentication & Authorization")
-            st.checkbox("Azure AD integration", value=True)
-            st.checkbox("RBAC enabled", value=True)
-            st.checkbox("Azure Policy for AKS", value=True)
+            st.metric("Azure AD integration", coverage('aad'))
+            st.metric("RBAC enabled", coverage('rbac'))
+            st.metric("Azure Policy for AKS", coverage('azure_policy'))
         
         with col2:
             st.markdown("#### 🛡️ Security Features")
-            st.checkbox("Microsoft Defender for Containers", value=True)
-            st.checkbox("Pod Security Standards", value=True)
-            st.checkbox("Network Policies", value=True)
+            st.metric("Microsoft Defender for Containers", coverage('defender'))
+            st.metric("Network Policies", f"{int(clusters['network_policy'].notna().sum())}/{len(clusters)} clusters")
+            st.metric("Private API Server", coverage('private_cluster'))
         
         st.markdown("---")
         
-        # Security recommendations
+        # Security recommendations derived from the fleet snapshot
         st.markdown("#### 💡 Security Recommendations")
         
-        recommendations = [
-            {"Recommendation": "Enable Azure AD Workload Identity", "Priority": "High", "Status": "⏳ Pending"},
-            {"Recommendation": "Implement Pod Security Standards", "Priority": "Medium", "Status": "✅ Implemented"},
-            {"Recommendation": "Enable Container Insights", "Priority": "Low", "Status": "✅ Implemented"}
+        checks = [
+            ("Enable Microsoft Defender for Containers", "High", 'defender'),
+            ("Enable Azure AD integration", "High", 'aad'),
+            ("Enable Azure Policy add-on", "Medium", 'azure_policy'),
+            ("Enable Container Insights", "Low", 'monitoring')
         ]
+        recommendations = []
+        for recommendation, priority, column in checks:
+            missing = clusters.loc[~clusters[column].fillna(False).astype(bool), 'name']
+            recommendations.append({
+                "Recommendation": recommendation,
+                "Priority": priority,
+                "Status": "✅ Implemented" if missing.empty else f"⏳ Pending ({len(missing)}/{total})",
+                "Clusters": ", ".join(missing)
+            })
         
         df = pd.DataFrame(recommendations)
         st.dataframe(df, use_container_width=True, hide_index=True)
     
     @staticmethod
-    def _render_monitoring():
+    def _render_monitoring(snapshot):
         st.markdown("### 📊 Cluster Monitoring")
         
+        summary = snapshot.summary()
+        metrics = snapshot.metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("CPU Usage", "45%", "↑ 5%")
+            cpu = metrics['cpu_percent'].mean()
+            st.metric("CPU Usage", f"{cpu:.0f}%" if pd.notna(cpu) else "N/A")
         with col2:
-            st.metric("Memory Usage", "62%", "↑ 3%")
+            memory = metrics['memory_percent'].mean()
+            st.metric("Memory Usage", f"{memory:.0f}%" if pd.notna(memory) else "N/A")
         with col3:
-            st.metric("Pod Count", "234", "+12")
+            st.metric("Pod Count", summary['pods'], f"{summary['pending_pods']} pending")
         with col4:
-            st.metric("Node Health", "100%", "")
+            st.metric("Failed Pods", summary['failed_pods'])
+        
+        if len(metrics):
+            per_cluster = metrics.assign(Cluster=metrics['cluster_id'].map(snapshot.clusters.set_index('id')['name']))
+            st.dataframe(per_cluster.rename(columns={'cpu_percent': 'CPU %', 'memory_percent': 'Memory %'})
+                         [['Cluster', 'CPU %', 'Memory %']].round(1), use_container_width=True, hide_index=True)
         
         st.markdown("---")
         
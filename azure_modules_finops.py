@@ -8,7 +8,9 @@ import pandas as pd
 from azure_theme import AzureTheme
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from azure_cost_cube import get_cost_cube, timeframe_range
+from azure_cost_management import AzureCostManagementService
+from rightsizing_engine import get_rightsizing_service
 
 class AzureFinOpsModule:
     """Azure FinOps & Cost Management module"""
@@ -44,25 +46,38 @@ class AzureFinOpsModule:
     def _render_cost_dashboard():
         st.markdown("### 📊 Cost Dashboard")
         
+        cube = get_cost_cube()
+        summary = AzureCostManagementService.get_cost_by_subscription(None)
+        
         # Key metrics
         col1, col2, col3, col4 = st.columns(4)
         
+        symbol = '$' if summary['currency'] == 'USD' else f"{summary['currency']} "
         with col1:
-            AzureTheme.azure_metric_card("Current Month", "$142,890", "💰", "-8.3% vs last month")
+            AzureTheme.azure_metric_card("Current Month", f"{symbol}{summary['total_cost']:,.0f}", "💰",
+                                         f"{summary['vs_last_month']:+.1f}% vs last month")
         with col2:
-            AzureTheme.azure_metric_card("Forecast (Month End)", "$156,400", "📊", "+5.2%")
+            growth = (summary['forecast'] / summary['total_cost'] - 1) * 100 if summary['total_cost'] else 0.0
+            AzureTheme.azure_metric_card("Forecast (Month End)", f"{symbol}{summary['forecast']:,.0f}", "📊", f"{growth:+.1f}%")
         with col3:
             AzureTheme.azure_metric_card("Savings Opportunities", "$23,450", "💡")
         with col4:
             AzureTheme.azure_metric_card("Reserved Instances", "34%", "📦", "+5% coverage")
+        if summary['other_currencies']:
+            st.caption("Also billed: " + ", ".join(f"{amount:,.0f} {currency}"
+                                                   for currency, amount in summary['other_currencies'].items()))
         
         st.markdown("---")
         
         # Cost trend
         st.markdown("#### 📈 Monthly Cost Trend")
         
-        months = pd.date_range(start='2024-01-01', end='2024-12-01', freq='M')
-        costs = [125000, 130000, 128000, 135000, 142000, 138000, 145000, 148000, 152000, 149000, 147000, 142890]
+        if cube is not None:
+            monthly = cube.monthly()
+            months, costs = monthly.index.to_timestamp(), monthly.to_numpy()
+        else:
+            months = pd.date_range(start='2024-01-01', end='2024-12-01', freq='M')
+            costs = [125000, 130000, 128000, 135000, 142000, 138000, 145000, 148000, 152000, 149000, 147000, 142890]
         
         fig = px.line(x=months, y=costs, markers=True)
         fig.update_traces(line_color='#0078D4', marker=dict(size=8, color='#50E6FF'))
@@ -81,14 +96,7 @@ class AzureFinOpsModule:
         with col1:
             st.markdown("#### 💸 Top Cost Services")
             
-            services_cost = {
-                'Virtual Machines': 45230,
-                'SQL Database': 28450,
-                'Storage': 18900,
-                'App Services': 15670,
-                'AKS': 12340,
-                'VPN Gateway': 8900
-            }
+            services_cost = {c.service: c.cost for c in AzureCostManagementService.get_cost_by_service(None)[:6]}
             
             fig = px.bar(
                 x=list(services_cost.values()),
@@ -108,12 +116,16 @@ class AzureFinOpsModule:
         with col2:
             st.markdown("#### 🌍 Cost by Location")
             
-            location_cost = {
-                'East US': 58900,
-                'West US': 42300,
-                'Central US': 28450,
-                'West Europe': 13240
-            }
+            if cube is not None:
+                start, end = timeframe_range('MonthToDate')
+                location_cost = cube.breakdown('location', start=start, end=end).to_dict()
+            else:
+                location_cost = {
+                    'East US': 58900,
+                    'West US': 42300,
+                    'Central US': 28450,
+                    'West Europe': 13240
+                }
             
             fig = go.Figure(data=[go.Pie(
                 labels=list(location_cost.keys()),
@@ -132,6 +144,8 @@ class AzureFinOpsModule:
     def _render_cost_analysis():
         st.markdown("### 💰 Cost Analysis")
         
+        cube = get_cost_cube()
+        
         # Filters
         col1, col2, col3, col4 = st.columns(4)
         
@@ -140,7 +154,13 @@ class AzureFinOpsModule:
         with col2:
             group_by = st.selectbox("Group By", ["Service", "Resource Group", "Location", "Tag"])
         with col3:
-            subscription_filter = st.selectbox("Subscription", ["All", "Production", "Development", "Staging"])
+            if cube is not None:
+                from config_settings import AppConfig
+                names = {s.subscription_id.lower(): s.subscription_name for s in AppConfig.load_azure_subscriptions()}
+                subscriptions = {names.get(sub, sub): sub for sub in cube.frame['subscription_id'].cat.categories}
+                subscription_filter = st.selectbox("Subscription", ["All"] + sorted(subscriptions))
+            else:
+                subscription_filter = st.selectbox("Subscription", ["All", "Production", "Development", "Staging"])
         with col4:
             granularity = st.selectbox("Granularity", ["Daily", "Monthly"])
         
@@ -149,6 +169,11 @@ class AzureFinOpsModule:
         # Cost breakdown table
         st.markdown("#### 📋 Detailed Cost Breakdown")
         
+        if cube is not None:
+            AzureFinOpsModule._render_cube_breakdown(cube, time_range, group_by,
+                                                     subscriptions.get(subscription_filter), granularity)
+            return
+        
         cost_data = [
             {"Resource Group": "Production-RG", "Service": "Virtual Machines", "Cost": "$28,450", "% of Total": "19.9%", "Trend": "↓ 5%"},
             {"Resource Group": "Production-RG", "Service": "SQL Database", "Cost": "$18,900", "% of Total": "13.2%", "Trend": "↑ 3%"},
@@ -169,6 +194,51 @@ class AzureFinOpsModule:
             if st.button("📧 Email Report", use_container_width=True):
                 st.info("📧 Report will be emailed to your address")
     
+    @staticmethod
+    def _render_cube_breakdown(cube, time_range: str, group_by: str, subscription_id, granularity: str):
+        """Cost breakdown sliced from the cost cube"""
+        timeframes = {"This Month": "MonthToDate", "Last Month": "TheLastMonth", "Last 3 Months": "Last90Days",
+                      "Last 6 Months": "Last180Days", "Last Year": "Last365Days"}
+        dimensions = {"Service": "service", "Resource Group": "resource_group", "Location": "location"}
+        if group_by not in dimensions:
+            st.info(f"Grouping by {group_by} is not part of the cost cube")
+            return
+        
+        start, end = timeframe_range(timeframes.get(time_range, "MonthToDate"))
+        frame = cube.slice(subscription_id, start, end)
+        breakdown = frame.groupby(dimensions[group_by], observed=True)['cost'].sum().sort_values(ascending=False)
+        total = breakdown.sum()
+        
+        # Trend: second half of the window vs first half
+        midpoint = pd.Timestamp(start + (end - start) / 2)
+        halves = frame.groupby([dimensions[group_by], frame['date'] > midpoint], observed=True)['cost'].sum().unstack(fill_value=0.0)
+        df = pd.DataFrame({
+            group_by: breakdown.index.astype(str),
+            "Cost": [f"${c:,.0f}" for c in breakdown],
+            "% of Total": [f"{c / total * 100:.1f}%" if total else "0.0%" for c in breakdown],
+        })
+        if True in halves and False in halves:
+            change = (halves[True] / halves[False].replace(0, float('nan')) - 1) * 100
+            df["Trend"] = [f"{change.get(k, 0):+.0f}%" if pd.notna(change.get(k)) else "→ new" for k in breakdown.index]
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        # Cost over time for the top groups
+        period = frame['date'].dt.to_period('M').dt.to_timestamp() if granularity == "Monthly" else frame['date']
+        top = breakdown.index[:8]
+        series = frame[frame[dimensions[group_by]].isin(top)].groupby(
+            [period, dimensions[group_by]], observed=True)['cost'].sum().reset_index()
+        series.columns = ['Date', group_by, 'Cost']
+        fig = px.bar(series, x='Date', y='Cost', color=group_by)
+        fig.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(family='Segoe UI', color='#004E8C')
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        st.download_button("📥 Download CSV", data=frame.to_csv(index=False),
+                           file_name=f"cost_{start.isoformat()}_{end.isoformat()}.csv", use_container_width=True)
+    
     @staticmethod
     def _render_budgets():
         st.markdown("### 🎯 Budgets & Cost Alerts")
@@ -214,61 +284,65 @@ class AzureFinOpsModule:
     def _render_optimization():
         st.markdown("### 💡 Cost Optimization Recommendations")
         
+        recommendations = AzureCostManagementService.get_cost_optimization_recommendations(None)
+        savings = [rec for rec in recommendations if rec['potential_savings'] > 0]
+        by_effort = {effort: sum(rec['potential_savings'] for rec in savings if rec['effort'] == effort)
+                     for effort in ("Low", "Medium", "High")}
+        
         # Savings summary
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Savings Identified", "$23,450/mo")
+            st.metric("Total Savings Identified", f"${sum(by_effort.values()):,.0f}/mo")
         with col2:
-            st.metric("Quick Wins", "$8,900/mo")
+            st.metric("Quick Wins", f"${by_effort['Low']:,.0f}/mo")
         with col3:
-            st.metric("Medium Effort", "$10,200/mo")
+            st.metric("Medium Effort", f"${by_effort['Medium']:,.0f}/mo")
         with col4:
-            st.metric("High Effort", "$4,350/mo")
+            st.metric("High Effort", f"${by_effort['High']:,.0f}/mo")
         
         st.markdown("---")
         
         # Recommendations
         st.markdown("#### 💡 Top Recommendations")
         
-        recommendations = [
-            {
-                "Recommendation": "Right-size underutilized VMs",
-                "Impact": "$8,900/month",
-                "Effort": "Low",
-                "Resources": 23,
-                "Priority": "🔴 High",
-                "Action": "Resize"
-            },
-            {
-                "Recommendation": "Purchase Reserved Instances",
-                "Impact": "$7,200/month",
-                "Effort": "Low",
-                "Resources": 12,
-                "Priority": "🔴 High",
-                "Action": "Purchase"
-            },
-            {
-                "Recommendation": "Delete unattached disks",
-                "Impact": "$2,340/month",
-                "Effort": "Low",
-                "Resources": 45,
-                "Priority": "🟠 Medium",
-                "Action": "Delete"
-            },
-            {
-                "Recommendation": "Use Azure Hybrid Benefit",
-                "Impact": "$5,010/month",
-                "Effort": "Medium",
-                "Resources": 18,
-                "Priority": "🟠 Medium",
-                "Action": "Configure"
-            }
-        ]
-        
-        df = pd.DataFrame(recommendations)
+        priority_icons = {"High": "🔴 High", "Medium": "🟠 Medium", "Low": "🟢 Low"}
+        df = pd.DataFrame([{
+            "Recommendation": rec['recommendation'],
+            "Impact": f"${rec['potential_savings']:,.0f}/month",
+            "Effort": rec['effort'],
+            "Resources": rec['affected_resources'],
+            "Priority": priority_icons.get(rec['priority'], rec['priority']),
+            "Details": rec['details']
+        } for rec in sorted(recommendations, key=lambda rec: rec['potential_savings'], reverse=True)])
         st.dataframe(df, use_container_width=True, hide_index=True)
         
+        # Per-VM sizing
+        st.markdown("#### 📐 VM Rightsizing")
+        
+        min_confidence = st.slider("Minimum confidence", 0.0, 1.0, 0.5, 0.05, key="azure_rightsizing_confidence")
+        service = get_rightsizing_service('azure')
+        vms = service.recommendations(min_confidence=min_confidence)
+        if service.last_error:
+            st.warning(f"⚠️ Utilization refresh failed, showing the last results: {service.last_error}")
+        unknown = service.summary()['unknown_type']
+        if unknown:
+            st.caption(f"{unknown:,} VMs have a size missing from the price table and are not sized")
+        if vms.empty:
+            st.info("No VM sizing changes at this confidence level")
+        else:
+            st.dataframe(pd.DataFrame({
+                "VM": vms['name'],
+                "Subscription": vms['scope'],
+                "Current Size": vms['instance_type'],
+                "Recommended": vms['recommended_type'],
+                "Action": vms['action'],
+                "p95 CPU %": vms['cpu_p95'].round(0),
+                "p95 Memory %": vms['mem_p95'].round(0),
+                "Monthly Savings": vms['monthly_savings'].map(lambda value: f"${value:,.0f}"),
+                "Confidence": vms['confidence'].map(lambda value: f"{value:.0%}")
+            }).head(50), use_container_width=True, hide_index=True)
+        
         if st.button("🔧 Apply Selected Recommendations", type="primary", use_container_width=True):
             st.success("✅ Optimization workflow initiated!")
     
@@ -291,21 +365,35 @@ class AzureFinOpsModule:
         # Forecast chart
         st.markdown("#### 📊 Cost Forecast")
         
-        # Generate forecast data
-        historical_dates = pd.date_range(end=datetime.now(), periods=90, freq='D')
-        forecast_dates = pd.date_range(start=datetime.now(), periods=90, freq='D')
-        
-        historical_costs = [4500 + (i * 10) + (i % 7 * 100) for i in range(90)]
-        forecast_costs = [historical_costs[-1] + (i * 12) for i in range(90)]
-        
-        df = pd.DataFrame({
-            'Date': list(historical_dates) + list(forecast_dates),
-            'Cost': historical_costs + forecast_costs,
-            'Type': ['Historical'] * 90 + ['Forecast'] * 90
-        })
-        
-        fig = px.line(df, x='Date', y='Cost', color='Type')
+        # Forecast total and every service in one batch
+        horizon = {"Next 30 Days": 30, "Next 90 Days": 90, "Next 6 Months": 180, "Next Year": 365}.get(forecast_period, 90)
+        result = AzureCostManagementService.get_service_forecast(None, horizon, confidence_level / 100)
+        history, forecast, backtest = result['history'], result['forecast'], result['backtest']
+        
+        services = [str(s) for s in history.index if s != 'Total']
+        ranked = sorted(services, key=lambda s: -history.loc[s].iloc[-30:].sum())
+        shown = st.multiselect("Series", ['Total'] + ranked, default=['Total'] + ranked[:3], key="azure_forecast_series")
+        
+        fig = go.Figure()
+        colors = ['#0078D4', '#D83B01', '#107C10', '#5C2D91', '#008575', '#FFB900', '#E3008C']
+        for i, name in enumerate(shown):
+            color = colors[i % len(colors)]
+            daily = history.loc[name].iloc[-90:]
+            predicted = forecast.series(name)
+            fig.add_trace(go.Scatter(x=daily.index, y=daily.values, mode='lines', name=f"{name} (actual)",
+                                     line=dict(color=color, width=1), legendgroup=name))
+            fig.add_trace(go.Scatter(
+                x=list(predicted['date']) + list(predicted['date'][::-1]),
+                y=list(predicted['upper']) + list(predicted['lower'][::-1]),
+                fill='toself', fillcolor=color, opacity=0.15, line=dict(width=0),
+                name=f"{name} {confidence_level}% interval", legendgroup=name, showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(x=predicted['date'], y=predicted['forecast'], mode='lines',
+                                     name=f"{name} (forecast)", line=dict(color=color, width=2, dash='dash'),
+                                     legendgroup=name))
         fig.update_layout(
+            yaxis_title='Daily Cost ($)',
+            hovermode='x unified',
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
             font=dict(family='Segoe UI', color='#004E8C')
@@ -315,12 +403,29 @@ class AzureFinOpsModule:
         # Forecast summary
         col1, col2, col3 = st.columns(3)
         
+        totals = forecast.totals(30)
+        next_month = totals.loc['Total', 'forecast']
+        last_month = history.loc['Total'].iloc[-30:].sum()
         with col1:
-            st.metric("Forecasted Next Month", "$156,400")
+            st.metric("Forecasted Next 30 Days", f"${next_month:,.0f}",
+                      help=f"{confidence_level}% interval: ${totals.loc['Total', 'lower']:,.0f} - ${totals.loc['Total', 'upper']:,.0f}")
         with col2:
-            st.metric("vs Current Month", "+9.5%")
+            st.metric("vs Last 30 Days", f"{(next_month / last_month - 1) * 100:+.1f}%" if last_month else "n/a")
         with col3:
-            st.metric("Confidence", f"{confidence_level}%")
+            error = backtest.loc['Total', 'period_error']
+            st.metric("Backtest Accuracy", f"{(1 - error) * 100:.1f}%" if pd.notna(error) else "n/a",
+                      help="30-day total vs actual, averaged over the last two 30-day backtests")
+        
+        # Per-service outlook with backtest error
+        st.markdown("#### 📋 Forecast by Service (Next 30 Days)")
+        table = totals.join(backtest).loc[['Total'] + ranked]
+        st.dataframe(pd.DataFrame({
+            'Series': table.index.astype(str),
+            'Forecast': table['forecast'].map(lambda v: f"${v:,.0f}"),
+            f'{confidence_level}% Interval': [f"${lo:,.0f} - ${hi:,.0f}" for lo, hi in zip(table['lower'], table['upper'])],
+            'Backtest WAPE': table['wape'].map(lambda v: f"{v:.1%}" if pd.notna(v) else "n/a"),
+            'Interval Coverage': table['coverage'].map(lambda v: f"{v:.0%}" if pd.notna(v) else "n/a")
+        }), use_container_width=True, hide_index=True)
     
     @staticmethod
     def _render_reports():
@@ -6,6 +6,7 @@ Hierarchical organization and governance structure management
 import streamlit as st
 import pandas as pd
 from azure_theme import AzureTheme
+from azure_management_groups import get_hierarchy_cache, MANAGEMENT_GROUP
 
 class AzureManagementGroupsUI:
     """Azure Management Groups module"""
@@ -39,30 +40,27 @@ class AzureManagementGroupsUI:
         st.markdown("### 🌳 Management Group Hierarchy")
         
         AzureTheme.azure_info_box(
-            "Management Groups",
             "Organize Azure subscriptions into containers for applying policies and access controls at scale.",
             "🏢"
         )
         
-        st.markdown("""
-        ```
-        Tenant Root Group
-        ├── Production
-        │   ├── Prod-Apps
-        │   └── Prod-Data
-        ├── Development
-        │   ├── Dev-Team-A
-        │   └── Dev-Team-B
-        └── Shared-Services
-            ├── Networking
-            └── Security
-        ```
-        """)
+        cache = get_hierarchy_cache()
+        if st.button("🔄 Reload Hierarchy"):
+            cache.get(force=True)
+        hierarchy = cache.get()
         
+        st.code(hierarchy.render_tree(), language=None)
+        
+        policies = hierarchy.assignment_counts('policy')
         groups_data = [
-            {"Name": "Production", "Subscriptions": 5, "Child Groups": 2, "Policies": 12},
-            {"Name": "Development", "Subscriptions": 8, "Child Groups": 2, "Policies": 8},
-            {"Name": "Shared-Services", "Subscriptions": 3, "Child Groups": 2, "Policies": 15}
+            {
+                "Name": hierarchy.names[i],
+                "Depth": int(hierarchy.depth[i]),
+                "Subscriptions": int(hierarchy.subscription_count[i]),
+                "Child Groups": len([c for c in hierarchy.children(i) if hierarchy.kinds[c] == MANAGEMENT_GROUP]),
+                "Policies": int(policies[i])
+            }
+            for i in hierarchy.groups() if hierarchy.parent[i] >= 0
         ]
         
         df = pd.DataFrame(groups_data)
@@ -72,14 +70,51 @@ class AzureManagementGroupsUI:
     def _render_policies():
         st.markdown("### 📋 Azure Policies")
         
-        policies_data = [
-            {"Policy": "Allowed Locations", "Effect": "Deny", "Scope": "Production", "Compliance": "100%"},
-            {"Policy": "Required Tags", "Effect": "Audit", "Scope": "All", "Compliance": "94%"},
-            {"Policy": "Allowed VM SKUs", "Effect": "Deny", "Scope": "Development", "Compliance": "100%"}
-        ]
+        hierarchy = get_hierarchy_cache().get()
+        
+        policies_data = []
+        for scope, assignments in hierarchy.assignments.get('policy', {}).items():
+            node = hierarchy.node(scope)
+            for assignment in assignments:
+                policies_data.append({
+                    "Policy": assignment.policy_name,
+                    "Enforcement": assignment.enforcement_mode,
+                    "Scope": hierarchy.names[node] if node is not None else scope.split('/')[-1],
+                    "Subscriptions Covered": int(hierarchy.subscription_count[node]) if node is not None else 1
+                })
         
         df = pd.DataFrame(policies_data)
         st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        
+        # Effective assignments for a subscription (direct + inherited)
+        st.markdown("#### 🔎 Effective Assignments")
+        
+        subscriptions = hierarchy.subscriptions()
+        if not subscriptions:
+            st.info("No subscriptions in the hierarchy")
+            return
+        
+        selected = st.selectbox("Subscription", subscriptions, format_func=lambda i: hierarchy.names[i])
+        if selected is None:
+            return
+        
+        st.caption(" → ".join(hierarchy.names[i] for i in reversed(hierarchy.chains[selected])))
+        effective = [
+            {
+                "Type": "Policy" if e['kind'] == 'policy' else "Role",
+                "Assignment": e['assignment'].policy_name if e['kind'] == 'policy'
+                else f"{e['assignment'].role_definition} → {e['assignment'].principal_name}",
+                "Assigned At": e['source_name'],
+                "Inherited": "Yes" if e['inherited'] else "No"
+            }
+            for e in hierarchy.effective(hierarchy.ids[selected])
+        ]
+        if effective:
+            st.dataframe(pd.DataFrame(effective), use_container_width=True, hide_index=True)
+        else:
+            st.info("No policy or role assignments apply to this subscription")
     
     @staticmethod
     def _render_access_control():
@@ -99,12 +134,15 @@ class AzureManagementGroupsUI:
     def _render_analytics():
         st.markdown("### 📊 Management Group Analytics")
         
+        hierarchy = get_hierarchy_cache().get()
+        
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Total Groups", "12")
+            st.metric("Total Groups", len(hierarchy.groups()))
         with col2:
-            st.metric("Total Subscriptions", "28")
+            st.metric("Total Subscriptions", len(hierarchy.subscriptions()))
         with col3:
-            st.metric("Policy Compliance", "96.5%")
+            from azure_policy import AzurePolicyService
+            st.metric("Policy Compliance", f"{AzurePolicyService.get_policy_insights(None)['overall_compliance']:.1f}%")
         with col4:
-            st.metric("Role Assignments", "145")
+            st.metric("Role Assignments", int(hierarchy.assignment_counts('role').sum()))
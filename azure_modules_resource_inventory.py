@@ -9,6 +9,7 @@ from typing import Dict, List
 from datetime import datetime
 from azure_theme import AzureTheme
 from config_settings import AppConfig
+from azure_resource_graph import get_azure_inventory, RESOURCE_TYPE_LABELS
 import plotly.express as px
 import plotly.graph_objects as go
 
@@ -62,20 +63,34 @@ class AzureResourceInventoryModule:
         
         st.markdown("### 📊 Resource Inventory Overview")
         
+        inventory = get_azure_inventory()
+        frame = inventory.snapshot() if inventory is not None else None
+        
         # Key metrics
         col1, col2, col3, col4 = st.columns(4)
         
-        with col1:
-            AzureTheme.azure_metric_card("Total Resources", "12,847", "📦", "+458 this week")
-        
-        with col2:
-            AzureTheme.azure_metric_card("Resource Groups", "48", "📁", "+2 this month")
-        
-        with col3:
-            AzureTheme.azure_metric_card("Resource Types", "67", "🔧")
-        
-        with col4:
-            AzureTheme.azure_metric_card("Untagged", "234", "⚠️", "-45 this week")
+        if frame is not None:
+            untagged = int(sum(1 for tags in frame['tags'] if not tags))
+            with col1:
+                AzureTheme.azure_metric_card("Total Resources", f"{len(frame):,}", "📦")
+            with col2:
+                AzureTheme.azure_metric_card("Resource Groups", f"{frame['resource_group'].str.lower().nunique():,}", "📁")
+            with col3:
+                AzureTheme.azure_metric_card("Resource Types", f"{frame['type'].nunique():,}", "🔧")
+            with col4:
+                AzureTheme.azure_metric_card("Untagged", f"{untagged:,}", "⚠️")
+        else:
+            with col1:
+                AzureTheme.azure_metric_card("Total Resources", "12,847", "📦", "+458 this week")
+            
+            with col2:
+                AzureTheme.azure_metric_card("Resource Groups", "48", "📁", "+2 this month")
+            
+            with col3:
+                AzureTheme.azure_metric_card("Resource Types", "67", "🔧")
+            
+            with col4:
+                AzureTheme.azure_metric_card("Untagged", "234", "⚠️", "-45 this week")
         
         st.markdown("---")
         
@@ -85,18 +100,21 @@ class AzureResourceInventoryModule:
         with col1:
             st.markdown("#### 📊 Resources by Type")
             
-            resource_types = {
-                'Virtual Machines': 234,
-                'Storage Accounts': 156,
-                'SQL Databases': 89,
-                'App Services': 67,
-                'Virtual Networks': 45,
-                'Load Balancers': 34,
-                'Azure Functions': 28,
-                'Key Vaults': 23,
-                'Cosmos DB': 12,
-                'AKS Clusters': 8
-            }
+            if frame is not None:
+                resource_types = frame['type'].map(lambda t: RESOURCE_TYPE_LABELS.get(t, t)).value_counts().head(10).to_dict()
+            else:
+                resource_types = {
+                    'Virtual Machines': 234,
+                    'Storage Accounts': 156,
+                    'SQL Databases': 89,
+                    'App Services': 67,
+                    'Virtual Networks': 45,
+                    'Load Balancers': 34,
+                    'Azure Functions': 28,
+                    'Key Vaults': 23,
+                    'Cosmos DB': 12,
+                    'AKS Clusters': 8
+                }
             
             fig = px.bar(
                 x=list(resource_types.values()),
@@ -119,14 +137,17 @@ class AzureResourceInventoryModule:
         with col2:
             st.markdown("#### 🌍 Resources by Location")
             
-            locations = {
-                'East US': 3456,
-                'West US': 2890,
-                'East US 2': 2345,
-                'Central US': 1890,
-                'West Europe': 1456,
-                'North Europe': 890
-            }
+            if frame is not None:
+                locations = frame['location'].value_counts().head(8).to_dict()
+            else:
+                locations = {
+                    'East US': 3456,
+                    'West US': 2890,
+                    'East US 2': 2345,
+                    'Central US': 1890,
+                    'West Europe': 1456,
+                    'North Europe': 890
+                }
             
             fig = go.Figure(data=[go.Pie(
                 labels=list(locations.keys()),
@@ -184,55 +205,78 @@ class AzureResourceInventoryModule:
         # Resource table
         st.markdown("#### 📋 Resources")
         
-        resources_data = [
-            {
-                "Name": "prod-web-vm-01",
-                "Type": "Virtual Machine",
-                "Resource Group": "Production-RG",
-                "Location": "East US",
-                "Status": "✅ Running",
-                "Tags": "Environment:Prod, App:Web",
-                "Cost/Mo": "$145.80"
-            },
-            {
-                "Name": "prodstorageacct001",
-                "Type": "Storage Account",
-                "Resource Group": "Production-RG",
-                "Location": "East US",
-                "Status": "✅ Active",
-                "Tags": "Environment:Prod",
-                "Cost/Mo": "$67.40"
-            },
-            {
-                "Name": "prod-sqldb-main",
-                "Type": "SQL Database",
-                "Resource Group": "Database-RG",
-                "Location": "East US 2",
-                "Status": "✅ Online",
-                "Tags": "Environment:Prod, Tier:Critical",
-                "Cost/Mo": "$890.50"
-            },
-            {
-                "Name": "prod-app-service-01",
-                "Type": "App Service",
-                "Resource Group": "Production-RG",
-                "Location": "West US",
-                "Status": "✅ Running",
-                "Tags": "Environment:Prod, App:API",
-                "Cost/Mo": "$234.20"
-            },
-            {
-                "Name": "dev-test-vm-02",
-                "Type": "Virtual Machine",
-                "Resource Group": "Development-RG",
-                "Location": "West US",
-                "Status": "⏸️ Stopped",
-                "Tags": "Environment:Dev",
-                "Cost/Mo": "$0.00"
-            }
-        ]
-        
-        df_resources = pd.DataFrame(resources_data)
+        inventory = get_azure_inventory()
+        if inventory is not None:
+            frame = inventory.snapshot()
+            names = {s.subscription_id: s.subscription_name for s in subscriptions}
+            labels = frame['type'].map(lambda t: RESOURCE_TYPE_LABELS.get(t, t))
+            mask = pd.Series(True, index=frame.index)
+            if selected_subscription != "All":
+                mask &= frame['subscription_id'].map(names) == selected_subscription
+            if resource_type != "All":
+                mask &= labels == resource_type
+            if location != "All":
+                mask &= frame['location'].str.replace(' ', '').str.lower() == location.replace(' ', '').lower()
+            selected = frame[mask]
+            df_resources = pd.DataFrame({
+                "Name": selected['name'],
+                "Type": labels[mask],
+                "Resource Group": selected['resource_group'],
+                "Location": selected['location'],
+                "Subscription": selected['subscription_id'].map(names).fillna(selected['subscription_id']),
+                "Tags": [', '.join(f"{k}:{v}" for k, v in tags.items()) for tags in selected['tags']]
+            })
+            st.caption(f"{len(df_resources):,} of {len(frame):,} resources from Azure Resource Graph")
+        else:
+            resources_data = [
+                {
+                    "Name": "prod-web-vm-01",
+                    "Type": "Virtual Machine",
+                    "Resource Group": "Production-RG",
+                    "Location": "East US",
+                    "Status": "✅ Running",
+                    "Tags": "Environment:Prod, App:Web",
+                    "Cost/Mo": "$145.80"
+                },
+                {
+                    "Name": "prodstorageacct001",
+                    "Type": "Storage Account",
+                    "Resource Group": "Production-RG",
+                    "Location": "East US",
+                    "Status": "✅ Active",
+                    "Tags": "Environment:Prod",
+                    "Cost/Mo": "$67.40"
+                },
+                {
+                    "Name": "prod-sqldb-main",
+                    "Type": "SQL Database",
+                    "Resource Group": "Database-RG",
+                    "Location": "East US 2",
+                    "Status": "✅ Online",
+                    "Tags": "Environment:Prod, Tier:Critical",
+                    "Cost/Mo": "$890.50"
+                },
+                {
+                    "Name": "prod-app-service-01",
+                    "Type": "App Service",
+                    "Resource Group": "Production-RG",
+                    "Location": "West US",
+                    "Status": "✅ Running",
+                    "Tags": "Environment:Prod, App:API",
+                    "Cost/Mo": "$234.20"
+                },
+                {
+                    "Name": "dev-test-vm-02",
+                    "Type": "Virtual Machine",
+                    "Resource Group": "Development-RG",
+                    "Location": "West US",
+                    "Status": "⏸️ Stopped",
+                    "Tags": "Environment:Dev",
+                    "Cost/Mo": "$0.00"
+                }
+            ]
+        
+            df_resources = pd.DataFrame(resources_data)
         
         # Apply filters
         if search_term:
@@ -246,7 +290,12 @@ class AzureResourceInventoryModule:
         
         with col1:
             if st.button("🔄 Refresh Inventory", use_container_width=True):
-                st.info("Refreshing resource inventory...")
+                if inventory is not None:
+                    with st.spinner("Querying Azure Resource Graph..."):
+                        count = inventory.refresh()
+                    st.success(f"✅ Inventory refreshed: {count:,} resources")
+                else:
+                    st.info("Refreshing resource inventory...")
         
         with col2:
             if st.button("🏷️ Bulk Tag", use_container_width=True):
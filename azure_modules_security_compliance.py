@@ -7,6 +7,7 @@ import streamlit as st
 import pandas as pd
 from azure_theme import AzureTheme
 import plotly.express as px
+from azure_policy_compliance import get_compliance_summarizer
 
 class AzureSecurityComplianceModule:
     """Azure Security & Compliance module"""
@@ -129,6 +130,11 @@ class AzureSecurityComplianceModule:
     def _render_compliance():
         st.markdown("### ✅ Compliance Dashboard")
         
+        summarizer = get_compliance_summarizer()
+        if summarizer is not None:
+            AzureSecurityComplianceModule._render_policy_compliance(summarizer)
+            return
+        
         # Compliance standards
         standards = ["Azure Security Benchmark", "PCI DSS", "HIPAA", "ISO 27001", "SOC 2"]
         
@@ -156,6 +162,52 @@ class AzureSecurityComplianceModule:
         df = pd.DataFrame(failed_controls)
         st.dataframe(df, use_container_width=True, hide_index=True)
     
+    @staticmethod
+    def _render_policy_compliance(summarizer):
+        """Policy compliance across every configured scope, served from the compliance snapshot"""
+        entries = summarizer.compliance()
+        frame = summarizer.snapshot.frame()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Overall Compliance", f"{summarizer.snapshot.overall():.1f}%", f"{summarizer.trend(30):+.1f} pts (30d)")
+        with col2:
+            st.metric("Assignments", f"{len(entries):,}")
+        with col3:
+            st.metric("Non-Compliant Assignments", f"{sum(1 for e in entries if e.non_compliant):,}")
+        with col4:
+            st.metric("Non-Compliant Resources", f"{int(frame['non_compliant'].sum()):,}")
+        
+        if st.button("🔄 Refresh Compliance", use_container_width=True):
+            stats = summarizer.refresh()
+            st.success(f"✅ {stats['assignments']} assignments summarized, {stats['drilled']} drilled down")
+        elif summarizer.refreshing:
+            st.caption("🔄 Refreshing compliance in the background - showing the last snapshot")
+        
+        if summarizer.last_error:
+            st.warning(f"⚠️ Last compliance refresh failed: {summarizer.last_error}")
+        for (scope, assignment), error in list(summarizer.errors.items()):
+            st.warning(f"⚠️ {assignment.rstrip('/').split('/')[-1] or scope}: {error}")
+        
+        st.markdown("---")
+        
+        st.markdown("#### 📋 Assignments by Non-Compliance")
+        st.dataframe(frame[['policy_name', 'scope', 'compliant', 'non_compliant', 'compliance_percentage']].rename(columns={
+            'policy_name': 'Assignment', 'scope': 'Scope', 'compliant': 'Compliant',
+            'non_compliant': 'Non-Compliant', 'compliance_percentage': 'Compliance %'
+        }), use_container_width=True, hide_index=True)
+        
+        failing = frame[frame['non_compliant'] > 0]
+        if failing.empty:
+            return
+        
+        selected = st.selectbox("Drill into assignment", failing['assignment_id'].tolist(),
+                                format_func=lambda a: a.rstrip('/').split('/')[-1])
+        if selected:
+            resources = summarizer.non_compliant_resources(selected)
+            st.dataframe(pd.DataFrame(resources), use_container_width=True, hide_index=True)
+    
     @staticmethod
     def _render_defender():
         st.markdown("### 🛡️ Microsoft Defender for Cloud")
@@ -43,8 +43,14 @@ class AzureMonitorService:
     @staticmethod
     def get_resource_metrics(resource_id: str, metric_name: str, timespan: str = "PT1H", interval: str = "PT5M") -> List[MetricData]:
         """Get metrics for a specific resource"""
-        # Placeholder for Azure SDK integration
-        # from azure.mgmt.monitor import MonitorManagementClient
+        from azure_monitor_metrics import get_metrics_engine
+        
+        if get_metrics_engine() is not None:
+            try:
+                series = AzureMonitorService.get_metrics_batch([resource_id], [metric_name], timespan, interval)
+            except Exception:
+                return []
+            return series[(resource_id, metric_name)].to_metric_data() if (resource_id, metric_name) in series else []
         
         # Demo data - CPU usage for last hour
         import random
@@ -61,6 +67,40 @@ class AzureMonitorService:
         
         return metrics
     
+    @staticmethod
+    def get_metrics_batch(resource_ids: List[str], metric_names: List[str], timespan: str = "PT1H",
+                          interval: str = "PT5M", aggregation: str = "Average") -> Dict:
+        """
+        Get many metrics for many resources (batched, incrementally cached)
+        
+        Returns:
+            (resource_id, metric_name) -> MetricSeries with NumPy timestamps/values
+        """
+        import numpy as np
+        from azure_monitor_metrics import get_metrics_engine, parse_duration, MetricSeries
+        from azure_resource_graph import get_azure_inventory
+        
+        span, step = parse_duration(timespan), parse_duration(interval)
+        engine = get_metrics_engine()
+        if engine is not None:
+            inventory = get_azure_inventory()
+            regions = {}
+            if inventory is not None:
+                frame = inventory.snapshot()
+                regions = dict(zip(frame['id'].str.lower(), frame['location']))
+            resources = [(rid, regions.get(rid.lower(), '')) for rid in resource_ids]
+            return engine.fetch(resources, metric_names, span, step, aggregation)
+        
+        # Demo data
+        points = int(span / step)
+        end = np.datetime64('now', 'm').astype('datetime64[s]')
+        timestamps = end - np.arange(points)[::-1] * np.timedelta64(int(step.total_seconds()), 's')
+        rng = np.random.default_rng()
+        return {
+            (rid, metric): MetricSeries(rid, metric, aggregation, "Percent", timestamps, rng.uniform(30, 80, points))
+            for rid in resource_ids for metric in metric_names
+        }
+    
     @staticmethod
     def get_available_metrics(resource_type: str) -> List[str]:
         """Get available metrics for resource type"""
@@ -168,8 +208,12 @@ class AzureMonitorService:
     
     @staticmethod
     def query_logs(workspace_id: str, query: str, timespan: str = "P1D") -> List[Dict]:
-        """Query logs using KQL (Kusto Query Language)"""
-        # from azure.monitor.query import LogsQueryClient
+        """Query logs using KQL (Kusto Query Language) - sharded and cached per time bucket"""
+        from azure_log_analytics import get_log_query_executor
+        
+        executor = get_log_query_executor()
+        if executor is not None:
+            return executor.query(workspace_id, query, timespan).to_dict('records')
         
         # Demo data
         return [
@@ -223,7 +267,13 @@ class AzureMonitorService:
     
     @staticmethod
     def query_application_insights(app_insights_id: str, query: str, timespan: str = "P1D") -> List[Dict]:
-        """Query Application Insights telemetry"""
+        """Query Application Insights telemetry (app_insights_id is the component's ARM resource ID)"""
+        from azure_log_analytics import get_log_query_executor
+        
+        executor = get_log_query_executor()
+        if executor is not None:
+            return executor.query(app_insights_id, query, timespan).to_dict('records')
+        
         return [
             {
                 "timestamp": datetime.now() - timedelta(hours=1),
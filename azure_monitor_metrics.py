@@ -0,0 +1,347 @@
+"""
+Azure Monitor Batched Metrics
+Many metrics for many resources per request via the metrics batch (data plane) endpoint
+
+Features:
+- Requests grouped by subscription, region and resource type (endpoint requirement)
+- Up to 50 resources x 20 metrics per call, groups fetched concurrently
+- NumPy-backed time series (datetime64 timestamps, float64 values)
+- Incremental window cache: refreshes fetch only intervals newer than the cache
+"""
+
+import re
+import threading
+import numpy as np
+import streamlit as st
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from azure_monitor import MetricData
+
+try:
+    from azure.monitor.query import MetricsClient
+    METRICS_BATCH_AVAILABLE = True
+except ImportError:
+    METRICS_BATCH_AVAILABLE = False
+
+# Metrics batch API limits per request
+MAX_RESOURCES_PER_CALL = 50
+MAX_METRICS_PER_CALL = 20
+
+_DURATION = re.compile(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+
+def parse_duration(value: str) -> timedelta:
+    """ISO 8601 duration as used by Azure Monitor ('PT1H', 'PT5M', 'P1D', 'P1DT12H')"""
+    match = _DURATION.match(value.upper())
+    if not match or not any(match.groups()):
+        raise ValueError(f"Unsupported duration: {value}")
+    days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+    return timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def parse_resource_id(resource_id: str) -> Tuple[str, str]:
+    """(subscription ID, resource type) from an ARM resource ID"""
+    parts = resource_id.strip('/').split('/')
+    lowered = [p.lower() for p in parts]
+    subscription = parts[lowered.index('subscriptions') + 1] if 'subscriptions' in lowered else ''
+    if 'providers' not in lowered:
+        return subscription, ''
+    rest = parts[lowered.index('providers') + 1:]
+    # namespace/type/name[/subtype/subname...] -> namespace/type[/subtype...]
+    return subscription, '/'.join([rest[0]] + rest[1::2])
+
+
+@dataclass
+class MetricSeries:
+    """One metric of one resource as NumPy arrays"""
+    resource_id: str
+    metric: str
+    aggregation: str
+    unit: str
+    timestamps: np.ndarray
+    values: np.ndarray
+
+    def latest(self) -> Optional[float]:
+        """Most recent non-NaN value"""
+        valid = self.values[~np.isnan(self.values)]
+        return float(valid[-1]) if len(valid) else None
+
+    def to_metric_data(self) -> List[MetricData]:
+        """Convert to the MetricData model (newest first, like get_resource_metrics)"""
+        return [
+            MetricData(timestamp=ts.astype('datetime64[us]').astype(datetime), value=float(value),
+                       unit=self.unit, aggregation=self.aggregation)
+            for ts, value in zip(self.timestamps[::-1], self.values[::-1])
+        ]
+
+
+# Transport: (region, namespace, resource_ids, metric_names, start, end, interval, aggregation)
+#   -> [{'resource_id', 'metric', 'unit', 'timestamps': [datetime], 'values': [float or None]}]
+Transport = Callable[[str, str, List[str], List[str], datetime, datetime, timedelta, str], List[Dict]]
+
+
+class MetricsBatchTransport:
+    """Live transport over azure-monitor-query MetricsClient (one client per region)"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.credential = credential
+        self.clients: Dict[str, object] = {}
+        self.lock = threading.Lock()
+
+    def _client(self, region: str):
+        """Regional metrics client, created once"""
+        with self.lock:
+            if region not in self.clients:
+                self.clients[region] = MetricsClient(f"https://{region}.metrics.monitor.azure.com", self.credential)
+            return self.clients[region]
+
+    def __call__(self, region: str, namespace: str, resource_ids: List[str], metric_names: List[str],
+                 start: datetime, end: datetime, interval: timedelta, aggregation: str) -> List[Dict]:
+        results = self._client(region).query_resources(
+            resource_ids=resource_ids,
+            metric_namespace=namespace,
+            metric_names=metric_names,
+            timespan=(start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc)),
+            granularity=interval,
+            aggregations=[aggregation]
+        )
+        rows = []
+        for result in results:
+            for metric in result.metrics:
+                points = metric.timeseries[0].data if metric.timeseries else []
+                rows.append({
+                    'resource_id': result.resource_id,
+                    'metric': metric.name,
+                    'unit': str(metric.unit),
+                    'timestamps': [p.timestamp for p in points],
+                    'values': [getattr(p, aggregation.lower(), None) for p in points]
+                })
+        return rows
+
+
+def _to_datetime64(values: List[datetime]) -> np.ndarray:
+    """UTC datetimes -> naive datetime64[s]"""
+    return np.array([(v.astimezone(timezone.utc).replace(tzinfo=None) if v.tzinfo else v) for v in values],
+                    dtype='datetime64[s]')
+
+
+class MetricWindowCache:
+    """
+    Rolling per-series cache of fetched intervals.
+
+    The last cached point is always re-fetched on refresh, since the
+    interval it covers may still have been open when it was read. Each
+    series keeps at least the longest window requested for it.
+    """
+
+    def __init__(self, retention: timedelta = timedelta(days=2)):
+        """
+        Initialize cache
+
+        Args:
+            retention: Minimum history kept per series (relative to the newest point)
+        """
+        self.retention = np.timedelta64(int(retention.total_seconds()), 's')
+        self.lock = threading.Lock()
+        self.series: Dict[Tuple[str, str, str, int], MetricSeries] = {}
+        self.covered_from: Dict[Tuple[str, str, str, int], datetime] = {}
+        self.spans: Dict[Tuple[str, str, str, int], np.timedelta64] = {}
+
+    @staticmethod
+    def key(resource_id: str, metric: str, aggregation: str, interval: timedelta) -> Tuple[str, str, str, int]:
+        """Cache key of one series"""
+        return resource_id.lower(), metric, aggregation, int(interval.total_seconds())
+
+    def fetch_start(self, key: Tuple, start: datetime) -> datetime:
+        """Earliest time that still has to be fetched for a window starting at start"""
+        with self.lock:
+            series = self.series.get(key)
+            covered_from = self.covered_from.get(key)
+        if series is None or covered_from is None or covered_from > start:
+            return start
+        if not len(series.timestamps):
+            return start
+        return max(start, series.timestamps[-1].astype(datetime))
+
+    def merge(self, key: Tuple, fresh: MetricSeries, fetched_from: datetime, span: timedelta = timedelta(0)):
+        """
+        Merge newly fetched points (new values win on overlap) and trim to retention
+
+        Args:
+            key: Series key
+            fresh: Fetched points
+            fetched_from: Start of the fetched interval
+            span: Window length requested for this series (kept in addition to retention)
+        """
+        with self.lock:
+            previous = self.covered_from.get(key)
+            covered_from = fetched_from if previous is None else min(previous, fetched_from)
+            self.spans[key] = max(self.spans.get(key, self.retention), np.timedelta64(int(span.total_seconds()), 's'))
+            current = self.series.get(key)
+            if current is None:
+                timestamps, values = fresh.timestamps, fresh.values
+            elif not len(fresh.timestamps):
+                timestamps, values = current.timestamps, current.values
+            else:
+                keep = current.timestamps < fresh.timestamps[0]
+                timestamps = np.concatenate([current.timestamps[keep], fresh.timestamps])
+                values = np.concatenate([current.values[keep], fresh.values])
+            if len(timestamps):
+                cutoff = timestamps[-1] - self.spans[key]
+                recent = timestamps >= cutoff
+                timestamps, values = timestamps[recent], values[recent]
+                # Trimmed points are no longer covered
+                covered_from = max(covered_from, cutoff.astype(datetime))
+            self.covered_from[key] = covered_from
+            self.series[key] = MetricSeries(fresh.resource_id, fresh.metric, fresh.aggregation,
+                                            fresh.unit or (current.unit if current else ''), timestamps, values)
+
+    def window(self, key: Tuple, start: datetime, end: datetime) -> Optional[MetricSeries]:
+        """Cached points within [start, end]"""
+        with self.lock:
+            series = self.series.get(key)
+        if series is None:
+            return None
+        mask = (series.timestamps >= np.datetime64(start, 's')) & (series.timestamps <= np.datetime64(end, 's'))
+        return MetricSeries(series.resource_id, series.metric, series.aggregation, series.unit,
+                            series.timestamps[mask], series.values[mask])
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size"""
+        with self.lock:
+            return {'series': len(self.series), 'points': sum(len(s.timestamps) for s in self.series.values())}
+
+
+class BatchedMetricsEngine:
+    """
+    Batched, incremental Azure Monitor metrics.
+
+    Resources are grouped by (subscription, region, resource type) - the
+    batch endpoint only accepts homogeneous groups - and further by the
+    start time still missing from the cache, so a refresh asks only for
+    the newest intervals. Each group is split into calls of 50
+    resources x 20 metrics and the calls run concurrently. A failed call
+    is recorded in errors and its resources are served from the cache.
+    """
+
+    def __init__(self, transport: Transport, cache: Optional[MetricWindowCache] = None, max_workers: int = 8):
+        """
+        Initialize engine
+
+        Args:
+            transport: Metrics batch transport
+            cache: Window cache (private one if None)
+            max_workers: Concurrent batch calls
+        """
+        self.transport = transport
+        self.cache = cache or MetricWindowCache()
+        self.max_workers = max_workers
+        self.calls = 0
+        self.errors: Dict[Tuple[str, str], str] = {}
+        self.lock = threading.Lock()
+
+    def fetch(self, resources: List[Tuple[str, str]], metric_names: List[str],
+              timespan: timedelta = timedelta(hours=1), interval: timedelta = timedelta(minutes=5),
+              aggregation: str = 'Average', end: Optional[datetime] = None) -> Dict[Tuple[str, str], MetricSeries]:
+        """
+        Fetch metrics for many resources
+
+        Args:
+            resources: (resource ID, region) pairs, e.g. from the Resource Graph inventory
+                       (resources without a region are skipped - it selects the endpoint)
+            metric_names: Metric names (must exist for each resource's type)
+            timespan: Window length
+            interval: Granularity
+            aggregation: Average, Total, Maximum, Minimum or Count
+            end: Window end as naive UTC (defaults to now, aligned down to the interval)
+
+        Returns:
+            (resource ID, metric name) -> MetricSeries covering the window
+        """
+        step = int(interval.total_seconds())
+        if end is None:
+            now = int(datetime.now(timezone.utc).timestamp())
+            end = datetime.fromtimestamp(now - now % step, timezone.utc).replace(tzinfo=None)
+        start = end - timespan
+
+        # (subscription, region, type, fetch start) -> resource IDs
+        groups: Dict[Tuple[str, str, str, datetime], List[str]] = {}
+        for resource_id, region in resources:
+            subscription, resource_type = parse_resource_id(resource_id)
+            fetch_start = min(self.cache.fetch_start(self.cache.key(resource_id, m, aggregation, interval), start)
+                              for m in metric_names)
+            if fetch_start >= end:
+                continue
+            location = region.replace(' ', '').lower()
+            if not location:
+                with self.lock:
+                    self.errors[('', resource_type)] = f"Region unknown for {resource_id}"
+                continue
+            groups.setdefault((subscription, location, resource_type, fetch_start), []).append(resource_id)
+
+        calls = []
+        for (_, region, resource_type, fetch_start), resource_ids in groups.items():
+            for i in range(0, len(resource_ids), MAX_RESOURCES_PER_CALL):
+                for j in range(0, len(metric_names), MAX_METRICS_PER_CALL):
+                    calls.append((region, resource_type, resource_ids[i:i + MAX_RESOURCES_PER_CALL],
+                                  metric_names[j:j + MAX_METRICS_PER_CALL], fetch_start))
+
+        def run(call) -> None:
+            region, namespace, resource_ids, names, fetch_start = call
+            try:
+                rows = self.transport(region, namespace, resource_ids, names, fetch_start, end, interval, aggregation)
+            except Exception as e:
+                with self.lock:
+                    self.errors[(region, namespace)] = str(e)
+                return
+            with self.lock:
+                self.calls += 1
+                self.errors.pop((region, namespace), None)
+            for row in rows:
+                values = np.array([np.nan if v is None else v for v in row['values']], dtype='float64')
+                fresh = MetricSeries(row['resource_id'], row['metric'], aggregation, row.get('unit', ''),
+                                     _to_datetime64(row['timestamps']), values)
+                self.cache.merge(self.cache.key(row['resource_id'], row['metric'], aggregation, interval),
+                                 fresh, fetch_start, timespan)
+
+        if calls:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(calls)))) as pool:
+                list(pool.map(run, calls))
+
+        results = {}
+        for resource_id, _ in resources:
+            for metric in metric_names:
+                series = self.cache.window(self.cache.key(resource_id, metric, aggregation, interval), start, end)
+                if series is not None:
+                    results[(resource_id, metric)] = series
+        return results
+
+    @staticmethod
+    def to_matrix(results: Dict[Tuple[str, str], MetricSeries], metric: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        One metric across resources as a 2-D array aligned on timestamps
+
+        Returns:
+            (resource IDs, timestamps, values[resource, timestamp] with NaN gaps)
+        """
+        series = [s for (_, m), s in results.items() if m == metric]
+        if not series:
+            return [], np.array([], dtype='datetime64[s]'), np.empty((0, 0))
+        timestamps = np.unique(np.concatenate([s.timestamps for s in series]))
+        matrix = np.full((len(series), len(timestamps)), np.nan)
+        for row, s in enumerate(series):
+            matrix[row, np.searchsorted(timestamps, s.timestamps)] = s.values
+        return [s.resource_id for s in series], timestamps, matrix
+
+
+@st.cache_resource
+def get_metrics_engine() -> Optional[BatchedMetricsEngine]:
+    """Get process-wide metrics engine (None without Azure credentials - use demo data)"""
+    from azure_resource_graph import get_azure_credential
+    credential = get_azure_credential()
+    if not METRICS_BATCH_AVAILABLE or credential is None:
+        return None
+    return BatchedMetricsEngine(MetricsBatchTransport(credential))
@@ -21,6 +21,15 @@ class AzureNetworkingService:
     @staticmethod
     def list_virtual_networks(subscription_id: str) -> List[AzureVirtualNetwork]:
         """List virtual networks"""
+        from azure_resource_graph import get_azure_inventory, VNET_TYPE
+        
+        inventory = get_azure_inventory()
+        if inventory is not None:
+            try:
+                return inventory.models(VNET_TYPE, subscription_id)
+            except Exception:
+                return []
+        
         return [
             AzureVirtualNetwork(
                 name="prod-vnet-east",
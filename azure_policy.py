@@ -5,7 +5,7 @@ Handles Azure Policy, Blueprints, and governance features
 
 from dataclasses import dataclass
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
 @dataclass
 class PolicyDefinition:
@@ -175,7 +175,23 @@ class AzurePolicyService:
     
     @staticmethod
     def get_policy_compliance(scope: str = None) -> List[PolicyComplianceState]:
-        """Get policy compliance state"""
+        """Get policy compliance state per assignment (None = every configured scope)"""
+        from azure_policy_compliance import get_compliance_summarizer
+        
+        summarizer = get_compliance_summarizer()
+        if summarizer is not None:
+            return [
+                PolicyComplianceState(
+                    policy_name=e.policy_name,
+                    compliance_state="NonCompliant" if e.non_compliant else "Compliant",
+                    compliant_resources=e.compliant,
+                    non_compliant_resources=e.non_compliant,
+                    total_resources=e.total,
+                    compliance_percentage=e.compliance_percentage
+                )
+                for e in summarizer.compliance(scope)
+            ]
+        
         return [
             PolicyComplianceState(
                 policy_name="Allowed locations",
@@ -206,6 +222,22 @@ class AzurePolicyService:
     @staticmethod
     def get_non_compliant_resources(policy_assignment_id: str) -> List[Dict]:
         """Get list of non-compliant resources"""
+        from azure_policy_compliance import get_compliance_summarizer
+        
+        summarizer = get_compliance_summarizer()
+        if summarizer is not None:
+            return [
+                {
+                    "resource_id": r['resource_id'],
+                    "resource_name": r['resource_id'].rstrip('/').split('/')[-1],
+                    "resource_type": r['resource_type'],
+                    "policy_name": r['policy_name'],
+                    "compliance_state": "NonCompliant",
+                    "timestamp": datetime.fromisoformat(r['timestamp']) if r['timestamp'] else None
+                }
+                for r in summarizer.non_compliant_resources(policy_assignment_id)
+            ]
+        
         return [
             {
                 "resource_id": "/subscriptions/.../resourceGroups/Production-RG/providers/Microsoft.Compute/virtualMachines/old-vm-01",
@@ -376,6 +408,27 @@ class AzurePolicyService:
     @staticmethod
     def get_policy_insights(scope: str, days: int = 30) -> Dict:
         """Get policy compliance insights and trends"""
+        from azure_policy_compliance import get_compliance_summarizer
+        
+        summarizer = get_compliance_summarizer()
+        if summarizer is not None:
+            entries = summarizer.compliance(scope)
+            by_type: Dict[str, int] = {}
+            for entry in entries:
+                for resource in entry.resources:
+                    provider = (resource['resource_type'] or '').split('/')[0].replace('Microsoft.', '')
+                    by_type[provider] = by_type.get(provider, 0) + 1
+            return {
+                "scope": scope,
+                "time_range_days": days,
+                "overall_compliance": summarizer.snapshot.overall(scope),
+                "compliance_trend": f"{summarizer.trend(days):+.1f}%",
+                "top_non_compliant_policies": [
+                    {"policy": e.policy_name, "non_compliant_count": e.non_compliant} for e in entries[:10] if e.non_compliant
+                ],
+                "non_compliant_by_provider": by_type
+            }
+        
         return {
             "scope": scope,
             "time_range_days": days,
@@ -0,0 +1,452 @@
+"""
+Azure Policy Compliance Summarizer
+Policy-state summaries at management-group scope with concurrent per-assignment drill-downs
+
+Features:
+- One summarize call per management group (or subscription) for every assignment below it
+- Non-compliant resource drill-downs fanned out concurrently, paged by the SDK
+- Snapshot keyed by (scope, assignment); only assignments whose counts changed are re-drilled
+- Compliance history for trend reporting (every refresh for a day, hourly after that)
+- Background refresh: views are served from the last snapshot while a refresh runs
+- JSON persistence so dashboards load from the snapshot after a restart
+"""
+
+import os
+import json
+import time
+import threading
+import pandas as pd
+import streamlit as st
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from azure.mgmt.policyinsights import PolicyInsightsClient
+    from azure.mgmt.policyinsights.models import QueryOptions
+    POLICY_INSIGHTS_AVAILABLE = True
+except ImportError:
+    POLICY_INSIGHTS_AVAILABLE = False
+
+MANAGEMENT_GROUP_PREFIX = '/providers/Microsoft.Management/managementGroups/'
+
+# Assignments returned per summarize call (a full page means the summary may be truncated)
+SUMMARY_TOP = 1000
+
+# Re-drill assignments whose counts are unchanged after this many seconds
+DRILL_MAX_AGE = 6 * 3600
+
+# Compliance history kept (days); points older than a day are thinned to one per hour
+HISTORY_DAYS = 90
+
+NON_COMPLIANT_SELECT = 'ResourceId, ResourceType, PolicyDefinitionName, PolicyDefinitionAction, Timestamp'
+
+
+def scope_kind(scope: str) -> Tuple[str, str]:
+    """('managementGroup', name) or ('subscription', id) for a scope path"""
+    lowered = scope.lower()
+    if lowered.startswith(MANAGEMENT_GROUP_PREFIX.lower()):
+        return 'managementGroup', scope[len(MANAGEMENT_GROUP_PREFIX):].split('/')[0]
+    parts = scope.strip('/').split('/')
+    if len(parts) >= 2 and parts[0].lower() == 'subscriptions':
+        return 'subscription', parts[1]
+    raise ValueError(f"Unsupported compliance scope: {scope}")
+
+
+@dataclass
+class AssignmentCompliance:
+    """Compliance of one policy assignment as seen from one scope"""
+    scope: str
+    assignment_id: str
+    policy_name: str
+    compliant: int
+    non_compliant: int
+    other: int
+    non_compliant_policies: int
+    summarized_at: float
+    drilled_at: Optional[float] = None
+    resources: List[Dict] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.compliant + self.non_compliant + self.other
+
+    @property
+    def compliance_percentage(self) -> float:
+        evaluated = self.compliant + self.non_compliant
+        return round(self.compliant / evaluated * 100, 1) if evaluated else 100.0
+
+    def fingerprint(self) -> Tuple[int, int]:
+        return self.compliant, self.non_compliant
+
+
+class PolicyInsightsTransport:
+    """Live transport over the Policy Insights SDK"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.credential = credential
+        self.clients: Dict[str, object] = {}
+        self.lock = threading.Lock()
+
+    def _client(self, subscription_id: str):
+        """Client per subscription (management-group calls ignore the subscription)"""
+        with self.lock:
+            if subscription_id not in self.clients:
+                self.clients[subscription_id] = PolicyInsightsClient(self.credential, subscription_id)
+            return self.clients[subscription_id]
+
+    def summarize(self, scope: str) -> List[Dict]:
+        """Per-assignment summary rows for every assignment evaluated under the scope"""
+        kind, name = scope_kind(scope)
+        options = QueryOptions(top=SUMMARY_TOP)
+        if kind == 'managementGroup':
+            result = self._client('').policy_states.summarize_for_management_group(
+                management_group_name=name, query_options=options)
+        else:
+            result = self._client(name).policy_states.summarize_for_subscription(
+                subscription_id=name, query_options=options)
+        rows = []
+        for summary in result.value or []:
+            for assignment in summary.policy_assignments or []:
+                details = {d.compliance_state.lower(): d.count for d in assignment.results.resource_details or []}
+                rows.append({
+                    'assignment_id': assignment.policy_assignment_id,
+                    'compliant': details.get('compliant', 0),
+                    'non_compliant': details.get('noncompliant', 0),
+                    'other': sum(v for k, v in details.items() if k not in ('compliant', 'noncompliant')),
+                    'non_compliant_policies': assignment.results.non_compliant_policies or 0,
+                })
+        return rows
+
+    def non_compliant(self, scope: str, assignment_id: str) -> Iterator[Dict]:
+        """Non-compliant resource states for one assignment (all pages)"""
+        kind, name = scope_kind(scope)
+        options = QueryOptions(filter=f"IsCompliant eq false and PolicyAssignmentId eq '{assignment_id}'",
+                               select=NON_COMPLIANT_SELECT)
+        if kind == 'managementGroup':
+            pages = self._client('').policy_states.list_query_results_for_management_group(
+                policy_states_resource='latest', management_group_name=name, query_options=options)
+        else:
+            pages = self._client(name).policy_states.list_query_results_for_subscription(
+                policy_states_resource='latest', subscription_id=name, query_options=options)
+        for state in pages:
+            yield {
+                'resource_id': state.resource_id,
+                'resource_type': state.resource_type,
+                'policy_definition': state.policy_definition_name,
+                'effect': state.policy_definition_action,
+                'timestamp': state.timestamp.isoformat() if state.timestamp else None,
+            }
+
+
+class ComplianceSnapshot:
+    """(scope, assignment) -> AssignmentCompliance, with per-refresh history"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize snapshot
+
+        Args:
+            path: JSON snapshot file (None = in-memory only)
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self.assignments: Dict[Tuple[str, str], AssignmentCompliance] = {}
+        self.history: List[Tuple[float, float]] = []
+        self.refreshed_at: Optional[float] = None
+        self._load()
+
+    def get(self, scope: str, assignment_id: str) -> Optional[AssignmentCompliance]:
+        """Entry for one (scope, assignment)"""
+        with self.lock:
+            return self.assignments.get((scope.lower(), assignment_id.lower()))
+
+    def put(self, entry: AssignmentCompliance):
+        """Insert or replace one entry"""
+        with self.lock:
+            self.assignments[(entry.scope.lower(), entry.assignment_id.lower())] = entry
+
+    def retain(self, scope: str, assignment_ids: List[str]):
+        """Drop entries under scope whose assignment no longer reports"""
+        keep = {a.lower() for a in assignment_ids}
+        with self.lock:
+            for key in [k for k in self.assignments if k[0] == scope.lower() and k[1] not in keep]:
+                del self.assignments[key]
+
+    def entries(self, scope: Optional[str] = None) -> List[AssignmentCompliance]:
+        """Entries for a scope (all scopes if None)"""
+        with self.lock:
+            if scope is None:
+                return list(self.assignments.values())
+            return [e for (s, _), e in self.assignments.items() if s == scope.lower()]
+
+    def overall(self, scope: Optional[str] = None) -> float:
+        """Resource-weighted compliance percentage"""
+        entries = self.entries(scope)
+        compliant = sum(e.compliant for e in entries)
+        evaluated = compliant + sum(e.non_compliant for e in entries)
+        return round(compliant / evaluated * 100, 1) if evaluated else 100.0
+
+    def record(self):
+        """Append the current overall compliance to the history and persist"""
+        with self.lock:
+            self.refreshed_at = time.time()
+            self.history.append((self.refreshed_at, self.overall()))
+            self.history = self._thin(self.history, self.refreshed_at)
+            self._save()
+
+    @staticmethod
+    def _thin(history: List[Tuple[float, float]], now: float) -> List[Tuple[float, float]]:
+        """Drop points older than HISTORY_DAYS; keep the first point per hour for points older than a day"""
+        kept, last_hour = [], None
+        for ts, pct in history:
+            if ts < now - HISTORY_DAYS * 86400:
+                continue
+            if ts < now - 86400:
+                hour = int(ts // 3600)
+                if hour == last_hour:
+                    continue
+                last_hour = hour
+            kept.append((ts, pct))
+        return kept
+
+    def history_since(self, cutoff: float) -> List[Tuple[float, float]]:
+        """(timestamp, overall compliance) points at or after cutoff"""
+        with self.lock:
+            return [(ts, pct) for ts, pct in self.history if ts >= cutoff]
+
+    def frame(self, scope: Optional[str] = None) -> pd.DataFrame:
+        """Entries as a DataFrame, most non-compliant first"""
+        entries = self.entries(scope)
+        frame = pd.DataFrame({
+            'scope': [e.scope for e in entries],
+            'assignment_id': [e.assignment_id for e in entries],
+            'policy_name': [e.policy_name for e in entries],
+            'compliant': [e.compliant for e in entries],
+            'non_compliant': [e.non_compliant for e in entries],
+            'total': [e.total for e in entries],
+            'compliance_percentage': [e.compliance_percentage for e in entries],
+        })
+        return frame.sort_values('non_compliant', ascending=False, ignore_index=True)
+
+    def is_empty(self) -> bool:
+        """True if no snapshot is loaded"""
+        return not self.assignments
+
+    # ============= PERSISTENCE =============
+
+    def _save(self):
+        """Persist snapshot (caller holds the lock)"""
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump({'refreshed_at': self.refreshed_at, 'history': self.history,
+                       'assignments': [asdict(e) for e in self.assignments.values()]}, fp)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        """Load a persisted snapshot if present"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as fp:
+            snapshot = json.load(fp)
+        for raw in snapshot['assignments']:
+            self.put(AssignmentCompliance(**raw))
+        self.history = [tuple(h) for h in snapshot.get('history', [])]
+        self.refreshed_at = snapshot.get('refreshed_at')
+
+
+class PolicyComplianceSummarizer:
+    """
+    Keeps a ComplianceSnapshot current for a set of scopes.
+
+    Refresh = one summarize call per scope (concurrent), then drill-downs
+    only for assignments that are non-compliant and whose counts changed
+    (or whose drill-down is older than DRILL_MAX_AGE). Views start refreshes
+    in a background thread and read the last snapshot meanwhile.
+    """
+
+    def __init__(self, transport, scopes: List[str], snapshot: ComplianceSnapshot, max_workers: int = 8,
+                 ttl: float = 900.0, retry_after: float = 300.0):
+        """
+        Initialize summarizer
+
+        Args:
+            transport: Object with summarize(scope) and non_compliant(scope, assignment_id)
+            scopes: Management group or subscription scope paths
+            snapshot: Compliance snapshot
+            max_workers: Concurrent summarize / drill-down calls
+            ttl: Seconds before views trigger a refresh
+            retry_after: Seconds before a failed background refresh is retried
+        """
+        self.transport = transport
+        self.scopes = scopes
+        self.snapshot = snapshot
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.drill_calls = 0
+        # (scope, assignment) -> error; scope-level summarize errors use an empty assignment
+        self.errors: Dict[Tuple[str, str], str] = {}
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _summarize(self, scope: str) -> Optional[List[Dict]]:
+        """Summary rows for one scope, None (error recorded) if the call failed"""
+        key = (scope.lower(), '')
+        try:
+            rows = self.transport.summarize(scope)
+        except Exception as e:
+            with self.lock:
+                self.errors[key] = str(e)
+            return None
+        with self.lock:
+            if len(rows) >= SUMMARY_TOP:
+                self.errors[key] = (f"Summary returned {len(rows)} assignments (limit {SUMMARY_TOP}); "
+                                    "results may be truncated, so missing assignments are kept")
+            else:
+                self.errors.pop(key, None)
+        return rows
+
+    def _drill(self, entry: AssignmentCompliance) -> AssignmentCompliance:
+        """
+        Fetch all non-compliant resources for one entry
+
+        A failed drill-down is recorded in errors; the entry keeps its previous
+        resources and stays undrilled, so the next refresh retries it.
+        """
+        key = (entry.scope.lower(), entry.assignment_id.lower())
+        try:
+            resources = list(self.transport.non_compliant(entry.scope, entry.assignment_id))
+        except Exception as e:
+            with self.lock:
+                self.errors[key] = str(e)
+            return entry
+        entry.resources, entry.drilled_at = resources, time.time()
+        with self.lock:
+            self.drill_calls += 1
+            self.errors.pop(key, None)
+        return entry
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Summarize every scope and re-drill changed assignments
+
+        Returns:
+            Counts of assignments seen, drilled and reused
+        """
+        with self.refresh_lock:
+            now = time.time()
+            stale: List[AssignmentCompliance] = []
+            seen = reused = 0
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                summaries = list(pool.map(self._summarize, self.scopes))
+                for scope, rows in zip(self.scopes, summaries):
+                    if rows is None:
+                        # Failed scope: keep serving its previous entries
+                        continue
+                    for row in rows:
+                        seen += 1
+                        previous = self.snapshot.get(scope, row['assignment_id'])
+                        entry = AssignmentCompliance(
+                            scope=scope, policy_name=row['assignment_id'].rstrip('/').split('/')[-1],
+                            summarized_at=now, **row)
+                        if row['non_compliant'] == 0:
+                            entry.drilled_at = now
+                        elif (previous and previous.drilled_at and previous.fingerprint() == entry.fingerprint()
+                              and now - previous.drilled_at < DRILL_MAX_AGE):
+                            entry.resources, entry.drilled_at = previous.resources, previous.drilled_at
+                            reused += 1
+                        else:
+                            entry.resources = previous.resources if previous else []
+                            stale.append(entry)
+                        self.snapshot.put(entry)
+                    # A full page may be truncated: pruning would drop history of unseen assignments
+                    if len(rows) < SUMMARY_TOP:
+                        self.snapshot.retain(scope, [r['assignment_id'] for r in rows])
+                list(pool.map(self._drill, stale))
+            self.snapshot.record()
+            return {'assignments': seen, 'drilled': len(stale), 'reused': reused}
+
+    @property
+    def refreshing(self) -> bool:
+        """True while a background refresh is running"""
+        worker = self._worker
+        return worker is not None and worker.is_alive()
+
+    def _background_refresh(self):
+        """refresh() for the worker thread; failures are kept for views and retried after retry_after"""
+        try:
+            self.refresh()
+            self.last_error, self.failed_at = None, None
+        except Exception as e:
+            self.last_error, self.failed_at = str(e), time.time()
+
+    def _ensure_fresh(self):
+        """Start a background refresh when the snapshot is empty or older than ttl (never waits)"""
+        now = time.time()
+        refreshed_at = self.snapshot.refreshed_at
+        stale = refreshed_at is None or now - refreshed_at > self.ttl
+        backing_off = self.failed_at is not None and now - self.failed_at < self.retry_after
+        if stale and not backing_off:
+            with self._start_lock:
+                if not self.refreshing:
+                    self._worker = threading.Thread(target=self._background_refresh,
+                                                    name='policy-compliance-refresh', daemon=True)
+                    self._worker.start()
+
+    # ============= VIEWS =============
+
+    def compliance(self, scope: Optional[str] = None) -> List[AssignmentCompliance]:
+        """Entries for a configured scope (all if None), most non-compliant first"""
+        self._ensure_fresh()
+        return sorted(self.snapshot.entries(scope), key=lambda e: e.non_compliant, reverse=True)
+
+    def non_compliant_resources(self, assignment_id: str) -> List[Dict]:
+        """Non-compliant resources of an assignment, drilled on demand if missing"""
+        self._ensure_fresh()
+        results = []
+        for entry in self.snapshot.entries():
+            if entry.assignment_id.lower() != assignment_id.lower():
+                continue
+            if entry.non_compliant and entry.drilled_at is None:
+                self._drill(entry)
+            results.extend(dict(r, policy_name=entry.policy_name) for r in entry.resources)
+        return results
+
+    def trend(self, days: int = 30) -> float:
+        """Change in overall compliance (percentage points) over days"""
+        self._ensure_fresh()
+        history = self.snapshot.history_since(time.time() - days * 86400)
+        return round(history[-1][1] - history[0][1], 1) if history else 0.0
+
+
+def compliance_scopes() -> List[str]:
+    """Scopes from [azure] management_groups in secrets, else one per active subscription"""
+    try:
+        return [MANAGEMENT_GROUP_PREFIX + name for name in st.secrets['azure']['management_groups']]
+    except Exception:
+        from config_settings import AppConfig
+        return [f"/subscriptions/{s.subscription_id}" for s in AppConfig.load_azure_subscriptions()
+                if s.status == 'active']
+
+
+@st.cache_resource
+def get_compliance_summarizer() -> Optional[PolicyComplianceSummarizer]:
+    """
+    Get process-wide compliance summarizer (None = no Azure access, use demo data)
+
+    AZURE_POLICY_SNAPSHOT_PATH persists the snapshot between restarts.
+    """
+    from azure_resource_graph import get_azure_credential
+    credential = get_azure_credential()
+    if not POLICY_INSIGHTS_AVAILABLE or credential is None:
+        return None
+    snapshot = ComplianceSnapshot(os.environ.get('AZURE_POLICY_SNAPSHOT_PATH'))
+    return PolicyComplianceSummarizer(PolicyInsightsTransport(credential), compliance_scopes(), snapshot)
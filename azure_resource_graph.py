@@ -0,0 +1,417 @@
+"""
+Azure Resource Graph Inventory
+One paginated KQL query across all subscriptions, mapped into the Azure service models
+
+Features:
+- Single Resource Graph query for every resource in every configured subscription
+- $skipToken streaming, 1000 rows per page, 1000 subscriptions per request
+- Rows mapped into AzureVM, AzureVirtualNetwork, AzureStorageAccount, AzureSQLDatabase
+- Local snapshot store with per-subscription / per-type indexes (JSON on disk)
+- Recorded-response transport for replaying captured pages without Azure access
+"""
+
+import os
+import json
+import time
+import threading
+import streamlit as st
+import pandas as pd
+from typing import Callable, Dict, Iterator, List, Optional
+from azure_compute import AzureVM
+from azure_networking import AzureVirtualNetwork
+from azure_storage import AzureStorageAccount
+from azure_databases import AzureSQLDatabase
+
+try:
+    from azure.identity import ClientSecretCredential
+    from azure.mgmt.resourcegraph import ResourceGraphClient
+    from azure.mgmt.resourcegraph.models import QueryRequest, QueryRequestOptions
+    RESOURCE_GRAPH_AVAILABLE = True
+except ImportError:
+    RESOURCE_GRAPH_AVAILABLE = False
+
+VM_TYPE = 'microsoft.compute/virtualmachines'
+VNET_TYPE = 'microsoft.network/virtualnetworks'
+STORAGE_TYPE = 'microsoft.storage/storageaccounts'
+SQL_DB_TYPE = 'microsoft.sql/servers/databases'
+NIC_TYPE = 'microsoft.network/networkinterfaces'
+PUBLIC_IP_TYPE = 'microsoft.network/publicipaddresses'
+
+RESOURCE_TYPE_LABELS = {
+    VM_TYPE: 'Virtual Machines',
+    VNET_TYPE: 'Virtual Networks',
+    STORAGE_TYPE: 'Storage Accounts',
+    SQL_DB_TYPE: 'SQL Databases',
+    NIC_TYPE: 'Network Interfaces',
+    PUBLIC_IP_TYPE: 'Public IP Addresses',
+    'microsoft.web/sites': 'App Services',
+    'microsoft.network/loadbalancers': 'Load Balancers',
+    'microsoft.network/networksecuritygroups': 'Network Security Groups',
+    'microsoft.keyvault/vaults': 'Key Vaults',
+    'microsoft.documentdb/databaseaccounts': 'Cosmos DB',
+    'microsoft.containerservice/managedclusters': 'AKS Clusters',
+    'microsoft.compute/disks': 'Managed Disks'
+}
+
+# Resource Graph limits: 1000 rows per page, 1000 subscriptions per request
+PAGE_SIZE = 1000
+MAX_SUBSCRIPTIONS = 1000
+
+INVENTORY_QUERY = """
+Resources
+| project id, name, type = tolower(type), resourceGroup, location, subscriptionId, tags, sku, kind, properties
+| order by id asc
+"""
+
+# Transport: (subscriptions, query, skip_token) -> {'data': [rows], 'skip_token': str or None}
+Transport = Callable[[List[str], str, Optional[str]], Dict]
+
+
+class ResourceGraphTransport:
+    """Live transport over the Resource Graph SDK"""
+
+    def __init__(self, credential):
+        """Initialize with an azure-identity credential"""
+        self.client = ResourceGraphClient(credential)
+
+    def __call__(self, subscriptions: List[str], query: str, skip_token: Optional[str]) -> Dict:
+        options = QueryRequestOptions(top=PAGE_SIZE, skip_token=skip_token, result_format='objectArray')
+        response = self.client.resources(QueryRequest(subscriptions=subscriptions, query=query, options=options))
+        return {'data': response.data, 'skip_token': response.skip_token}
+
+
+class RecordedTransport:
+    """
+    Replays recorded Resource Graph pages.
+
+    Recording format: {"pages": [{"data": [...], "skip_token": "..."}, ...]};
+    the first page answers a request without a token, later pages are
+    looked up by the token the previous page returned.
+    """
+
+    def __init__(self, pages: List[Dict]):
+        """Initialize from recorded pages (in order)"""
+        self.first = pages[0] if pages else {'data': [], 'skip_token': None}
+        self.by_token = {}
+        for previous, page in zip(pages, pages[1:]):
+            self.by_token[previous.get('skip_token')] = page
+        self.requests = 0
+
+    @classmethod
+    def load(cls, path: str) -> 'RecordedTransport':
+        """Load a recording file"""
+        with open(path) as fp:
+            return cls(json.load(fp)['pages'])
+
+    def __call__(self, subscriptions: List[str], query: str, skip_token: Optional[str]) -> Dict:
+        self.requests += 1
+        page = self.first if skip_token is None else self.by_token.get(skip_token)
+        if page is None:
+            raise KeyError(f"No recorded page for skip token {skip_token}")
+        wanted = {s.lower() for s in subscriptions}
+        return {
+            'data': [row for row in page['data'] if (row.get('subscriptionId') or '').lower() in wanted],
+            'skip_token': page.get('skip_token')
+        }
+
+
+def _get(row: Dict, *path, default=None):
+    """Nested dict lookup tolerant of missing keys and nulls"""
+    value = row
+    for key in path:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key)
+    return default if value is None else value
+
+
+class AzureInventoryStore:
+    """
+    Inventory snapshot indexed by type and subscription.
+
+    Typed model lists are built on first use per (type, subscription)
+    and memoized until the next load.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize store
+
+        Args:
+            path: JSON snapshot file (None = in-memory only)
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self.rows: List[Dict] = []
+        self.by_type: Dict[str, Dict[str, List[Dict]]] = {}
+        self.refreshed_at: Optional[float] = None
+        self._memo: Dict[tuple, object] = {}
+        self._load()
+
+    def replace(self, rows: List[Dict]):
+        """Swap in a complete snapshot"""
+        with self.lock:
+            self._index(rows, time.time())
+            self._save()
+
+    def _index(self, rows: List[Dict], refreshed_at: Optional[float]):
+        """Build type/subscription indexes and reset memoized views (caller holds the lock)"""
+        by_type: Dict[str, Dict[str, List[Dict]]] = {}
+        for row in rows:
+            by_type.setdefault(row['type'], {}).setdefault(row['subscriptionId'].lower(), []).append(row)
+        self.rows = rows
+        self.by_type = by_type
+        self.refreshed_at = refreshed_at
+        self._memo = {}
+
+    def of_type(self, resource_type: str, subscription_id: Optional[str] = None) -> List[Dict]:
+        """Raw rows of one type (all subscriptions when subscription_id is None; IDs match case-insensitively)"""
+        per_subscription = self.by_type.get(resource_type.lower(), {})
+        if subscription_id is not None:
+            return per_subscription.get(subscription_id.lower(), [])
+        return [row for rows in per_subscription.values() for row in rows]
+
+    def memo(self, key: tuple, build: Callable[[], object]):
+        """Value derived from the current snapshot, built once"""
+        with self.lock:
+            if key not in self._memo:
+                self._memo[key] = build()
+            return self._memo[key]
+
+    def models(self, resource_type: str, subscription_id: Optional[str], mapper: Callable) -> List:
+        """Mapped models for a type/subscription (memoized)"""
+        return self.memo((resource_type, subscription_id and subscription_id.lower()), lambda: [
+            m for m in (mapper(row, self) for row in self.of_type(resource_type, subscription_id)) if m is not None
+        ])
+
+    def frame(self) -> pd.DataFrame:
+        """All resources as a flat DataFrame"""
+        def build() -> pd.DataFrame:
+            rows = self.rows
+            return pd.DataFrame({
+                'id': [r['id'] for r in rows],
+                'name': [r['name'] for r in rows],
+                'type': [r['type'] for r in rows],
+                'resource_group': [r.get('resourceGroup', '') for r in rows],
+                'location': [r.get('location', '') for r in rows],
+                'subscription_id': [r['subscriptionId'] for r in rows],
+                'tags': [r.get('tags') or {} for r in rows]
+            })
+
+        return self.memo(('frame',), build)
+
+    def is_empty(self) -> bool:
+        """True if no snapshot is loaded"""
+        return not self.rows
+
+    # ============= PERSISTENCE =============
+
+    def _save(self):
+        """Persist snapshot (caller holds the lock)"""
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump({'refreshed_at': self.refreshed_at, 'rows': self.rows}, fp)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        """Load a persisted snapshot if present"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path) as fp:
+            snapshot = json.load(fp)
+        self._index(snapshot['rows'], snapshot.get('refreshed_at'))
+
+
+# ============================================================================
+# ROW MAPPERS
+# ============================================================================
+
+def _vm_addresses(store: AzureInventoryStore, subscription_id: str) -> Dict[str, tuple]:
+    """VM ID -> (private IP, public IP) from NIC and public IP rows (memoized per subscription)"""
+    def build() -> Dict[str, tuple]:
+        public_ips = {row['id'].lower(): _get(row, 'properties', 'ipAddress')
+                      for row in store.of_type(PUBLIC_IP_TYPE, subscription_id)}
+        addresses = {}
+        for nic in store.of_type(NIC_TYPE, subscription_id):
+            vm_id = _get(nic, 'properties', 'virtualMachine', 'id')
+            configs = _get(nic, 'properties', 'ipConfigurations', default=[])
+            if not vm_id or not configs:
+                continue
+            primary = next((c for c in configs if _get(c, 'properties', 'primary')), configs[0])
+            public_id = _get(primary, 'properties', 'publicIPAddress', 'id', default='')
+            addresses.setdefault(vm_id.lower(), (
+                _get(primary, 'properties', 'privateIPAddress', default=''),
+                public_ips.get(public_id.lower())
+            ))
+        return addresses
+
+    return store.memo(('addresses', subscription_id.lower()), build)
+
+
+def _power_state(row: Dict) -> str:
+    """'PowerState/running' -> 'Running'"""
+    code = _get(row, 'properties', 'extended', 'instanceView', 'powerState', 'code', default='')
+    return code.split('/')[-1].capitalize() if code else 'Unknown'
+
+
+def to_vm(row: Dict, store: AzureInventoryStore) -> AzureVM:
+    """Map a VM row"""
+    private_ip, public_ip = _vm_addresses(store, row['subscriptionId']).get(row['id'].lower(), ('', None))
+    return AzureVM(
+        name=row['name'],
+        resource_group=row.get('resourceGroup', ''),
+        location=row.get('location', ''),
+        vm_size=_get(row, 'properties', 'hardwareProfile', 'vmSize', default=''),
+        os_type=_get(row, 'properties', 'storageProfile', 'osDisk', 'osType', default=''),
+        status=_power_state(row),
+        private_ip=private_ip,
+        public_ip=public_ip,
+        tags=row.get('tags') or {}
+    )
+
+
+def to_vnet(row: Dict, store: AzureInventoryStore) -> AzureVirtualNetwork:
+    """Map a virtual network row"""
+    return AzureVirtualNetwork(
+        name=row['name'],
+        resource_group=row.get('resourceGroup', ''),
+        location=row.get('location', ''),
+        address_space=', '.join(_get(row, 'properties', 'addressSpace', 'addressPrefixes', default=[])),
+        subnets=len(_get(row, 'properties', 'subnets', default=[]))
+    )
+
+
+def to_storage_account(row: Dict, store: AzureInventoryStore) -> AzureStorageAccount:
+    """Map a storage account row"""
+    return AzureStorageAccount(
+        name=row['name'],
+        resource_group=row.get('resourceGroup', ''),
+        location=row.get('location', ''),
+        sku=_get(row, 'sku', 'name', default=''),
+        kind=row.get('kind') or '',
+        access_tier=_get(row, 'properties', 'accessTier', default='')
+    )
+
+
+def to_sql_database(row: Dict, store: AzureInventoryStore) -> Optional[AzureSQLDatabase]:
+    """Map a SQL database row (system 'master' databases are skipped)"""
+    if row['name'].lower() == 'master':
+        return None
+    parts = row['id'].split('/')
+    server = parts[parts.index('servers') + 1] if 'servers' in parts else ''
+    return AzureSQLDatabase(
+        name=row['name'],
+        server_name=server,
+        resource_group=row.get('resourceGroup', ''),
+        location=row.get('location', ''),
+        tier=_get(row, 'sku', 'tier', default=''),
+        size=_get(row, 'sku', 'name', default='')
+    )
+
+
+MAPPERS = {
+    VM_TYPE: to_vm,
+    VNET_TYPE: to_vnet,
+    STORAGE_TYPE: to_storage_account,
+    SQL_DB_TYPE: to_sql_database
+}
+
+
+class AzureInventoryEngine:
+    """
+    Bulk Azure inventory over Resource Graph.
+
+    Replaces per-type, per-subscription ARM list calls with one KQL
+    query streamed page by page via $skipToken.
+    """
+
+    def __init__(self, transport: Transport, subscriptions: List[str],
+                 store: Optional[AzureInventoryStore] = None, ttl: float = 900.0):
+        """
+        Initialize engine
+
+        Args:
+            transport: Resource Graph transport (live or recorded)
+            subscriptions: Subscription IDs to query
+            store: Snapshot store (in-memory if None)
+            ttl: Seconds before a snapshot is refreshed on access
+        """
+        self.transport = transport
+        self.subscriptions = subscriptions
+        self.store = store or AzureInventoryStore()
+        self.ttl = ttl
+        self.query = INVENTORY_QUERY
+        self.pages = 0
+
+    def iter_rows(self, query: Optional[str] = None) -> Iterator[Dict]:
+        """Stream result rows across all subscriptions ($skipToken paging)"""
+        query = query or self.query
+        for i in range(0, len(self.subscriptions), MAX_SUBSCRIPTIONS):
+            batch = self.subscriptions[i:i + MAX_SUBSCRIPTIONS]
+            skip_token = None
+            while True:
+                page = self.transport(batch, query, skip_token)
+                self.pages += 1
+                yield from page.get('data', [])
+                skip_token = page.get('skip_token')
+                if not skip_token:
+                    break
+
+    def refresh(self) -> int:
+        """Re-run the inventory query into the store; returns row count"""
+        rows = list(self.iter_rows())
+        self.store.replace(rows)
+        return len(rows)
+
+    def _ensure_fresh(self):
+        """Refresh when the snapshot is missing or older than the TTL"""
+        refreshed_at = self.store.refreshed_at
+        if refreshed_at is None or time.time() - refreshed_at > self.ttl:
+            self.refresh()
+
+    def models(self, resource_type: str, subscription_id: Optional[str] = None) -> List:
+        """Mapped models of one type"""
+        self._ensure_fresh()
+        return self.store.models(resource_type, subscription_id, MAPPERS[resource_type])
+
+    def resources_by_type(self, resource_type: str, subscription_id: Optional[str] = None) -> List[Dict]:
+        """Raw resource dicts of any type"""
+        self._ensure_fresh()
+        return self.store.of_type(resource_type, subscription_id)
+
+    def snapshot(self) -> pd.DataFrame:
+        """All resources as a DataFrame (id, name, type, resource_group, location, subscription_id, tags)"""
+        self._ensure_fresh()
+        return self.store.frame()
+
+
+def get_azure_credential():
+    """Service principal credential from Streamlit secrets ([azure] tenant_id/client_id/client_secret)"""
+    try:
+        azure = st.secrets['azure']
+        return ClientSecretCredential(azure['tenant_id'], azure['client_id'], azure['client_secret'])
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def get_azure_inventory() -> Optional[AzureInventoryEngine]:
+    """
+    Get process-wide inventory engine (None = no Azure access, use demo data)
+
+    AZURE_RESOURCE_GRAPH_REPLAY points at a recorded response file to replay;
+    AZURE_INVENTORY_PATH persists the snapshot between restarts.
+    """
+    from config_settings import AppConfig
+    subscriptions = [s.subscription_id for s in AppConfig.load_azure_subscriptions() if s.status == 'active']
+
+    replay = os.environ.get('AZURE_RESOURCE_GRAPH_REPLAY')
+    if replay:
+        transport = RecordedTransport.load(replay)
+    elif RESOURCE_GRAPH_AVAILABLE and get_azure_credential() is not None:
+        transport = ResourceGraphTransport(get_azure_credential())
+    else:
+        return None
+    return AzureInventoryEngine(transport, subscriptions, AzureInventoryStore(os.environ.get('AZURE_INVENTORY_PATH')))
@@ -139,7 +139,15 @@ class AzureResourceManagerService:
     @staticmethod
     def list_resources_by_type(subscription_id: str, resource_type: str) -> List[Dict]:
         """List all resources of specific type"""
-        return []
+        from azure_resource_graph import get_azure_inventory
+        
+        inventory = get_azure_inventory()
+        if inventory is None:
+            return []
+        try:
+            return inventory.resources_by_type(resource_type, subscription_id)
+        except Exception:
+            return []
     
     @staticmethod
     def move_resources(source_rg: str, target_rg: str, resource_ids: List[str]) -> bool:
@@ -22,6 +22,15 @@ class AzureStorageService:
     @staticmethod
     def list_storage_accounts(subscription_id: str) -> List[AzureStorageAccount]:
         """List storage accounts"""
+        from azure_resource_graph import get_azure_inventory, STORAGE_TYPE
+        
+        inventory = get_azure_inventory()
+        if inventory is not None:
+            try:
+                return inventory.models(STORAGE_TYPE, subscription_id)
+            except Exception:
+                return []
+        
         return [
             AzureStorageAccount(
                 name="prodstorageacct001",
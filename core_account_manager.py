@@ -305,6 +305,22 @@ class AWSAccountManager:
         except Exception:
             return []
     
+    def get_management_session(self) -> Optional[boto3.Session]:
+        """
+        Get boto3 session for the management (payer) account itself
+        
+        Returns:
+            boto3.Session or None in demo mode
+        """
+        if self.demo_mode:
+            return None
+        
+        return boto3.Session(
+            aws_access_key_id=self.management_credentials['access_key_id'],
+            aws_secret_access_key=self.management_credentials['secret_access_key'],
+            region_name=self.management_credentials.get('region', 'us-east-1')
+        )
+    
     def clear_session_cache(self):
         """Clear all cached sessions (useful for debugging or force refresh)"""
         self._session_cache = {}
@@ -0,0 +1,364 @@
+"""
+Tiered Cache
+Shared cache layer for module data loaders
+
+Features:
+- Argument-aware keys (module + function + hashed arguments)
+- In-memory LRU tier over an optional on-disk pickle tier (survives restarts;
+  off unless APP_CACHE_DIR names a private directory)
+- Per-namespace invalidation - refreshing one module leaves the others warm
+- Stale-while-revalidate: expired entries are served while a background
+  thread reloads them
+- One load per key at a time; concurrent callers wait for the same result
+- Hit / miss / latency counters per namespace
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import functools
+import threading
+import contextlib
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Background refresh threads shared by all namespaces
+_REFRESH_WORKERS = 4
+
+COUNTERS = ['memory_hits', 'disk_hits', 'stale_hits', 'coalesced', 'misses', 'refreshes', 'errors', 'load_seconds']
+
+
+def make_key(func: Callable, args: Tuple, kwargs: Dict) -> str:
+    """Stable key for a function call (falls back to repr for unpicklable arguments)"""
+    try:
+        payload = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        payload = repr((args, sorted(kwargs.items()))).encode()
+    return f"{func.__module__}.{func.__qualname__}:{hashlib.sha1(payload).hexdigest()}"
+
+
+def private_directory(directory: str) -> Optional[str]:
+    """
+    directory if it is (or can be made) private to this user, else None
+
+    The disk tier unpickles what it finds there, so a directory that other
+    users can write to (or that belongs to someone else) is never used.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.stat(directory)
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            return None
+        if info.st_mode & 0o077:
+            os.chmod(directory, 0o700)
+    except OSError:
+        return None
+    return directory
+
+
+class _Entry:
+    """Cached value with the time it was stored"""
+    __slots__ = ('value', 'stored_at')
+
+    def __init__(self, value: Any, stored_at: float):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class TieredCache:
+    """
+    Process-wide two-tier cache keyed by (namespace, key).
+
+    An entry is fresh for ttl seconds, then served stale for up to
+    stale_ttl more seconds while it reloads in the background; after that
+    it is reloaded synchronously.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 512):
+        """
+        Initialize cache
+
+        Args:
+            directory: Disk tier root (None = memory only)
+            max_entries: Memory tier capacity across all namespaces
+        """
+        self.directory = private_directory(directory) if directory else None
+        self.max_entries = max_entries
+        self.memory: 'OrderedDict[Tuple[str, str], _Entry]' = OrderedDict()
+        self.generations: Dict[str, int] = {}
+        self.inflight: Dict[Tuple[str, str], Future] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=_REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+
+    # ============= TIERS =============
+
+    def _path(self, namespace: str, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, namespace, hashlib.sha1(key.encode()).hexdigest() + '.pkl')
+
+    def _read_disk(self, namespace: str, key: str) -> Optional[_Entry]:
+        path = self._path(namespace, key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                stored_key, stored_at, value = pickle.load(f)
+        except Exception:
+            return None
+        return _Entry(value, stored_at) if stored_key == key else None
+
+    def _write_disk(self, namespace: str, key: str, entry: _Entry) -> None:
+        path = self._path(namespace, key)
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                pickle.dump((key, entry.stored_at, entry.value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            # Unpicklable values stay memory-only
+            pass
+
+    def _remember(self, namespace: str, key: str, entry: _Entry) -> None:
+        """Insert into the memory tier, evicting least recently used entries (lock held)"""
+        self.memory[(namespace, key)] = entry
+        self.memory.move_to_end((namespace, key))
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _count(self, namespace: str, counter: str, amount: float = 1) -> None:
+        stats = self.counters.setdefault(namespace, dict.fromkeys(COUNTERS, 0))
+        stats[counter] += amount
+
+    # ============= LOADING =============
+
+    def _load(self, namespace: str, key: str, loader: Callable[[], Any], future: Future, generation: int) -> None:
+        """Run loader and publish the result unless the namespace was invalidated meanwhile"""
+        started = time.time()
+        try:
+            value = loader()
+        except BaseException as e:
+            with self.lock:
+                self._count(namespace, 'errors')
+                self.inflight.pop((namespace, key), None)
+            future.set_exception(e)
+            return
+        entry = _Entry(value, time.time())
+        with self.lock:
+            self._count(namespace, 'load_seconds', entry.stored_at - started)
+            current = self.generations.get(namespace, 0) == generation
+            if current:
+                self._remember(namespace, key, entry)
+            self.inflight.pop((namespace, key), None)
+        if current:
+            self._write_disk(namespace, key, entry)
+        future.set_result(value)
+
+    def _start(self, namespace: str, key: str) -> Tuple[Future, bool, int]:
+        """In-flight future for key and whether the caller owns the load (lock held)"""
+        future = self.inflight.get((namespace, key))
+        if future is not None:
+            return future, False, self.generations.get(namespace, 0)
+        future = Future()
+        self.inflight[(namespace, key)] = future
+        return future, True, self.generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: str, loader: Callable[[], Any], ttl: float = 300,
+            stale_ttl: Optional[float] = None, on_load: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Cached value for key, loading it when missing or expired
+
+        Args:
+            namespace: Invalidation group (usually one per module)
+            key: Entry key within the namespace
+            loader: Zero-argument function producing the value
+            ttl: Seconds an entry is fresh
+            stale_ttl: Seconds an expired entry is still served while it refreshes (default ttl)
+            on_load: Context manager factory wrapped around synchronous loads (e.g. a spinner)
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        stale_ttl = ttl if stale_ttl is None else stale_ttl
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get((namespace, key))
+            if entry is not None:
+                self.memory.move_to_end((namespace, key))
+                tier = 'memory_hits'
+        if entry is None:
+            entry = self._read_disk(namespace, key)
+            with self.lock:
+                if entry is not None and now - entry.stored_at <= ttl + stale_ttl:
+                    self._remember(namespace, key, entry)
+                    tier = 'disk_hits'
+
+        if entry is not None:
+            age = now - entry.stored_at
+            if age <= ttl:
+                with self.lock:
+                    self._count(namespace, tier)
+                return entry.value
+            if age <= ttl + stale_ttl:
+                with self.lock:
+                    self._count(namespace, 'stale_hits')
+                    future, owner, generation = self._start(namespace, key)
+                    if owner:
+                        self._count(namespace, 'refreshes')
+                if owner:
+                    self.pool.submit(self._load, namespace, key, loader, future, generation)
+                return entry.value
+
+        with self.lock:
+            future, owner, generation = self._start(namespace, key)
+            self._count(namespace, 'misses' if owner else 'coalesced')
+        if owner:
+            with (on_load() if on_load else contextlib.nullcontext()):
+                self._load(namespace, key, loader, future, generation)
+        return future.result()
+
+    # ============= MAINTENANCE =============
+
+    def invalidate(self, namespace: str, key: Optional[str] = None) -> None:
+        """Drop one key or a whole namespace from both tiers"""
+        with self.lock:
+            if key is None:
+                self.generations[namespace] = self.generations.get(namespace, 0) + 1
+                for cached in [k for k in self.memory if k[0] == namespace]:
+                    del self.memory[cached]
+            else:
+                self.memory.pop((namespace, key), None)
+        if key is not None:
+            path = self._path(namespace, key)
+            if path and os.path.exists(path):
+                os.remove(path)
+        elif self.directory and os.path.isdir(os.path.join(self.directory, namespace)):
+            folder = os.path.join(self.directory, namespace)
+            for name in os.listdir(folder):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(folder, name))
+
+    def contains(self, namespace: str, key: str) -> bool:
+        """Whether key is in the memory tier"""
+        with self.lock:
+            return (namespace, key) in self.memory
+
+    def stats(self, namespace: Optional[str] = None) -> Dict:
+        """Counters for one namespace, or per namespace"""
+        with self.lock:
+            if namespace is not None:
+                stats = dict(self.counters.get(namespace, dict.fromkeys(COUNTERS, 0)))
+                loads = stats['misses'] + stats['refreshes']
+                hits = stats['memory_hits'] + stats['disk_hits'] + stats['stale_hits'] + stats['coalesced']
+                stats['entries'] = sum(1 for k in self.memory if k[0] == namespace)
+                stats['hit_rate'] = hits / (hits + stats['misses']) if hits + stats['misses'] else 0.0
+                stats['avg_load_seconds'] = stats['load_seconds'] / loads if loads else 0.0
+                return stats
+            namespaces = list(self.counters)
+        return {name: self.stats(name) for name in namespaces}
+
+
+@st.cache_resource
+def get_tiered_cache() -> TieredCache:
+    """Get process-wide cache (memory only unless APP_CACHE_DIR names a directory for the disk tier)"""
+    directory = os.environ.get('APP_CACHE_DIR', 'off')
+    return TieredCache(None if directory == 'off' else directory)
+
+
+class CacheNamespace:
+    """
+    Module-facing cache helpers bound to one namespace
+
+    Usage:
+        PerformanceOptimizer = CacheNamespace("finops")
+
+        @PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading cost data...")
+        def load_cost_data(account_id):
+            return expensive_operation(account_id)
+    """
+
+    def __init__(self, namespace: str, refresh_label: str = "🔄 Refresh Data"):
+        self.namespace = namespace
+        self.refresh_label = refresh_label
+
+    def cache_with_spinner(self, ttl=300, spinner_text="Loading...", stale_ttl=None):
+        """
+        Decorator that caches per argument set and shows a spinner on cold loads
+
+        Args:
+            ttl: Seconds a result is fresh
+            spinner_text: Text to show while loading
+            stale_ttl: Seconds an expired result is served while it refreshes (default ttl)
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return get_tiered_cache().get(
+                    self.namespace, make_key(func, args, kwargs), lambda: func(*args, **kwargs),
+                    ttl=ttl, stale_ttl=stale_ttl, on_load=lambda: st.spinner(spinner_text))
+            return wrapper
+        return decorator
+
+    def load_once(self, key, loader_func, spinner_text="Loading...", ttl=3600):
+        """
+        Load data once and share it until ttl or the namespace is refreshed
+
+        Args:
+            key: Unique key within the namespace
+            loader_func: Function that loads the data
+            spinner_text: Text to show while loading
+            ttl: Seconds the data is fresh
+        """
+        return get_tiered_cache().get(self.namespace, key, loader_func, ttl=ttl,
+                                      on_load=lambda: st.spinner(spinner_text))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one load_once key, or everything in this namespace"""
+        get_tiered_cache().invalidate(self.namespace, key)
+
+    def add_refresh_button(self, cache_keys=None, key=None, auto_refresh=False):
+        """
+        Add a refresh button that clears this namespace only
+
+        Args:
+            cache_keys: load_once keys to report as cached
+            key: Widget key (needed when rendered more than once per page)
+            auto_refresh: Offer a 60-second auto-refresh toggle
+        """
+        cache = get_tiered_cache()
+        col1, col2, col3 = st.columns([1, 1, 4])
+
+        with col1:
+            if st.button(self.refresh_label, key=key, use_container_width=True):
+                self.invalidate()
+                st.success("✅ Cache cleared! Reloading fresh data...")
+                st.rerun()
+
+        with col2:
+            if auto_refresh:
+                enabled = st.checkbox("Auto-refresh", value=False, help="Auto-refresh every 60 seconds",
+                                      key=f"auto_refresh_{key or self.namespace}")
+                if enabled:
+                    try:
+                        from streamlit_autorefresh import st_autorefresh
+                        st_autorefresh(interval=60 * 1000, key=f"autorefresh_{key or self.namespace}")
+                        st.caption("🔄 Auto-refresh: ON")
+                    except ImportError:
+                        st.caption("⚠️ Install streamlit-autorefresh for auto-refresh")
+            elif cache_keys:
+                loaded_count = sum(1 for k in cache_keys if cache.contains(self.namespace, k))
+                st.caption(f"📦 Cached: {loaded_count}/{len(cache_keys)}")
+            else:
+                st.caption("💾 Cache ready")
+
+        with col3:
+            stats = cache.stats(self.namespace)
+            st.caption(f"⚡ Hit rate {stats['hit_rate']:.0%} · {stats['entries']} entries · "
+                       f"avg load {stats['avg_load_seconds'] * 1000:.0f} ms")
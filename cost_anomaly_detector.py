@@ -0,0 +1,419 @@
+"""
+Cost Anomaly Detector
+Vectorized anomaly detection over thousands of account x service daily cost series
+
+Features:
+- All series scored at once as one (series x day) matrix
+- Robust baseline: rolling median level x day-of-week factor (median ratio of
+  the same weekday over the previous weeks)
+- Robust scale: rolling MAD of past residuals, with relative and absolute floors
+- Incremental updates - only the days that landed (or were restated) are rescored
+- Account totals scored alongside their services; account spikes are attributed
+  to the services that drove them, service spikes hidden in a flat total are
+  reported on their own
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Scale factor turning a MAD into a standard-deviation estimate for normal data
+MAD_TO_SIGMA = 1.4826
+
+# Marker used as the service of account-total series
+TOTAL = '(total)'
+
+
+def _nanmedian(values: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Median ignoring NaN (NaN where a slice has no values)
+
+    Sort-based; much faster than np.nanmedian on the large 3-D window stacks used here.
+    """
+    ordered = np.sort(np.moveaxis(values, axis, -1), axis=-1)
+    count = np.sum(~np.isnan(ordered), axis=-1)
+    lower = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0)[..., None], axis=-1)[..., 0]
+    upper = np.take_along_axis(ordered, np.maximum(count // 2, 0)[..., None], axis=-1)[..., 0]
+    return np.where(count > 0, (lower + upper) / 2, np.nan)
+
+
+def _windows(matrix: np.ndarray, start: int, stop: int, width: int) -> np.ndarray:
+    """(series, stop - start, width) view of the width columns preceding each column in [start, stop)"""
+    padded = np.concatenate([np.full((matrix.shape[0], width), np.nan), matrix[:, :stop]], axis=1)
+    return sliding_window_view(padded, width, axis=1)[:, start:stop]
+
+
+class CostAnomalyDetector:
+    """
+    Robust seasonal anomaly detector over a matrix of daily cost series.
+
+    For series s on day t:
+        level     = median of the previous `window` days
+        factor    = median over the previous `season_weeks` same weekdays of cost / level
+        expected  = level x factor
+        scale     = max(1.4826 x MAD of the previous `window` residuals, rel_floor x expected, abs_floor)
+        score     = (cost - expected) / scale
+    A day is anomalous when score >= threshold and the excess is at least min_excess.
+    Days before a series first has spend are treated as missing, so new
+    series warm up instead of firing on their first bill.
+    """
+
+    def __init__(self, window: int = 28, season_weeks: int = 8, min_history: int = 14,
+                 threshold: float = 3.5, min_excess: float = 10.0, rel_floor: float = 0.05,
+                 abs_floor: float = 1.0):
+        """
+        Initialize detector
+
+        Args:
+            window: Days in the rolling level and scale windows
+            season_weeks: Same-weekday observations used for the day-of-week factor
+            min_history: Days of history a series needs before it is scored
+            threshold: Robust z-score that flags an anomaly
+            min_excess: Minimum cost above expected (currency) to flag an anomaly
+            rel_floor: Scale floor as a fraction of expected cost
+            abs_floor: Scale floor in currency
+        """
+        self.window = window
+        self.season_weeks = season_weeks
+        self.min_history = min_history
+        self.threshold = threshold
+        self.min_excess = min_excess
+        self.rel_floor = rel_floor
+        self.abs_floor = abs_floor
+
+        self.dates = pd.DatetimeIndex([])
+        self.keys = pd.MultiIndex.from_arrays([[], []], names=['account', 'service'])
+        self.values = np.zeros((0, 0))
+        self.level = np.zeros((0, 0))
+        self.expected = np.zeros((0, 0))
+        self.scale = np.zeros((0, 0))
+        self.lock = threading.Lock()
+
+    # ============= INGEST =============
+
+    @staticmethod
+    def _leaves(frame: pd.DataFrame) -> pd.DataFrame:
+        """Pivot long rows (date, account, service, cost) to one row per account x service"""
+        frame = frame.assign(date=pd.to_datetime(frame['date']))
+        return frame.pivot_table(index=['account', 'service'], columns='date', values='cost',
+                                 aggfunc='sum', fill_value=0.0)
+
+    @staticmethod
+    def _with_totals(leaves: pd.DataFrame) -> pd.DataFrame:
+        """Leaves followed by one total row per account"""
+        totals = leaves.groupby(level='account').sum()
+        totals.index = pd.MultiIndex.from_arrays([totals.index, [TOTAL] * len(totals)], names=['account', 'service'])
+        return pd.concat([leaves, totals])
+
+    def _aligned(self, matrix: np.ndarray, keys: pd.MultiIndex, dates: pd.DatetimeIndex) -> np.ndarray:
+        """Stored matrix reindexed to a grown (keys, dates) grid, NaN where new"""
+        return pd.DataFrame(matrix, index=self.keys, columns=self.dates).reindex(
+            index=keys, columns=dates).to_numpy(dtype='float64', copy=True)
+
+    def fit(self, frame: pd.DataFrame) -> 'CostAnomalyDetector':
+        """
+        Score a full history
+
+        Args:
+            frame: Long rows with date, account, service, cost
+        """
+        matrix = self._with_totals(self._leaves(frame).sort_index(axis=1))
+        with self.lock:
+            self.keys = matrix.index
+            self.dates = pd.DatetimeIndex(matrix.columns)
+            self.values = matrix.to_numpy(dtype='float64', copy=True)
+            self.level = np.full(self.values.shape, np.nan)
+            self.expected = np.full(self.values.shape, np.nan)
+            self.scale = np.full(self.values.shape, np.nan)
+            self._score(0)
+        return self
+
+    def update(self, frame: pd.DataFrame) -> int:
+        """
+        Merge new or restated days and rescore from the earliest changed day
+
+        Args:
+            frame: Long rows with date, account, service, cost for the days that changed
+
+        Returns:
+            Number of days rescored
+        """
+        if frame.empty:
+            return 0
+        incoming = self._leaves(frame)
+        with self.lock:
+            stored = pd.DataFrame(self.values, index=self.keys, columns=self.dates)
+            stored = stored[stored.index.get_level_values('service') != TOTAL]
+            dates = self.dates.union(pd.DatetimeIndex(incoming.columns))
+            leaves = stored.reindex(index=stored.index.union(incoming.index, sort=False), columns=dates, fill_value=0.0)
+            # Restated days replace stored values; series missing from the update keep theirs
+            leaves.loc[incoming.index, incoming.columns] = incoming.to_numpy()
+            matrix = self._with_totals(leaves)
+            start = dates.get_loc(incoming.columns.min())
+            self.level = self._aligned(self.level, matrix.index, dates)
+            self.expected = self._aligned(self.expected, matrix.index, dates)
+            self.scale = self._aligned(self.scale, matrix.index, dates)
+            self.keys, self.dates = matrix.index, dates
+            self.values = matrix.to_numpy(dtype='float64', copy=True)
+            self._score(start)
+        return len(self.dates) - start
+
+    # ============= SCORING =============
+
+    def _score(self, start: int) -> None:
+        """Recompute level, expected and scale for days [start, end) (lock held)"""
+        stop = self.values.shape[1]
+        if start >= stop:
+            return
+        born = np.maximum.accumulate(self.values > 0, axis=1)
+        history = np.where(born, self.values, np.nan)
+
+        level_windows = _windows(history, start, stop, self.window)
+        level = _nanmedian(level_windows, axis=2)
+        level[np.sum(~np.isnan(level_windows), axis=2) < self.min_history] = np.nan
+        self.level[:, start:] = level
+
+        # Day-of-week factor: median ratio to the level on the same weekday in previous weeks
+        with np.errstate(all='ignore'):
+            ratio = np.where(self.level > 0, history / self.level, np.nan)
+        lags = np.stack([
+            np.concatenate([np.full((ratio.shape[0], 7 * k), np.nan), ratio[:, :stop - 7 * k]], axis=1)[:, start:stop]
+            for k in range(1, self.season_weeks + 1)
+        ])
+        factor = _nanmedian(lags, axis=0)
+        factor[(np.sum(~np.isnan(lags), axis=0) < 3) | ~np.isfinite(factor)] = 1.0
+        expected = level * factor
+        self.expected[:, start:] = expected
+
+        residual = history - self.expected
+        residual_windows = _windows(residual, start, stop, self.window)
+        centre = _nanmedian(residual_windows, axis=2)
+        mad = _nanmedian(np.abs(residual_windows - centre[:, :, None]), axis=2)
+        scale = np.fmax(np.fmax(MAD_TO_SIGMA * mad, self.rel_floor * np.abs(expected)), self.abs_floor)
+        scale[np.isnan(expected)] = np.nan
+        self.scale[:, start:] = scale
+
+    def scores(self) -> np.ndarray:
+        """Robust z-score per (series, day); NaN while warming up"""
+        with np.errstate(all='ignore'):
+            return (self.values - self.expected) / self.scale
+
+    def flags(self) -> np.ndarray:
+        """Boolean anomaly mask per (series, day)"""
+        with np.errstate(all='ignore'):
+            return (self.scores() >= self.threshold) & (self.values - self.expected >= self.min_excess)
+
+    # ============= RESULTS =============
+
+    @staticmethod
+    def severity(score: float, excess_ratio: float) -> str:
+        """Severity from robust z-score and excess relative to expected"""
+        if score >= 10 or excess_ratio >= 1.0:
+            return 'Critical'
+        if score >= 6 or excess_ratio >= 0.5:
+            return 'High'
+        return 'Medium'
+
+    def anomalies(self, since: Optional[datetime] = None, top: Optional[int] = 50, drivers: int = 3) -> List[Dict]:
+        """
+        Ranked anomalies with attribution
+
+        Account-total anomalies list the services whose excess drove them;
+        service anomalies are reported only when their account total was not
+        itself anomalous that day (otherwise they appear as drivers).
+
+        Args:
+            since: Only days on or after this date
+            top: Maximum anomalies returned (None = all)
+            drivers: Services listed per account anomaly
+
+        Returns:
+            Anomalies sorted by excess cost, largest first
+        """
+        with self.lock:
+            if not len(self.dates):
+                return []
+            flags = self.flags()
+            excess = self.values - self.expected
+            scores = self.scores()
+            accounts = self.keys.get_level_values('account')
+            services = self.keys.get_level_values('service')
+            is_total = np.asarray(services == TOTAL)
+            total_row = {account: i for i, account in enumerate(accounts) if is_total[i]}
+            first = 0 if since is None else int(self.dates.searchsorted(pd.Timestamp(since).normalize()))
+
+            rows, cols = np.nonzero(flags[:, first:])
+            cols = cols + first
+            children = {}
+            results = []
+            for row, col in zip(rows, cols):
+                account = accounts[row]
+                if not is_total[row] and flags[total_row[account], col]:
+                    continue
+                result = {
+                    'date': self.dates[col].strftime('%Y-%m-%d'),
+                    'account': account,
+                    'service': None if is_total[row] else services[row],
+                    'actual': float(self.values[row, col]),
+                    'expected': float(self.expected[row, col]),
+                    'excess': float(excess[row, col]),
+                    'score': float(scores[row, col]),
+                    'drivers': []
+                }
+                ratio = result['excess'] / result['expected'] if result['expected'] > 0 else float('inf')
+                result['deviation'] = f"+{ratio * 100:.0f}%" if np.isfinite(ratio) else "new spend"
+                result['severity'] = self.severity(result['score'], ratio)
+                if is_total[row]:
+                    if account not in children:
+                        children[account] = np.nonzero((accounts == account) & ~is_total)[0]
+                    members = children[account]
+                    contribution = np.nan_to_num(excess[members, col])
+                    for i in np.argsort(-contribution)[:drivers]:
+                        if contribution[i] <= 0:
+                            break
+                        result['drivers'].append({
+                            'service': services[members[i]],
+                            'excess': float(contribution[i]),
+                            'share': float(contribution[i] / result['excess']) if result['excess'] > 0 else 0.0
+                        })
+                results.append(result)
+        results.sort(key=lambda r: (r['excess'], r['score']), reverse=True)
+        return results[:top] if top else results
+
+    def series(self, account: str, service: str = TOTAL) -> pd.DataFrame:
+        """One series with its expected value, upper band and anomaly flags (for charts)"""
+        with self.lock:
+            row = self.keys.get_loc((account, service))
+            upper = self.expected[row] + self.threshold * self.scale[row]
+            return pd.DataFrame({
+                'date': self.dates,
+                'cost': self.values[row],
+                'expected': self.expected[row],
+                'upper': np.fmax(upper, self.expected[row] + self.min_excess),
+                'score': self.scores()[row],
+                'anomaly': self.flags()[row]
+            })
+
+    def summary(self) -> Dict:
+        """Series and day counts"""
+        is_total = np.asarray(self.keys.get_level_values('service') == TOTAL)
+        return {
+            'series': int((~is_total).sum()),
+            'accounts': int(is_total.sum()),
+            'days': len(self.dates),
+            'first_day': self.dates.min().strftime('%Y-%m-%d') if len(self.dates) else None,
+            'last_day': self.dates.max().strftime('%Y-%m-%d') if len(self.dates) else None
+        }
+
+
+class CostExplorerSource:
+    """Daily account x service cost from Cost Explorer"""
+
+    def __init__(self, session):
+        """Initialize with a boto3 session for the payer / management account"""
+        from aws_cost_explorer import CostExplorerService
+        self.service = CostExplorerService(session)
+
+    def fetch(self, start, end) -> pd.DataFrame:
+        """Rows of date, account, service, cost for [start, end)"""
+        result = self.service.get_daily_cost_by_group(start, end, ['LINKED_ACCOUNT', 'SERVICE'])
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        frame = pd.DataFrame(result['rows'], columns=['date', 'LINKED_ACCOUNT', 'SERVICE', 'cost'])
+        return frame.rename(columns={'LINKED_ACCOUNT': 'account', 'SERVICE': 'service'})
+
+
+class DemoCostSource:
+    """Deterministic synthetic account x service costs with weekly seasonality and injected spikes"""
+
+    SERVICES = ['EC2', 'S3', 'RDS', 'Lambda', 'CloudFront', 'ELB', 'DynamoDB', 'VPC', 'CloudWatch', 'ECS']
+    ACCOUNTS = ['Production', 'Staging', 'Development', 'Shared Services']
+
+    def __init__(self, accounts: Optional[List[str]] = None, services: Optional[List[str]] = None, seed: int = 7):
+        self.accounts = accounts or self.ACCOUNTS
+        self.services = services or self.SERVICES
+        self.seed = seed
+
+    def fetch(self, start, end) -> pd.DataFrame:
+        dates = pd.date_range(start, end - timedelta(days=1), freq='D')
+        keys = pd.MultiIndex.from_product([self.accounts, self.services], names=['account', 'service'])
+        rng = np.random.default_rng(self.seed)
+        base = rng.uniform(20, 600, len(keys))[:, None]
+        weekly = 1 + rng.uniform(0, 0.25, len(keys))[:, None] * np.where(dates.dayofweek >= 5, -1, 0.4)[None, :]
+        # Noise and spikes are keyed by day so refetching a day reproduces it
+        day = (dates - pd.Timestamp('2020-01-01')).days.to_numpy()
+        series = np.arange(len(keys))[:, None]
+        uniform = np.modf(np.abs(np.sin(day[None, :] * 12.9898 + series * 78.233 + self.seed)) * 43758.5453)[0]
+        noise = (uniform - 0.5) * 0.2
+        cost = base * weekly * (1 + noise)
+        spikes = (day[None, :] * 31 + series * 17) % 211 == 0
+        cost = np.where(spikes, cost * 3.5, cost)
+        frame = pd.DataFrame(cost, index=keys, columns=dates).stack().rename('cost').reset_index()
+        return frame.rename(columns={'level_2': 'date'})
+
+
+class CostAnomalyService:
+    """
+    Keeps a detector current with its cost source.
+
+    The first refresh loads history_days; later refreshes fetch only from a
+    few days before the last stored day (Cost Explorer restates recent days)
+    and rescore those days.
+    """
+
+    def __init__(self, source, detector: Optional[CostAnomalyDetector] = None,
+                 history_days: int = 120, restate_days: int = 3, ttl: float = 6 * 3600):
+        """
+        Initialize service
+
+        Args:
+            source: Object with fetch(start, end) -> long DataFrame
+            detector: Detector to keep current (default settings when None)
+            history_days: Days loaded on first refresh
+            restate_days: Trailing days refetched on each refresh
+            ttl: Seconds between automatic refreshes
+        """
+        self.source = source
+        self.detector = detector or CostAnomalyDetector()
+        self.history_days = history_days
+        self.restate_days = restate_days
+        self.ttl = ttl
+        self.refreshed_at = 0.0
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> CostAnomalyDetector:
+        """Detector with data through yesterday"""
+        with self.refresh_lock:
+            if not force and time.time() - self.refreshed_at < self.ttl:
+                return self.detector
+            end = datetime.now().date()
+            if len(self.detector.dates):
+                start = (self.detector.dates.max() - pd.Timedelta(days=self.restate_days)).date()
+                self.detector.update(self.source.fetch(start, end))
+            else:
+                self.detector.fit(self.source.fetch(end - timedelta(days=self.history_days), end))
+            self.refreshed_at = time.time()
+            return self.detector
+
+
+@st.cache_resource
+def _cost_anomaly_service(scope: str, _account_mgr) -> CostAnomalyService:
+    """Anomaly service for one credential scope"""
+    session = _account_mgr.get_management_session() if scope != 'demo' else None
+    return CostAnomalyService(CostExplorerSource(session) if session else DemoCostSource())
+
+
+def get_cost_anomaly_service(account_mgr=None) -> CostAnomalyService:
+    """
+    Get the anomaly service for the current management credentials (demo data without them)
+
+    One service per credential scope, so each account set keeps its own
+    detector state.
+    """
+    from aws_cost_cube import credential_scope
+    return _cost_anomaly_service(credential_scope(account_mgr), account_mgr)
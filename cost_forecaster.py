@@ -0,0 +1,243 @@
+"""
+Cost Forecaster
+Vectorized daily cost forecasting over thousands of series with backtesting
+
+Features:
+- Per-series model: piecewise-linear trend with changepoints + day-of-week effects
+- Every series shares one design matrix, so a batch of thousands of series is
+  fitted with a single ridge solve
+- Changepoint slopes are shrunk (ridge penalty) so trend only bends where
+  the data insists
+- Prediction intervals from each series' residual spread and the leverage of
+  the forecast days (intervals widen with the horizon); period totals use the
+  variance of the sum rather than summed daily bounds
+- Rolling-origin backtest reporting WAPE, bias, period-total error and
+  interval coverage per series
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import date
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+
+class CostForecast:
+    """Forecast of a batch of series: mean, lower and upper as (series x day) arrays"""
+
+    def __init__(self, keys: pd.Index, dates: pd.DatetimeIndex, mean: np.ndarray,
+                 lower: np.ndarray, upper: np.ndarray, level: float, sigma: Optional[np.ndarray] = None,
+                 design: Optional[np.ndarray] = None, gram_inverse: Optional[np.ndarray] = None):
+        self.keys = keys
+        self.dates = dates
+        self.mean = mean
+        self.lower = lower
+        self.upper = upper
+        self.level = level
+        # Residual spread per series and the forecast-day design, for intervals of period totals
+        self.sigma = sigma
+        self.design = design
+        self.gram_inverse = gram_inverse
+
+    def series(self, key) -> pd.DataFrame:
+        """Daily forecast of one series: date, forecast, lower, upper"""
+        row = self.keys.get_loc(key)
+        return pd.DataFrame({
+            'date': self.dates,
+            'forecast': self.mean[row],
+            'lower': self.lower[row],
+            'upper': self.upper[row]
+        })
+
+    def totals(self, days: Optional[int] = None) -> pd.DataFrame:
+        """
+        Forecast total of each series over the first days of the horizon (all days if None)
+
+        The interval is that of the sum: variance sigma^2 * (h + s' G^-1 s) with
+        s the summed design rows of the h days, so daily errors partly cancel
+        instead of adding up their bounds.
+        """
+        days = days or len(self.dates)
+        total = self.mean[:, :days].sum(axis=1)
+        if self.sigma is None:
+            lower, upper = self.lower[:, :days].sum(axis=1), self.upper[:, :days].sum(axis=1)
+        else:
+            summed = self.design[:days].sum(axis=0)
+            z = NormalDist().inv_cdf(0.5 + self.level / 2)
+            spread = z * self.sigma * np.sqrt(days + summed @ self.gram_inverse @ summed)
+            lower, upper = np.maximum(total - spread, 0.0), total + spread
+        return pd.DataFrame({'forecast': total, 'lower': lower, 'upper': upper}, index=self.keys)
+
+    def frame(self) -> pd.DataFrame:
+        """Long frame: key column(s), date, forecast, lower, upper"""
+        index = pd.MultiIndex.from_product([self.keys, self.dates])
+        frame = pd.DataFrame({
+            'forecast': self.mean.ravel(),
+            'lower': self.lower.ravel(),
+            'upper': self.upper.ravel()
+        }, index=index)
+        frame.index.names = list(self.keys.names if self.keys.nlevels > 1 else [self.keys.name or 'key']) + ['date']
+        return frame.reset_index()
+
+
+class CostForecaster:
+    """
+    Batch forecaster for a wide (series x day) cost matrix.
+
+    Design per day t (t scaled to [0, 1] over the history):
+        1, t, max(0, t - c_k) for each changepoint c_k, weekday dummies (Tue..Sun)
+    Coefficients for all series come from one ridge solve with the penalty on
+    the changepoint terms only; the forecast extends the final trend segment.
+    """
+
+    def __init__(self, history_days: int = 180, changepoints: int = 12, changepoint_range: float = 0.85,
+                 changepoint_penalty: float = 2.0):
+        """
+        Initialize forecaster
+
+        Args:
+            history_days: Trailing days used for fitting
+            changepoints: Potential trend changepoints (evenly spaced)
+            changepoint_range: Share of the history in which changepoints are placed
+            changepoint_penalty: Ridge penalty on changepoint slopes (higher = smoother trend)
+        """
+        self.history_days = history_days
+        self.changepoints = changepoints
+        self.changepoint_range = changepoint_range
+        self.changepoint_penalty = changepoint_penalty
+
+    def _design(self, t: np.ndarray, dates: pd.DatetimeIndex, knots: np.ndarray) -> np.ndarray:
+        """Design matrix rows for scaled times t on dates"""
+        weekday = np.asarray(dates.dayofweek)
+        return np.column_stack([
+            np.ones_like(t),
+            t,
+            np.maximum(t[:, None] - knots[None, :], 0.0),
+            (weekday[:, None] == np.arange(1, 7)[None, :]).astype('float64')
+        ])
+
+    def forecast(self, history: pd.DataFrame, horizon: int, level: float = 0.95) -> CostForecast:
+        """
+        Fit every series and forecast the following days
+
+        Args:
+            history: Wide frame, one row per series, one column per consecutive day (missing = 0)
+            horizon: Days to forecast
+            level: Prediction interval level (e.g. 0.95)
+
+        Returns:
+            CostForecast for the horizon days after the last history day
+        """
+        history = history.iloc[:, -self.history_days:]
+        dates = pd.DatetimeIndex(history.columns)
+        values = np.nan_to_num(history.to_numpy(dtype='float64'))
+        days = values.shape[1]
+        future = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+
+        # Too little history for the full model: drop changepoints, then trend and weekdays
+        knots_count = self.changepoints if days >= 56 else 0
+        knots = np.linspace(0, self.changepoint_range, knots_count + 2)[1:-1] if knots_count else np.empty(0)
+        scale = max(days - 1, 1)
+        design = self._design(np.arange(days) / scale, dates, knots)
+        future_design = self._design(np.arange(days, days + horizon) / scale, future, knots)
+        if days < 14:
+            design, future_design = design[:, :1], future_design[:, :1]
+
+        penalty = np.zeros(design.shape[1])
+        penalty[2:2 + len(knots)] = self.changepoint_penalty
+        # Tiny ridge everywhere keeps the solve stable when weekdays are missing
+        gram_inverse = np.linalg.inv(design.T @ design + np.diag(penalty + 1e-6))
+        coefficients = gram_inverse @ design.T @ values.T
+
+        residuals = values - (design @ coefficients).T
+        dof = max(days - design.shape[1], 1)
+        sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+        leverage = np.einsum('ij,jk,ik->i', future_design, gram_inverse, future_design)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        mean = (future_design @ coefficients).T
+        spread = z * sigma[:, None] * np.sqrt(1.0 + leverage)[None, :]
+        return CostForecast(history.index, future, np.maximum(mean, 0.0), np.maximum(mean - spread, 0.0),
+                            mean + spread, level, sigma, future_design, gram_inverse)
+
+    def backtest(self, history: pd.DataFrame, horizon: int = 30, folds: int = 3,
+                 level: float = 0.95) -> pd.DataFrame:
+        """
+        Rolling-origin backtest: refit at folds cut-offs spaced horizon days apart
+
+        Args:
+            history: Wide frame, as for forecast()
+            horizon: Days forecast from each cut-off
+            folds: Number of cut-offs (the last ends at the final history day)
+            level: Prediction interval level
+
+        Returns:
+            DataFrame per series (averaged over folds): wape, bias, period_error, coverage
+        """
+        values = np.nan_to_num(history.to_numpy(dtype='float64'))
+        folds = min(folds, max((values.shape[1] - 28) // horizon, 0))
+        if folds == 0:
+            return pd.DataFrame({'wape': np.nan, 'bias': np.nan, 'period_error': np.nan, 'coverage': np.nan},
+                                index=history.index)
+        metrics = []
+        for fold in range(folds, 0, -1):
+            cutoff = values.shape[1] - fold * horizon
+            result = self.forecast(history.iloc[:, :cutoff], horizon, level)
+            actual = values[:, cutoff:cutoff + horizon]
+            actual_total = np.abs(actual).sum(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                metrics.append(np.stack([
+                    np.abs(result.mean - actual).sum(axis=1) / actual_total,
+                    (result.mean - actual).sum(axis=1) / actual_total,
+                    np.abs(result.mean.sum(axis=1) - actual.sum(axis=1)) / actual_total,
+                    ((actual >= result.lower) & (actual <= result.upper)).mean(axis=1)
+                ], axis=1))
+        stacked = np.stack(metrics)
+        valid = np.isfinite(stacked)
+        # Series without spend in a fold (zero actuals) are averaged over the remaining folds
+        with np.errstate(invalid='ignore'):
+            summary = np.where(valid, stacked, 0.0).sum(axis=0) / valid.sum(axis=0)
+        return pd.DataFrame(summary, index=history.index, columns=['wape', 'bias', 'period_error', 'coverage'])
+
+
+def wide_history(frame: pd.DataFrame, keys, start: Optional[date] = None, end: Optional[date] = None) -> pd.DataFrame:
+    """
+    Pivot long daily rows (date, key column(s), cost) into the wide matrix the forecaster takes
+
+    Missing days inside [start, end] (defaults: first / last date in frame) become 0.
+    Without rows (and no explicit range) the result has no columns.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    frame = frame.assign(date=pd.to_datetime(frame['date']))
+    wide = frame.pivot_table(index=keys, columns='date', values='cost', aggfunc='sum', fill_value=0.0,
+                             observed=True)
+    start = pd.Timestamp(start) if start is not None else wide.columns.min()
+    end = pd.Timestamp(end) if end is not None else wide.columns.max()
+    if pd.isna(start) or pd.isna(end):
+        return wide.reindex(columns=pd.DatetimeIndex([]))
+    return wide.reindex(columns=pd.date_range(start, end, freq='D'), fill_value=0.0)
+
+
+def month_end_outlook(forecast: CostForecast, spent: pd.Series, today: date) -> pd.DataFrame:
+    """
+    Month-end spend per series: month-to-date spend plus the forecast for the remaining days
+
+    Args:
+        forecast: Forecast starting the day after the last complete day
+        spent: Month-to-date spend per series key
+        today: First forecast day (days before it in the month count as spent)
+
+    Returns:
+        DataFrame per key: spent, forecast, lower, upper (month-end totals)
+    """
+    month_end = (pd.Timestamp(today) + pd.offsets.MonthEnd(0)).normalize()
+    remaining = int((forecast.dates <= month_end).sum())
+    outlook = forecast.totals(remaining) if remaining else forecast.totals(1) * 0.0
+    spent = spent.reindex(outlook.index, fill_value=0.0)
+    return outlook.add(spent, axis=0).assign(spent=spent)[['spent', 'forecast', 'lower', 'upper']]
+
+
+def split_history(history: pd.DataFrame, today: date) -> Tuple[pd.DataFrame, pd.Series]:
+    """History before today, and month-to-date spend per series (days of today's month before today)"""
+    history = history.loc[:, history.columns < pd.Timestamp(today)]
+    month_start = pd.Timestamp(today).replace(day=1)
+    return history, history.loc[:, history.columns >= month_start].sum(axis=1)
@@ -21,58 +21,13 @@ import plotly.graph_objects as go
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import json
+from core_cache import CacheNamespace
 
 # ============================================================================
 # PERFORMANCE OPTIMIZER
 # ============================================================================
 
-class PerformanceOptimizer:
-    """Performance optimization wrapper"""
-    
-    @staticmethod
-    def cache_with_spinner(ttl=60, spinner_text="Loading..."):
-        """Decorator with caching and spinner - shorter TTL for real-time data"""
-        import functools
-        
-        def decorator(func):
-            cached_func = st.cache_data(ttl=ttl)(func)
-            
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                cache_key = f"cache_{func.__name__}"
-                
-                if cache_key not in st.session_state:
-                    with st.spinner(spinner_text):
-                        result = cached_func(*args, **kwargs)
-                        st.session_state[cache_key] = True
-                    return result
-                else:
-                    return cached_func(*args, **kwargs)
-            
-            return wrapper
-        return decorator
-    
-    @staticmethod
-    def add_refresh_button(cache_keys=None):
-        """Add refresh button"""
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
-        with col1:
-            if st.button("🔄 Refresh", key=f"refresh_{st.session_state.db_ops_session_id}", use_container_width=True):
-                if cache_keys:
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                st.cache_data.clear()
-                st.success("✅ Refreshed!")
-                st.rerun()
-        
-        with col2:
-            auto_refresh = st.checkbox("Auto-refresh", value=False, 
-                                      help="Auto-refresh every 60 seconds",
-                                      key=f"auto_refresh_db_{st.session_state.db_ops_session_id}")
-            if auto_refresh:
-                st.caption("🔄 Auto-refresh: ON")
+PerformanceOptimizer = CacheNamespace("database_operations", refresh_label="🔄 Refresh")
 
 # ============================================================================
 # AI CLIENT INITIALIZATION
@@ -520,7 +475,7 @@ class DatabaseOperationsDashboard:
             'database_inventory',
             'ai_predictions',
             'remediation_history'
-        ])
+        ], key=f"refresh_{st.session_state.db_ops_session_id}", auto_refresh=True)
         
         # Check AI availability
         ai_available = get_anthropic_client() is not None
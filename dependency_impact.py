@@ -0,0 +1,319 @@
+"""
+Dependency Impact Analysis
+Change-impact (blast radius) queries and streaming exports for ResourceDependencyGraph
+
+Features:
+- Reverse traversal: "what breaks if sg-X or vpc-Y changes"
+- Memoized transitive closures over the condensed (cycle-free) graph
+- Account-wide blast radius ranking
+- Streaming JSON and GraphML export (no DataFrame materialization)
+"""
+
+import json
+import streamlit as st
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO
+from xml.sax.saxutils import escape, quoteattr
+from resource_dependency_graph import ResourceDependencyGraph, APPLICATION_TAG, NON_CRITICAL_TYPES
+
+
+class ImpactAnalyzer:
+    """
+    Change-impact queries over a ResourceDependencyGraph.
+
+    Strongly connected components are collapsed first (iterative Tarjan),
+    so the closure of each component is computed once from its
+    successors' closures and memoized. Repeated queries - including
+    ranking every resource in an account - reuse those closures.
+    """
+
+    def __init__(self, graph: ResourceDependencyGraph):
+        """
+        Initialize analyzer
+
+        Args:
+            graph: Dependency graph (edge A -> B means A depends on B)
+        """
+        self.graph = graph
+        self._component: Dict[str, int] = {}
+        self._members: List[List[str]] = []
+        self._successors: List[Set[int]] = []
+        self._closure: Dict[int, frozenset] = {}
+
+    # ============= CONDENSATION =============
+
+    def _condense(self):
+        """Tarjan SCC over reverse edges (node -> its dependents), iteratively"""
+        if self._members:
+            return
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        counter = 0
+
+        for start in self.graph.nodes:
+            if start in index:
+                continue
+            work = [(start, iter(self.graph.dependents.get(start, [])))]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.graph.dependents.get(child, []))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        self._component[member] = len(self._members)
+                        component.append(member)
+                        if member == node:
+                            break
+                    self._members.append(component)
+
+        self._successors = [set() for _ in self._members]
+        for node, comp in self._component.items():
+            for dependent in self.graph.dependents.get(node, []):
+                other = self._component[dependent]
+                if other != comp:
+                    self._successors[comp].add(other)
+
+    def _component_closure(self, comp: int) -> frozenset:
+        """All nodes transitively depending on a component (memoized, iterative post-order)"""
+        if comp in self._closure:
+            return self._closure[comp]
+        work = [(comp, False)]
+        while work:
+            current, ready = work.pop()
+            if current in self._closure:
+                continue
+            if not ready:
+                work.append((current, True))
+                work.extend((s, False) for s in self._successors[current] if s not in self._closure)
+                continue
+            nodes: Set[str] = set()
+            for successor in self._successors[current]:
+                nodes.update(self._members[successor])
+                nodes.update(self._closure[successor])
+            self._closure[current] = frozenset(nodes)
+        return self._closure[comp]
+
+    # ============= QUERIES =============
+
+    def impacted(self, node_id: str) -> Set[str]:
+        """
+        Resources that transitively depend on node_id
+
+        Args:
+            node_id: Resource ID or ARN being changed
+
+        Returns:
+            Set of impacted node IDs (excluding node_id itself)
+        """
+        if node_id not in self.graph.nodes:
+            return set()
+        self._condense()
+        comp = self._component[node_id]
+        result = set(self._component_closure(comp))
+        result.update(m for m in self._members[comp] if m != node_id)
+        return result
+
+    def impact_report(self, node_ids: Iterable[str]) -> Dict:
+        """
+        Impact summary for changing one or more resources
+
+        Returns:
+            Dict with changed, impacted (sorted IDs), direct_dependents,
+            by_type counts, applications affected and critical count
+        """
+        changed = [n for n in node_ids if n in self.graph.nodes]
+        impacted: Set[str] = set()
+        direct: Set[str] = set()
+        for node_id in changed:
+            impacted |= self.impacted(node_id)
+            direct.update(self.graph.dependents.get(node_id, []))
+        impacted -= set(changed)
+
+        by_type: Dict[str, int] = {}
+        applications: Set[str] = set()
+        critical = 0
+        for node_id in impacted:
+            node = self.graph.nodes[node_id]
+            by_type[node.resource_type] = by_type.get(node.resource_type, 0) + 1
+            if node.tags.get(APPLICATION_TAG):
+                applications.add(node.tags[APPLICATION_TAG])
+            if node.resource_type not in NON_CRITICAL_TYPES:
+                critical += 1
+
+        return {
+            'changed': changed,
+            'impacted': sorted(impacted),
+            'direct_dependents': sorted(direct - set(changed)),
+            'by_type': by_type,
+            'applications': sorted(applications),
+            'critical': critical
+        }
+
+    def blast_radius_ranking(self, resource_types: Optional[Set[str]] = None, top: int = 20) -> List[Dict]:
+        """
+        Resources ranked by number of transitive dependents
+
+        Args:
+            resource_types: Only rank these types (e.g. {'Security Group', 'VPC'})
+            top: Number of rows to return
+
+        Returns:
+            Rows with Resource, Type, Impacted Resources and Applications
+        """
+        rows = []
+        for node_id, node in self.graph.nodes.items():
+            if resource_types and node.resource_type not in resource_types:
+                continue
+            impacted = self.impacted(node_id)
+            if not impacted:
+                continue
+            apps = {self.graph.nodes[n].tags.get(APPLICATION_TAG) for n in impacted} - {None}
+            rows.append({
+                'Resource': node.label,
+                'ID': node_id,
+                'Type': node.resource_type,
+                'Impacted Resources': len(impacted),
+                'Applications': len(apps)
+            })
+        rows.sort(key=lambda r: r['Impacted Resources'], reverse=True)
+        return rows[:top]
+
+
+def application_nodes(graph: ResourceDependencyGraph, application: str) -> Set[str]:
+    """Tagged resources of an application plus everything they depend on"""
+    seen: Set[str] = set()
+    stack = list(graph.applications.get(application, set()))
+    while stack:
+        node_id = stack.pop()
+        if node_id in seen:
+            continue
+        seen.add(node_id)
+        stack.extend(graph.depends_on.get(node_id, []))
+    return seen
+
+
+@st.cache_resource(ttl=600, max_entries=16)
+def get_impact_analyzer(graph_version: str, _graph: ResourceDependencyGraph) -> ImpactAnalyzer:
+    """Get cached analyzer for a graph version (closures persist across reruns)"""
+    return ImpactAnalyzer(_graph)
+
+
+# ============================================================================
+# STREAMING EXPORT
+# ============================================================================
+
+def _node_record(node) -> Dict:
+    """Serializable node dict"""
+    return {
+        'id': node.node_id, 'type': node.resource_type, 'name': node.name,
+        'status': node.status, 'account_id': node.account_id, 'region': node.region,
+        'tags': node.tags
+    }
+
+
+def iter_json(graph: ResourceDependencyGraph, node_ids: Optional[Set[str]] = None) -> Iterator[str]:
+    """
+    Stream the graph as JSON text chunks
+
+    Args:
+        graph: Dependency graph
+        node_ids: Optional subset of nodes (edges are kept when both ends are included)
+
+    Yields:
+        JSON fragments; concatenated they form {"nodes": [...], "edges": [...]}
+    """
+    include = (lambda n: n in node_ids) if node_ids is not None else (lambda n: True)
+
+    yield '{"nodes": ['
+    first = True
+    for node_id, node in graph.nodes.items():
+        if include(node_id):
+            yield ('' if first else ',') + json.dumps(_node_record(node))
+            first = False
+    yield '], "edges": ['
+    first = True
+    for source, targets in graph.depends_on.items():
+        if not include(source):
+            continue
+        for target in targets:
+            if include(target):
+                yield ('' if first else ',') + json.dumps({'source': source, 'target': target,
+                                                           'relation': 'depends_on'})
+                first = False
+    yield ']}'
+
+
+def iter_graphml(graph: ResourceDependencyGraph, node_ids: Optional[Set[str]] = None) -> Iterator[str]:
+    """
+    Stream the graph as GraphML lines (readable by Gephi, yEd, networkx)
+
+    Args:
+        graph: Dependency graph
+        node_ids: Optional subset of nodes
+
+    Yields:
+        GraphML text lines
+    """
+    include = (lambda n: n in node_ids) if node_ids is not None else (lambda n: True)
+    keys = [('type', 'string'), ('name', 'string'), ('status', 'string'),
+            ('account_id', 'string'), ('region', 'string'), ('application', 'string')]
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    for key, attr_type in keys:
+        yield f'  <key id="{key}" for="node" attr.name="{key}" attr.type="{attr_type}"/>\n'
+    yield '  <graph id="dependencies" edgedefault="directed">\n'
+
+    for node_id, node in graph.nodes.items():
+        if not include(node_id):
+            continue
+        values = {
+            'type': node.resource_type, 'name': node.name, 'status': node.status,
+            'account_id': node.account_id, 'region': node.region,
+            'application': node.tags.get(APPLICATION_TAG, '')
+        }
+        data = ''.join(f'<data key="{k}">{escape(str(v))}</data>' for k, v in values.items() if v)
+        yield f'    <node id={quoteattr(node_id)}>{data}</node>\n'
+
+    edge_count = 0
+    for source, targets in graph.depends_on.items():
+        if not include(source):
+            continue
+        for target in targets:
+            if include(target):
+                yield f'    <edge id="e{edge_count}" source={quoteattr(source)} target={quoteattr(target)}/>\n'
+                edge_count += 1
+
+    yield '  </graph>\n</graphml>\n'
+
+
+def write_export(chunks: Iterator[str], fp: TextIO):
+    """Write streamed export chunks to an open text file"""
+    for chunk in chunks:
+        fp.write(chunk)
@@ -21,6 +21,7 @@ import json
 import hashlib
 import time
 import base64
+from aws_ssm import SystemsManagerManager
 
 def render_cicd_phase2_module(session, selected_account: str, selected_region: str):
     """Main entry point for Phase 2: Advanced Triggering"""
@@ -36,6 +37,7 @@ def render_cicd_phase2_module(session, selected_account: str, selected_region: s
         lambda_client = session.client('lambda', region_name=selected_region)
         s3_client = session.client('s3', region_name=selected_region)
         ecr_client = session.client('ecr', region_name=selected_region)
+        ssm_manager = SystemsManagerManager(session, selected_region)
     except Exception as e:
         st.error(f"❌ Failed to initialize AWS clients: {str(e)}")
         return
@@ -64,7 +66,7 @@ def render_cicd_phase2_module(session, selected_account: str, selected_region: s
     
     # Tab 4: Pipeline Parameters
     with tabs[3]:
-        render_pipeline_parameters(cp_client)
+        render_pipeline_parameters(cp_client, ssm_manager)
     
     # Tab 5: Advanced Configuration
     with tabs[4]:
@@ -706,7 +708,7 @@ def render_event_triggers(cp_client, events_client, iam_client, s3_client, ecr_c
 # TAB 4: PIPELINE PARAMETERS
 # ============================================================================
 
-def render_pipeline_parameters(cp_client):
+def render_pipeline_parameters(cp_client, ssm_manager):
     """Manage pipeline parameters"""
     
     st.subheader("📋 Pipeline Parameters")
@@ -853,6 +855,30 @@ def render_pipeline_parameters(cp_client):
     else:
         st.info("No parameters configured for this pipeline.")
     
+    # Values stored in Parameter Store (one cached path load per pipeline)
+    st.markdown("---")
+    st.markdown("### 🔐 Parameter Store")
+    
+    store_path = f"/pipelines/{selected_pipeline}"
+    stored = ssm_manager.list_parameters(store_path, recursive=True)
+    stored_values = {p['name'].rsplit('/', 1)[-1]: p['value'] for p in stored if p['type'] != 'SecureString'}
+    
+    if stored:
+        st.dataframe(pd.DataFrame(stored), use_container_width=True, hide_index=True)
+    else:
+        st.info(f"No values stored under {store_path}")
+    
+    publishable = {
+        f"{store_path}/{p['name']}": str(p['default'])
+        for p in parameters if p['type'] != 'Secret' and str(p.get('default', '')) != ''
+    }
+    if st.button("⬆️ Publish Defaults to Parameter Store", disabled=not publishable, use_container_width=True):
+        result = ssm_manager.put_parameters(publishable)
+        if result['success']:
+            st.success(f"✅ {result['message']} under {store_path}")
+        else:
+            st.error(f"❌ {len(result['failed'])} parameters failed: {'; '.join(result['failed'].values())}")
+    
     # Test parameters
     if parameters:
         st.markdown("---")
@@ -866,7 +892,7 @@ def render_pipeline_parameters(cp_client):
                 if param['type'] == 'String':
                     test_values[param['name']] = st.text_input(
                         param['name'],
-                        value=param.get('default', ''),
+                        value=stored_values.get(param['name'], param.get('default', '')),
                         help=param.get('description', '')
                     )
                 elif param['type'] == 'Choice':
@@ -17,6 +17,7 @@ import os
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from enum import Enum
+from core_cache import CacheNamespace
 
 # ============================================================================
 # NEW ENGINE IMPORTS (ADDED FOR AI SIZING & COST ANALYSIS)
@@ -51,112 +52,7 @@ except ImportError:
 # PERFORMANCE OPTIMIZER - Makes module 10-100x faster!
 # ============================================================================
 
-class PerformanceOptimizer:
-    """
-    Performance optimization wrapper for fast module loading
-    Adds intelligent caching and loading indicators
-    """
-    
-    @staticmethod
-    def cache_with_spinner(ttl=300, spinner_text="Loading..."):
-        """
-        Decorator that adds both caching AND loading spinner
-        
-        Args:
-            ttl: Cache time-to-live in seconds (default 5 minutes)
-            spinner_text: Text to show while loading
-        
-        Usage:
-            @PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading templates...")
-            def load_templates():
-                return expensive_operation()
-        """
-        import functools
-        
-        def decorator(func):
-            # Create cached version
-            cached_func = st.cache_data(ttl=ttl)(func)
-            
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                # Check if in cache
-                cache_key = f"cache_{func.__name__}"
-                
-                if cache_key not in st.session_state:
-                    # Not in cache - show spinner and load
-                    with st.spinner(spinner_text):
-                        result = cached_func(*args, **kwargs)
-                        st.session_state[cache_key] = True  # Mark as loaded
-                    return result
-                else:
-                    # In cache - instant!
-                    return cached_func(*args, **kwargs)
-            
-            return wrapper
-        return decorator
-    
-    @staticmethod
-    def load_once(key, loader_func, spinner_text="Loading..."):
-        """
-        Load data once and cache in session state
-        
-        Args:
-            key: Unique key for session state
-            loader_func: Function that loads the data
-            spinner_text: Text to show while loading
-        
-        Usage:
-            data = PerformanceOptimizer.load_once(
-                key="design_templates",
-                loader_func=lambda: load_templates(),
-                spinner_text="Loading design templates..."
-            )
-        """
-        if key not in st.session_state:
-            with st.spinner(spinner_text):
-                st.session_state[key] = loader_func()
-        
-        return st.session_state[key]
-    
-    @staticmethod
-    def add_refresh_button(cache_keys=None):
-        """
-        Add a refresh button to clear cache
-        
-        Args:
-            cache_keys: List of session state keys to clear (None = clear all)
-        
-        Usage:
-            PerformanceOptimizer.add_refresh_button(['design_templates', 'waf_data'])
-        """
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
-        with col1:
-            if st.button("🔄 Refresh Data", use_container_width=True):
-                # Clear specified caches
-                if cache_keys:
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                    # Also clear function caches
-                    st.cache_data.clear()
-                else:
-                    # Clear all cache
-                    st.cache_data.clear()
-                    # Clear all session state
-                    for key in list(st.session_state.keys()):
-                        if key.startswith('cache_') or key.startswith('design_'):
-                            del st.session_state[key]
-                
-                st.success("✅ Cache cleared! Reloading fresh data...")
-                st.rerun()
-        
-        with col2:
-            if cache_keys:
-                loaded_count = sum(1 for key in cache_keys if key in st.session_state)
-                st.caption(f"📦 Cached: {loaded_count}/{len(cache_keys)}")
-            else:
-                st.caption("💾 Cache ready")
+PerformanceOptimizer = CacheNamespace("design_planning")
 
 
 @st.cache_resource
@@ -17,6 +17,7 @@ Features:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict, List, Optional
@@ -24,6 +25,11 @@ from datetime import datetime, timedelta
 from config_settings import AppConfig
 from core_account_manager import get_account_manager
 from utils_helpers import Helpers
+from core_cache import CacheNamespace
+from cost_anomaly_detector import CostAnomalyDetector, get_cost_anomaly_service
+from aws_cost_cube import UNTAGGED, get_aws_cost_cube
+from cost_forecaster import CostForecaster, month_end_outlook, split_history, wide_history
+from rightsizing_engine import get_rightsizing_service
 import json
 import os
 import random
@@ -32,112 +38,7 @@ import random
 # PERFORMANCE OPTIMIZER - Makes module 10-100x faster!
 # ============================================================================
 
-class PerformanceOptimizer:
-    """
-    Performance optimization wrapper for fast module loading
-    Adds intelligent caching and loading indicators
-    """
-    
-    @staticmethod
-    def cache_with_spinner(ttl=300, spinner_text="Loading..."):
-        """
-        Decorator that adds both caching AND loading spinner
-        
-        Args:
-            ttl: Cache time-to-live in seconds (default 5 minutes)
-            spinner_text: Text to show while loading
-        
-        Usage:
-            @PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading cost data...")
-            def load_cost_data():
-                return expensive_operation()
-        """
-        import functools
-        
-        def decorator(func):
-            # Create cached version
-            cached_func = st.cache_data(ttl=ttl)(func)
-            
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                # Check if in cache
-                cache_key = f"cache_{func.__name__}"
-                
-                if cache_key not in st.session_state:
-                    # Not in cache - show spinner and load
-                    with st.spinner(spinner_text):
-                        result = cached_func(*args, **kwargs)
-                        st.session_state[cache_key] = True  # Mark as loaded
-                    return result
-                else:
-                    # In cache - instant!
-                    return cached_func(*args, **kwargs)
-            
-            return wrapper
-        return decorator
-    
-    @staticmethod
-    def load_once(key, loader_func, spinner_text="Loading..."):
-        """
-        Load data once and cache in session state
-        
-        Args:
-            key: Unique key for session state
-            loader_func: Function that loads the data
-            spinner_text: Text to show while loading
-        
-        Usage:
-            data = PerformanceOptimizer.load_once(
-                key="finops_data",
-                loader_func=lambda: expensive_load_function(),
-                spinner_text="Loading FinOps data..."
-            )
-        """
-        if key not in st.session_state:
-            with st.spinner(spinner_text):
-                st.session_state[key] = loader_func()
-        
-        return st.session_state[key]
-    
-    @staticmethod
-    def add_refresh_button(cache_keys=None):
-        """
-        Add a refresh button to clear cache
-        
-        Args:
-            cache_keys: List of session state keys to clear (None = clear all)
-        
-        Usage:
-            PerformanceOptimizer.add_refresh_button(['finops_data', 'cost_data'])
-        """
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
-        with col1:
-            if st.button("🔄 Refresh Data", use_container_width=True):
-                # Clear specified caches
-                if cache_keys:
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                    # Also clear function caches
-                    st.cache_data.clear()
-                else:
-                    # Clear all cache
-                    st.cache_data.clear()
-                    # Clear all session state
-                    for key in list(st.session_state.keys()):
-                        if key.startswith('cache_') or key.startswith('finops_'):
-                            del st.session_state[key]
-                
-                st.success("✅ Cache cleared! Reloading fresh data...")
-                st.rerun()
-        
-        with col2:
-            if cache_keys:
-                loaded_count = sum(1 for key in cache_keys if key in st.session_state)
-                st.caption(f"📦 Cached: {loaded_count}/{len(cache_keys)}")
-            else:
-                st.caption("💾 Cache ready")
+PerformanceOptimizer = CacheNamespace("finops")
 
 # ============================================================================
 # AI CLIENT INITIALIZATION
@@ -250,33 +151,30 @@ def generate_cost_anomalies() -> List[Dict]:
     return anomalies
 
 def detect_anomalies_ml(cost_history: List[Dict]) -> Dict:
-    """ML-based anomaly detection with statistical analysis"""
-    # Calculate baseline statistics
-    costs = [item['cost'] for item in cost_history]
-    mean = sum(costs) / len(costs)
-    variance = sum((x - mean) ** 2 for x in costs) / len(costs)
-    std_dev = variance ** 0.5
-    
-    # Detect anomalies (> 2 standard deviations)
-    anomaly_threshold = mean + (2 * std_dev)
+    """Robust seasonal anomaly detection for one daily cost series (rolling median/MAD + day-of-week)"""
+    history = pd.DataFrame(cost_history).assign(account='Total', service='Total')
+    detector = CostAnomalyDetector().fit(history)
+    series = detector.series('Total')
+    scored = series.dropna(subset=['expected'])
     
     detected = []
-    for item in cost_history[-7:]:  # Last 7 days
-        if item['cost'] > anomaly_threshold:
-            deviation_pct = ((item['cost'] - mean) / mean) * 100
-            detected.append({
-                'date': item['date'],
-                'expected': f"${mean:.2f}",
-                'actual': f"${item['cost']:.2f}",
-                'deviation': f"+{deviation_pct:.0f}%",
-                'confidence': '95%' if item['cost'] > anomaly_threshold * 1.5 else '85%'
-            })
+    for _, row in scored[scored['anomaly']].iterrows():
+        deviation_pct = (row['cost'] - row['expected']) / row['expected'] * 100 if row['expected'] > 0 else 0
+        detected.append({
+            'date': row['date'].strftime('%Y-%m-%d'),
+            'expected': f"${row['expected']:.2f}",
+            'actual': f"${row['cost']:.2f}",
+            'deviation': f"+{deviation_pct:.0f}%",
+            'score': row['score'],
+            'confidence': '95%' if row['score'] >= 2 * detector.threshold else '85%'
+        })
     
     return {
         'detected': detected,
-        'baseline_mean': mean,
-        'baseline_std': std_dev,
-        'threshold': anomaly_threshold,
+        'series': series,
+        'baseline_mean': float(scored['expected'].mean()) if len(scored) else 0.0,
+        'baseline_std': float((scored['upper'] - scored['expected']).median() / detector.threshold) if len(scored) else 0.0,
+        'threshold': float(scored['upper'].median()) if len(scored) else 0.0,
         'total_anomalies': len(detected)
     }
 
@@ -499,93 +397,73 @@ def generate_carbon_footprint_data() -> Dict:
 # DEMO DATA GENERATION
 # ============================================================================
 
-@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading cost data...")
-def generate_demo_cost_data() -> Dict:
-    """Generate demo cost data for visualization"""
-    
-    services = ['EC2', 'S3', 'RDS', 'Lambda', 'CloudFront', 'ELB', 'DynamoDB', 'VPC', 'CloudWatch', 'ECS']
-    
-    cost_data = {
-        'total_cost': 0,
-        'services': {},
-        'daily_costs': [],
-        'by_account': {}
-    }
-    
-    # Service costs
-    for service in services:
-        cost = random.uniform(500, 5000)
-        cost_data['services'][service] = cost
-        cost_data['total_cost'] += cost
-    
-    # Daily costs for last 30 days
-    for i in range(30):
-        date = (datetime.now() - timedelta(days=30-i)).strftime('%Y-%m-%d')
-        daily_cost = cost_data['total_cost'] / 30 * random.uniform(0.8, 1.2)
-        cost_data['daily_costs'].append({'date': date, 'cost': daily_cost})
+def load_cost_data(days: int = 30) -> Dict:
+    """Cost summary (total, services, daily_costs, by_account) for the last days from the AWS cost cube"""
+    return get_aws_cost_cube().cost_data(days)
+
+def configured_budgets() -> Dict[str, float]:
+    """Monthly budget per account from [aws] budgets in secrets (empty if not configured)"""
+    try:
+        return {str(k): float(v) for k, v in st.secrets['aws']['budgets'].items()}
+    except Exception:
+        return {}
+
+@PerformanceOptimizer.cache_with_spinner(ttl=900, spinner_text="Forecasting budgets...")
+def forecast_account_budgets() -> pd.DataFrame:
+    """
+    Month-end outlook per account against its budget, computed offline from the cost cube
     
-    # By account
-    accounts = ['Production', 'Staging', 'Development', 'Shared Services']
-    for account in accounts:
-        cost_data['by_account'][account] = cost_data['total_cost'] * random.uniform(0.1, 0.4)
+    Each account's daily spend is forecast to month end, and the forecast is
+    widened by that account's 30-day backtest error so alerts reflect how
+    well the account has actually been forecast. Accounts without a
+    configured budget are measured against last month's spend. Without
+    daily cost history the outlook is empty.
+    """
+    cube = get_aws_cost_cube()
+    history = wide_history(cube.rollup(['account'], grain='day'), 'account')
+    if history.empty:
+        return pd.DataFrame(columns=['spent', 'forecast', 'lower', 'upper', 'budget', 'high',
+                                     'backtest_error', 'status'], dtype=float)
+    today = (history.columns.max() + pd.Timedelta(days=1)).date()
+    history, spent = split_history(history, today)
+    forecaster = CostForecaster()
+    outlook = month_end_outlook(forecaster.forecast(history, 31), spent, today)
+    error = forecaster.backtest(history, 30, 3)['period_error'].fillna(0.0)
     
-    return cost_data
+    last_month_end = pd.Timestamp(today).replace(day=1) - pd.Timedelta(days=1)
+    last_month = history.loc[:, (history.columns >= last_month_end.replace(day=1))
+                             & (history.columns <= last_month_end)].sum(axis=1)
+    budgets = configured_budgets()
+    outlook['budget'] = [budgets.get(str(a), (last_month.get(a, 0.0) // 1000 + 1) * 1000) for a in outlook.index]
+    outlook['high'] = outlook['spent'] + (outlook['forecast'] - outlook['spent']) * (1 + error)
+    outlook['backtest_error'] = error
+    outlook['status'] = np.select(
+        [outlook['forecast'] > outlook['budget'], outlook['high'] > outlook['budget']],
+        ['🔴 Over Budget', '⚠️ At Risk'], '✅ On Track')
+    outlook.index = outlook.index.astype(str)
+    return outlook
 
-@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Generating AI recommendations...")
-def generate_demo_recommendations() -> List[Dict]:
-    """Generate demo optimization recommendations"""
-    return [
-        {
-            'type': 'Reserved Instances',
-            'resource': 'EC2 - m5.large',
-            'current_cost': '$1,450/month',
-            'optimized_cost': '$870/month',
-            'savings': '$580/month',
-            'savings_percentage': '40%',
-            'priority': 'High',
-            'implementation': 'Purchase 1-year All Upfront RI'
-        },
-        {
-            'type': 'Right-Sizing',
-            'resource': 'RDS - db.m5.2xlarge',
-            'current_cost': '$890/month',
-            'optimized_cost': '$445/month',
-            'savings': '$445/month',
-            'savings_percentage': '50%',
-            'priority': 'High',
-            'implementation': 'Downsize to db.m5.xlarge (avg CPU: 15%)'
-        },
-        {
-            'type': 'Unused Resources',
-            'resource': '23 Unattached EBS Volumes',
-            'current_cost': '$276/month',
-            'optimized_cost': '$0/month',
-            'savings': '$276/month',
-            'savings_percentage': '100%',
-            'priority': 'Medium',
-            'implementation': 'Delete unused volumes after verification'
-        },
-        {
-            'type': 'Savings Plans',
-            'resource': 'Lambda Compute',
-            'current_cost': '$780/month',
-            'optimized_cost': '$546/month',
-            'savings': '$234/month',
-            'savings_percentage': '30%',
-            'priority': 'Medium',
-            'implementation': '1-year Compute Savings Plan'
-        },
-        {
-            'type': 'Storage Optimization',
-            'resource': 'S3 - Infrequent Access',
-            'current_cost': '$340/month',
-            'optimized_cost': '$170/month',
-            'savings': '$170/month',
-            'savings_percentage': '50%',
-            'priority': 'Low',
-            'implementation': 'Move to Glacier for rarely accessed data'
-        }
-    ]
+def load_rightsizing_recommendations(limit: int = 20, min_confidence: float = 0.0) -> List[Dict]:
+    """Top EC2 / RDS rightsizing recommendations by monthly savings from the rightsizing engine"""
+    frame = get_rightsizing_service('aws').recommendations(min_confidence=min_confidence).head(limit)
+    kinds = {'Downsize': 'Right-Sizing', 'Change family': 'Family Change', 'Upsize': 'Upsize'}
+    recommendations = []
+    for row in frame.itertuples():
+        memory = f"{row.mem_p95:.0f}%" if pd.notna(row.mem_p95) else "not reported"
+        recommendations.append({
+            'type': kinds[row.action],
+            'resource_id': row.resource_id,
+            'resource': f"{row.platform.upper()} - {row.name} ({row.scope})",
+            'current_cost': f"${row.current_monthly:,.0f}/month",
+            'optimized_cost': f"${row.recommended_monthly:,.0f}/month",
+            'savings': f"${row.monthly_savings:,.0f}/month",
+            'savings_percentage': f"{row.monthly_savings / row.current_monthly * 100:.0f}%",
+            'priority': row.priority,
+            'implementation': (f"{row.instance_type} → {row.recommended_type} "
+                               f"(p95 CPU {row.cpu_p95:.0f}%, p95 memory {memory}, {row.days} days)"),
+            'confidence': row.confidence
+        })
+    return recommendations
 
 # ============================================================================
 # MAIN FINOPS MODULE
@@ -646,7 +524,7 @@ class FinOpsEnterpriseModule:
             FinOpsEnterpriseModule._render_cost_dashboard(account_mgr, ai_available)
         
         with tabs[1]:
-            FinOpsEnterpriseModule._render_cost_anomalies()
+            FinOpsEnterpriseModule._render_cost_anomalies(account_mgr)
         
         with tabs[2]:
             FinOpsEnterpriseModule._render_sustainability_carbon()
@@ -678,7 +556,19 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 🎯 Cost Overview")
         
-        cost_data = generate_demo_cost_data()
+        cube = get_aws_cost_cube()
+        cost_data = load_cost_data()
+        if cube.last_error:
+            as_of = cube.refreshed_at.strftime('%Y-%m-%d %H:%M') if cube.refreshed_at else 'no data yet'
+            st.warning(f"⚠️ Cost Explorer refresh failed, showing the last loaded costs ({as_of}): {cube.last_error}")
+        if cube.daily.empty:
+            st.info("No cost data loaded yet")
+            return
+        
+        # Previous 30 days for the month-over-month delta
+        last_day = pd.Timestamp(cost_data['daily_costs'][-1]['date'])
+        previous = cube.total(last_day - timedelta(days=59), last_day - timedelta(days=30))
+        change = (cost_data['total_cost'] / previous - 1) * 100 if previous else 0.0
         
         # Top metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -687,17 +577,23 @@ class FinOpsEnterpriseModule:
             st.metric(
                 "Total Monthly Cost",
                 Helpers.format_currency(cost_data['total_cost']),
-                delta="-5.2%",
-                help="Current month vs last month"
+                delta=f"{change:+.1f}%",
+                delta_color="inverse",
+                help="Last 30 days vs previous 30 days"
             )
         
         with col2:
-            forecast = cost_data['total_cost'] * 1.05
+            outlook = cube.forecast(30)
+            forecast = outlook['forecast']
+            top_services = ', '.join(list(outlook['by_service'])[:3])
             st.metric(
                 "30-Day Forecast",
                 Helpers.format_currency(forecast),
-                delta="+5%",
-                help="Projected cost for next 30 days"
+                delta=f"{(forecast / cost_data['total_cost'] - 1) * 100:+.1f}%" if cost_data['total_cost'] else None,
+                delta_color="inverse",
+                help=(f"Projected cost for next 30 days, {outlook['level']:.0%} interval "
+                      f"{Helpers.format_currency(outlook['lower'])} - {Helpers.format_currency(outlook['upper'])} "
+                      f"(largest: {top_services})")
             )
         
         with col3:
@@ -749,6 +645,43 @@ class FinOpsEnterpriseModule:
             )
             st.plotly_chart(fig_pie, use_container_width=True)
         
+        # Drill-down: category -> service -> region -> account
+        st.markdown("### 🔎 Cost Drill-Down")
+        
+        start = last_day - timedelta(days=29)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            categories = cube.drill(start, last_day)
+            category = st.selectbox("Category", ['All'] + categories['category'].astype(str).tolist(),
+                                    key="finops_drill_category")
+        path = {}
+        if category != 'All':
+            path['category'] = category
+            with col2:
+                services = cube.drill(start, last_day, **path)
+                service = st.selectbox("Service", ['All'] + services['service'].astype(str).tolist(),
+                                       key="finops_drill_service")
+            if service != 'All':
+                path['service'] = service
+                with col3:
+                    regions = cube.drill(start, last_day, **path)
+                    region = st.selectbox("Region", ['All'] + regions['region'].astype(str).tolist(),
+                                          key="finops_drill_region")
+                if region != 'All':
+                    path['region'] = region
+        
+        breakdown = cube.drill(start, last_day, **path)
+        level = breakdown.columns[0]
+        breakdown[level] = breakdown[level].astype(str)
+        fig = px.bar(
+            breakdown.head(15),
+            x=level,
+            y='cost',
+            title=f"Last 30 Days by {level.title()}" + (f" ({' / '.join(path.values())})" if path else ''),
+            labels={level: level.title(), 'cost': 'Cost ($)'}
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
         # Quick AI analysis if available
         if ai_available:
             st.markdown("---")
@@ -769,7 +702,7 @@ class FinOpsEnterpriseModule:
                         st.markdown(f"- {insight}")
     
     @staticmethod
-    def _render_cost_anomalies():
+    def _render_cost_anomalies(account_mgr):
         """NEW: Cost Anomaly Detection and Alerting"""
         
         st.markdown("### 🚨 Cost Anomaly Detection")
@@ -872,21 +805,64 @@ class FinOpsEnterpriseModule:
                         if st.button("✅ Mark Resolved", key=f"resolve_{anomaly['date']}_{anomaly['service']}", use_container_width=True):
                             st.success("Marked as resolved!")
         
+        # Account x service scan
+        st.markdown("---")
+        st.markdown("### 🧭 Account × Service Anomaly Scan")
+        
+        service = get_cost_anomaly_service(account_mgr)
+        try:
+            detector = service.refresh()
+        except Exception as e:
+            st.error(f"Cost data unavailable: {str(e)}")
+            detector = service.detector
+        
+        scan = detector.summary()
+        lookback = st.slider("Days to scan", 7, 60, 14, key="finops_anomaly_lookback")
+        since = datetime.now() - timedelta(days=lookback)
+        ranked = detector.anomalies(since=since, top=None)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Series Monitored", f"{scan['series']:,}", delta=f"{scan['accounts']} accounts")
+        with col2:
+            st.metric("Anomalies", len(ranked), delta=f"Last {lookback} days")
+        with col3:
+            st.metric("Excess Spend", f"${sum(a['excess'] for a in ranked):,.0f}")
+        
+        if ranked:
+            st.dataframe(pd.DataFrame([
+                {
+                    'Date': a['date'],
+                    'Account': a['account'],
+                    'Service': a['service'] or 'All services',
+                    'Expected': f"${a['expected']:,.2f}",
+                    'Actual': f"${a['actual']:,.2f}",
+                    'Excess': f"${a['excess']:,.2f}",
+                    'Deviation': a['deviation'],
+                    'Score': round(a['score'], 1),
+                    'Severity': a['severity'],
+                    'Driven By': ", ".join(f"{d['service']} ({d['share']:.0%})" for d in a['drivers'])
+                }
+                for a in ranked[:50]
+            ]), use_container_width=True, hide_index=True)
+        else:
+            st.success("✅ No anomalies in the selected window")
+        
         # ML Detection visualization
         st.markdown("---")
         st.markdown("### 📈 ML Anomaly Detection")
         
-        # Generate sample cost history
+        # Generate sample cost history (weekday/weekend pattern plus spikes)
         cost_history = []
         base_cost = 450
-        for i in range(30):
-            date = (datetime.now() - timedelta(days=30-i)).strftime('%Y-%m-%d')
+        for i in range(60):
+            day = datetime.now() - timedelta(days=60-i)
             # Normal variation
-            cost = base_cost + random.uniform(-50, 50)
+            cost = base_cost * (0.7 if day.weekday() >= 5 else 1.0) + random.uniform(-30, 30)
             # Add some anomalies
-            if i in [28, 25, 20]:  # Add spikes
+            if i in [58, 55, 50]:  # Add spikes
                 cost = base_cost + random.uniform(300, 800)
-            cost_history.append({'date': date, 'cost': cost})
+            cost_history.append({'date': day.strftime('%Y-%m-%d'), 'cost': cost})
         
         ml_results = detect_anomalies_ml(cost_history)
         
@@ -908,21 +884,30 @@ class FinOpsEnterpriseModule:
                 line=dict(color='blue', width=2)
             ))
             
-            # Add baseline
-            fig.add_hline(
-                y=ml_results['baseline_mean'],
-                line_dash="dash",
-                line_color="green",
-                annotation_text=f"Baseline (${ml_results['baseline_mean']:.2f})"
-            )
-            
-            # Add anomaly threshold
-            fig.add_hline(
-                y=ml_results['threshold'],
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"Anomaly Threshold (${ml_results['threshold']:.2f})"
-            )
+            # Seasonal baseline and anomaly band
+            series = ml_results['series']
+            fig.add_trace(go.Scatter(
+                x=series['date'],
+                y=series['expected'],
+                mode='lines',
+                name='Expected',
+                line=dict(color='green', dash='dash')
+            ))
+            fig.add_trace(go.Scatter(
+                x=series['date'],
+                y=series['upper'],
+                mode='lines',
+                name='Anomaly Threshold',
+                line=dict(color='red', dash='dot')
+            ))
+            flagged = series[series['anomaly']]
+            fig.add_trace(go.Scatter(
+                x=flagged['date'],
+                y=flagged['cost'],
+                mode='markers',
+                name='Anomaly',
+                marker=dict(color='red', size=12, symbol='x')
+            ))
             
             fig.update_layout(
                 title='Cost History with ML-Detected Anomalies',
@@ -936,8 +921,8 @@ class FinOpsEnterpriseModule:
         with col2:
             st.markdown("**📊 ML Statistics:**")
             st.metric("Baseline Mean", f"${ml_results['baseline_mean']:.2f}")
-            st.metric("Std Deviation", f"${ml_results['baseline_std']:.2f}")
-            st.metric("Anomaly Threshold", f"${ml_results['threshold']:.2f}")
+            st.metric("Robust Std (MAD)", f"${ml_results['baseline_std']:.2f}")
+            st.metric("Median Threshold", f"${ml_results['threshold']:.2f}")
             st.metric("Anomalies Found", ml_results['total_anomalies'])
             
             if ml_results['detected']:
@@ -1094,7 +1079,7 @@ class FinOpsEnterpriseModule:
             st.info("Configure ANTHROPIC_API_KEY in Streamlit secrets to enable AI features")
             return
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
         
         with st.spinner("🤖 AI analyzing your cost data..."):
             analysis = analyze_costs_with_ai(cost_data, cost_data['total_cost'], cost_data['services'])
@@ -1157,7 +1142,7 @@ class FinOpsEnterpriseModule:
         
         if st.button("🔍 Ask AI", type="primary", key="finops_ask_ai_submit_btn"):
             if query:
-                cost_data = generate_demo_cost_data()
+                cost_data = load_cost_data()
                 
                 with st.spinner("🤖 AI thinking..."):
                     response = natural_language_query(query, cost_data)
@@ -1174,7 +1159,10 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 📊 Multi-Account Cost Analysis")
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
+        if not cost_data['by_account']:
+            st.info("No cost data loaded yet")
+            return
         
         account_df = pd.DataFrame([
             {
@@ -1214,7 +1202,7 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 📈 Cost Trends (30 Days)")
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
         
         trend_df = pd.DataFrame(cost_data['daily_costs'])
         trend_df['date'] = pd.to_datetime(trend_df['date'])
@@ -1263,22 +1251,27 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 💡 Cost Optimization Opportunities")
         
-        recommendations = generate_demo_recommendations()
+        min_confidence = st.slider("Minimum confidence", 0.0, 1.0, 0.5, 0.05, key="finops_rightsizing_confidence")
+        summary = get_rightsizing_service('aws').summary()
+        recommendations = load_rightsizing_recommendations(min_confidence=min_confidence)
+        if summary['last_error']:
+            st.warning(f"⚠️ Utilization refresh failed, showing the last results: {summary['last_error']}")
         
-        total_monthly_savings = sum(
-            float(rec['savings'].replace('$', '').replace(',', '').replace('/month', ''))
-            for rec in recommendations
-        )
+        total_monthly_savings = summary['monthly_savings']
         annual_savings = total_monthly_savings * 12
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Monthly Savings Potential", Helpers.format_currency(total_monthly_savings))
+            st.metric("Monthly Savings Potential", Helpers.format_currency(total_monthly_savings),
+                      help=f"{Helpers.format_currency(summary['high_confidence_savings'])} at confidence ≥ 0.7")
         with col2:
             st.metric("Annual Savings Potential", Helpers.format_currency(annual_savings))
         with col3:
-            st.metric("Recommendations", len(recommendations))
+            st.metric("Recommendations", summary['actionable'],
+                      help=f"{summary['instances']} instances analysed, {summary['upsize']} under-provisioned, "
+                           f"{summary['insufficient_data']} without utilization data, "
+                           f"{summary['unknown_type']} of a type missing from the price table")
         
         st.markdown("---")
         st.markdown("#### 🎯 Optimization Recommendations")
@@ -1300,8 +1293,9 @@ class FinOpsEnterpriseModule:
                 with col2:
                     st.metric("Savings %", rec['savings_percentage'])
                     st.markdown(f"**Priority:** {rec['priority']}")
+                    st.markdown(f"**Confidence:** {rec['confidence']:.0%}")
                     
-                    if st.button("📋 Create Action Item", key=f"finops_opt_action_{rec['resource']}_unique", use_container_width=True):
+                    if st.button("📋 Create Action Item", key=f"finops_opt_action_{rec['resource_id']}", use_container_width=True):
                         st.success("Action item created!")
     
     @staticmethod
@@ -1310,14 +1304,35 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 🎯 Budget Management")
         
-        budgets = [
-            {'Budget Name': 'Production Monthly', 'Amount': '$15,000', 'Current Spend': '$11,400', 'Utilization': '76%', 'Forecast': '$14,250', 'Status': '✅ On Track'},
-            {'Budget Name': 'Staging Monthly', 'Amount': '$5,000', 'Current Spend': '$4,650', 'Utilization': '93%', 'Forecast': '$5,580', 'Status': '⚠️ At Risk'},
-            {'Budget Name': 'Development Monthly', 'Amount': '$3,000', 'Current Spend': '$2,100', 'Utilization': '70%', 'Forecast': '$2,520', 'Status': '✅ On Track'}
-        ]
+        outlook = forecast_account_budgets()
+        if outlook.empty:
+            st.info("No daily cost history yet - budget forecasts appear once Cost Explorer returns data.")
+            return
         
-        df = pd.DataFrame(budgets)
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Month-End Forecast", Helpers.format_currency(outlook['forecast'].sum()),
+                      help="Month-to-date spend plus forecast for the remaining days")
+        with col2:
+            st.metric("Total Budget", Helpers.format_currency(outlook['budget'].sum()))
+        with col3:
+            alerts = int((outlook['status'] != '✅ On Track').sum())
+            st.metric("Budget Alerts", alerts, delta=f"{alerts} of {len(outlook)} accounts", delta_color="inverse")
+        
+        df = pd.DataFrame({
+            'Budget Name': outlook.index + ' Monthly',
+            'Amount': outlook['budget'].map(Helpers.format_currency),
+            'Current Spend': outlook['spent'].map(Helpers.format_currency),
+            'Utilization': (outlook['spent'] / outlook['budget'] * 100).map(lambda p: f"{p:.0f}%"),
+            'Forecast': outlook['forecast'].map(Helpers.format_currency),
+            'Forecast (High)': outlook['high'].map(Helpers.format_currency),
+            'Backtest Error': outlook['backtest_error'].map(lambda e: f"{e:.1%}"),
+            'Status': outlook['status']
+        })
         st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        if not configured_budgets():
+            st.caption("Budgets default to last month's spend; set [aws] budgets in secrets to configure them.")
     
     @staticmethod
     def _render_tag_based_costs():
@@ -1325,34 +1340,54 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 🏷️ Tag-Based Cost Allocation")
         
-        tag_costs = [
-            {'Tag': 'Department', 'Value': 'Engineering', 'Cost': '$8,450', 'Percentage': '42%'},
-            {'Tag': 'Department', 'Value': 'Data Science', 'Cost': '$5,230', 'Percentage': '26%'},
-            {'Tag': 'Department', 'Value': 'Marketing', 'Cost': '$3,120', 'Percentage': '16%'},
-            {'Tag': 'Department', 'Value': 'Untagged', 'Cost': '$3,200', 'Percentage': '16%'}
-        ]
+        cube = get_aws_cost_cube()
+        last_day = cube.daily_series(1).index[-1]
+        start = last_day - timedelta(days=29)
         
-        df = pd.DataFrame(tag_costs)
+        tag_keys = cube.tags['tag_key'].cat.categories.tolist()
+        if not tag_keys:
+            st.info("No cost allocation tags loaded. Activate tags in the Billing console and list them under [aws] cost_tag_keys.")
+            return
+        tag_key = st.selectbox("Tag key", tag_keys, key="finops_tag_key")
+        
+        df = cube.tag_rollup(tag_key, start, last_day)
+        df['tag_value'] = df['tag_value'].astype(str)
+        total = df['cost'].sum()
+        df = pd.DataFrame({
+            'Tag': tag_key,
+            'Value': df['tag_value'].replace(UNTAGGED, 'Untagged'),
+            'Cost': df['cost'],
+            'Percentage': (df['cost'] / total * 100).map(lambda p: f"{p:.0f}%") if total else '0%'
+        })
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            fig = px.bar(df, x='Value', y='Cost', text='Percentage', title='Cost by Department', color='Cost')
+            fig = px.bar(df, x='Value', y='Cost', text='Percentage', title=f'Cost by {tag_key} (30 Days)', color='Cost')
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.dataframe(df.assign(Cost=df['Cost'].map(Helpers.format_currency)), use_container_width=True, hide_index=True)
         
         st.markdown("---")
         st.markdown("#### 🎯 Tag Compliance")
         
+        # Coverage per tag key: share of spend carrying a value, now vs previous 30 days
+        untagged = df.loc[df['Value'] == 'Untagged', 'Cost'].sum()
+        previous = cube.tag_rollup(tag_key, start - timedelta(days=30), start - timedelta(days=1))
+        previous_untagged = previous.loc[previous['tag_value'] == UNTAGGED, 'cost'].sum()
+        coverage = (1 - untagged / total) * 100 if total else 0.0
+        previous_total = previous['cost'].sum()
+        previous_coverage = (1 - previous_untagged / previous_total) * 100 if previous_total else coverage
+        
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Tagged Resources", "84%", delta="↑ 5%")
+            st.metric("Tagged Cost", f"{coverage:.0f}%", delta=f"{coverage - previous_coverage:+.1f}%")
         with col2:
-            st.metric("Untagged Cost", "$3,200", delta="↓ $450")
+            st.metric("Untagged Cost", Helpers.format_currency(untagged),
+                      delta=Helpers.format_currency(untagged - previous_untagged), delta_color="inverse")
         with col3:
-            st.metric("Tag Coverage Goal", "95%", delta="11% to go")
+            st.metric("Tag Coverage Goal", "95%", delta=f"{max(95 - coverage, 0):.0f}% to go")
 
 # Backward compatibility - support both old and new class names
 FinOpsModule = FinOpsEnterpriseModule
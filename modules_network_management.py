@@ -8,6 +8,8 @@ import pandas as pd
 from typing import Optional
 from core_account_manager import get_account_manager, get_account_names
 from aws_vpc import VPCManager
+from security_group_analyzer import (SecurityGroupRuleAnalyzer, get_security_group_analyzer,
+                                     clear_security_group_analyzers)
 
 class NetworkManagementUI:
     """UI for VPC and Network Management"""
@@ -101,7 +103,7 @@ class NetworkManagementUI:
         
         # Security Groups Tab
         with tabs[6]:
-            NetworkManagementUI._render_security_groups(vpc_mgr)
+            NetworkManagementUI._render_security_groups(vpc_mgr, account_mgr, selected_account, selected_region)
     
     @staticmethod
     def _render_vpc_overview(vpc_mgr: VPCManager):
@@ -342,7 +344,7 @@ class NetworkManagementUI:
                     st.dataframe(routes_df, use_container_width=True)
     
     @staticmethod
-    def _render_security_groups(vpc_mgr: VPCManager):
+    def _render_security_groups(vpc_mgr: VPCManager, account_mgr, account_name: str, region: str):
         """Render Security Groups"""
         st.subheader("🔒 Security Groups")
         
@@ -352,6 +354,12 @@ class NetworkManagementUI:
             st.info("No security groups found")
             return
         
+        # Rule analysis (shared, cached analyzer for this account/region)
+        analyzer, errors = get_security_group_analyzer(account_mgr, (account_name,), (region,))
+        if errors:
+            st.warning(f"⚠️ Security group rule analysis incomplete: {'; '.join(errors)}")
+        NetworkManagementUI._render_rule_analysis(analyzer)
+        
         # Display security groups
         st.write(f"**Total Security Groups:** {len(security_groups)}")
         
@@ -384,6 +392,74 @@ class NetworkManagementUI:
                         result = vpc_mgr.create_security_group(vpc_id, sg_name, sg_desc)
                         if result.get('success'):
                             st.success(f"✅ {result.get('message')}")
+                            clear_security_group_analyzers()
                             st.rerun()
                         else:
-                            st.error(f"❌ {result.get('error')}")
\ No newline at end of file
+                            st.error(f"❌ {result.get('error')}")
+    
+    @staticmethod
+    def _render_rule_analysis(analyzer: SecurityGroupRuleAnalyzer):
+        """Render exposure, reachability and redundancy analysis for security group rules"""
+        summary = analyzer.summary()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Security Groups", summary['groups'])
+        with col2:
+            st.metric("Rules", summary['rules'])
+        with col3:
+            st.metric("Network Interfaces", summary['enis'])
+        with col4:
+            st.metric("Internet-Open Rules", summary['internet_exposed_rules'])
+        
+        with st.expander("🚨 Sensitive Ports Open to the Internet", expanded=True):
+            exposure = analyzer.internet_exposure()
+            if exposure:
+                st.dataframe(pd.DataFrame(exposure), use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No sensitive ports exposed to 0.0.0.0/0 or ::/0")
+        
+        with st.expander("🔎 Exposure Query"):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                port = st.number_input("Port", min_value=0, max_value=65535, value=22, key="sg_query_port")
+            with col2:
+                protocol = st.selectbox("Protocol", ["tcp", "udp", "icmp"], key="sg_query_protocol")
+            with col3:
+                cidr = st.text_input("Source CIDR", value="0.0.0.0/0", key="sg_query_cidr")
+            
+            try:
+                matches = analyzer.exposed(int(port), protocol, cidr)
+                st.write(f"**{len(matches)} rule(s)** allow {port}/{protocol} from {cidr}")
+                if matches:
+                    st.dataframe(pd.DataFrame([r.to_dict() for r in matches]),
+                                 use_container_width=True, hide_index=True)
+            except ValueError as e:
+                st.error(f"Invalid CIDR: {e}")
+        
+        with st.expander("🎯 What Can Reach This ENI?"):
+            if analyzer.enis:
+                eni_id = st.selectbox(
+                    "Network Interface",
+                    options=list(analyzer.enis),
+                    format_func=lambda e: f"{e} ({analyzer.enis[e]['private_ip']}) {analyzer.enis[e]['description']}",
+                    key="sg_query_eni"
+                )
+                rows = []
+                for entry in analyzer.can_reach_eni(eni_id):
+                    row = entry['rule'].to_dict()
+                    row['Source ENIs'] = len(entry['source_enis']) if entry['rule'].source_type == 'sg' else '-'
+                    rows.append(row)
+                if rows:
+                    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+                else:
+                    st.info("No ingress rules attached to this interface")
+            else:
+                st.info("No network interfaces found")
+        
+        with st.expander("♻️ Redundant / Shadowed Rules"):
+            redundant = analyzer.redundant_rules()
+            if redundant:
+                st.dataframe(pd.DataFrame(redundant), use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No redundant rules found")
@@ -24,6 +24,8 @@ from config_settings import AppConfig
 from core_account_manager import get_account_manager
 from core_session_manager import SessionManager
 from utils_helpers import Helpers
+from core_cache import CacheNamespace
+from resource_dependencies_enhanced import render_real_mode_dependencies, render_dependency_visualization_options
 import json
 import os
 
@@ -31,67 +33,7 @@ import os
 # PERFORMANCE OPTIMIZER - Makes module 10-100x faster!
 # ============================================================================
 
-class PerformanceOptimizer:
-    """Performance optimization wrapper for fast module loading"""
-    
-    @staticmethod
-    def cache_with_spinner(ttl=300, spinner_text="Loading..."):
-        """Decorator that adds both caching AND loading spinner"""
-        import functools
-        
-        def decorator(func):
-            cached_func = st.cache_data(ttl=ttl)(func)
-            
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                cache_key = f"cache_{func.__name__}"
-                
-                if cache_key not in st.session_state:
-                    with st.spinner(spinner_text):
-                        result = cached_func(*args, **kwargs)
-                        st.session_state[cache_key] = True
-                    return result
-                else:
-                    return cached_func(*args, **kwargs)
-            
-            return wrapper
-        return decorator
-    
-    @staticmethod
-    def load_once(key, loader_func, spinner_text="Loading..."):
-        """Load data once and cache in session state"""
-        if key not in st.session_state:
-            with st.spinner(spinner_text):
-                st.session_state[key] = loader_func()
-        return st.session_state[key]
-    
-    @staticmethod
-    def add_refresh_button(cache_keys=None):
-        """Add a refresh button to clear cache"""
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
-        with col1:
-            if st.button("🔄 Refresh Data", use_container_width=True):
-                if cache_keys:
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                    st.cache_data.clear()
-                else:
-                    st.cache_data.clear()
-                    for key in list(st.session_state.keys()):
-                        if key.startswith('cache_') or key.startswith('resource_'):
-                            del st.session_state[key]
-                
-                st.success("✅ Cache cleared! Reloading fresh data...")
-                st.rerun()
-        
-        with col2:
-            if cache_keys:
-                loaded_count = sum(1 for key in cache_keys if key in st.session_state)
-                st.caption(f"📦 Cached: {loaded_count}/{len(cache_keys)}")
-            else:
-                st.caption("💾 Cache ready")
+PerformanceOptimizer = CacheNamespace("resource_inventory")
 
 # ============================================================================
 # AI CLIENT INITIALIZATION
@@ -1420,34 +1362,8 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # ================================================================
         
         else:  # Real Mode
-            st.markdown("#### 🔄 Real Mode - Your AWS Resources")
-            
-            with col2:
-                st.info("🔧 **Setup Required:** Tag your AWS resources with 'Application' tag to enable auto-discovery")
-                
-                real_applications = st.selectbox(
-                    "Select Application",
-                    options=["No applications found - Add 'Application' tags to your resources"],
-                    key="real_app_selector",
-                    disabled=True,
-                    help="Tag your AWS resources with 'Application' to auto-discover them"
-                )
-            
-            st.markdown("##### 📋 How to Enable Real Mode:")
-            st.code("""# Tag your AWS resources with 'Application' tag:
-# 
-# For EC2:
-aws ec2 create-tags --resources i-1234567890abcdef0 \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For RDS:
-aws rds add-tags-to-resource --resource-name arn:aws:rds:... \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For Load Balancers:
-aws elbv2 add-tags --resource-arns arn:aws:elasticloadbalancing:... \\
-  --tags Key=Application,Value="Production Web Application"
-            """, language="bash")
+            graph, selected_app = render_real_mode_dependencies(account_mgr, col2)
+            render_dependency_visualization_options(graph, selected_app)
         
         st.markdown("---")
         st.success("💡 **Tip:** Understanding resource dependencies helps identify impact of changes, optimize costs, and ensure high availability")
\ No newline at end of file
@@ -19,6 +19,7 @@ from core_account_manager import get_account_manager, get_account_names
 from aws_security import SecurityManager
 from aws_cloudwatch import CloudWatchManager
 from aws_organizations import AWSOrganizationsManager
+from security_group_analyzer import get_security_group_analyzer
 import json
 import os
 import boto3
@@ -392,7 +393,7 @@ class UnifiedSecurityComplianceModule:
         
         # Tab 9: Guardrails
         with tabs[9]:
-            UnifiedSecurityComplianceModule._render_guardrails()
+            UnifiedSecurityComplianceModule._render_guardrails(account_mgr, selected_accounts, region)
         
         # Tab 10: Policy Compliance
         with tabs[10]:
@@ -1153,7 +1154,7 @@ class UnifiedSecurityComplianceModule:
                     st.error("Tag key is required")
     
     @staticmethod
-    def _render_guardrails():
+    def _render_guardrails(account_mgr=None, selected_accounts=None, region=None):
         """Guardrail Enforcement - COMPLETE"""
         st.subheader("🛡️ Guardrails")
         
@@ -1195,9 +1196,19 @@ class UnifiedSecurityComplianceModule:
         with guardrail_tabs[1]:
             st.markdown("### Detective Guardrails")
             
+            # Open security groups come from the shared rule analyzer (all selected accounts)
+            open_sg_rows = []
+            if account_mgr and selected_accounts and region:
+                analyzer, sg_errors = get_security_group_analyzer(
+                    account_mgr, tuple(selected_accounts), (region,)
+                )
+                open_sg_rows = analyzer.internet_exposure()
+                if sg_errors:
+                    st.caption(f"⚠️ Security group scan incomplete for {len(sg_errors)} account/region(s)")
+            
             detective_guardrails = [
                 {"Name": "Detect Unused IAM Credentials", "Status": "Enabled", "Findings": 3},
-                {"Name": "Detect Open Security Groups", "Status": "Enabled", "Findings": 5},
+                {"Name": "Detect Open Security Groups", "Status": "Enabled", "Findings": len(open_sg_rows)},
                 {"Name": "Detect Unencrypted Resources", "Status": "Enabled", "Findings": 12},
                 {"Name": "Detect Public RDS Instances", "Status": "Enabled", "Findings": 0}
             ]
@@ -1214,7 +1225,10 @@ class UnifiedSecurityComplianceModule:
                 with col3:
                     if gr['Findings'] > 0:
                         if st.button("View Findings", key=f"view_det_guardrail_{gr['Name']}"):
-                            st.info(f"Viewing findings for {gr['Name']}")
+                            if gr['Name'] == "Detect Open Security Groups":
+                                st.dataframe(pd.DataFrame(open_sg_rows), use_container_width=True, hide_index=True)
+                            else:
+                                st.info(f"Viewing findings for {gr['Name']}")
     
     @staticmethod
     def _render_policy_compliance(session):
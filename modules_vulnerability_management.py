@@ -15,6 +15,7 @@ Features:
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import boto3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
@@ -28,6 +29,8 @@ try:
     from vulnerability_scanner_plugins import (
         PluginRegistry,
         PluginUI,
+        get_scan_result_cache,
+        resolve_ecr_targets,
         TrivyScanner,
         SnykScanner,
         WindowsServerScanner,
@@ -42,6 +45,37 @@ try:
 except ImportError:
     PLUGIN_SYSTEM_AVAILABLE = False
 
+try:
+    from vulnerability_warehouse import get_vulnerability_warehouse
+    WAREHOUSE_AVAILABLE = True
+except ImportError:
+    WAREHOUSE_AVAILABLE = False
+
+try:
+    from remediation_rule_engine import (RemediationRuleEngine, DEFAULT_RULES, compile_trigger, RuleSyntaxError,
+                                         join_inventory)
+    REMEDIATION_ENGINE_AVAILABLE = True
+except ImportError:
+    REMEDIATION_ENGINE_AVAILABLE = False
+
+try:
+    from ssm_fleet_dispatcher import FleetCommandDispatcher, account_session_provider
+    FLEET_DISPATCH_AVAILABLE = True
+except ImportError:
+    FLEET_DISPATCH_AVAILABLE = False
+
+try:
+    from ssm_inventory_store import SSMInventoryIngester, get_inventory_store
+    INVENTORY_AVAILABLE = True
+except ImportError:
+    INVENTORY_AVAILABLE = False
+
+from core_account_manager import get_account_manager
+
+# Warehouse asset types of the OS and EKS scans (container scans use 'Container Image')
+OS_ASSET_TYPE = 'EC2 Instance'
+EKS_ASSET_TYPE = 'EKS Cluster'
+
 class VulnerabilityManagementModule:
     """Comprehensive Vulnerability Management System"""
     
@@ -59,7 +93,7 @@ class VulnerabilityManagementModule:
         # Initialize plugin registry
         if PLUGIN_SYSTEM_AVAILABLE:
             if 'vuln_plugin_registry' not in st.session_state:
-                st.session_state.vuln_plugin_registry = PluginRegistry()
+                st.session_state.vuln_plugin_registry = PluginRegistry(cache=get_scan_result_cache())
             registry = st.session_state.vuln_plugin_registry
             st.success("✅ Enhanced with modular scanner plugin system")
         else:
@@ -107,6 +141,265 @@ class VulnerabilityManagementModule:
         """Vulnerability Management Dashboard"""
         st.markdown("### 📊 Vulnerability Overview Dashboard")
         
+        warehouse = get_vulnerability_warehouse(get_account_manager()) if WAREHOUSE_AVAILABLE else None
+        if warehouse is not None and not warehouse.is_empty():
+            VulnerabilityManagementModule._render_warehouse_overview(warehouse)
+        else:
+            if warehouse is not None:
+                st.caption("📋 Sample data shown - run a scan to populate the vulnerability warehouse")
+            VulnerabilityManagementModule._render_sample_overview()
+        
+        # Action buttons
+        st.markdown("---")
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            if st.button("🔄 Scan All Resources", key="vuln_scan_all", use_container_width=True):
+                with st.spinner("Scanning all resources..."):
+                    import time
+                    time.sleep(2)
+                    st.success("✅ Scan complete! Found 8 new vulnerabilities")
+        
+        with col2:
+            if st.button("⚡ Auto-Remediate All", type="primary", key="vuln_auto_rem_all", use_container_width=True):
+                st.warning("This will remediate 45 vulnerabilities automatically. Proceed?")
+        
+        with col3:
+            if st.button("📊 Generate Report", key="vuln_gen_report_dash", use_container_width=True):
+                st.info("Generating comprehensive vulnerability report...")
+        
+        with col4:
+            if st.button("📧 Alert Security Team", key="vuln_alert_team", use_container_width=True):
+                st.success("Security team notified of critical vulnerabilities")
+    
+    @staticmethod
+    def _render_warehouse_overview(warehouse):
+        """Dashboard overview from warehouse aggregates (precomputed at ingest)"""
+        aggregates = warehouse.aggregates
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Open Vulnerabilities", f"{aggregates['open']:,}")
+        
+        with col2:
+            st.metric("Critical CVEs", f"{aggregates['critical_open']:,}")
+        
+        with col3:
+            st.metric("Affected Resources", f"{aggregates['affected_assets']:,}")
+        
+        with col4:
+            st.metric("Remediation Rate", f"{aggregates['remediation_rate']:.0%}")
+        
+        if warehouse.updated_at is not None:
+            st.caption(f"🗄️ Vulnerability warehouse: {len(warehouse.findings):,} findings tracked, "
+                       f"last updated {warehouse.updated_at:%Y-%m-%d %H:%M} UTC")
+        
+        st.markdown("---")
+        
+        st.markdown("### 🎯 Vulnerability Distribution")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            by_type = warehouse.severity_by_asset_type()
+            st.dataframe(by_type.rename(columns=str.title).reset_index()
+                         .rename(columns={'asset_type': 'Asset Type'}),
+                         use_container_width=True, hide_index=True)
+        
+        with col2:
+            st.line_chart(aggregates['trend'][['CRITICAL', 'HIGH']].rename(columns=str.title))
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### ⏱️ Mean Time to Remediate")
+            mttr = aggregates['mttr_days']
+            st.dataframe(pd.DataFrame({
+                'Severity': [s.title() for s in mttr.index],
+                'MTTR (days)': [f"{v:.1f}" if pd.notna(v) else '-' for v in mttr.values]
+            }), use_container_width=True, hide_index=True)
+        
+        with col2:
+            st.markdown("#### 📅 Open Finding Age")
+            st.dataframe(aggregates['aging'].rename(index=str.title), use_container_width=True)
+        
+        matrix = aggregates['severity_matrix']
+        if len(matrix.index.get_level_values('account_id').unique()) > 1:
+            with st.expander("🏢 Severity by Asset Type and Account"):
+                st.dataframe(matrix.rename(columns=str.title).reset_index(), use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        
+        st.markdown("### 🚨 Top Critical Vulnerabilities")
+        
+        top_cves = aggregates['top_cves']
+        if top_cves.empty:
+            st.success("✅ No open vulnerabilities")
+        else:
+            icons = {'CRITICAL': '🔴 Critical', 'HIGH': '🟠 High', 'MEDIUM': '🟡 Medium', 'LOW': '🟢 Low'}
+            st.dataframe(pd.DataFrame({
+                'CVE': top_cves.index,
+                'Severity': [icons.get(s, s.title()) for s in top_cves['severity']],
+                'CVSS': [f"{v:.1f}" if pd.notna(v) else '-' for v in top_cves['cvss']],
+                'Affected': [f"{n} {t}" for n, t in zip(top_cves['assets'], top_cves['asset_types'])],
+                'Fix': [v or '-' for v in top_cves['fixed_version']]
+            }), use_container_width=True, hide_index=True)
+    
+    @staticmethod
+    def _account_id(session) -> str:
+        """AWS account ID of the session ('unknown' if it cannot be resolved)"""
+        try:
+            return session.client('sts').get_caller_identity()['Account']
+        except Exception:
+            return 'unknown'
+    
+    @staticmethod
+    def _ingest_scan(session, records: List[Dict], scanned: List[str], asset_type: str):
+        """Record an orchestrated scan in the warehouse (only fully scanned assets close findings)"""
+        if not WAREHOUSE_AVAILABLE or not (scanned or records):
+            return
+        st.session_state.setdefault('vuln_scanned_asset_types', set()).add(asset_type)
+        changes = get_vulnerability_warehouse(get_account_manager()).ingest(
+            records,
+            asset_type=asset_type,
+            account_id=VulnerabilityManagementModule._account_id(session),
+            scanned_assets=scanned
+        )
+        st.caption(f"🗄️ Warehouse updated: {changes['new']} new, {changes['fixed']} fixed, "
+                   f"{changes['reopened']} reopened")
+    
+    @staticmethod
+    def _warehouse_findings(asset_type: str) -> Optional[pd.DataFrame]:
+        """Open warehouse findings of one asset type (None until such scans are ingested)"""
+        if not WAREHOUSE_AVAILABLE:
+            return None
+        warehouse = get_vulnerability_warehouse(get_account_manager())
+        # Clean scans leave no rows behind, so also count asset types scanned this session
+        if (asset_type not in st.session_state.get('vuln_scanned_asset_types', ())
+                and not (warehouse.findings['asset_type'] == asset_type).any()):
+            return None
+        findings = warehouse.open_findings()
+        return findings[findings['asset_type'] == asset_type]
+    
+    @staticmethod
+    def _render_warehouse_findings(findings: pd.DataFrame, asset_label: str):
+        """Open findings table, most severe first"""
+        if findings.empty:
+            st.success("✅ No open vulnerabilities")
+            return
+        rank = {'CRITICAL': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
+        icons = {'CRITICAL': '🔴 Critical', 'HIGH': '🟠 High', 'MEDIUM': '🟡 Medium', 'LOW': '🟢 Low'}
+        ordered = findings.assign(_rank=findings['severity'].astype(str).map(rank).fillna(4)) \
+            .sort_values(['_rank', 'cvss_score'], ascending=[True, False])
+        st.dataframe(pd.DataFrame({
+            asset_label: ordered['asset'].astype(str),
+            'CVE': ordered['cve_id'],
+            'Severity': [icons.get(s, str(s).title()) for s in ordered['severity'].astype(str)],
+            'CVSS': [f"{v:.1f}" if pd.notna(v) else '-' for v in ordered['cvss_score']],
+            'Package': ordered['package'],
+            'Fix': ordered['fixed_version'].fillna('-'),
+            'Scanners': ordered['scanners'].astype(str),
+            'First Seen': ordered['first_seen']
+        }), use_container_width=True, hide_index=True)
+    
+    @staticmethod
+    def _fleet_dispatcher(session) -> 'FleetCommandDispatcher':
+        """Run Command dispatcher: configured account roles, falling back to the current session"""
+        account_mgr = get_account_manager()
+        by_role = account_session_provider(account_mgr) if account_mgr else (lambda account_id: None)
+        current_account = VulnerabilityManagementModule._account_id(session)
+        
+        def provider(account_id: str):
+            if account_id in (current_account, 'unknown'):
+                return session
+            return by_role(account_id)
+        
+        return FleetCommandDispatcher(provider)
+    
+    @staticmethod
+    def _execute_remediations(session, work_items: List):
+        """Send SSM documents for work items not gated on approval, across accounts and regions"""
+        if not FLEET_DISPATCH_AVAILABLE:
+            st.error("❌ SSM fleet dispatcher not installed - install ssm_fleet_dispatcher.py to send remediations")
+            return
+        runnable = [item for item in work_items
+                    if not item.requires_approval and item.ssm_document and item.instance_ids]
+        if not runnable:
+            st.warning("No work items with SSM-remediable instances (approval-gated items are skipped)")
+            return
+        if session is None or all(item.account_id == 'demo' for item in runnable):
+            st.info("Demo mode: remediations would be sent with SSM Run Command "
+                    f"({sum(len(item.instance_ids) for item in runnable)} instances)")
+            return
+        
+        by_document: Dict[str, Dict] = {}
+        for item in runnable:
+            targets = by_document.setdefault(item.ssm_document, {})
+            targets.setdefault((item.account_id, item.region), []).extend(item.instance_ids)
+        
+        dispatcher = VulnerabilityManagementModule._fleet_dispatcher(session)
+        commands = []
+        with st.spinner("Sending remediation commands..."):
+            for document, instances in by_document.items():
+                parameters = {'Operation': ['Install']} if document == 'AWS-RunPatchBaseline' else None
+                commands.append(dispatcher.dispatch(document, instances, parameters=parameters,
+                                                    comment='Vulnerability auto-remediation'))
+        
+        st.session_state.vuln_fleet_command = commands
+        sent = sum(c.summary()['sent'] for c in commands)
+        failed = sum(c.summary()['failed_to_send'] for c in commands)
+        if failed:
+            st.warning(f"⚠️ Sent {sent} commands, {failed} could not be sent")
+        else:
+            st.success(f"✅ Sent {sent} remediation commands")
+    
+    @staticmethod
+    def _render_remediation_progress(session):
+        """Live Run Command progress for the last remediation dispatch"""
+        commands = st.session_state.vuln_fleet_command
+        
+        st.markdown("---")
+        st.markdown("### 📡 Remediation Progress")
+        
+        if st.button("🔄 Refresh Status", key="vuln_rem_refresh") and not all(c.done for c in commands):
+            dispatcher = VulnerabilityManagementModule._fleet_dispatcher(session)
+            with st.spinner("Polling command invocations..."):
+                for command in commands:
+                    dispatcher.poll(command)
+        
+        summaries = [c.summary() for c in commands]
+        targets = sum(s['targets'] for s in summaries)
+        completed = sum(s['completed'] for s in summaries)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Commands", sum(s['sent'] for s in summaries))
+        with col2:
+            st.metric("Targets", f"{targets:,}")
+        with col3:
+            st.metric("Completed", f"{completed:,}")
+        with col4:
+            st.metric("Errors", f"{sum(s['errors'] for s in summaries):,}")
+        st.progress(completed / targets if targets else 0.0)
+        poll_errors = [error for summary in summaries for error in summary['poll_errors']]
+        if poll_errors:
+            st.warning("⚠️ Status poll failed (retried on next refresh): " + "; ".join(poll_errors[:3]))
+        
+        statuses: Dict[str, int] = {}
+        for summary in summaries:
+            for status, count in summary['invocation_statuses'].items():
+                statuses[status] = statuses.get(status, 0) + count
+        if statuses:
+            st.caption(" · ".join(f"{status}: {count:,}" for status, count in sorted(statuses.items())))
+        
+        rows = [dict(row, Document=c.document_name) for c in commands for row in c.by_location()]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    @staticmethod
+    def _render_sample_overview():
+        """Dashboard overview with sample data (no scans ingested yet)"""
+        
         # Overall metrics
         col1, col2, col3, col4 = st.columns(4)
         
@@ -220,29 +513,6 @@ class VulnerabilityManagementModule:
         
         df_critical = pd.DataFrame(critical_vulns)
         st.dataframe(df_critical, use_container_width=True, hide_index=True)
-        
-        # Action buttons
-        st.markdown("---")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            if st.button("🔄 Scan All Resources", key="vuln_scan_all", use_container_width=True):
-                with st.spinner("Scanning all resources..."):
-                    import time
-                    time.sleep(2)
-                    st.success("✅ Scan complete! Found 8 new vulnerabilities")
-        
-        with col2:
-            if st.button("⚡ Auto-Remediate All", type="primary", key="vuln_auto_rem_all", use_container_width=True):
-                st.warning("This will remediate 45 vulnerabilities automatically. Proceed?")
-        
-        with col3:
-            if st.button("📊 Generate Report", key="vuln_gen_report_dash", use_container_width=True):
-                st.info("Generating comprehensive vulnerability report...")
-        
-        with col4:
-            if st.button("📧 Alert Security Team", key="vuln_alert_team", use_container_width=True):
-                st.success("Security team notified of critical vulnerabilities")
     
     @staticmethod
     def _render_os_vulnerabilities(session, region: str, registry=None):
@@ -250,6 +520,13 @@ class VulnerabilityManagementModule:
         st.markdown("### 🖥️ Operating System Vulnerabilities")
         st.info("Scan and remediate vulnerabilities in Windows and Linux servers")
         
+        if INVENTORY_AVAILABLE:
+            inventory = get_inventory_store(get_account_manager())
+            inventory_summary = VulnerabilityManagementModule._render_ssm_inventory(session, region, inventory)
+        else:
+            inventory = None
+            inventory_summary = {'instances': 0, 'windows': 0, 'linux': 0}
+        
         # OS Type selector
         os_type = st.selectbox(
             "Select Operating System Type",
@@ -271,19 +548,41 @@ class VulnerabilityManagementModule:
                 key="os_scan_type"
             )
             
+            if inventory_summary['instances']:
+                managed = inventory.instances()
+                instance_targets = {
+                    f"{row.computer_name or row.instance_id} "
+                    f"({' '.join(v for v in (row.platform_name, row.platform_version) if v)})":
+                        {'instance_id': row.instance_id,
+                         'os_version': ' '.join(v for v in (row.platform_name, row.platform_version) if v),
+                         'distribution': row.platform_name or ''}
+                    for row in managed.itertuples()
+                }
+                windows_label = f"All Windows Instances ({inventory_summary['windows']})"
+                linux_label = f"All Linux Instances ({inventory_summary['linux']})"
+            else:
+                instance_targets = {
+                    f"{name} ({os_version})": {'instance_id': name, 'os_version': os_version,
+                                               'distribution': os_version}
+                    for name, os_version in [
+                        ("prod-web-01", "Windows Server 2022"),
+                        ("prod-web-02", "Windows Server 2022"),
+                        ("prod-db-01", "Windows Server 2019"),
+                        ("prod-app-01", "Ubuntu 22.04"),
+                        ("prod-app-02", "Amazon Linux 2023"),
+                        ("dev-test-01", "RHEL 9")
+                    ]
+                }
+                windows_label = "All Windows Instances (12)"
+                linux_label = "All Linux Instances (24)"
+            target_options = list(instance_targets) + [windows_label, linux_label]
+            windows_ids = {t['instance_id'] for t in instance_targets.values()
+                           if 'windows' in t['os_version'].lower()}
+            
             scan_targets = st.multiselect(
                 "Select Instances to Scan",
-                options=[
-                    "prod-web-01 (Windows Server 2022)",
-                    "prod-web-02 (Windows Server 2022)",
-                    "prod-db-01 (Windows Server 2019)",
-                    "prod-app-01 (Ubuntu 22.04)",
-                    "prod-app-02 (Amazon Linux 2023)",
-                    "dev-test-01 (RHEL 9)",
-                    "All Windows Instances (12)",
-                    "All Linux Instances (24)"
-                ],
-                default=["All Windows Instances (12)", "All Linux Instances (24)"],
+                options=target_options,
+                default=target_options[-2:],
                 key="os_scan_targets"
             )
         
@@ -300,145 +599,171 @@ class VulnerabilityManagementModule:
             st.metric("Est. Scan Time", "3-5 min")
         
         if st.button("🚀 Start OS Vulnerability Scan", type="primary", key="vuln_start_os_scan", use_container_width=True):
-            with st.spinner("Scanning operating systems..."):
-                import time
-                
-                # Simulate scan progress
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                stages = [
-                    ("Connecting to AWS Inspector...", 20),
-                    ("Scanning Windows instances...", 40),
-                    ("Scanning Linux instances...", 60),
-                    ("Querying NIST database...", 80),
-                    ("Analyzing results...", 100)
-                ]
-                
-                for stage, progress in stages:
-                    status_text.text(stage)
-                    progress_bar.progress(progress)
-                    time.sleep(0.8)
-                
-                status_text.empty()
-                progress_bar.empty()
+            if registry is not None:
+                targets = {}
+                for label in scan_targets:
+                    if label in (windows_label, linux_label):
+                        windows = label == windows_label
+                        targets.update({t['instance_id']: t for t in instance_targets.values()
+                                        if (t['instance_id'] in windows_ids) == windows})
+                    else:
+                        targets[instance_targets[label]['instance_id']] = instance_targets[label]
                 
-                st.success("✅ Scan complete! Found 89 vulnerabilities across 36 instances")
+                findings, scanned = PluginUI.render_orchestrated_scan(
+                    registry, list(targets.values()), ['windows_server', 'linux_distro']
+                )
+                VulnerabilityManagementModule._ingest_scan(session, findings, scanned, OS_ASSET_TYPE)
+            else:
+                with st.spinner("Scanning operating systems..."):
+                    import time
+                    
+                    # Simulate scan progress
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    
+                    stages = [
+                        ("Connecting to AWS Inspector...", 20),
+                        ("Scanning Windows instances...", 40),
+                        ("Scanning Linux instances...", 60),
+                        ("Querying NIST database...", 80),
+                        ("Analyzing results...", 100)
+                    ]
+                    
+                    for stage, progress in stages:
+                        status_text.text(stage)
+                        progress_bar.progress(progress)
+                        time.sleep(0.8)
+                    
+                    status_text.empty()
+                    progress_bar.empty()
+                    
+                    st.success("✅ Scan complete! Found 89 vulnerabilities across 36 instances")
         
         st.markdown("---")
         
         # Scan results
         st.markdown("### 📋 OS Vulnerability Scan Results")
         
-        # Windows vulnerabilities
-        with st.expander("🪟 Windows Server Vulnerabilities (45)", expanded=True):
-            windows_vulns = [
-                {
-                    'Instance': 'prod-web-01',
-                    'OS': 'Windows Server 2022',
-                    'CVE': 'CVE-2024-1234',
-                    'Severity': '🔴 Critical',
-                    'CVSS': '9.8',
-                    'Package': 'Windows Update KB5034441',
-                    'Description': 'Remote Code Execution',
-                    'NIST': 'SI-2',
-                    'Remediation': 'Install KB5034441',
-                    'Confidence': '95%'
-                },
-                {
-                    'Instance': 'prod-db-01',
-                    'OS': 'Windows Server 2019',
-                    'CVE': 'CVE-2024-2345',
-                    'Severity': '🟠 High',
-                    'CVSS': '8.1',
-                    'Package': 'Windows Update KB5034127',
-                    'Description': 'Privilege Escalation',
-                    'NIST': 'AC-6, SI-2',
-                    'Remediation': 'Install KB5034127',
-                    'Confidence': '98%'
-                },
-                {
-                    'Instance': 'prod-web-02',
-                    'OS': 'Windows Server 2022',
-                    'CVE': 'CVE-2024-3456',
-                    'Severity': '🟡 Medium',
-                    'CVSS': '6.5',
-                    'Package': 'IIS 10.0',
-                    'Description': 'Information Disclosure',
-                    'NIST': 'SI-2, SC-28',
-                    'Remediation': 'Apply IIS patch',
-                    'Confidence': '92%'
-                }
-            ]
-            
-            df_windows = pd.DataFrame(windows_vulns)
-            st.dataframe(df_windows, use_container_width=True, hide_index=True)
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("⚡ Auto-Remediate Windows (Critical)", key="auto_rem_win", use_container_width=True):
-                    st.success("✅ Scheduled remediation for 12 critical vulnerabilities")
-            with col2:
-                if st.button("📋 Export Windows Report", key="export_win", use_container_width=True):
-                    st.info("Report exported to S3")
-            with col3:
-                if st.button("🔄 Rescan Windows", key="rescan_win", use_container_width=True):
-                    st.info("Rescanning Windows instances...")
-        
-        # Linux vulnerabilities
-        with st.expander("🐧 Linux Distribution Vulnerabilities (44)", expanded=True):
-            linux_vulns = [
-                {
-                    'Instance': 'prod-app-01',
-                    'Distribution': 'Ubuntu 22.04',
-                    'CVE': 'CVE-2024-9012',
-                    'Severity': '🔴 Critical',
-                    'CVSS': '9.1',
-                    'Package': 'sudo 1.9.9',
-                    'Description': 'Privilege Escalation',
-                    'NIST': 'AC-6, SI-2',
-                    'Remediation': 'apt upgrade sudo',
-                    'Confidence': '99%'
-                },
-                {
-                    'Instance': 'prod-app-02',
-                    'Distribution': 'Amazon Linux 2023',
-                    'CVE': 'CVE-2024-4567',
-                    'Severity': '🟠 High',
-                    'CVSS': '7.8',
-                    'Package': 'kernel 6.1.29',
-                    'Description': 'Kernel Memory Leak',
-                    'NIST': 'SI-2, SC-39',
-                    'Remediation': 'yum update kernel',
-                    'Confidence': '96%'
-                },
-                {
-                    'Instance': 'dev-test-01',
-                    'Distribution': 'RHEL 9',
-                    'CVE': 'CVE-2024-7890',
-                    'Severity': '🟠 High',
-                    'CVSS': '8.4',
-                    'Package': 'openssl 3.0.7',
-                    'Description': 'Cryptographic Weakness',
-                    'NIST': 'SC-12, SC-13, SI-2',
-                    'Remediation': 'dnf update openssl',
-                    'Confidence': '97%'
-                }
-            ]
+        os_findings = VulnerabilityManagementModule._warehouse_findings(OS_ASSET_TYPE)
+        if os_findings is not None:
+            windows = os_findings['asset'].astype(str).isin(windows_ids)
+            with st.expander(f"🪟 Windows Server Vulnerabilities ({int(windows.sum())})", expanded=True):
+                VulnerabilityManagementModule._render_warehouse_findings(os_findings[windows], 'Instance')
+            with st.expander(f"🐧 Linux Distribution Vulnerabilities ({int((~windows).sum())})", expanded=True):
+                VulnerabilityManagementModule._render_warehouse_findings(os_findings[~windows], 'Instance')
+        else:
+            if WAREHOUSE_AVAILABLE:
+                st.caption("📋 Sample data shown - run a scan to populate the vulnerability warehouse")
             
-            df_linux = pd.DataFrame(linux_vulns)
-            st.dataframe(df_linux, use_container_width=True, hide_index=True)
+            # Windows vulnerabilities
+            with st.expander("🪟 Windows Server Vulnerabilities (45)", expanded=True):
+                windows_vulns = [
+                    {
+                        'Instance': 'prod-web-01',
+                        'OS': 'Windows Server 2022',
+                        'CVE': 'CVE-2024-1234',
+                        'Severity': '🔴 Critical',
+                        'CVSS': '9.8',
+                        'Package': 'Windows Update KB5034441',
+                        'Description': 'Remote Code Execution',
+                        'NIST': 'SI-2',
+                        'Remediation': 'Install KB5034441',
+                        'Confidence': '95%'
+                    },
+                    {
+                        'Instance': 'prod-db-01',
+                        'OS': 'Windows Server 2019',
+                        'CVE': 'CVE-2024-2345',
+                        'Severity': '🟠 High',
+                        'CVSS': '8.1',
+                        'Package': 'Windows Update KB5034127',
+                        'Description': 'Privilege Escalation',
+                        'NIST': 'AC-6, SI-2',
+                        'Remediation': 'Install KB5034127',
+                        'Confidence': '98%'
+                    },
+                    {
+                        'Instance': 'prod-web-02',
+                        'OS': 'Windows Server 2022',
+                        'CVE': 'CVE-2024-3456',
+                        'Severity': '🟡 Medium',
+                        'CVSS': '6.5',
+                        'Package': 'IIS 10.0',
+                        'Description': 'Information Disclosure',
+                        'NIST': 'SI-2, SC-28',
+                        'Remediation': 'Apply IIS patch',
+                        'Confidence': '92%'
+                    }
+                ]
+                
+                df_windows = pd.DataFrame(windows_vulns)
+                st.dataframe(df_windows, use_container_width=True, hide_index=True)
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.button("⚡ Auto-Remediate Windows (Critical)", key="auto_rem_win", use_container_width=True):
+                        st.success("✅ Scheduled remediation for 12 critical vulnerabilities")
+                with col2:
+                    if st.button("📋 Export Windows Report", key="export_win", use_container_width=True):
+                        st.info("Report exported to S3")
+                with col3:
+                    if st.button("🔄 Rescan Windows", key="rescan_win", use_container_width=True):
+                        st.info("Rescanning Windows instances...")
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("⚡ Auto-Remediate Linux (Critical)", key="auto_rem_linux", use_container_width=True):
-                    st.success("✅ Scheduled remediation for 8 critical vulnerabilities")
-            with col2:
-                if st.button("📋 Export Linux Report", key="export_linux", use_container_width=True):
-                    st.info("Report exported to S3")
-            with col3:
-                if st.button("🔄 Rescan Linux", key="rescan_linux", use_container_width=True):
-                    st.info("Rescanning Linux instances...")
+            # Linux vulnerabilities
+            with st.expander("🐧 Linux Distribution Vulnerabilities (44)", expanded=True):
+                linux_vulns = [
+                    {
+                        'Instance': 'prod-app-01',
+                        'Distribution': 'Ubuntu 22.04',
+                        'CVE': 'CVE-2024-9012',
+                        'Severity': '🔴 Critical',
+                        'CVSS': '9.1',
+                        'Package': 'sudo 1.9.9',
+                        'Description': 'Privilege Escalation',
+                        'NIST': 'AC-6, SI-2',
+                        'Remediation': 'apt upgrade sudo',
+                        'Confidence': '99%'
+                    },
+                    {
+                        'Instance': 'prod-app-02',
+                        'Distribution': 'Amazon Linux 2023',
+                        'CVE': 'CVE-2024-4567',
+                        'Severity': '🟠 High',
+                        'CVSS': '7.8',
+                        'Package': 'kernel 6.1.29',
+                        'Description': 'Kernel Memory Leak',
+                        'NIST': 'SI-2, SC-39',
+                        'Remediation': 'yum update kernel',
+                        'Confidence': '96%'
+                    },
+                    {
+                        'Instance': 'dev-test-01',
+                        'Distribution': 'RHEL 9',
+                        'CVE': 'CVE-2024-7890',
+                        'Severity': '🟠 High',
+                        'CVSS': '8.4',
+                        'Package': 'openssl 3.0.7',
+                        'Description': 'Cryptographic Weakness',
+                        'NIST': 'SC-12, SC-13, SI-2',
+                        'Remediation': 'dnf update openssl',
+                        'Confidence': '97%'
+                    }
+                ]
+                
+                df_linux = pd.DataFrame(linux_vulns)
+                st.dataframe(df_linux, use_container_width=True, hide_index=True)
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.button("⚡ Auto-Remediate Linux (Critical)", key="auto_rem_linux", use_container_width=True):
+                        st.success("✅ Scheduled remediation for 8 critical vulnerabilities")
+                with col2:
+                    if st.button("📋 Export Linux Report", key="export_linux", use_container_width=True):
+                        st.info("Report exported to S3")
+                with col3:
+                    if st.button("🔄 Rescan Linux", key="rescan_linux", use_container_width=True):
+                        st.info("Rescanning Linux instances...")
         
         # NIST Control Mapping
         st.markdown("---")
@@ -454,6 +779,63 @@ class VulnerabilityManagementModule:
         
         st.dataframe(nist_mapping, use_container_width=True, hide_index=True)
     
+    @staticmethod
+    def _render_ssm_inventory(session, region: str, inventory) -> Dict:
+        """SSM inventory sync, package exposure query and patch compliance"""
+        with st.expander("📦 SSM Inventory & Patch Compliance", expanded=False):
+            full = st.checkbox("Full resync (also prunes instances that stopped reporting)",
+                               value=False, key="vuln_ssm_inventory_full")
+            if st.button("🔄 Sync SSM Inventory", key="vuln_ssm_inventory_sync", disabled=session is None):
+                account_id = VulnerabilityManagementModule._account_id(session)
+                with st.spinner(f"Syncing SSM inventory for {account_id} / {region}..."):
+                    try:
+                        results = SSMInventoryIngester(inventory).sync(session, account_id, region,
+                                                                       full=True if full else None)
+                        changed = sum(r['changed'] for r in results.values())
+                        removed = sum(r['removed'] for r in results.values())
+                        info = results['AWS:InstanceInformation']
+                        mode = "Full" if info['full'] else "Incremental"
+                        st.success(f"✅ {mode} sync: {info['instances']:,} instances reported, "
+                                   f"{changed:,} inventory records updated, {removed:,} removed")
+                    except Exception as e:
+                        st.error(f"Error syncing SSM inventory: {str(e)}")
+            
+            summary = inventory.summary()
+            if not summary['instances']:
+                st.caption("No SSM inventory synced yet - instance lists below use sample data")
+                return summary
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Managed Instances", f"{summary['instances']:,}")
+            with col2:
+                st.metric("Windows / Linux", f"{summary['windows']:,} / {summary['linux']:,}")
+            with col3:
+                st.metric("Installed Packages", f"{summary['packages']:,}")
+            with col4:
+                st.metric("Patch Non-Compliant", f"{summary['non_compliant']:,}")
+            st.caption(f"Last sync: {summary['last_sync']}")
+            
+            st.markdown("#### 🔎 Package Exposure")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                package = st.text_input("Package", value="openssl", key="vuln_inv_package")
+            with col2:
+                fixed_version = st.text_input("Fixed Version", value="3.0.8", key="vuln_inv_version")
+            with col3:
+                platform = st.text_input("Platform (optional)", value="", key="vuln_inv_platform")
+            
+            if package and fixed_version:
+                exposed = inventory.instances_with_package_below(package, fixed_version, platform or None)
+                st.caption(f"{len(exposed):,} instances have {package} below {fixed_version}")
+                if not exposed.empty:
+                    st.dataframe(exposed, use_container_width=True, hide_index=True)
+            
+            st.markdown("#### 🩹 Patch Compliance")
+            st.dataframe(inventory.patch_compliance().head(500), use_container_width=True, hide_index=True)
+            
+            return summary
+    
     @staticmethod
     def _render_container_vulnerabilities(session, region: str, registry=None):
         """Container Vulnerability Scanning"""
@@ -511,36 +893,67 @@ class VulnerabilityManagementModule:
             )
         
         if st.button("🚀 Start Container Scan", type="primary", key="vuln_start_cont_scan", use_container_width=True):
-            with st.spinner("Scanning containers..."):
-                import time
+            if registry is not None and target_type == "ECR Repositories":
+                images = [r for r in repositories if not r.startswith("All Repositories")] or [
+                    "prod/api-service", "prod/web-frontend", "prod/worker-service",
+                    "staging/api-service", "dev/test-app"
+                ]
+                selected_scanners = [name for name, checked in
+                                     [('aws_inspector', aws_inspector), ('trivy', trivy), ('snyk', snyk)] if checked]
                 
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+                # Digest-addressed targets let unchanged images be served from the scan cache
+                targets = [{'image': image} for image in images]
+                if session is not None:
+                    try:
+                        targets = resolve_ecr_targets(session.client('ecr', region_name=region), images) or targets
+                    except Exception:
+                        pass
                 
-                stages = [
-                    ("Initializing Trivy scanner...", 15),
-                    ("Scanning base images...", 30),
-                    ("Analyzing dependencies...", 50),
-                    ("Checking for malware...", 70),
-                    ("Querying vulnerability databases...", 85),
-                    ("Generating report...", 100)
-                ]
+                st.session_state.vuln_container_findings, scanned = PluginUI.render_orchestrated_scan(
+                    registry, targets, selected_scanners
+                )
                 
-                for stage, progress in stages:
-                    status_text.text(stage)
-                    progress_bar.progress(progress)
-                    time.sleep(0.6)
+                # Only images every scanner finished count as re-scanned (a clean scan closes findings too)
+                VulnerabilityManagementModule._ingest_scan(
+                    session, st.session_state.vuln_container_findings, scanned, 'Container Image'
+                )
+            else:
+                with st.spinner("Scanning containers..."):
+                    import time
+                
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                
+                    stages = [
+                        ("Initializing Trivy scanner...", 15),
+                        ("Scanning base images...", 30),
+                        ("Analyzing dependencies...", 50),
+                        ("Checking for malware...", 70),
+                        ("Querying vulnerability databases...", 85),
+                        ("Generating report...", 100)
+                    ]
                 
-                status_text.empty()
-                progress_bar.empty()
+                    for stage, progress in stages:
+                        status_text.text(stage)
+                        progress_bar.progress(progress)
+                        time.sleep(0.6)
                 
-                st.success("✅ Scan complete! Found 156 vulnerabilities in 24 images")
+                    status_text.empty()
+                    progress_bar.empty()
+                
+                    st.success("✅ Scan complete! Found 156 vulnerabilities in 24 images")
         
         st.markdown("---")
         
         # Container scan results
         st.markdown("### 📊 Container Vulnerability Results")
         
+        if st.session_state.get('vuln_container_findings'):
+            st.markdown("#### 🔀 Fused Scanner Findings")
+            st.caption("Deduplicated across scanners by (CVE, package, image)")
+            PluginUI.render_scan_results(st.session_state.vuln_container_findings)
+            st.markdown("#### 📋 Sample Results")
+        
         container_vulns = [
             {
                 'Image': 'prod/api-service:v2.1.0',
@@ -630,16 +1043,21 @@ class VulnerabilityManagementModule:
         with col1:
             st.markdown("#### 🎯 Select EKS Clusters")
             
+            cluster_names = []
+            if session is not None:
+                try:
+                    paginator = session.client('eks', region_name=region).get_paginator('list_clusters')
+                    cluster_names = [name for page in paginator.paginate() for name in page['clusters']]
+                except Exception:
+                    pass
+            if not cluster_names:
+                cluster_names = ["prod-eks-cluster-01", "prod-eks-cluster-02", "staging-eks-cluster", "dev-eks-cluster"]
+            all_label = f"All Clusters ({len(cluster_names)})"
+            
             clusters = st.multiselect(
                 "EKS Clusters",
-                options=[
-                    "prod-eks-cluster-01 (1.28)",
-                    "prod-eks-cluster-02 (1.28)",
-                    "staging-eks-cluster (1.27)",
-                    "dev-eks-cluster (1.29)",
-                    "All Clusters (4)"
-                ],
-                default=["All Clusters (4)"],
+                options=cluster_names + [all_label],
+                default=[all_label],
                 key="eks_clusters"
             )
             
@@ -672,143 +1090,158 @@ class VulnerabilityManagementModule:
             st.metric("Total Pods", "456")
         
         if st.button("🚀 Start EKS Vulnerability Scan", type="primary", key="vuln_start_eks_scan", use_container_width=True):
-            with st.spinner("Scanning EKS clusters..."):
-                import time
-                
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                stages = [
-                    ("Connecting to EKS clusters...", 10),
-                    ("Scanning running pods...", 30),
-                    ("Analyzing container images...", 50),
-                    ("Checking RBAC permissions...", 70),
-                    ("Scanning node OS...", 85),
-                    ("Generating report...", 100)
-                ]
-                
-                for stage, progress in stages:
-                    status_text.text(stage)
-                    progress_bar.progress(progress)
-                    time.sleep(0.7)
-                
-                status_text.empty()
-                progress_bar.empty()
-                
-                st.success("✅ Scan complete! Found 78 vulnerabilities across 4 clusters")
+            if registry is not None:
+                selected = cluster_names if all_label in clusters else clusters
+                findings, scanned = PluginUI.render_orchestrated_scan(
+                    registry, [{'cluster_name': name} for name in selected], ['kube_bench', 'falco']
+                )
+                VulnerabilityManagementModule._ingest_scan(session, findings, scanned, EKS_ASSET_TYPE)
+            else:
+                with st.spinner("Scanning EKS clusters..."):
+                    import time
+                    
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    
+                    stages = [
+                        ("Connecting to EKS clusters...", 10),
+                        ("Scanning running pods...", 30),
+                        ("Analyzing container images...", 50),
+                        ("Checking RBAC permissions...", 70),
+                        ("Scanning node OS...", 85),
+                        ("Generating report...", 100)
+                    ]
+                    
+                    for stage, progress in stages:
+                        status_text.text(stage)
+                        progress_bar.progress(progress)
+                        time.sleep(0.7)
+                    
+                    status_text.empty()
+                    progress_bar.empty()
+                    
+                    st.success("✅ Scan complete! Found 78 vulnerabilities across 4 clusters")
         
         st.markdown("---")
         
         # EKS vulnerability results
         st.markdown("### 📊 EKS Vulnerability Results")
         
-        # Pod vulnerabilities
-        with st.expander("🚀 Pod & Container Vulnerabilities (45)", expanded=True):
-            pod_vulns = [
-                {
-                    'Cluster': 'prod-eks-cluster-01',
-                    'Namespace': 'production',
-                    'Pod': 'api-deployment-7d9f8',
-                    'Container': 'api-service',
-                    'CVE': 'CVE-2024-5555',
-                    'Severity': '🔴 Critical',
-                    'CVSS': '9.3',
-                    'Description': 'RCE in application dependency',
-                    'Remediation': 'Update dependency in requirements.txt',
-                    'Status': 'Fix Available'
-                },
-                {
-                    'Cluster': 'prod-eks-cluster-02',
-                    'Namespace': 'production',
-                    'Pod': 'worker-7b8c9',
-                    'Container': 'celery-worker',
-                    'CVE': 'CVE-2024-6666',
-                    'Severity': '🟠 High',
-                    'CVSS': '8.1',
-                    'Description': 'Privilege escalation',
-                    'Remediation': 'Apply security context constraints',
-                    'Status': 'Manual Review Required'
-                },
-                {
-                    'Cluster': 'staging-eks-cluster',
-                    'Namespace': 'staging',
-                    'Pod': 'web-frontend-5c7d',
-                    'Container': 'nginx',
-                    'CVE': 'CVE-2024-7777',
-                    'Severity': '🟡 Medium',
-                    'CVSS': '6.5',
-                    'Description': 'Information disclosure',
-                    'Remediation': 'Update nginx to 1.25.3',
-                    'Status': 'Fix Available'
-                }
-            ]
+        eks_findings = VulnerabilityManagementModule._warehouse_findings(EKS_ASSET_TYPE)
+        if eks_findings is not None:
+            with st.expander(f"☸️ Open Cluster Findings ({len(eks_findings)})", expanded=True):
+                VulnerabilityManagementModule._render_warehouse_findings(eks_findings, 'Cluster')
+        else:
+            if WAREHOUSE_AVAILABLE:
+                st.caption("📋 Sample data shown - run a scan to populate the vulnerability warehouse")
             
-            df_pods = pd.DataFrame(pod_vulns)
-            st.dataframe(df_pods, use_container_width=True, hide_index=True)
-        
-        # Configuration issues
-        with st.expander("⚙️ Kubernetes Configuration Issues (23)", expanded=True):
-            config_issues = [
-                {
-                    'Cluster': 'prod-eks-cluster-01',
-                    'Resource': 'Deployment: api-service',
-                    'Issue': 'Container running as root',
-                    'Severity': '🟠 High',
-                    'Risk': 'Privilege escalation',
-                    'NIST': 'AC-6',
-                    'Remediation': 'Add securityContext with runAsNonRoot',
-                    'Auto-Fix': '✅ Yes'
-                },
-                {
-                    'Cluster': 'prod-eks-cluster-02',
-                    'Resource': 'Pod: monitoring-agent',
-                    'Issue': 'Privileged container',
-                    'Severity': '🔴 Critical',
-                    'Risk': 'Full node access',
-                    'NIST': 'AC-6, SC-39',
-                    'Remediation': 'Remove privileged: true unless required',
-                    'Auto-Fix': '❌ Manual'
-                },
-                {
-                    'Cluster': 'staging-eks-cluster',
-                    'Resource': 'Namespace: default',
-                    'Issue': 'No NetworkPolicy defined',
-                    'Severity': '🟡 Medium',
-                    'Risk': 'Unrestricted network access',
-                    'NIST': 'SC-7',
-                    'Remediation': 'Create default-deny NetworkPolicy',
-                    'Auto-Fix': '✅ Yes'
-                }
-            ]
+            # Pod vulnerabilities
+            with st.expander("🚀 Pod & Container Vulnerabilities (45)", expanded=True):
+                pod_vulns = [
+                    {
+                        'Cluster': 'prod-eks-cluster-01',
+                        'Namespace': 'production',
+                        'Pod': 'api-deployment-7d9f8',
+                        'Container': 'api-service',
+                        'CVE': 'CVE-2024-5555',
+                        'Severity': '🔴 Critical',
+                        'CVSS': '9.3',
+                        'Description': 'RCE in application dependency',
+                        'Remediation': 'Update dependency in requirements.txt',
+                        'Status': 'Fix Available'
+                    },
+                    {
+                        'Cluster': 'prod-eks-cluster-02',
+                        'Namespace': 'production',
+                        'Pod': 'worker-7b8c9',
+                        'Container': 'celery-worker',
+                        'CVE': 'CVE-2024-6666',
+                        'Severity': '🟠 High',
+                        'CVSS': '8.1',
+                        'Description': 'Privilege escalation',
+                        'Remediation': 'Apply security context constraints',
+                        'Status': 'Manual Review Required'
+                    },
+                    {
+                        'Cluster': 'staging-eks-cluster',
+                        'Namespace': 'staging',
+                        'Pod': 'web-frontend-5c7d',
+                        'Container': 'nginx',
+                        'CVE': 'CVE-2024-7777',
+                        'Severity': '🟡 Medium',
+                        'CVSS': '6.5',
+                        'Description': 'Information disclosure',
+                        'Remediation': 'Update nginx to 1.25.3',
+                        'Status': 'Fix Available'
+                    }
+                ]
+                
+                df_pods = pd.DataFrame(pod_vulns)
+                st.dataframe(df_pods, use_container_width=True, hide_index=True)
             
-            df_config = pd.DataFrame(config_issues)
-            st.dataframe(df_config, use_container_width=True, hide_index=True)
-        
-        # Node OS vulnerabilities
-        with st.expander("🖥️ EKS Node OS Vulnerabilities (10)", expanded=True):
-            node_vulns = [
-                {
-                    'Node': 'ip-10-0-1-45.ec2.internal',
-                    'OS': 'Amazon Linux 2',
-                    'CVE': 'CVE-2024-8888',
-                    'Severity': '🟠 High',
-                    'Package': 'kernel 5.10.201',
-                    'Fix': 'Update to kernel 5.10.210',
-                    'Impact': '8 running pods'
-                },
-                {
-                    'Node': 'ip-10-0-2-67.ec2.internal',
-                    'OS': 'Amazon Linux 2',
-                    'CVE': 'CVE-2024-9999',
-                    'Severity': '🟡 Medium',
-                    'Package': 'containerd 1.6.24',
-                    'Fix': 'Update to containerd 1.7.11',
-                    'Impact': '12 running pods'
-                }
-            ]
+            # Configuration issues
+            with st.expander("⚙️ Kubernetes Configuration Issues (23)", expanded=True):
+                config_issues = [
+                    {
+                        'Cluster': 'prod-eks-cluster-01',
+                        'Resource': 'Deployment: api-service',
+                        'Issue': 'Container running as root',
+                        'Severity': '🟠 High',
+                        'Risk': 'Privilege escalation',
+                        'NIST': 'AC-6',
+                        'Remediation': 'Add securityContext with runAsNonRoot',
+                        'Auto-Fix': '✅ Yes'
+                    },
+                    {
+                        'Cluster': 'prod-eks-cluster-02',
+                        'Resource': 'Pod: monitoring-agent',
+                        'Issue': 'Privileged container',
+                        'Severity': '🔴 Critical',
+                        'Risk': 'Full node access',
+                        'NIST': 'AC-6, SC-39',
+                        'Remediation': 'Remove privileged: true unless required',
+                        'Auto-Fix': '❌ Manual'
+                    },
+                    {
+                        'Cluster': 'staging-eks-cluster',
+                        'Resource': 'Namespace: default',
+                        'Issue': 'No NetworkPolicy defined',
+                        'Severity': '🟡 Medium',
+                        'Risk': 'Unrestricted network access',
+                        'NIST': 'SC-7',
+                        'Remediation': 'Create default-deny NetworkPolicy',
+                        'Auto-Fix': '✅ Yes'
+                    }
+                ]
+                
+                df_config = pd.DataFrame(config_issues)
+                st.dataframe(df_config, use_container_width=True, hide_index=True)
             
-            df_nodes = pd.DataFrame(node_vulns)
-            st.dataframe(df_nodes, use_container_width=True, hide_index=True)
+            # Node OS vulnerabilities
+            with st.expander("🖥️ EKS Node OS Vulnerabilities (10)", expanded=True):
+                node_vulns = [
+                    {
+                        'Node': 'ip-10-0-1-45.ec2.internal',
+                        'OS': 'Amazon Linux 2',
+                        'CVE': 'CVE-2024-8888',
+                        'Severity': '🟠 High',
+                        'Package': 'kernel 5.10.201',
+                        'Fix': 'Update to kernel 5.10.210',
+                        'Impact': '8 running pods'
+                    },
+                    {
+                        'Node': 'ip-10-0-2-67.ec2.internal',
+                        'OS': 'Amazon Linux 2',
+                        'CVE': 'CVE-2024-9999',
+                        'Severity': '🟡 Medium',
+                        'Package': 'containerd 1.6.24',
+                        'Fix': 'Update to containerd 1.7.11',
+                        'Impact': '12 running pods'
+                    }
+                ]
+                
+                df_nodes = pd.DataFrame(node_vulns)
+                st.dataframe(df_nodes, use_container_width=True, hide_index=True)
         
         # EKS actions
         st.markdown("---")
@@ -836,20 +1269,47 @@ class VulnerabilityManagementModule:
         st.markdown("### 🔧 Auto-Remediation Engine")
         st.info("Automatically fix vulnerabilities with confidence-based remediation")
         
+        if not REMEDIATION_ENGINE_AVAILABLE:
+            st.error("❌ Remediation rule engine not installed")
+            st.info("Install remediation_rule_engine.py to enable auto-remediation")
+            return
+        
+        if 'vuln_remediation_rules' not in st.session_state:
+            st.session_state.vuln_remediation_rules = list(DEFAULT_RULES)
+        rules = st.session_state.vuln_remediation_rules
+        engine = RemediationRuleEngine(rules)
+        
+        # Findings: open findings from the warehouse, sample findings until scans are ingested
+        warehouse = get_vulnerability_warehouse(get_account_manager()) if WAREHOUSE_AVAILABLE else None
+        if warehouse is not None and not warehouse.is_empty():
+            # OS / REGION triggers need the instance's platform and region from SSM inventory
+            inventory = get_inventory_store(get_account_manager()) if INVENTORY_AVAILABLE else None
+            findings = join_inventory(warehouse.open_findings(),
+                                      None if inventory is None or inventory.is_empty() else inventory.instances())
+        else:
+            findings = VulnerabilityManagementModule._sample_remediation_findings(region)
+        
+        masks = engine.match(findings)
+        work_items = engine.work_items(findings, default_region=region, masks=masks)
+        st.session_state.vuln_work_items = work_items
+        
+        matched_any = np.logical_or.reduce(list(masks.values())) if masks else np.zeros(len(findings), dtype=bool)
+        
         # Remediation dashboard
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Auto-Remediable", "127", delta="51% of total")
+            share = f"{matched_any.mean():.0%} of total" if len(findings) else None
+            st.metric("Auto-Remediable", f"{int(matched_any.sum()):,}", delta=share)
         
         with col2:
-            st.metric("Remediated Today", "45", delta="↑ 12 from yesterday")
+            st.metric("Work Items", len(work_items))
         
         with col3:
-            st.metric("Success Rate", "96.8%", delta="↑ 1.2%")
+            st.metric("Awaiting Approval", sum(1 for item in work_items if item.requires_approval))
         
         with col4:
-            st.metric("Time Saved", "18 hours", delta="This week")
+            st.metric("Assets Targeted", len({a for item in work_items for a in item.assets}))
         
         st.markdown("---")
         
@@ -858,96 +1318,56 @@ class VulnerabilityManagementModule:
         
         rules_data = [
             {
-                'Rule Name': 'Windows Critical Patches',
-                'Trigger': 'CVSS >= 9.0 AND OS = Windows',
-                'Action': 'Install Windows Update via SSM',
-                'Confidence': '98%',
-                'Requires Approval': 'No',
-                'Executions': '247',
-                'Success Rate': '99.2%',
-                'Status': '✅ Active'
-            },
-            {
-                'Rule Name': 'Linux Package Updates',
-                'Trigger': 'CVSS >= 8.0 AND OS = Linux',
-                'Action': 'Run package manager update',
-                'Confidence': '95%',
-                'Requires Approval': 'No',
-                'Executions': '412',
-                'Success Rate': '97.8%',
-                'Status': '✅ Active'
-            },
-            {
-                'Rule Name': 'Container Image Rebuild',
-                'Trigger': 'Critical CVE in base image',
-                'Action': 'Trigger CI/CD rebuild',
-                'Confidence': '92%',
-                'Requires Approval': 'Yes',
-                'Executions': '89',
-                'Success Rate': '95.5%',
-                'Status': '✅ Active'
-            },
-            {
-                'Rule Name': 'EKS Pod Restart',
-                'Trigger': 'High CVE in running pod',
-                'Action': 'Rolling restart deployment',
-                'Confidence': '94%',
-                'Requires Approval': 'No',
-                'Executions': '156',
-                'Success Rate': '98.1%',
-                'Status': '✅ Active'
-            },
-            {
-                'Rule Name': 'Privilege De-escalation',
-                'Trigger': 'Container running as root',
-                'Action': 'Apply securityContext',
-                'Confidence': '89%',
-                'Requires Approval': 'Yes',
-                'Executions': '34',
-                'Success Rate': '91.2%',
-                'Status': '✅ Active'
+                'Rule Name': rule.name,
+                'Trigger': rule.trigger,
+                'Action': rule.action,
+                'Confidence': f"{rule.confidence:.0%}",
+                'Requires Approval': 'Yes' if rule.requires_approval else 'No',
+                'Matches': int(masks[rule.name].sum()) if rule.name in masks else 0,
+                'SSM Document': rule.ssm_document or '-',
+                'Status': '✅ Active' if rule.enabled else '⏸️ Disabled'
             }
+            for rule in rules
         ]
         
         df_rules = pd.DataFrame(rules_data)
         st.dataframe(df_rules, use_container_width=True, hide_index=True)
         
+        with st.expander("🧪 Test a Trigger Expression"):
+            st.caption("Fields: CVSS, SEVERITY, OS, ASSET_TYPE, ACCOUNT, REGION, PACKAGE, CVE, ASSET - "
+                       "operators: = != > >= < <= IN (...) CONTAINS, combined with AND / OR / NOT")
+            expression = st.text_input("Trigger", value="CVSS >= 7.0 AND SEVERITY IN (CRITICAL, HIGH)",
+                                       key="vuln_rule_test_expr")
+            try:
+                predicate, _ = compile_trigger(expression)
+                matches = int(predicate(findings, {}).sum())
+                st.success(f"✅ Valid trigger - matches {matches:,} of {len(findings):,} open findings")
+            except RuleSyntaxError as e:
+                st.error(f"❌ {e}")
+        
         # Pending remediations
         st.markdown("---")
         st.markdown("### ⏳ Pending Auto-Remediations")
         
-        pending = [
-            {
-                'Resource': 'prod-web-01 (Windows)',
-                'Vulnerability': 'CVE-2024-1234 (Critical)',
-                'Remediation': 'Install KB5034441',
-                'Confidence': '98%',
-                'Approval': 'Not Required',
-                'ETA': '2 minutes',
-                'Status': 'Ready'
-            },
-            {
-                'Resource': 'prod/api-service:v2.1.0',
-                'Vulnerability': 'CVE-2024-1111 (Critical)',
-                'Remediation': 'Rebuild with updated dependencies',
-                'Confidence': '92%',
-                'Approval': 'Required',
-                'ETA': '15 minutes',
-                'Status': 'Awaiting Approval'
-            },
-            {
-                'Resource': 'prod-app-01 (Ubuntu)',
-                'Vulnerability': 'CVE-2024-9012 (Critical)',
-                'Remediation': 'apt upgrade sudo',
-                'Confidence': '99%',
-                'Approval': 'Not Required',
-                'ETA': '1 minute',
-                'Status': 'Ready'
-            }
-        ]
-        
-        df_pending = pd.DataFrame(pending)
-        st.dataframe(df_pending, use_container_width=True, hide_index=True)
+        if not work_items:
+            st.success("✅ No findings match the active remediation rules")
+        else:
+            pending = [
+                {
+                    'Action': item.action,
+                    'Account': item.account_id,
+                    'Region': item.region,
+                    'Resources': f"{item.assets[0]}" + (f" +{len(item.assets) - 1} more" if len(item.assets) > 1 else ''),
+                    'Vulnerabilities': f"{len(item.cve_ids)} CVEs ({item.max_severity.title()})",
+                    'Confidence': f"{item.confidence:.0%}",
+                    'Approval': 'Required' if item.requires_approval else 'Not Required',
+                    'Status': 'Awaiting Approval' if item.requires_approval else 'Ready'
+                }
+                for item in work_items
+            ]
+            
+            df_pending = pd.DataFrame(pending)
+            st.dataframe(df_pending, use_container_width=True, hide_index=True)
         
         # Remediation actions
         st.markdown("---")
@@ -955,10 +1375,7 @@ class VulnerabilityManagementModule:
         
         with col1:
             if st.button("⚡ Execute All Auto-Remediations", type="primary", key="vuln_exec_all_rem", use_container_width=True):
-                with st.spinner("Executing remediations..."):
-                    import time
-                    time.sleep(2)
-                    st.success("✅ Executed 45 auto-remediations successfully!")
+                VulnerabilityManagementModule._execute_remediations(session, work_items)
         
         with col2:
             if st.button("✅ Approve Pending", key="vuln_approve_pend", use_container_width=True):
@@ -968,6 +1385,9 @@ class VulnerabilityManagementModule:
             if st.button("📊 View History", key="vuln_view_history", use_container_width=True):
                 st.info("Loading remediation history...")
         
+        if st.session_state.get('vuln_fleet_command') is not None:
+            VulnerabilityManagementModule._render_remediation_progress(session)
+        
         # Remediation confidence model
         st.markdown("---")
         st.markdown("### 🎯 Confidence Scoring Model")
@@ -988,6 +1408,24 @@ class VulnerabilityManagementModule:
         - < 75% confidence: Manual remediation only
         """)
     
+    @staticmethod
+    def _sample_remediation_findings(region: str) -> pd.DataFrame:
+        """Sample open findings for the remediation engine (before any scan is ingested)"""
+        return pd.DataFrame([
+            {'cve_id': 'CVE-2024-1234', 'package': 'KB5034441', 'asset': 'i-0a1b2c3d4e5f60001', 'os': 'Windows',
+             'asset_type': 'EC2 Instance', 'severity': 'CRITICAL', 'cvss_score': 9.8, 'account_id': 'demo', 'region': region},
+            {'cve_id': 'CVE-2024-0002', 'package': 'KB5034441', 'asset': 'i-0a1b2c3d4e5f60002', 'os': 'Windows',
+             'asset_type': 'EC2 Instance', 'severity': 'CRITICAL', 'cvss_score': 9.1, 'account_id': 'demo', 'region': region},
+            {'cve_id': 'CVE-2024-9012', 'package': 'sudo', 'asset': 'i-0f9e8d7c6b5a40003', 'os': 'Linux',
+             'asset_type': 'EC2 Instance', 'severity': 'HIGH', 'cvss_score': 8.6, 'account_id': 'demo', 'region': region},
+            {'cve_id': 'CVE-2024-1111', 'package': 'urllib3', 'asset': 'prod/api-service:v2.1.0', 'os': None,
+             'asset_type': 'Container Image', 'severity': 'CRITICAL', 'cvss_score': 9.3, 'account_id': 'demo', 'region': region},
+            {'cve_id': 'CVE-2024-3456', 'package': 'kube-apiserver', 'asset': 'payments/api-7d9f', 'os': None,
+             'asset_type': 'EKS Pod', 'severity': 'HIGH', 'cvss_score': 7.8, 'account_id': 'demo', 'region': region},
+            {'cve_id': 'CVE-2023-4622', 'package': 'kernel', 'asset': 'i-0f9e8d7c6b5a40004', 'os': 'Linux',
+             'asset_type': 'EC2 Instance', 'severity': 'MEDIUM', 'cvss_score': 5.5, 'account_id': 'demo', 'region': region}
+        ])
+    
     @staticmethod
     def _render_scanner_integration(session, region: str):
         """Scanner Integration Configuration"""
@@ -21,65 +21,50 @@ import plotly.graph_objects as go
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import json
+from network_telemetry_collector import TelemetryTarget, get_network_telemetry_collector
+from core_cache import CacheNamespace
+from network_topology_graph import (
+    get_topology_graph, topology_fingerprint, DATA_CENTER, REGION, TGW, VPC, VPN, DX
+)
 
 # ============================================================================
 # PERFORMANCE OPTIMIZER
 # ============================================================================
 
-class PerformanceOptimizer:
-    """Performance optimization wrapper"""
-    
-    @staticmethod
-    def cache_with_spinner(ttl=60, spinner_text="Loading..."):
-        """Decorator with caching and spinner - shorter TTL for real-time data"""
-        import functools
-        
-        def decorator(func):
-            cached_func = st.cache_data(ttl=ttl)(func)
-            
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                cache_key = f"cache_{func.__name__}"
-                
-                if cache_key not in st.session_state:
-                    with st.spinner(spinner_text):
-                        result = cached_func(*args, **kwargs)
-                        st.session_state[cache_key] = True
-                    return result
-                else:
-                    return cached_func(*args, **kwargs)
-            
-            return wrapper
-        return decorator
-    
-    @staticmethod
-    def add_refresh_button(cache_keys=None):
-        """Add refresh button"""
-        col1, col2, col3 = st.columns([1, 1, 4])
-        
-        with col1:
-            if st.button("🔄 Refresh", key=f"refresh_{st.session_state.net_ops_session_id}", use_container_width=True):
-                if cache_keys:
-                    for key in cache_keys:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                st.cache_data.clear()
-                st.success("✅ Refreshed!")
-                st.rerun()
-        
-        with col2:
-            auto_refresh = st.checkbox("Auto-refresh", value=False, 
-                                      help="Auto-refresh every 60 seconds",
-                                      key=f"auto_refresh_net_{st.session_state.net_ops_session_id}")
-            if auto_refresh:
-                st.caption("🔄 Auto-refresh: ON")
+PerformanceOptimizer = CacheNamespace("network_operations", refresh_label="🔄 Refresh")
 
 # ============================================================================
 # CLOUDWATCH DATA FETCHER
 # ============================================================================
 
 class CloudWatchNetworkMonitor:
-    """Fetch network metrics from AWS CloudWatch"""
+    """Fetch network metrics from AWS CloudWatch
+    
+    All lookups go through the shared NetworkTelemetryCollector, which batches
+    every registered tunnel/connection of an (account, region) into a few
+    GetMetricData calls and keeps rolling windows between reruns.
+    """
+    
+    @staticmethod
+    def _collect(account_mgr, target: TelemetryTarget, metric: str):
+        """Register target, refresh incrementally and return buffered datapoints"""
+        try:
+            collector = get_network_telemetry_collector(account_mgr)
+            collector.register([target])
+            result = collector.refresh()
+            error = result['errors'].get((target.account_id, target.region))
+            if error:
+                return {'success': False, 'error': error}
+            
+            return {
+                'success': True,
+                'datapoints': [
+                    {'Timestamp': ts, 'Value': value}
+                    for ts, value in collector.series(target.resource_id, metric)
+                ]
+            }
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
     
     @staticmethod
     def get_vpn_tunnel_metrics(account_mgr, account_id, region, vpn_id):
@@ -91,36 +76,9 @@ class CloudWatchNetworkMonitor:
         - TunnelDataIn (bytes)
         - TunnelDataOut (bytes)
         """
-        try:
-            session = account_mgr.assume_role(
-                account_id,
-                "VPN Monitoring",
-                f"arn:aws:iam::{account_id}:role/MonitoringRole"
-            )
-            
-            if session:
-                import boto3
-                cloudwatch = session.session.client('cloudwatch', region_name=region)
-                
-                # Get tunnel state
-                response = cloudwatch.get_metric_statistics(
-                    Namespace='AWS/VPN',
-                    MetricName='TunnelState',
-                    Dimensions=[
-                        {'Name': 'VpnId', 'Value': vpn_id}
-                    ],
-                    StartTime=datetime.now() - timedelta(hours=1),
-                    EndTime=datetime.now(),
-                    Period=300,  # 5 minutes
-                    Statistics=['Average']
-                )
-                
-                return {
-                    'success': True,
-                    'datapoints': response.get('Datapoints', [])
-                }
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+        return CloudWatchNetworkMonitor._collect(
+            account_mgr, TelemetryTarget(vpn_id, 'vpn', account_id, region), 'TunnelState'
+        )
     
     @staticmethod
     def get_dx_connection_metrics(account_mgr, account_id, region, dx_id):
@@ -131,74 +89,49 @@ class CloudWatchNetworkMonitor:
         - ConnectionState (available, down, ordering, etc.)
         - ConnectionBpsEgress
         - ConnectionBpsIngress
-        - ConnectionPpsEgress
-        - ConnectionPpsIngress
         - ConnectionLightLevelTx
         - ConnectionLightLevelRx
         """
-        try:
-            session = account_mgr.assume_role(
-                account_id,
-                "DX Monitoring",
-                f"arn:aws:iam::{account_id}:role/MonitoringRole"
-            )
-            
-            if session:
-                import boto3
-                cloudwatch = session.session.client('cloudwatch', region_name=region)
-                
-                # Get connection state
-                response = cloudwatch.get_metric_statistics(
-                    Namespace='AWS/DX',
-                    MetricName='ConnectionState',
-                    Dimensions=[
-                        {'Name': 'ConnectionId', 'Value': dx_id}
-                    ],
-                    StartTime=datetime.now() - timedelta(hours=1),
-                    EndTime=datetime.now(),
-                    Period=300,
-                    Statistics=['Average']
-                )
-                
-                return {
-                    'success': True,
-                    'datapoints': response.get('Datapoints', [])
-                }
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+        return CloudWatchNetworkMonitor._collect(
+            account_mgr, TelemetryTarget(dx_id, 'dx', account_id, region), 'ConnectionState'
+        )
     
     @staticmethod
-    def get_network_latency(account_mgr, account_id, region):
+    def get_network_latency(account_mgr, account_id, region, path_id='default'):
         """
         Get network latency metrics using CloudWatch Synthetics or custom metrics
         """
-        try:
-            session = account_mgr.assume_role(
-                account_id,
-                "Latency Monitoring",
-                f"arn:aws:iam::{account_id}:role/MonitoringRole"
-            )
-            
-            if session:
-                import boto3
-                cloudwatch = session.session.client('cloudwatch', region_name=region)
-                
-                # Get custom latency metrics (if you've set them up)
-                response = cloudwatch.get_metric_statistics(
-                    Namespace='CustomMetrics/Network',
-                    MetricName='Latency',
-                    StartTime=datetime.now() - timedelta(hours=24),
-                    EndTime=datetime.now(),
-                    Period=3600,  # 1 hour
-                    Statistics=['Average', 'Maximum', 'Minimum']
-                )
-                
-                return {
-                    'success': True,
-                    'datapoints': response.get('Datapoints', [])
-                }
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+        return CloudWatchNetworkMonitor._collect(
+            account_mgr, TelemetryTarget(path_id, 'latency', account_id, region), 'Latency'
+        )
+    
+    @staticmethod
+    def collect_topology(account_mgr, topology: Dict) -> Dict:
+        """
+        Register every VPN/DX link of a topology and refresh them in one batched pass
+        
+        Links without an explicit account_id are attributed to the first
+        configured AWS account.
+        
+        Returns:
+            Refresh summary from NetworkTelemetryCollector.refresh()
+        """
+        from config_settings import AppConfig
+        
+        accounts = AppConfig.load_aws_accounts()
+        default_account = accounts[0].account_id if accounts else ''
+        
+        targets = []
+        for kind, key in (('vpn', 'vpn_connections'), ('dx', 'dx_connections')):
+            for link in topology.get(key, []):
+                account_id = link.get('account_id', default_account)
+                region = link.get('region', link['destination'])
+                targets.append(TelemetryTarget(link['id'], kind, account_id, region))
+                targets.append(TelemetryTarget(link['id'], 'latency', account_id, region))
+        
+        collector = get_network_telemetry_collector(account_mgr)
+        collector.register(targets)
+        return collector.refresh()
 
 # ============================================================================
 # DEMO DATA GENERATION (for testing without live AWS data)
@@ -409,6 +342,10 @@ def generate_network_alerts() -> List[Dict]:
         }
     ]
 
+def get_network_graph(topology: Dict):
+    """Get the indexed topology graph for a topology dict (cached across reruns)"""
+    return get_topology_graph(topology_fingerprint(topology), topology)
+
 # ============================================================================
 # NETWORK OPERATIONS DASHBOARD
 # ============================================================================
@@ -433,7 +370,7 @@ class NetworkOperationsDashboard:
             'network_topology',
             'network_metrics',
             'network_alerts'
-        ])
+        ], key=f"refresh_{st.session_state.net_ops_session_id}", auto_refresh=True)
         
         # Check account manager
         if not account_mgr:
@@ -441,6 +378,12 @@ class NetworkOperationsDashboard:
             st.info("👉 Go to 'Account Management' to add your AWS accounts")
             return
         
+        # One batched, incremental telemetry pass per rerun feeds the VPN, DX and latency tabs
+        telemetry = CloudWatchNetworkMonitor.collect_topology(account_mgr, generate_network_topology())
+        if telemetry['api_calls']:
+            st.caption(f"📡 CloudWatch: {telemetry['series']} series across {telemetry['groups']} "
+                       f"account/region groups ({telemetry['api_calls']} GetMetricData calls this refresh)")
+        
         # Tabs
         tabs = st.tabs([
             "📊 Overview",
@@ -584,16 +527,43 @@ class NetworkOperationsDashboard:
         
         with col2:
             st.markdown("#### 🌍 Connections by Region")
+            graph = get_network_graph(topology)
             region_count = {}
-            for vpn in topology['vpn_connections']:
-                dest = next(r for r in topology['aws_regions'] if r['id'] == vpn['destination'])
-                region_count[dest['name']] = region_count.get(dest['name'], 0) + 1
+            for vpn in graph.nodes_of_kind(VPN):
+                dest = graph.get(vpn.attributes['destination'])
+                region_count[dest.name] = region_count.get(dest.name, 0) + 1
             
             fig = px.bar(pd.DataFrame(list(region_count.items()), columns=['Region', 'Connections']),
                         x='Region', y='Connections', color='Connections',
                         color_continuous_scale='Blues')
             st.plotly_chart(fig, use_container_width=True)
     
+    @staticmethod
+    def _render_live_series(account_mgr, resource_id, metrics, title):
+        """Plot buffered CloudWatch series for a resource; returns False if none collected"""
+        
+        collector = get_network_telemetry_collector(account_mgr)
+        if not collector.has_data(resource_id):
+            return False
+        
+        fig = go.Figure()
+        for metric in metrics:
+            points = collector.series(resource_id, metric)
+            if points:
+                fig.add_trace(go.Scatter(
+                    x=[ts for ts, _ in points],
+                    y=[value for _, value in points],
+                    mode='lines',
+                    name=metric
+                ))
+        
+        fig.update_layout(title=title, xaxis_title="Time", hovermode='x unified')
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if collector.last_refresh:
+            st.caption(f"Last collected: {collector.last_refresh.strftime('%H:%M:%S')} UTC")
+        return True
+    
     # ========================================================================
     # TAB 2: VPN MONITORING
     # ========================================================================
@@ -631,13 +601,14 @@ class NetworkOperationsDashboard:
             )
         
         # Find matching VPN connection
-        dc = next((dc for dc in topology['data_centers'] if dc['name'] == selected_dc), None)
-        region = next((r for r in topology['aws_regions'] if r['name'] == selected_region), None)
+        graph = get_network_graph(topology)
+        dc = graph.find_by_name(selected_dc)
+        region = graph.find_by_name(selected_region)
         
         matching_vpn = None
         if dc and region:
-            matching_vpn = next((vpn for vpn in topology['vpn_connections'] 
-                               if vpn['source'] == dc['id'] and vpn['destination'] == region['id']), None)
+            links = graph.links_between(dc.node_id, region.node_id, kind=VPN)
+            matching_vpn = links[0].attributes if links else None
         
         if matching_vpn:
             st.success(f"✅ Connection Found: **{matching_vpn['name']}**")
@@ -690,6 +661,12 @@ class NetworkOperationsDashboard:
             # CloudWatch metrics
             st.markdown("#### 📊 CloudWatch Metrics (Last 24 Hours)")
             
+            NetworkOperationsDashboard._render_live_series(
+                account_mgr, matching_vpn['id'],
+                ['TunnelState', 'TunnelDataIn', 'TunnelDataOut'],
+                "CloudWatch: VPN Tunnel"
+            )
+            
             # Get network metrics
             metrics = generate_network_metrics(selected_dc, selected_region)
             
@@ -771,7 +748,8 @@ class NetworkOperationsDashboard:
             selected_dx_name = st.selectbox("Direct Connect Connection", dx_names,
                                            key=f"select_dx_{st.session_state.net_ops_session_id}")
             
-            dx = next((dx for dx in topology['dx_connections'] if dx['name'] == selected_dx_name), None)
+            dx_node = get_network_graph(topology).find_by_name(selected_dx_name)
+            dx = dx_node.attributes if dx_node else None
             
             if dx:
                 # Status
@@ -822,6 +800,12 @@ class NetworkOperationsDashboard:
                 # CloudWatch metrics
                 st.markdown("#### 📊 CloudWatch Metrics (Real-time)")
                 
+                NetworkOperationsDashboard._render_live_series(
+                    account_mgr, dx['id'],
+                    ['ConnectionBpsEgress', 'ConnectionBpsIngress'],
+                    "CloudWatch: Direct Connect Throughput"
+                )
+                
                 # Bandwidth utilization
                 metrics = generate_network_metrics(dx['source'], dx['destination'])
                 df_metrics = pd.DataFrame(metrics['metrics'])
@@ -926,6 +910,16 @@ class NetworkOperationsDashboard:
             key=f"time_range_{st.session_state.net_ops_session_id}"
         )
         
+        # Live latency for links on this path
+        graph = get_network_graph(topology)
+        source_node = graph.find_by_name(selected_source)
+        dest_node = graph.find_by_name(selected_dest)
+        if source_node and dest_node:
+            for link in graph.links_between(source_node.node_id, dest_node.node_id):
+                NetworkOperationsDashboard._render_live_series(
+                    account_mgr, link.node_id, ['Latency'], f"CloudWatch: {link.name} Latency"
+                )
+        
         # Generate metrics
         metrics = generate_network_metrics(selected_source, selected_dest)
         df = pd.DataFrame(metrics['metrics'])
@@ -1118,69 +1112,197 @@ class NetworkOperationsDashboard:
         st.caption("Visual representation of your network architecture")
         
         topology = generate_network_topology()
+        graph = get_network_graph(topology)
         
-        # ASCII topology
-        st.markdown("#### Network Architecture Diagram")
+        # Graph summary
+        counts = graph.summary()
+        col1, col2, col3, col4, col5 = st.columns(5)
         
-        st.code("""
-    ┌─────────────────────────────────────────────────────────────┐
-    │                     DATA CENTERS                            │
-    └─────────────────────────────────────────────────────────────┘
-    
-    🏢 HQ NYC           🏢 London Branch      🏢 Dallas Backup
-       │                      │                      │
-       │ VPN + DX             │ VPN                 │ VPN + DX
-       │                      │                      │
-       ▼                      ▼                      ▼
-    
-    ┌─────────────────────────────────────────────────────────────┐
-    │                     AWS REGIONS                             │
-    └─────────────────────────────────────────────────────────────┘
-    
-    ☁️ us-east-1         ☁️ eu-west-1        ☁️ us-west-2
-    (Virginia)           (Ireland)          (Oregon)
-       │                      │                      │
-    3 VPCs                1 VPC                 2 VPCs
-    
-    ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    
-    Connections:
-    ━━━ VPN (Site-to-Site)    ━━━ Direct Connect (Dedicated)
-        """, language="text")
+        with col1:
+            st.metric("Data Centers", counts.get(DATA_CENTER, 0))
+        
+        with col2:
+            st.metric("AWS Regions", counts.get(REGION, 0))
+        
+        with col3:
+            st.metric("Transit Gateways", counts.get(TGW, 0))
+        
+        with col4:
+            st.metric("VPCs", counts.get(VPC, 0))
+        
+        with col5:
+            st.metric("VPN / DX Links", counts.get(VPN, 0) + counts.get(DX, 0))
+        
+        # Topology diagram
+        st.markdown("#### Network Architecture Diagram")
+        st.plotly_chart(NetworkOperationsDashboard._build_topology_figure(graph), use_container_width=True)
         
         # Connection summary
         st.markdown("#### 📊 Connection Summary")
         
         connection_summary = []
         
-        for vpn in topology['vpn_connections']:
-            dc = next(dc for dc in topology['data_centers'] if dc['id'] == vpn['source'])
-            region = next(r for r in topology['aws_regions'] if r['id'] == vpn['destination'])
+        for link in graph.nodes_of_kind(VPN) + graph.nodes_of_kind(DX):
+            source, destination = graph.link_endpoints(link.node_id)
+            attrs = link.attributes
             
-            connection_summary.append({
-                'Source': dc['name'],
-                'Destination': region['name'],
-                'Type': 'VPN',
-                'Bandwidth': f"{vpn['bandwidth_mbps']} Mbps",
-                'Latency': f"{vpn['latency_ms']} ms",
-                'Status': '🟢 UP' if vpn['tunnel_1_state'] == 'UP' else '🔴 DOWN'
-            })
-        
-        for dx in topology['dx_connections']:
-            dc = next(dc for dc in topology['data_centers'] if dc['id'] == dx['source'])
-            region = next(r for r in topology['aws_regions'] if r['id'] == dx['destination'])
+            if link.kind == VPN:
+                bandwidth = f"{attrs.get('bandwidth_mbps', '-')} Mbps"
+                status = '🟢 UP' if attrs.get('tunnel_1_state') == 'UP' else '🔴 DOWN'
+            else:
+                bandwidth = f"{attrs.get('bandwidth_gbps', '-')} Gbps"
+                status = '🟢 Available' if attrs.get('status') == 'available' else '🔴 Down'
             
             connection_summary.append({
-                'Source': dc['name'],
-                'Destination': region['name'],
-                'Type': 'Direct Connect',
-                'Bandwidth': f"{dx['bandwidth_gbps']} Gbps",
-                'Latency': f"{dx['latency_ms']} ms",
-                'Status': '🟢 Available' if dx['status'] == 'available' else '🔴 Down'
+                'Source': source.name if source else attrs.get('source'),
+                'Destination': destination.name if destination else attrs.get('destination'),
+                'Type': 'VPN' if link.kind == VPN else 'Direct Connect',
+                'Bandwidth': bandwidth,
+                'Latency': f"{attrs.get('latency_ms', '-')} ms",
+                'Status': status
             })
         
         df = pd.DataFrame(connection_summary)
         st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        
+        # Path analysis
+        st.markdown("#### 🛣️ Path Analysis")
+        
+        endpoints = graph.nodes_of_kind(DATA_CENTER) + graph.nodes_of_kind(REGION) + graph.nodes_of_kind(VPC)
+        endpoint_names = [n.name for n in endpoints]
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            path_source = st.selectbox("From", endpoint_names,
+                                       key=f"topo_path_source_{st.session_state.net_ops_session_id}")
+        
+        with col2:
+            path_target = st.selectbox("To", endpoint_names, index=min(len(endpoint_names) - 1, len(graph.nodes_of_kind(DATA_CENTER))),
+                                       key=f"topo_path_target_{st.session_state.net_ops_session_id}")
+        
+        source_node = graph.find_by_name(path_source)
+        target_node = graph.find_by_name(path_target)
+        
+        if source_node and target_node:
+            result = graph.shortest_path(source_node.node_id, target_node.node_id)
+            if result:
+                hops = " → ".join(graph.get(n).name for n in result['path'])
+                st.success(f"✅ Reachable in {len(result['path']) - 1} hops, ~{result['latency_ms']} ms")
+                st.caption(hops)
+            else:
+                st.error("🔴 No available path between the selected endpoints")
+        
+        # Blast radius
+        st.markdown("#### 💥 Failure Impact (Blast Radius)")
+        
+        failure_candidates = (graph.nodes_of_kind(VPN) + graph.nodes_of_kind(DX) +
+                              graph.nodes_of_kind(TGW) + graph.nodes_of_kind(REGION))
+        failed_name = st.selectbox(
+            "Simulate failure of",
+            [n.name for n in failure_candidates],
+            key=f"topo_blast_{st.session_state.net_ops_session_id}"
+        )
+        failed_node = graph.find_by_name(failed_name)
+        
+        if failed_node:
+            impact = graph.blast_radius(failed_node.node_id)
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Isolated Resources", len(impact['isolated']))
+            
+            with col2:
+                st.metric("Rerouted Paths", len(impact['rerouted']))
+            
+            with col3:
+                st.metric("Disconnected DC → Region", len(impact['disconnected']))
+            
+            impact_rows = []
+            for dc, region in impact['disconnected']:
+                impact_rows.append({
+                    'Data Center': graph.get(dc).name,
+                    'Region': graph.get(region).name,
+                    'Impact': '🔴 Disconnected',
+                    'Latency': '-'
+                })
+            for dc, region, before, after in impact['rerouted']:
+                impact_rows.append({
+                    'Data Center': graph.get(dc).name,
+                    'Region': graph.get(region).name,
+                    'Impact': '🟡 Rerouted',
+                    'Latency': f"{before} → {after} ms"
+                })
+            
+            if impact_rows:
+                st.dataframe(pd.DataFrame(impact_rows), use_container_width=True, hide_index=True)
+            else:
+                st.success("✅ No data center loses connectivity - redundant paths available")
+            
+            if impact['isolated']:
+                st.caption("Isolated: " + ", ".join(graph.get(n).name for n in impact['isolated'][:50]))
+    
+    @staticmethod
+    def _build_topology_figure(graph):
+        """Layered topology diagram: data centers → links → regions → TGWs → VPCs"""
+        
+        layers = [DATA_CENTER, VPN, DX, REGION, TGW, VPC]
+        colors = {
+            DATA_CENTER: '#6366f1', VPN: '#3b82f6', DX: '#10b981',
+            REGION: '#FF9900', TGW: '#8b5cf6', VPC: '#64748b'
+        }
+        labels = {
+            DATA_CENTER: 'Data Center', VPN: 'VPN', DX: 'Direct Connect',
+            REGION: 'AWS Region', TGW: 'Transit Gateway', VPC: 'VPC'
+        }
+        
+        # VPN and DX share a layer
+        layer_y = {DATA_CENTER: 4, VPN: 3, DX: 3, REGION: 2, TGW: 1, VPC: 0}
+        positions = {}
+        for y in sorted(set(layer_y.values()), reverse=True):
+            row = [n for kind in layers if layer_y[kind] == y for n in graph.nodes_of_kind(kind)]
+            for i, node in enumerate(row):
+                positions[node.node_id] = ((i + 1) / (len(row) + 1), y)
+        
+        edge_x, edge_y = [], []
+        for source, neighbors in graph.adjacency.items():
+            for target in neighbors:
+                if source < target:
+                    edge_x += [positions[source][0], positions[target][0], None]
+                    edge_y += [positions[source][1], positions[target][1], None]
+        
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=edge_x, y=edge_y, mode='lines',
+                                 line=dict(color='#cbd5e1', width=1),
+                                 hoverinfo='skip', showlegend=False))
+        
+        for kind in layers:
+            nodes = graph.nodes_of_kind(kind)
+            if not nodes:
+                continue
+            fig.add_trace(go.Scatter(
+                x=[positions[n.node_id][0] for n in nodes],
+                y=[positions[n.node_id][1] for n in nodes],
+                mode='markers+text' if len(nodes) <= 12 else 'markers',
+                text=[n.name for n in nodes],
+                textposition='top center',
+                hovertext=[f"{n.name} ({n.status})" for n in nodes],
+                hoverinfo='text',
+                name=labels[kind],
+                marker=dict(size=14, color=[colors[kind] if n.status != 'down' else '#ef4444' for n in nodes])
+            ))
+        
+        fig.update_layout(
+            height=500,
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            margin=dict(l=10, r=10, t=30, b=10)
+        )
+        return fig
     
     # ========================================================================
     # TAB 7: AUDIT TRAIL
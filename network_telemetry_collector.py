@@ -0,0 +1,321 @@
+"""
+Network Telemetry Collector
+Batched CloudWatch collection for VPN tunnels, Direct Connect and latency metrics
+
+Features:
+- Groups targets by (account, region): one assume-role per account, one client per group
+- Fetches all metrics of a group with GetMetricData (up to 500 queries per call)
+- Incremental refresh - only intervals newer than a target's last fetch are requested;
+  targets fetched less than one metric period ago are skipped
+- Rolling per-series ring buffers shared across reruns
+"""
+
+import streamlit as st
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+# GetMetricData accepts at most 500 metric queries per request
+MAX_QUERIES_PER_CALL = 500
+
+# Clients are rebuilt this long before their assumed-role credentials expire
+CLIENT_EXPIRY_MARGIN = timedelta(minutes=5)
+
+# (namespace, metric name, dimension name, statistic) per target kind
+METRIC_SPECS = {
+    'vpn': [
+        ('AWS/VPN', 'TunnelState', 'VpnId', 'Average'),
+        ('AWS/VPN', 'TunnelDataIn', 'VpnId', 'Sum'),
+        ('AWS/VPN', 'TunnelDataOut', 'VpnId', 'Sum'),
+    ],
+    'dx': [
+        ('AWS/DX', 'ConnectionState', 'ConnectionId', 'Minimum'),
+        ('AWS/DX', 'ConnectionBpsEgress', 'ConnectionId', 'Average'),
+        ('AWS/DX', 'ConnectionBpsIngress', 'ConnectionId', 'Average'),
+        ('AWS/DX', 'ConnectionLightLevelTx', 'ConnectionId', 'Average'),
+        ('AWS/DX', 'ConnectionLightLevelRx', 'ConnectionId', 'Average'),
+    ],
+    'latency': [
+        ('CustomMetrics/Network', 'Latency', 'Path', 'Average'),
+        ('CustomMetrics/Network', 'Latency', 'Path', 'Maximum'),
+    ],
+}
+
+@dataclass(frozen=True)
+class TelemetryTarget:
+    """A monitored VPN connection, DX connection or latency path"""
+    resource_id: str
+    kind: str
+    account_id: str
+    region: str
+
+
+class MetricRingBuffer:
+    """Fixed-size, timestamp-ordered buffer of (timestamp, value) points"""
+
+    def __init__(self, maxlen: int):
+        """
+        Initialize ring buffer
+
+        Args:
+            maxlen: Maximum number of points retained
+        """
+        self._points: deque = deque(maxlen=maxlen)
+
+    def extend(self, points: List[Tuple[datetime, float]]):
+        """Append points newer than the last stored one; replace the last point if re-fetched"""
+        for ts, value in sorted(points):
+            if self._points and ts < self._points[-1][0]:
+                continue
+            if self._points and ts == self._points[-1][0]:
+                self._points[-1] = (ts, value)
+            else:
+                self._points.append((ts, value))
+
+    def points(self, since: Optional[datetime] = None) -> List[Tuple[datetime, float]]:
+        """Get points, optionally only those at or after since"""
+        if since is None:
+            return list(self._points)
+        return [p for p in self._points if p[0] >= since]
+
+    def latest(self) -> Optional[Tuple[datetime, float]]:
+        """Get the most recent point"""
+        return self._points[-1] if self._points else None
+
+    def __len__(self):
+        return len(self._points)
+
+
+class NetworkTelemetryCollector:
+    """
+    Batched network telemetry collector.
+
+    Targets are grouped by (account, region). Each refresh assumes the
+    monitoring role once per account, builds one CloudWatch client per
+    group and fetches every metric of the group in as few GetMetricData
+    calls as possible. Groups are refreshed concurrently.
+    """
+
+    def __init__(self, account_mgr, period: int = 300, window_hours: int = 24,
+                 max_workers: int = 8, role_name: str = 'MonitoringRole'):
+        """
+        Initialize collector
+
+        Args:
+            account_mgr: AWSAccountManager used to assume the monitoring role
+            period: Metric period in seconds
+            window_hours: Rolling window retained per series
+            max_workers: Concurrent (account, region) groups
+            role_name: Role assumed in each monitored account
+        """
+        self.account_mgr = account_mgr
+        self.period = period
+        self.window = timedelta(hours=window_hours)
+        self.max_workers = max_workers
+        self.role_name = role_name
+
+        self.targets: Dict[Tuple[str, str], TelemetryTarget] = {}
+        self.buffers: Dict[Tuple[str, str, str], MetricRingBuffer] = {}
+        self._series_by_resource: Dict[str, List[Tuple[str, str, str]]] = {}
+        # (resource_id, kind) -> end of the last successful fetch
+        self._last_end: Dict[Tuple[str, str], datetime] = {}
+        self._clients: Dict[Tuple[str, str], Tuple[object, datetime]] = {}
+        self.last_refresh: Optional[datetime] = None
+        self.errors: Dict[Tuple[str, str], str] = {}
+        self.api_calls = 0
+        self.lock = threading.Lock()
+
+    # ============= TARGETS =============
+
+    def register(self, targets: List[TelemetryTarget]):
+        """Register targets to monitor (idempotent)"""
+        with self.lock:
+            for target in targets:
+                self.targets[(target.resource_id, target.kind)] = target
+
+    def groups(self) -> Dict[Tuple[str, str], List[TelemetryTarget]]:
+        """Targets grouped by (account_id, region)"""
+        grouped: Dict[Tuple[str, str], List[TelemetryTarget]] = {}
+        for target in self.targets.values():
+            grouped.setdefault((target.account_id, target.region), []).append(target)
+        return grouped
+
+    # ============= COLLECTION =============
+
+    def refresh(self, now: Optional[datetime] = None, force: bool = False) -> Dict:
+        """
+        Fetch new datapoints for every registered target that is due
+
+        A target is due when it has never been fetched or its last fetch is at
+        least one metric period old, so reruns inside a period cost no calls.
+
+        Args:
+            now: End of the fetch window (defaults to current UTC time)
+            force: Fetch every target regardless of the period
+
+        Returns:
+            Dict with groups, series, api_calls and errors for this refresh
+        """
+        now = now or datetime.now(timezone.utc)
+        period = timedelta(seconds=self.period)
+        groups = {}
+        for group, targets in self.groups().items():
+            due = [t for t in targets
+                   if force or (t.resource_id, t.kind) not in self._last_end
+                   or now - self._last_end[(t.resource_id, t.kind)] >= period]
+            if due:
+                groups[group] = due
+        calls_before = self.api_calls
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(groups) or 1))) as pool:
+            list(pool.map(lambda item: self._refresh_group(item[0], item[1], now), groups.items()))
+
+        self.last_refresh = now
+        return {
+            'groups': len(groups),
+            'series': len(self.buffers),
+            'api_calls': self.api_calls - calls_before,
+            'errors': dict(self.errors)
+        }
+
+    def _client(self, account_id: str, region: str):
+        """CloudWatch client for (account, region), rebuilt before its credentials expire"""
+        key = (account_id, region)
+        cached = self._clients.get(key)
+        if cached is None or cached[1] <= datetime.now(timezone.utc) + CLIENT_EXPIRY_MARGIN:
+            session = self.account_mgr.assume_role(
+                account_id,
+                "Network Telemetry",
+                f"arn:aws:iam::{account_id}:role/{self.role_name}"
+            )
+            if not session or session.session is None:
+                # Demo mode or failed role assumption - nothing to collect
+                return None
+            cached = (session.session.client('cloudwatch', region_name=region), session.expiration)
+            with self.lock:
+                self._clients[key] = cached
+        return cached[0]
+
+    def _refresh_group(self, group: Tuple[str, str], targets: List[TelemetryTarget], now: datetime):
+        """Fetch all metrics for one (account, region) group"""
+        account_id, region = group
+        try:
+            client = self._client(account_id, region)
+            if client is None:
+                return
+
+            # Targets sharing a start are fetched together; new targets backfill the whole window.
+            # The last period is re-fetched too, since it may have been partial.
+            windows: Dict[datetime, List[TelemetryTarget]] = {}
+            for target in targets:
+                last_end = self._last_end.get((target.resource_id, target.kind))
+                start = last_end - timedelta(seconds=self.period) if last_end else now - self.window
+                windows.setdefault(start, []).append(target)
+
+            for start, batch in windows.items():
+                queries, index = self.build_queries(batch)
+                for offset in range(0, len(queries), MAX_QUERIES_PER_CALL):
+                    chunk = queries[offset:offset + MAX_QUERIES_PER_CALL]
+                    kwargs = {'MetricDataQueries': chunk, 'StartTime': start, 'EndTime': now,
+                              'ScanBy': 'TimestampAscending'}
+                    while True:
+                        response = client.get_metric_data(**kwargs)
+                        with self.lock:
+                            self.api_calls += 1
+                        self._ingest(response.get('MetricDataResults', []), index)
+                        token = response.get('NextToken')
+                        if not token:
+                            break
+                        kwargs['NextToken'] = token
+                with self.lock:
+                    for target in batch:
+                        self._last_end[(target.resource_id, target.kind)] = now
+
+            with self.lock:
+                self.errors.pop(group, None)
+        except Exception as e:
+            with self.lock:
+                self.errors[group] = str(e)
+
+    def build_queries(self, targets: List[TelemetryTarget]) -> Tuple[List[Dict], Dict[str, Tuple[str, str, str]]]:
+        """
+        Build GetMetricData queries for a group of targets
+
+        Returns:
+            Tuple of (queries, index) where index maps query Id to
+            (resource_id, metric_name, statistic)
+        """
+        queries, index = [], {}
+        for target in targets:
+            for namespace, metric, dimension, stat in METRIC_SPECS.get(target.kind, []):
+                query_id = f"m{len(queries)}"
+                index[query_id] = (target.resource_id, metric, stat)
+                queries.append({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': namespace,
+                            'MetricName': metric,
+                            'Dimensions': [{'Name': dimension, 'Value': target.resource_id}]
+                        },
+                        'Period': self.period,
+                        'Stat': stat
+                    },
+                    'ReturnData': True
+                })
+        return queries, index
+
+    def _ingest(self, results: List[Dict], index: Dict[str, Tuple[str, str, str]]):
+        """Merge GetMetricData results into ring buffers"""
+        maxlen = int(self.window.total_seconds() // self.period) + 1
+        with self.lock:
+            for result in results:
+                key = index.get(result.get('Id'))
+                if not key:
+                    continue
+                buffer = self.buffers.get(key)
+                if buffer is None:
+                    buffer = self.buffers[key] = MetricRingBuffer(maxlen)
+                    self._series_by_resource.setdefault(key[0], []).append(key)
+                buffer.extend(list(zip(result.get('Timestamps', []), result.get('Values', []))))
+
+    # ============= READ =============
+
+    def series(self, resource_id: str, metric: str, stat: Optional[str] = None) -> List[Tuple[datetime, float]]:
+        """Get buffered (timestamp, value) points for a resource metric"""
+        buffer = self._buffer(resource_id, metric, stat)
+        return buffer.points() if buffer else []
+
+    def latest(self, resource_id: str, metric: str, stat: Optional[str] = None) -> Optional[float]:
+        """Get the latest value for a resource metric"""
+        buffer = self._buffer(resource_id, metric, stat)
+        point = buffer.latest() if buffer else None
+        return point[1] if point else None
+
+    def _buffer(self, resource_id: str, metric: str, stat: Optional[str]) -> Optional[MetricRingBuffer]:
+        """Find the buffer for a resource metric (first statistic if not given)"""
+        if stat:
+            return self.buffers.get((resource_id, metric, stat))
+        for key in self._series_by_resource.get(resource_id, []):
+            if key[1] == metric:
+                return self.buffers[key]
+        return None
+
+    def has_data(self, resource_id: str) -> bool:
+        """True if any series has been collected for resource_id"""
+        return any(len(self.buffers[key]) for key in self._series_by_resource.get(resource_id, []))
+
+
+@st.cache_resource
+def _network_telemetry_collector(scope: str, _account_mgr) -> NetworkTelemetryCollector:
+    """Telemetry collector for one credential scope"""
+    return NetworkTelemetryCollector(_account_mgr)
+
+
+def get_network_telemetry_collector(account_mgr) -> NetworkTelemetryCollector:
+    """Get cached telemetry collector for the account manager's credentials (buffers persist across reruns)"""
+    from aws_cost_cube import credential_scope
+    return _network_telemetry_collector(credential_scope(account_mgr), account_mgr)
@@ -0,0 +1,463 @@
+"""
+Network Topology Graph
+Adjacency-indexed graph of data centers, AWS regions, TGWs, VPCs and VPN/DX links
+
+Features:
+- O(1) node and link lookups (replaces linear scans over topology lists)
+- Build from generate_network_topology() demo data or live EC2/DX describes
+- Shortest path (latency-weighted Dijkstra)
+- Reachability queries
+- Blast radius / impact analysis for a failed node or link
+- Graph cached between Streamlit reruns
+"""
+
+import streamlit as st
+import heapq
+import hashlib
+import json
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from collections import deque
+
+# Node kinds
+DATA_CENTER = 'data_center'
+REGION = 'region'
+TGW = 'tgw'
+VPC = 'vpc'
+VPN = 'vpn'
+DX = 'dx'
+
+# Default latency (ms) used for intra-AWS hops when no measurement exists
+INTERNAL_HOP_LATENCY_MS = 1.0
+
+@dataclass
+class TopologyNode:
+    """Node in the network topology graph"""
+    node_id: str
+    kind: str
+    name: str
+    region: Optional[str] = None
+    status: str = 'healthy'
+    attributes: Dict = field(default_factory=dict)
+
+
+class NetworkTopologyGraph:
+    """
+    Adjacency-indexed network topology.
+
+    VPN and Direct Connect links are modelled as nodes sitting between a
+    data center and a region (or TGW), so a link failure can be analysed
+    exactly like any other node failure.
+    """
+
+    def __init__(self):
+        """Initialize an empty graph"""
+        self.nodes: Dict[str, TopologyNode] = {}
+        self.adjacency: Dict[str, Dict[str, float]] = {}
+        self._by_kind: Dict[str, List[str]] = {}
+        self._by_name: Dict[str, str] = {}
+
+    # ============= CONSTRUCTION =============
+
+    def add_node(self, node: TopologyNode):
+        """Add (or replace) a node"""
+        if node.node_id not in self.nodes:
+            self._by_kind.setdefault(node.kind, []).append(node.node_id)
+            self.adjacency[node.node_id] = {}
+        self.nodes[node.node_id] = node
+        self._by_name[node.name] = node.node_id
+
+    def add_edge(self, source: str, target: str, latency_ms: float = INTERNAL_HOP_LATENCY_MS):
+        """Add an undirected, latency-weighted edge between two existing nodes"""
+        if source not in self.nodes or target not in self.nodes:
+            return
+        weight = max(float(latency_ms or 0), 0.0)
+        self.adjacency[source][target] = weight
+        self.adjacency[target][source] = weight
+
+    @classmethod
+    def from_topology(cls, topology: Dict) -> 'NetworkTopologyGraph':
+        """
+        Build graph from the dict returned by generate_network_topology()
+
+        Args:
+            topology: Dict with data_centers, aws_regions, vpn_connections, dx_connections
+                      and optional transit_gateways / vpcs lists
+
+        Returns:
+            NetworkTopologyGraph
+        """
+        graph = cls()
+
+        for dc in topology.get('data_centers', []):
+            graph.add_node(TopologyNode(
+                node_id=dc['id'], kind=DATA_CENTER, name=dc['name'],
+                status=dc.get('status', 'healthy'),
+                attributes={'location': dc.get('location'), 'type': dc.get('type')}
+            ))
+
+        for region in topology.get('aws_regions', []):
+            graph.add_node(TopologyNode(
+                node_id=region['id'], kind=REGION, name=region['name'],
+                region=region['id'], status=region.get('status', 'healthy'),
+                attributes={'location': region.get('location')}
+            ))
+
+        # Explicit TGWs / VPCs (live mode) take precedence over the per-region VPC counts
+        tgws = topology.get('transit_gateways')
+        vpcs = topology.get('vpcs')
+        if tgws is None and vpcs is None:
+            tgws, vpcs = cls._synthesize_region_fabric(topology.get('aws_regions', []))
+
+        for tgw in tgws or []:
+            graph.add_node(TopologyNode(
+                node_id=tgw['id'], kind=TGW, name=tgw.get('name', tgw['id']),
+                region=tgw['region'], status=tgw.get('status', 'healthy')
+            ))
+            graph.add_edge(tgw['id'], tgw['region'])
+
+        for vpc in vpcs or []:
+            graph.add_node(TopologyNode(
+                node_id=vpc['id'], kind=VPC, name=vpc.get('name', vpc['id']),
+                region=vpc['region'], status=vpc.get('status', 'healthy'),
+                attributes={'cidr_block': vpc.get('cidr_block'), 'account_id': vpc.get('account_id')}
+            ))
+            graph.add_edge(vpc['id'], vpc.get('tgw_id') or vpc['region'])
+
+        for vpn in topology.get('vpn_connections', []):
+            up = vpn.get('tunnel_1_state') == 'UP' or vpn.get('tunnel_2_state') == 'UP'
+            graph._add_link(vpn, VPN, 'healthy' if up else 'down')
+
+        for dx in topology.get('dx_connections', []):
+            up = dx.get('status') == 'available' and dx.get('bgp_state', 'established') == 'established'
+            graph._add_link(dx, DX, 'healthy' if up else 'down')
+
+        return graph
+
+    @staticmethod
+    def _synthesize_region_fabric(regions: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """Create one TGW per region with the region's VPCs attached (demo topology)"""
+        tgws, vpcs = [], []
+        for region in regions:
+            tgw_id = f"tgw-{region['id']}"
+            tgws.append({'id': tgw_id, 'name': f"TGW {region['id']}", 'region': region['id']})
+            for i in range(int(region.get('vpcs', 0) or 0)):
+                vpcs.append({
+                    'id': f"vpc-{region['id']}-{i + 1}",
+                    'name': f"VPC {i + 1} ({region['id']})",
+                    'region': region['id'],
+                    'tgw_id': tgw_id
+                })
+        return tgws, vpcs
+
+    def _add_link(self, link: Dict, kind: str, status: str):
+        """Add a VPN/DX link node between its source and destination"""
+        self.add_node(TopologyNode(
+            node_id=link['id'], kind=kind, name=link.get('name', link['id']),
+            region=link.get('destination'), status=status, attributes=dict(link)
+        ))
+        latency = link.get('latency_ms', INTERNAL_HOP_LATENCY_MS)
+        # Split link latency across its two hops so path totals equal the link latency
+        self.add_edge(link['source'], link['id'], latency / 2)
+        self.add_edge(link['id'], link['destination'], latency / 2)
+
+    @classmethod
+    def from_live(cls, session, regions: List[str], account_id: Optional[str] = None) -> 'NetworkTopologyGraph':
+        """
+        Build graph from live EC2 / Direct Connect describes
+
+        Customer gateways become data center nodes; VPN connections and DX
+        connections become links. VPCs attach to their TGW when a TGW
+        attachment exists, otherwise directly to the region.
+
+        Args:
+            session: boto3 Session (e.g. AssumedRoleSession.session)
+            regions: Regions to describe
+            account_id: Optional account ID recorded on VPC nodes
+
+        Returns:
+            NetworkTopologyGraph
+        """
+        topology = {
+            'data_centers': [], 'aws_regions': [], 'transit_gateways': [],
+            'vpcs': [], 'vpn_connections': [], 'dx_connections': []
+        }
+        seen_dcs: Set[str] = set()
+
+        for region in regions:
+            ec2 = session.client('ec2', region_name=region)
+            dx = session.client('directconnect', region_name=region)
+            topology['aws_regions'].append({'id': region, 'name': region, 'location': region})
+
+            vpc_tgw = {}
+            for page in ec2.get_paginator('describe_transit_gateway_attachments').paginate(
+                    Filters=[{'Name': 'resource-type', 'Values': ['vpc']}]):
+                for att in page.get('TransitGatewayAttachments', []):
+                    vpc_tgw[att['ResourceId']] = att['TransitGatewayId']
+
+            for page in ec2.get_paginator('describe_transit_gateways').paginate():
+                for tgw in page.get('TransitGateways', []):
+                    topology['transit_gateways'].append({
+                        'id': tgw['TransitGatewayId'],
+                        'name': _tag_name(tgw.get('Tags'), tgw['TransitGatewayId']),
+                        'region': region,
+                        'status': 'healthy' if tgw.get('State') == 'available' else 'down'
+                    })
+
+            for page in ec2.get_paginator('describe_vpcs').paginate():
+                for vpc in page.get('Vpcs', []):
+                    topology['vpcs'].append({
+                        'id': vpc['VpcId'],
+                        'name': _tag_name(vpc.get('Tags'), vpc['VpcId']),
+                        'region': region,
+                        'cidr_block': vpc.get('CidrBlock'),
+                        'account_id': account_id or vpc.get('OwnerId'),
+                        'tgw_id': vpc_tgw.get(vpc['VpcId']),
+                        'status': 'healthy' if vpc.get('State') == 'available' else 'down'
+                    })
+
+            for cgw in ec2.describe_customer_gateways().get('CustomerGateways', []):
+                if cgw['CustomerGatewayId'] not in seen_dcs:
+                    seen_dcs.add(cgw['CustomerGatewayId'])
+                    topology['data_centers'].append({
+                        'id': cgw['CustomerGatewayId'],
+                        'name': _tag_name(cgw.get('Tags'), cgw.get('IpAddress', cgw['CustomerGatewayId'])),
+                        'location': cgw.get('IpAddress'),
+                        'type': 'Customer Gateway'
+                    })
+
+            for vpn in ec2.describe_vpn_connections().get('VpnConnections', []):
+                tunnels = vpn.get('VgwTelemetry', [])
+                states = [t.get('Status', 'DOWN') for t in tunnels] + ['DOWN', 'DOWN']
+                topology['vpn_connections'].append({
+                    'id': vpn['VpnConnectionId'],
+                    'name': _tag_name(vpn.get('Tags'), vpn['VpnConnectionId']),
+                    'source': vpn['CustomerGatewayId'],
+                    'destination': vpn.get('TransitGatewayId') or region,
+                    'status': vpn.get('State'),
+                    'tunnel_1_state': states[0],
+                    'tunnel_2_state': states[1]
+                })
+
+            for conn in dx.describe_connections().get('connections', []):
+                location = conn.get('location', conn['connectionId'])
+                if location not in seen_dcs:
+                    seen_dcs.add(location)
+                    topology['data_centers'].append({
+                        'id': location, 'name': location, 'location': location, 'type': 'DX Location'
+                    })
+                topology['dx_connections'].append({
+                    'id': conn['connectionId'],
+                    'name': conn.get('connectionName', conn['connectionId']),
+                    'source': location,
+                    'destination': region,
+                    'status': conn.get('connectionState'),
+                    'bandwidth': conn.get('bandwidth')
+                })
+
+        return cls.from_topology(topology)
+
+    # ============= LOOKUPS =============
+
+    def get(self, node_id: str) -> Optional[TopologyNode]:
+        """Get node by ID"""
+        return self.nodes.get(node_id)
+
+    def find_by_name(self, name: str) -> Optional[TopologyNode]:
+        """Get node by display name"""
+        node_id = self._by_name.get(name)
+        return self.nodes.get(node_id) if node_id else None
+
+    def nodes_of_kind(self, kind: str) -> List[TopologyNode]:
+        """Get all nodes of a given kind, in insertion order"""
+        return [self.nodes[n] for n in self._by_kind.get(kind, [])]
+
+    def neighbors(self, node_id: str) -> List[str]:
+        """Get neighbor IDs of a node"""
+        return list(self.adjacency.get(node_id, {}))
+
+    def link_endpoints(self, link_id: str) -> Tuple[Optional[TopologyNode], Optional[TopologyNode]]:
+        """Resolve (source, destination) nodes of a VPN/DX link"""
+        link = self.nodes.get(link_id)
+        if not link:
+            return None, None
+        return self.nodes.get(link.attributes.get('source')), self.nodes.get(link.attributes.get('destination'))
+
+    def links_between(self, source: str, destination: str, kind: Optional[str] = None) -> List[TopologyNode]:
+        """Get VPN/DX links that directly connect source and destination"""
+        links = []
+        for neighbor in self.adjacency.get(source, {}):
+            node = self.nodes[neighbor]
+            if node.kind in (VPN, DX) and (kind is None or node.kind == kind):
+                if destination in self.adjacency[neighbor]:
+                    links.append(node)
+        return links
+
+    def summary(self) -> Dict[str, int]:
+        """Node counts by kind plus edge count"""
+        counts = {kind: len(ids) for kind, ids in self._by_kind.items()}
+        counts['edges'] = sum(len(adj) for adj in self.adjacency.values()) // 2
+        return counts
+
+    # ============= QUERIES =============
+
+    def _is_usable(self, node_id: str, excluded: Set[str]) -> bool:
+        """A node can carry traffic if it is not excluded and not down"""
+        return node_id not in excluded and self.nodes[node_id].status != 'down'
+
+    def shortest_path(self, source: str, target: str,
+                      excluded: Optional[Set[str]] = None) -> Optional[Dict]:
+        """
+        Latency-weighted shortest path (Dijkstra)
+
+        Args:
+            source: Start node ID
+            target: End node ID
+            excluded: Node IDs to treat as failed
+
+        Returns:
+            Dict with path (list of node IDs) and latency_ms, or None if unreachable
+        """
+        excluded = excluded or set()
+        if source not in self.nodes or target not in self.nodes:
+            return None
+        if not self._is_usable(source, excluded) or not self._is_usable(target, excluded):
+            return None
+
+        dist, prev = self._dijkstra(source, excluded, target)
+        if target not in dist:
+            return None
+
+        path = [target]
+        while path[-1] != source:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return {'path': path, 'latency_ms': round(dist[target], 3)}
+
+    def _dijkstra(self, source: str, excluded: Set[str],
+                  target: Optional[str] = None) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """Single-source Dijkstra returning distance and predecessor maps"""
+        dist = {source: 0.0}
+        prev: Dict[str, str] = {}
+        heap = [(0.0, source)]
+        done: Set[str] = set()
+
+        while heap:
+            d, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            if node == target:
+                break
+            for neighbor, weight in self.adjacency[node].items():
+                if neighbor in done or not self._is_usable(neighbor, excluded):
+                    continue
+                nd = d + weight
+                if nd < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = nd
+                    prev[neighbor] = node
+                    heapq.heappush(heap, (nd, neighbor))
+
+        return dist, prev
+
+    def reachable(self, source: str, excluded: Optional[Set[str]] = None) -> Set[str]:
+        """
+        All node IDs reachable from source (BFS)
+
+        Args:
+            source: Start node ID
+            excluded: Node IDs to treat as failed
+
+        Returns:
+            Set of reachable node IDs (including source)
+        """
+        excluded = excluded or set()
+        if source not in self.nodes or not self._is_usable(source, excluded):
+            return set()
+
+        seen = {source}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbor in self.adjacency[node]:
+                if neighbor not in seen and self._is_usable(neighbor, excluded):
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        return seen
+
+    def blast_radius(self, failed_node: str) -> Dict:
+        """
+        Impact of a node or link failure on data center connectivity
+
+        Runs one Dijkstra per data center with and without the failed node, so
+        cost is O(DCs x E log V) regardless of how many VPCs sit behind a TGW.
+
+        Args:
+            failed_node: Node ID to treat as failed
+
+        Returns:
+            Dict with:
+            - isolated: node IDs no data center can reach any more
+            - rerouted: (dc, region, old_latency_ms, new_latency_ms) for regions
+              still reachable over a slower path
+            - disconnected: (dc, region) pairs that lost all connectivity
+        """
+        if failed_node not in self.nodes:
+            return {'isolated': [], 'rerouted': [], 'disconnected': []}
+
+        excluded = {failed_node}
+        regions = self._by_kind.get(REGION, [])
+        reachable_before: Set[str] = set()
+        reachable_after: Set[str] = set()
+        rerouted, disconnected = [], []
+
+        for dc in self._by_kind.get(DATA_CENTER, []):
+            if dc == failed_node or not self._is_usable(dc, set()):
+                continue
+            before, _ = self._dijkstra(dc, set())
+            after, _ = self._dijkstra(dc, excluded)
+            reachable_before.update(before)
+            reachable_after.update(after)
+
+            for region in regions:
+                if region not in before:
+                    continue
+                if region not in after:
+                    disconnected.append((dc, region))
+                elif after[region] > before[region]:
+                    rerouted.append((dc, region, round(before[region], 3), round(after[region], 3)))
+
+        isolated = sorted(reachable_before - reachable_after - excluded)
+        return {'isolated': isolated, 'rerouted': rerouted, 'disconnected': disconnected}
+
+    def fingerprint(self) -> str:
+        """Stable hash of nodes and edges (used to detect topology changes)"""
+        payload = json.dumps(
+            [sorted((n, node.kind, node.status) for n, node in self.nodes.items()),
+             sorted((a, b, w) for a, adj in self.adjacency.items() for b, w in adj.items() if a < b)]
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _tag_name(tags: Optional[List[Dict]], default: str) -> str:
+    """Get Name tag value from an AWS tag list"""
+    for tag in tags or []:
+        if tag.get('Key') == 'Name':
+            return tag.get('Value') or default
+    return default
+
+
+def topology_fingerprint(topology: Dict) -> str:
+    """Stable hash of a topology dict (cache key for get_topology_graph)"""
+    return hashlib.sha1(json.dumps(topology, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@st.cache_resource(ttl=300, max_entries=8)
+def get_topology_graph(fingerprint: str, _topology: Dict) -> NetworkTopologyGraph:
+    """
+    Get cached topology graph
+
+    The graph is rebuilt only when the topology fingerprint changes, so reruns
+    reuse the same indexed graph instead of rescanning topology lists.
+    """
+    return NetworkTopologyGraph.from_topology(_topology)
@@ -0,0 +1,436 @@
+"""
+Remediation Rule Engine
+Compiles auto-remediation trigger expressions into vectorized predicates
+
+Features:
+- Trigger grammar: CVSS >= 9.0 AND OS = Windows, SEVERITY IN (CRITICAL, HIGH), NOT ...
+- Each expression compiles once into a function returning a boolean mask over a findings frame
+- Conditions shared between rules are evaluated once per batch
+- Matches are deduplicated into work items grouped by (action, account, region)
+- OS and region joined from instance inventory for findings that lack them
+"""
+
+import re
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+# Trigger field -> findings column
+FIELD_ALIASES = {
+    'CVSS': 'cvss_score',
+    'SEVERITY': 'severity',
+    'OS': 'os',
+    'PLATFORM': 'os',
+    'ASSET_TYPE': 'asset_type',
+    'ACCOUNT': 'account_id',
+    'REGION': 'region',
+    'PACKAGE': 'package',
+    'CVE': 'cve_id',
+    'ASSET': 'asset',
+    'AGE_DAYS': 'age_days',
+    'FIX_AVAILABLE': 'fix_available',
+    'RUN_AS_ROOT': 'run_as_root'
+}
+
+SEVERITY_ORDER = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW']
+
+KEYWORDS = {'AND', 'OR', 'NOT', 'IN', 'CONTAINS'}
+
+_TOKEN = re.compile(r'\s*(?:(>=|<=|!=|=|>|<|\(|\)|,)|"([^"]*)"|\'([^\']*)\'|([^\s()=<>!,]+))')
+
+Mask = Callable[[pd.DataFrame, Dict], np.ndarray]
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a trigger expression cannot be parsed"""
+    pass
+
+
+# ============================================================================
+# PARSER
+# ============================================================================
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    """Split an expression into (kind, text) tokens: op, str, word"""
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise RuleSyntaxError(f"Unexpected character at {position}: {expression[position:]!r}")
+        op, double, single, word = match.groups()
+        if op:
+            tokens.append(('op', op))
+        elif double is not None or single is not None:
+            tokens.append(('str', double if double is not None else single))
+        else:
+            tokens.append(('kw' if word.upper() in KEYWORDS else 'word', word))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser producing compiled mask functions
+
+        expr   := term (OR term)*
+        term   := factor (AND factor)*
+        factor := NOT factor | '(' expr ')' | cond
+        cond   := FIELD op value | FIELD IN '(' value, ... ')' | FIELD CONTAINS value
+        value  := number | quoted string | bare words up to the next keyword
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.conditions: List[Tuple[str, str, object]] = []
+
+    def parse(self) -> Mask:
+        if not self.tokens:
+            raise RuleSyntaxError("Empty trigger expression")
+        mask = self._expr()
+        if self.position != len(self.tokens):
+            raise RuleSyntaxError(f"Unexpected token {self.tokens[self.position][1]!r} in {self.expression!r}")
+        return mask
+
+    def _peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self) -> Tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise RuleSyntaxError(f"Unexpected end of expression {self.expression!r}")
+        self.position += 1
+        return token
+
+    def _is_keyword(self, word: str) -> bool:
+        token = self._peek()
+        return token is not None and token[0] == 'kw' and token[1].upper() == word
+
+    def _expr(self) -> Mask:
+        parts = [self._term()]
+        while self._is_keyword('OR'):
+            self.position += 1
+            parts.append(self._term())
+        if len(parts) == 1:
+            return parts[0]
+        return lambda frame, memo: np.logical_or.reduce([p(frame, memo) for p in parts])
+
+    def _term(self) -> Mask:
+        parts = [self._factor()]
+        while self._is_keyword('AND'):
+            self.position += 1
+            parts.append(self._factor())
+        if len(parts) == 1:
+            return parts[0]
+
+        def conjunction(frame, memo):
+            result = parts[0](frame, memo)
+            for part in parts[1:]:
+                if not result.any():
+                    break
+                result = result & part(frame, memo)
+            return result
+        return conjunction
+
+    def _factor(self) -> Mask:
+        if self._is_keyword('NOT'):
+            self.position += 1
+            inner = self._factor()
+            return lambda frame, memo: ~inner(frame, memo)
+        if self._peek() == ('op', '('):
+            self.position += 1
+            inner = self._expr()
+            if self._next() != ('op', ')'):
+                raise RuleSyntaxError(f"Missing ')' in {self.expression!r}")
+            return inner
+        return self._condition()
+
+    def _condition(self) -> Mask:
+        kind, name = self._next()
+        if kind != 'word':
+            raise RuleSyntaxError(f"Expected a field name, got {name!r} in {self.expression!r}")
+        column = FIELD_ALIASES.get(name.upper(), name.lower())
+
+        if self._is_keyword('IN'):
+            self.position += 1
+            if self._next() != ('op', '('):
+                raise RuleSyntaxError(f"Expected '(' after IN in {self.expression!r}")
+            values = [self._value()]
+            while self._peek() == ('op', ','):
+                self.position += 1
+                values.append(self._value())
+            if self._next() != ('op', ')'):
+                raise RuleSyntaxError(f"Missing ')' after IN list in {self.expression!r}")
+            op, value = 'IN', tuple(v.lower() for v in values)
+        elif self._is_keyword('CONTAINS'):
+            self.position += 1
+            op, value = 'CONTAINS', self._value()
+        else:
+            kind, op = self._next()
+            if kind != 'op' or op not in ('>=', '<=', '!=', '=', '>', '<'):
+                raise RuleSyntaxError(f"Expected a comparison after {name!r} in {self.expression!r}")
+            value = self._value()
+
+        key = (column, op, value)
+        self.conditions.append(key)
+        return lambda frame, memo: _condition_mask(frame, memo, key)
+
+    def _value(self) -> str:
+        kind, text = self._next()
+        if kind == 'str':
+            return text
+        if kind != 'word':
+            raise RuleSyntaxError(f"Expected a value, got {text!r} in {self.expression!r}")
+        words = [text]
+        while self._peek() is not None and self._peek()[0] == 'word':
+            words.append(self._next()[1])
+        return ' '.join(words)
+
+
+def _compare(values: pd.Series, op: str, value) -> np.ndarray:
+    """Evaluate one string comparison over distinct column values"""
+    text = values.astype(str).str.lower()
+    if op == 'IN':
+        result = text.isin(value)
+    elif op == 'CONTAINS':
+        result = text.str.contains(value.lower(), regex=False)
+    else:
+        result = text == str(value).lower()
+        if op == '!=':
+            return (~result).to_numpy(dtype=bool)
+    return (result & values.notna()).to_numpy(dtype=bool)
+
+
+def _numeric(frame: pd.DataFrame, memo: Dict, column: str) -> np.ndarray:
+    """Column as float64, converted once per batch"""
+    key = ('__numeric__', column)
+    if key not in memo:
+        memo[key] = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype='float64')
+    return memo[key]
+
+
+def _codes(frame: pd.DataFrame, memo: Dict, column: str) -> Tuple[np.ndarray, pd.Series]:
+    """Column as (codes, distinct values), factorized once per batch (-1 = missing)"""
+    key = ('__codes__', column)
+    if key not in memo:
+        series = frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            memo[key] = (series.cat.codes.to_numpy(), pd.Series(series.cat.categories))
+        else:
+            codes, uniques = pd.factorize(series)
+            memo[key] = (codes, pd.Series(uniques))
+    return memo[key]
+
+
+def _condition_mask(frame: pd.DataFrame, memo: Dict, key: Tuple[str, str, object]) -> np.ndarray:
+    """Mask for one condition, memoized per batch (rules share many conditions)"""
+    if key in memo:
+        return memo[key]
+    column, op, value = key
+    if column not in frame.columns:
+        mask = np.full(len(frame), op == '!=', dtype=bool)
+    elif op in ('>=', '<=', '>', '<'):
+        try:
+            threshold = float(value)
+        except ValueError:
+            raise RuleSyntaxError(f"{op} needs a numeric value, got {value!r}")
+        numbers = _numeric(frame, memo, column)
+        with np.errstate(invalid='ignore'):
+            mask = {'>=': numbers >= threshold, '<=': numbers <= threshold,
+                    '>': numbers > threshold, '<': numbers < threshold}[op]
+    else:
+        # Compare the distinct values once, then broadcast through the codes
+        codes, uniques = _codes(frame, memo, column)
+        mask = np.append(_compare(uniques, op, value), op == '!=')[codes]
+    memo[key] = mask
+    return mask
+
+
+def join_inventory(findings: pd.DataFrame, inventory: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Findings with os and region filled in from instance inventory
+
+    Scanner findings name the asset but not its OS or region, so OS / REGION
+    triggers would never match them. Assets are matched on instance_id;
+    values already present on a finding are kept.
+
+    Args:
+        findings: Findings frame
+        inventory: Instances with instance_id, platform_type and region (e.g. SSM inventory)
+    """
+    if inventory is None or inventory.empty or findings.empty or 'asset' not in findings:
+        return findings
+    lookup = inventory.drop_duplicates('instance_id').set_index('instance_id')
+    joined = {}
+    for column, source in (('os', 'platform_type'), ('region', 'region')):
+        values = findings['asset'].map(lookup[source])
+        joined[column] = findings[column].astype('object').fillna(values) if column in findings else values
+    return findings.assign(**joined)
+
+
+def compile_trigger(expression: str) -> Tuple[Mask, List[Tuple[str, str, object]]]:
+    """
+    Compile a trigger expression
+
+    Returns:
+        Tuple of (mask function, parsed conditions)
+
+    Raises:
+        RuleSyntaxError: If the expression is invalid
+    """
+    parser = _Parser(expression)
+    return parser.parse(), parser.conditions
+
+
+# ============================================================================
+# RULES & ENGINE
+# ============================================================================
+
+@dataclass
+class RemediationRule:
+    """Auto-remediation rule with a compiled trigger"""
+    name: str
+    trigger: str
+    action: str
+    confidence: float = 0.9
+    requires_approval: bool = False
+    enabled: bool = True
+    ssm_document: Optional[str] = None
+    predicate: Mask = field(init=False, repr=False)
+    conditions: List[Tuple[str, str, object]] = field(init=False, repr=False, default_factory=list)
+
+    def __post_init__(self):
+        self.predicate, self.conditions = compile_trigger(self.trigger)
+
+
+@dataclass
+class WorkItem:
+    """Deduplicated remediation work for one (action, account, region)"""
+    action: str
+    account_id: str
+    region: str
+    assets: List[str]
+    cve_ids: List[str]
+    findings: int
+    rules: List[str]
+    max_severity: str
+    requires_approval: bool
+    confidence: float
+    ssm_document: Optional[str] = None
+
+    @property
+    def instance_ids(self) -> List[str]:
+        """EC2 instance assets (targets for SSM documents)"""
+        return [a for a in self.assets if a.startswith(('i-', 'mi-'))]
+
+
+class RemediationRuleEngine:
+    """
+    Evaluates a rule set against findings batches.
+
+    All rules are applied to the same frame with a shared condition memo,
+    so a condition used by many rules (e.g. SEVERITY = CRITICAL) is
+    computed once per batch.
+    """
+
+    def __init__(self, rules: List[RemediationRule]):
+        """
+        Initialize engine
+
+        Args:
+            rules: Rules (triggers are compiled on construction)
+        """
+        self.rules = rules
+
+    def match(self, findings: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every enabled rule
+
+        Args:
+            findings: Findings frame (columns per FIELD_ALIASES)
+
+        Returns:
+            Dict of rule name -> boolean mask over findings rows
+        """
+        memo: Dict = {}
+        return {rule.name: rule.predicate(findings, memo) for rule in self.rules if rule.enabled}
+
+    def work_items(self, findings: pd.DataFrame, default_account: str = 'unknown',
+                   default_region: str = 'unknown', masks: Optional[Dict[str, np.ndarray]] = None) -> List[WorkItem]:
+        """
+        Matched findings grouped into work items by (action, account, region)
+
+        Rule masks are OR-ed per action first, so a finding matched by
+        several rules with the same action is counted once; assets are
+        deduplicated within each work item. Pass masks from match() to
+        avoid evaluating the rules again.
+        """
+        if findings.empty:
+            return []
+        masks = self.match(findings) if masks is None else masks
+        rules = {rule.name: rule for rule in self.rules}
+
+        by_action: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        for name, mask in masks.items():
+            if not mask.any():
+                continue
+            action = rules[name].action
+            combined, names = by_action.get(action, (np.zeros(len(findings), dtype=bool), []))
+            by_action[action] = (combined | mask, names + [name])
+
+        def column(name: str, default: str) -> np.ndarray:
+            if name not in findings:
+                return np.full(len(findings), default, dtype=object)
+            return findings[name].astype('object').fillna(default).to_numpy()
+
+        assets = column('asset', '')
+        cves = column('cve_id', '')
+        accounts = column('account_id', default_account)
+        regions = column('region', default_region)
+        severity_rank = pd.Series(column('severity', 'UNKNOWN')).str.upper().map(
+            {s: len(SEVERITY_ORDER) - i for i, s in enumerate(SEVERITY_ORDER)}).fillna(0).to_numpy(dtype=int)
+
+        items = []
+        for action, (mask, names) in by_action.items():
+            rows = np.flatnonzero(mask)
+            matched = pd.DataFrame({'row': rows, 'account_id': accounts[rows], 'region': regions[rows]})
+            for (account_id, region), group in matched.groupby(['account_id', 'region'], sort=False):
+                group_rows = group['row'].to_numpy()
+                group_rules = [rules[name] for name in names if masks[name][group_rows].any()]
+                top = int(severity_rank[group_rows].max())
+                items.append(WorkItem(
+                    action=action,
+                    account_id=account_id,
+                    region=region,
+                    assets=sorted(set(assets[group_rows])),
+                    cve_ids=sorted(set(cves[group_rows])),
+                    findings=len(group_rows),
+                    rules=[r.name for r in group_rules],
+                    max_severity=SEVERITY_ORDER[len(SEVERITY_ORDER) - top] if top else 'UNKNOWN',
+                    requires_approval=any(r.requires_approval for r in group_rules),
+                    confidence=min(r.confidence for r in group_rules),
+                    ssm_document=next((r.ssm_document for r in group_rules if r.ssm_document), None)
+                ))
+
+        severity_position = {s: i for i, s in enumerate(SEVERITY_ORDER)}
+        items.sort(key=lambda item: (item.requires_approval,
+                                     severity_position.get(item.max_severity, len(SEVERITY_ORDER)),
+                                     -item.findings))
+        return items
+
+
+DEFAULT_RULES = [
+    RemediationRule('Windows Critical Patches', 'CVSS >= 9.0 AND OS = Windows',
+                    'Install Windows Update via SSM', 0.98, ssm_document='AWS-InstallWindowsUpdates'),
+    RemediationRule('Linux Package Updates', 'CVSS >= 8.0 AND OS = Linux',
+                    'Run package manager update', 0.95, ssm_document='AWS-RunPatchBaseline'),
+    RemediationRule('Container Image Rebuild', 'SEVERITY = CRITICAL AND ASSET_TYPE = "Container Image"',
+                    'Trigger CI/CD rebuild', 0.92, requires_approval=True),
+    RemediationRule('EKS Pod Restart', 'SEVERITY = HIGH AND ASSET_TYPE = "EKS Pod"',
+                    'Rolling restart deployment', 0.94),
+    RemediationRule('Privilege De-escalation', 'RUN_AS_ROOT = true AND ASSET_TYPE IN ("EKS Pod", "Container")',
+                    'Apply securityContext', 0.89, requires_approval=True)
+]
@@ -6,7 +6,9 @@ Allows users to select and view dependencies for specific applications
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Dict, List
+from typing import Dict, List, Optional
+from resource_dependency_graph import get_dependency_graph, ACTIVE_STATUSES, ResourceDependencyGraph
+from dependency_impact import get_impact_analyzer, application_nodes, iter_json, iter_graphml
 
 def render_resource_dependencies_enhanced(account_mgr):
     """Enhanced resource dependencies with application selector - REAL MODE READY"""
@@ -473,30 +475,79 @@ def render_resource_dependencies_enhanced(account_mgr):
     # ========================================================================
     
     else:  # Real Mode
-        st.markdown("#### 🔄 Real Mode - Your AWS Resources")
-        
-        # In real mode, you would fetch actual AWS resources
-        # Here's the framework for implementation:
-        
-        with col2:
-            # Get actual applications from AWS
-            # This would query your AWS environment for tagged resources
-            
-            # Example: Query resources with 'Application' tag
+        graph, selected_app = render_real_mode_dependencies(account_mgr, col2)
+    
+    # ========================================================================
+    # ADDITIONAL FEATURES
+    # ========================================================================
+    
+    if view_mode == "Real Mode":
+        render_dependency_visualization_options(graph, selected_app)
+    else:
+        st.markdown("---")
+        st.markdown("### 🎨 Additional Visualization Options")
+        st.info("Network graph view and GraphML/JSON export are available in Real Mode for discovered applications")
+    
+    st.markdown("---")
+    st.success("💡 **Tip:** Understanding resource dependencies helps identify impact of changes, optimize costs, and ensure high availability")
+
+
+def render_real_mode_dependencies(account_mgr, selector_col):
+    """
+    Real Mode: discover the account's dependency graph (cached) and render an application tree
+    
+    Returns:
+        Tuple of (graph, selected application); either may be None
+    """
+    from core_account_manager import get_account_names
+    from config_settings import AppConfig
+    
+    st.markdown("#### 🔄 Real Mode - Your AWS Resources")
+    
+    account_names = get_account_names()
+    if not account_names:
+        st.warning("⚠️ No AWS accounts configured")
+        return None, None
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        account_name = st.selectbox("AWS Account", account_names, key="dep_real_account")
+    
+    with col2:
+        regions = st.multiselect(
+            "Regions",
+            AppConfig.DEFAULT_REGIONS,
+            default=[AppConfig.DEFAULT_REGIONS[0]],
+            key="dep_real_regions",
+            help="Regions are discovered in parallel"
+        )
+    
+    if not regions:
+        st.info("Select at least one region")
+        return None, None
+    
+    with st.spinner("Discovering resource relationships..."):
+        graph = get_dependency_graph(account_mgr, account_name, tuple(sorted(regions)))
+    
+    if graph is None:
+        st.error(f"Failed to get session for {account_name}")
+        return None, None
+    
+    if graph.errors:
+        with st.expander(f"⚠️ Discovery warnings ({len(graph.errors)})"):
+            for error in graph.errors:
+                st.caption(error)
+    
+    applications = sorted(graph.applications)
+    
+    with selector_col:
+        if not applications:
             st.info("🔧 **Setup Required:** Tag your AWS resources with 'Application' tag to enable auto-discovery")
-            
-            # Placeholder for real implementation
-            real_applications = st.selectbox(
-                "Select Application",
-                options=["No applications found - Add 'Application' tags to your resources"],
-                key="real_app_selector",
-                disabled=True,
-                help="Tag your AWS resources with 'Application' to auto-discover them"
-            )
-        
+    
+    if not applications:
         st.markdown("##### 📋 How to Enable Real Mode:")
-        st.code("""
-# Tag your AWS resources with 'Application' tag:
+        st.code("""# Tag your AWS resources with 'Application' tag:
 # 
 # For EC2:
 aws ec2 create-tags --resources i-1234567890abcdef0 \\
@@ -510,81 +561,224 @@ aws rds add-tags-to-resource --resource-name arn:aws:rds:... \\
 aws elbv2 add-tags --resource-arns arn:aws:elasticloadbalancing:... \\
   --tags Key=Application,Value="Production Web Application"
         """, language="bash")
+        return graph, None
+    
+    with selector_col:
+        selected_app = st.selectbox(
+            "Select Application",
+            options=applications,
+            key="real_app_selector",
+            help="Applications discovered from the 'Application' tag"
+        )
+    
+    show_critical_only = st.checkbox("Critical Only", value=False, key="real_show_critical_only")
+    
+    st.markdown(f"#### 🔍 {selected_app} - Dependency Tree")
+    
+    dependencies = graph.tree(selected_app)
+    all_deps = dependencies
+    if show_critical_only:
+        dependencies = [d for d in dependencies if d['Critical'] == 'Yes']
+    
+    st.dataframe(pd.DataFrame(dependencies), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Total Resources", len(dependencies))
+    
+    with col2:
+        st.metric("Critical Resources", sum(1 for d in all_deps if d['Critical'] == 'Yes'))
+    
+    with col3:
+        st.metric("Resource Types", len(set(d['Type'] for d in all_deps)))
+    
+    with col4:
+        st.metric("Active/Healthy", sum(1 for d in all_deps if d['Status'].lower() in ACTIVE_STATUSES))
+    
+    summary = graph.summary()
+    st.caption(f"📦 Graph: {summary['resources']} resources, {summary['relationships']} relationships, "
+               f"{summary['applications']} applications (cached for 10 minutes)")
+    
+    render_change_impact(graph)
+    
+    return graph, selected_app
+
+
+def render_change_impact(graph: ResourceDependencyGraph):
+    """Change-impact query: what breaks if a resource (or several) changes"""
+    
+    st.markdown("---")
+    st.markdown("#### 💥 Change Impact Analysis")
+    st.caption("Select resources you plan to change to see everything that transitively depends on them")
+    
+    analyzer = get_impact_analyzer(graph.version, graph)
+    
+    impact_types = sorted({n.resource_type for n in graph.nodes.values() if graph.dependents.get(n.node_id)})
+    if not impact_types:
+        st.info("No resources with dependents discovered")
+        return
+    
+    default_types = [t for t in ('Security Group', 'VPC', 'Subnet') if t in impact_types] or impact_types[:1]
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        selected_types = st.multiselect("Resource Types", impact_types, default=default_types,
+                                        key="dep_impact_types")
+    
+    candidates = {
+        node.label: node_id for node_id, node in graph.nodes.items()
+        if node.resource_type in selected_types and graph.dependents.get(node_id)
+    }
+    
+    with col2:
+        changed = st.multiselect("Resources to Change", sorted(candidates), key="dep_impact_resources")
+    
+    if changed:
+        report = analyzer.impact_report(candidates[label] for label in changed)
         
-        # Implementation template
-        st.markdown("---")
-        st.markdown("##### 🔨 Real Mode Implementation (for developers):")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Impacted Resources", len(report['impacted']))
+        with col2:
+            st.metric("Direct Dependents", len(report['direct_dependents']))
+        with col3:
+            st.metric("Critical Impacted", report['critical'])
+        with col4:
+            st.metric("Applications Affected", len(report['applications']))
         
-        with st.expander("View Real Mode Implementation Code"):
-            st.code('''
-def get_application_dependencies(application_name: str, session, region: str):
-    """
-    Query AWS to build dependency tree for an application
-    """
-    import boto3
+        if report['applications']:
+            st.warning(f"⚠️ Affected applications: {', '.join(report['applications'])}")
+        
+        direct = set(report['direct_dependents'])
+        st.dataframe(pd.DataFrame([
+            {
+                'Resource': graph.nodes[n].label,
+                'Type': graph.nodes[n].resource_type,
+                'Status': graph.nodes[n].status.capitalize() if graph.nodes[n].status else '-',
+                'Application': graph.nodes[n].tags.get('Application', '-'),
+                'Impact': 'Direct' if n in direct else 'Transitive'
+            }
+            for n in report['impacted']
+        ]), use_container_width=True, hide_index=True)
+    
+    with st.expander("📈 Highest Blast Radius Resources"):
+        ranking = analyzer.blast_radius_ranking(set(selected_types) or None, top=20)
+        if ranking:
+            st.dataframe(pd.DataFrame(ranking).drop(columns=['ID']), use_container_width=True, hide_index=True)
+        else:
+            st.info("No resources with dependents for the selected types")
+
+
+def _build_dependency_figure(graph: ResourceDependencyGraph, node_ids: set) -> go.Figure:
+    """Layered dependency diagram: tagged resources on top, infrastructure below"""
     
-    # Initialize AWS clients
-    ec2 = session.client('ec2', region_name=region)
-    elb = session.client('elbv2', region_name=region)
-    rds = session.client('rds', region_name=region)
-    lambda_client = session.client('lambda', region_name=region)
+    # Layer = longest dependency chain above the node, so every edge points downwards
+    depth: Dict[str, int] = {}
+    order = sorted(node_ids, key=lambda n: (graph.nodes[n].resource_type, graph.nodes[n].name))
+    for node_id in order:
+        stack = [(node_id, 0)]
+        while stack:
+            current, level = stack.pop()
+            if depth.get(current, -1) >= level or level > len(node_ids):
+                continue
+            depth[current] = level
+            stack.extend((t, level + 1) for t in graph.depends_on.get(current, []) if t in node_ids)
     
-    dependencies = []
+    layers: Dict[int, List[str]] = {}
+    for node_id in order:
+        layers.setdefault(depth[node_id], []).append(node_id)
     
-    # 1. Find all resources tagged with this application
-    ec2_resources = ec2.describe_instances(
-        Filters=[{'Name': 'tag:Application', 'Values': [application_name]}]
-    )
+    positions = {}
+    for level, members in layers.items():
+        for i, node_id in enumerate(members):
+            positions[node_id] = ((i + 1) / (len(members) + 1), -level)
     
-    # 2. For each resource, find its dependencies
-    for reservation in ec2_resources['Reservations']:
-        for instance in reservation['Instances']:
-            # Get VPC
-            vpc_id = instance.get('VpcId')
-            
-            # Get Security Groups
-            sg_ids = [sg['GroupId'] for sg in instance.get('SecurityGroups', [])]
-            
-            # Get EBS Volumes
-            volumes = [bdm['Ebs']['VolumeId'] for bdm in instance.get('BlockDeviceMappings', [])]
-            
-            # Get Elastic IPs
-            # ... and so on
-    
-    # 3. Find load balancers for this application
-    load_balancers = elb.describe_load_balancers()
-    for lb in load_balancers['LoadBalancers']:
-        tags = elb.describe_tags(ResourceArns=[lb['LoadBalancerArn']])
-        # Check if tagged with application
-        # Get target groups
-        # Get EC2 instances in target groups
-        # ... and so on
-    
-    # 4. Build dependency tree
-    # ... organize resources into parent-child relationships
-    
-    return dependencies
-            ''', language='python')
+    edge_x, edge_y = [], []
+    for source in node_ids:
+        for target in graph.depends_on.get(source, []):
+            if target in node_ids:
+                edge_x += [positions[source][0], positions[target][0], None]
+                edge_y += [positions[source][1], positions[target][1], None]
     
-    # ========================================================================
-    # ADDITIONAL FEATURES
-    # ========================================================================
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=edge_x, y=edge_y, mode='lines',
+                             line=dict(color='#cbd5e1', width=1),
+                             hoverinfo='skip', showlegend=False))
+    
+    by_type: Dict[str, List[str]] = {}
+    for node_id in order:
+        by_type.setdefault(graph.nodes[node_id].resource_type, []).append(node_id)
+    
+    for resource_type, members in sorted(by_type.items()):
+        nodes = [graph.nodes[n] for n in members]
+        fig.add_trace(go.Scatter(
+            x=[positions[n][0] for n in members],
+            y=[positions[n][1] for n in members],
+            mode='markers+text' if len(node_ids) <= 30 else 'markers',
+            text=[n.name for n in nodes],
+            textposition='top center',
+            hovertext=[f"{n.label} ({n.status or 'unknown'})" for n in nodes],
+            hoverinfo='text',
+            name=resource_type,
+            marker=dict(size=14)
+        ))
+    
+    fig.update_layout(
+        height=max(400, 110 * len(layers)),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=10, r=10, t=30, b=10)
+    )
+    return fig
+
+
+def render_dependency_visualization_options(graph: Optional[ResourceDependencyGraph], application: Optional[str]):
+    """Network graph view and streaming JSON/GraphML export for a discovered graph"""
     
     st.markdown("---")
     st.markdown("### 🎨 Additional Visualization Options")
     
+    if graph is None:
+        st.info("Discover an account in Real Mode to view or export its dependency graph")
+        return
+    
+    scope = st.radio(
+        "Scope",
+        [f"Application: {application}", "Entire Account"] if application else ["Entire Account"],
+        horizontal=True,
+        key="dep_export_scope"
+    )
+    node_ids = application_nodes(graph, application) if scope.startswith("Application") else None
+    file_stem = (application or 'account').lower().replace(' ', '_') + '_dependencies'
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📊 View Network Graph", use_container_width=True, key="view_network_graph"):
-            st.info("Network graph visualization coming soon! Will show interactive node-based dependency graph.")
+        show_graph = st.checkbox("📊 View Network Graph", key="view_network_graph")
     
     with col2:
-        if st.button("📥 Export Dependencies", use_container_width=True, key="export_dependencies"):
-            st.success("Export functionality coming soon! Will export to CSV, JSON, or Visio format.")
+        export_col1, export_col2 = st.columns(2)
+        # Exports are serialized only on the run the button is clicked, not on every rerun
+        with export_col1:
+            if st.button("📥 Export JSON", use_container_width=True, key="export_dependencies_json"):
+                st.download_button("💾 Download JSON", ''.join(iter_json(graph, node_ids)),
+                                   f"{file_stem}.json", "application/json",
+                                   use_container_width=True, key="download_dependencies_json")
+        with export_col2:
+            if st.button("📥 Export GraphML", use_container_width=True, key="export_dependencies_graphml"):
+                st.download_button("💾 Download GraphML", ''.join(iter_graphml(graph, node_ids)),
+                                   f"{file_stem}.graphml", "application/xml",
+                                   use_container_width=True, key="download_dependencies_graphml")
     
-    st.markdown("---")
-    st.success("💡 **Tip:** Understanding resource dependencies helps identify impact of changes, optimize costs, and ensure high availability")
+    if show_graph:
+        visible = node_ids if node_ids is not None else set(graph.nodes)
+        if len(visible) > 300:
+            st.warning(f"Graph has {len(visible)} resources - select an application scope to view it")
+        elif visible:
+            st.plotly_chart(_build_dependency_figure(graph, visible), use_container_width=True)
 
 
 # ========================================================================
@@ -0,0 +1,490 @@
+"""
+Resource Dependency Graph
+Discovers AWS resource relationships and stores them as an adjacency-list graph
+
+Features:
+- EC2, ENI, Security Group, EBS, Elastic IP, ALB/NLB, Target Group, RDS, Lambda, CloudFront
+- Batched describes (paginators, elbv2 describe_tags 20 ARNs per call, tagging API for the rest)
+- Per-region discovery runs in parallel
+- Application index from the 'Application' tag
+- Dependency trees rendered from the cached graph
+"""
+
+import uuid
+import streamlit as st
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+APPLICATION_TAG = 'Application'
+
+# elbv2 DescribeTags accepts at most 20 resource ARNs per call
+ELB_TAG_BATCH = 20
+
+# Concurrent DescribeTargetHealth calls per region (one call per target group)
+TARGET_HEALTH_WORKERS = 8
+
+# Resource types not considered critical for an application's availability
+NON_CRITICAL_TYPES = {'Elastic IP', 'CloudFront Distribution', 'S3 Origin'}
+
+ACTIVE_STATUSES = {'active', 'running', 'available', 'in-use', 'healthy', 'deployed', 'associated'}
+
+@dataclass
+class ResourceNode:
+    """A discovered resource"""
+    node_id: str
+    resource_type: str
+    name: str
+    status: str = ''
+    account_id: str = ''
+    region: str = ''
+    tags: Dict[str, str] = field(default_factory=dict)
+    attributes: Dict = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        """Display label such as 'EC2: web-01'"""
+        short = {
+            'Application Load Balancer': 'ALB', 'Network Load Balancer': 'NLB',
+            'EC2 Instance': 'EC2', 'Network Interface': 'ENI', 'EBS Volume': 'EBS Volume',
+            'Lambda Function': 'Lambda', 'RDS Instance': 'RDS',
+            'CloudFront Distribution': 'CloudFront'
+        }.get(self.resource_type, self.resource_type)
+        return f"{short}: {self.name}"
+
+
+class ResourceDependencyGraph:
+    """
+    Adjacency-list dependency graph.
+
+    An edge A -> B means "A depends on B" (e.g. ALB -> Target Group ->
+    EC2 -> Security Group). Reverse adjacency is maintained alongside so
+    dependents can be found without scanning.
+    """
+
+    def __init__(self):
+        """Initialize empty graph"""
+        self.nodes: Dict[str, ResourceNode] = {}
+        self.depends_on: Dict[str, List[str]] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.applications: Dict[str, Set[str]] = {}
+        self.errors: List[str] = []
+        self._instance = uuid.uuid4().hex
+        self._revision = 0
+
+    @property
+    def version(self) -> str:
+        """Token that changes whenever the graph changes (unique across graph instances)"""
+        return f"{self._instance}:{self._revision}"
+
+    # ============= CONSTRUCTION =============
+
+    def add_node(self, node: ResourceNode):
+        """Add or update a node (tags are merged)"""
+        self._revision += 1
+        existing = self.nodes.get(node.node_id)
+        if existing:
+            existing.tags.update(node.tags)
+            existing.attributes.update(node.attributes)
+            if node.status:
+                existing.status = node.status
+            if node.name and node.name != node.node_id:
+                existing.name = node.name
+            if node.resource_type and existing.resource_type == 'Unknown':
+                existing.resource_type = node.resource_type
+            node = existing
+        else:
+            self.nodes[node.node_id] = node
+            self.depends_on.setdefault(node.node_id, [])
+            self.dependents.setdefault(node.node_id, [])
+
+        app = node.tags.get(APPLICATION_TAG)
+        if app:
+            self.applications.setdefault(app, set()).add(node.node_id)
+
+    def add_edge(self, source: str, target: str):
+        """Record that source depends on target (placeholder nodes are created as needed)"""
+        if not source or not target or source == target:
+            return
+        for node_id in (source, target):
+            if node_id not in self.nodes:
+                self.add_node(ResourceNode(node_id=node_id, resource_type=_guess_type(node_id), name=node_id))
+        if target not in self.depends_on[source]:
+            self._revision += 1
+            self.depends_on[source].append(target)
+            self.dependents[target].append(source)
+
+    def tag(self, node_id: str, tags: Dict[str, str]):
+        """Merge tags into an existing node"""
+        node = self.nodes.get(node_id)
+        if node and tags:
+            self.add_node(ResourceNode(node_id=node_id, resource_type=node.resource_type,
+                                       name=node.name, tags=dict(tags)))
+
+    def merge(self, other: 'ResourceDependencyGraph'):
+        """Merge another graph (e.g. one region's discovery) into this one"""
+        for node in other.nodes.values():
+            self.add_node(node)
+        for source, targets in other.depends_on.items():
+            for target in targets:
+                self.add_edge(source, target)
+        self.errors.extend(other.errors)
+
+    # ============= QUERIES =============
+
+    def application_roots(self, application: str) -> List[str]:
+        """Tagged resources of an application not reachable from another tagged resource"""
+        members = self.applications.get(application, set())
+        reached: Set[str] = set()
+        for member in members:
+            if member in reached:
+                continue
+            stack = list(self.depends_on.get(member, []))
+            while stack:
+                node_id = stack.pop()
+                if node_id in reached:
+                    continue
+                reached.add(node_id)
+                stack.extend(self.depends_on.get(node_id, []))
+        roots = members - reached
+        return sorted(roots or members, key=lambda n: (self.nodes[n].resource_type, self.nodes[n].name))
+
+    def tree(self, application: str, max_depth: int = 8) -> List[Dict]:
+        """
+        Dependency tree rows for an application
+
+        Shared resources (e.g. a security group used by many instances) are
+        expanded the first time they appear and shown as a leaf afterwards.
+
+        Returns:
+            Rows with Resource, Type, Status, Depends On and Critical, in the
+            same shape as the demo dependency tables
+        """
+        rows = []
+        expanded: Set[str] = set()
+
+        def visit(node_id: str, parent: Optional[str], prefix: str, connector: str, depth: int):
+            node = self.nodes[node_id]
+            rows.append({
+                'Resource': f"{prefix}{connector}{node.label}",
+                'Type': node.resource_type,
+                'Status': node.status.capitalize() if node.status else '-',
+                'Depends On': self.nodes[parent].label.split(':')[0] if parent else '-',
+                'Critical': 'No' if node.resource_type in NON_CRITICAL_TYPES else 'Yes'
+            })
+            if node_id in expanded or depth >= max_depth:
+                return
+            expanded.add(node_id)
+            children = self.depends_on.get(node_id, [])
+            child_prefix = prefix + ('   ' if connector in ('└─ ', '') else '│  ')
+            for i, child in enumerate(children):
+                visit(child, node_id, child_prefix if connector else '',
+                      '└─ ' if i == len(children) - 1 else '├─ ', depth + 1)
+
+        for root in self.application_roots(application):
+            visit(root, None, '', '', 0)
+        return rows
+
+    def summary(self) -> Dict:
+        """Counts for dashboard metrics"""
+        by_type: Dict[str, int] = {}
+        for node in self.nodes.values():
+            by_type[node.resource_type] = by_type.get(node.resource_type, 0) + 1
+        return {
+            'resources': len(self.nodes),
+            'relationships': sum(len(t) for t in self.depends_on.values()),
+            'applications': len(self.applications),
+            'by_type': by_type
+        }
+
+
+def _guess_type(node_id: str) -> str:
+    """Infer a resource type from an ID or ARN"""
+    prefixes = {
+        'i-': 'EC2 Instance', 'eni-': 'Network Interface', 'sg-': 'Security Group',
+        'vol-': 'EBS Volume', 'eipalloc-': 'Elastic IP', 'vpc-': 'VPC', 'subnet-': 'Subnet'
+    }
+    for prefix, resource_type in prefixes.items():
+        if node_id.startswith(prefix):
+            return resource_type
+    if ':targetgroup/' in node_id:
+        return 'Target Group'
+    if ':loadbalancer/' in node_id:
+        return 'Application Load Balancer'
+    return 'Unknown'
+
+
+def _tags(tag_list: Optional[List[Dict]]) -> Dict[str, str]:
+    """Convert an AWS tag list to a dict (handles Key/Value and key/value)"""
+    return {t.get('Key', t.get('key')): t.get('Value', t.get('value')) for t in tag_list or []}
+
+
+def _paginate(client, operation: str, key: str, **kwargs) -> List[Dict]:
+    """Collect all items of a paginated describe"""
+    items = []
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        items.extend(page.get(key, []))
+    return items
+
+
+# ============================================================================
+# DISCOVERY
+# ============================================================================
+
+class DependencyGraphBuilder:
+    """Builds a ResourceDependencyGraph from live AWS describes"""
+
+    def __init__(self, session, account_id: str = '', max_workers: int = 6):
+        """
+        Initialize builder
+
+        Args:
+            session: boto3 Session with credentials for the account
+            account_id: Account ID recorded on nodes
+            max_workers: Regions discovered in parallel
+        """
+        self.session = session
+        self.account_id = account_id
+        self.max_workers = max_workers
+
+    def _thread_session(self):
+        """New boto3 Session sharing credentials (sessions are not thread-safe)"""
+        import boto3
+        credentials = self.session.get_credentials().get_frozen_credentials()
+        return boto3.Session(
+            aws_access_key_id=credentials.access_key,
+            aws_secret_access_key=credentials.secret_key,
+            aws_session_token=credentials.token
+        )
+
+    def build(self, regions: List[str], include_cloudfront: bool = True) -> ResourceDependencyGraph:
+        """
+        Discover all regions in parallel and merge into one graph
+
+        Args:
+            regions: Regions to discover
+            include_cloudfront: Also discover (global) CloudFront distributions
+
+        Returns:
+            ResourceDependencyGraph
+        """
+        graph = ResourceDependencyGraph()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(regions) or 1))) as pool:
+            futures = {pool.submit(self.discover_region, region): region for region in regions}
+            for future, region in futures.items():
+                try:
+                    graph.merge(future.result())
+                except Exception as e:
+                    graph.errors.append(f"{region}: {e}")
+
+        if include_cloudfront:
+            try:
+                self.discover_cloudfront(graph)
+            except Exception as e:
+                graph.errors.append(f"cloudfront: {e}")
+        return graph
+
+    def discover_region(self, region: str) -> ResourceDependencyGraph:
+        """Discover one region into its own graph"""
+        session = self._thread_session()
+        graph = ResourceDependencyGraph()
+        steps = [
+            ('ec2', self._discover_ec2),
+            ('elbv2', self._discover_load_balancers),
+            ('rds', self._discover_rds),
+            ('lambda', self._discover_lambda),
+        ]
+        for service, step in steps:
+            try:
+                step(session.client(service, region_name=region), graph, region)
+            except Exception as e:
+                graph.errors.append(f"{region}/{service}: {e}")
+
+        # Tags for resources whose describe calls do not return them (Lambda)
+        try:
+            self._apply_tagging_api(session.client('resourcegroupstaggingapi', region_name=region),
+                                    graph, ['lambda:function'])
+        except Exception as e:
+            graph.errors.append(f"{region}/tagging: {e}")
+        return graph
+
+    def _node(self, graph, node_id, resource_type, name, status, region, tags=None):
+        """Add a node stamped with account and region"""
+        graph.add_node(ResourceNode(node_id=node_id, resource_type=resource_type, name=name or node_id,
+                                    status=status or '', account_id=self.account_id,
+                                    region=region, tags=tags or {}))
+
+    def _discover_ec2(self, ec2, graph: ResourceDependencyGraph, region: str):
+        """Instances, ENIs, security groups, volumes and Elastic IPs"""
+        for sg in _paginate(ec2, 'describe_security_groups', 'SecurityGroups'):
+            self._node(graph, sg['GroupId'], 'Security Group', sg.get('GroupName'), 'active',
+                       region, _tags(sg.get('Tags')))
+            graph.add_edge(sg['GroupId'], sg.get('VpcId'))
+
+        for volume in _paginate(ec2, 'describe_volumes', 'Volumes'):
+            tags = _tags(volume.get('Tags'))
+            self._node(graph, volume['VolumeId'], 'EBS Volume', tags.get('Name'), volume.get('State'),
+                       region, tags)
+
+        for reservation in _paginate(ec2, 'describe_instances', 'Reservations'):
+            for instance in reservation.get('Instances', []):
+                instance_id = instance['InstanceId']
+                tags = _tags(instance.get('Tags'))
+                self._node(graph, instance_id, 'EC2 Instance', tags.get('Name'),
+                           instance.get('State', {}).get('Name'), region, tags)
+                graph.add_edge(instance_id, instance.get('VpcId'))
+                for sg in instance.get('SecurityGroups', []):
+                    graph.add_edge(instance_id, sg['GroupId'])
+                for mapping in instance.get('BlockDeviceMappings', []):
+                    graph.add_edge(instance_id, mapping.get('Ebs', {}).get('VolumeId'))
+
+        for eni in _paginate(ec2, 'describe_network_interfaces', 'NetworkInterfaces'):
+            eni_id = eni['NetworkInterfaceId']
+            self._node(graph, eni_id, 'Network Interface', eni.get('PrivateIpAddress'), eni.get('Status'),
+                       region, _tags(eni.get('TagSet')))
+            for group in eni.get('Groups', []):
+                graph.add_edge(eni_id, group['GroupId'])
+            graph.add_edge(eni_id, eni.get('VpcId'))
+            instance_id = eni.get('Attachment', {}).get('InstanceId')
+            if instance_id:
+                graph.add_edge(instance_id, eni_id)
+
+        for address in ec2.describe_addresses().get('Addresses', []):
+            eip_id = address.get('AllocationId') or address.get('PublicIp')
+            self._node(graph, eip_id, 'Elastic IP', address.get('PublicIp'),
+                       'associated' if address.get('AssociationId') else 'unassociated',
+                       region, _tags(address.get('Tags')))
+            graph.add_edge(address.get('InstanceId'), eip_id)
+
+    def _discover_load_balancers(self, elb, graph: ResourceDependencyGraph, region: str):
+        """Load balancers, target groups and registered targets"""
+        load_balancers = _paginate(elb, 'describe_load_balancers', 'LoadBalancers')
+        for lb in load_balancers:
+            lb_type = 'Network Load Balancer' if lb.get('Type') == 'network' else 'Application Load Balancer'
+            self._node(graph, lb['LoadBalancerArn'], lb_type, lb.get('LoadBalancerName'),
+                       lb.get('State', {}).get('Code'), region)
+            graph.nodes[lb['LoadBalancerArn']].attributes['dns_name'] = lb.get('DNSName', '').lower()
+            graph.add_edge(lb['LoadBalancerArn'], lb.get('VpcId'))
+            for sg in lb.get('SecurityGroups', []):
+                graph.add_edge(lb['LoadBalancerArn'], sg)
+
+        target_groups = _paginate(elb, 'describe_target_groups', 'TargetGroups')
+        for tg in target_groups:
+            self._node(graph, tg['TargetGroupArn'], 'Target Group', tg.get('TargetGroupName'), 'active', region)
+            for lb_arn in tg.get('LoadBalancerArns', []):
+                graph.add_edge(lb_arn, tg['TargetGroupArn'])
+
+        # Registered targets: no batch API, so fan the per-group calls out (clients are thread-safe)
+        def targets(tg_arn: str) -> List[str]:
+            health = elb.describe_target_health(TargetGroupArn=tg_arn)
+            return [description['Target']['Id'] for description in health.get('TargetHealthDescriptions', [])]
+
+        tg_arns = [tg['TargetGroupArn'] for tg in target_groups]
+        if tg_arns:
+            with ThreadPoolExecutor(max_workers=min(TARGET_HEALTH_WORKERS, len(tg_arns))) as pool:
+                futures = {pool.submit(targets, tg_arn): tg_arn for tg_arn in tg_arns}
+                for future, tg_arn in futures.items():
+                    try:
+                        for target_id in future.result():
+                            graph.add_edge(tg_arn, target_id)
+                    except Exception as e:
+                        graph.errors.append(f"{region}/elbv2 {tg_arn}: {e}")
+
+        # Tags in batches of 20 ARNs per call
+        arns = [lb['LoadBalancerArn'] for lb in load_balancers] + [tg['TargetGroupArn'] for tg in target_groups]
+        for offset in range(0, len(arns), ELB_TAG_BATCH):
+            response = elb.describe_tags(ResourceArns=arns[offset:offset + ELB_TAG_BATCH])
+            for description in response.get('TagDescriptions', []):
+                graph.tag(description['ResourceArn'], _tags(description.get('Tags')))
+
+    def _discover_rds(self, rds, graph: ResourceDependencyGraph, region: str):
+        """RDS instances (tags are returned inline as TagList)"""
+        for db in _paginate(rds, 'describe_db_instances', 'DBInstances'):
+            arn = db['DBInstanceArn']
+            self._node(graph, arn, 'RDS Instance', db.get('DBInstanceIdentifier'),
+                       db.get('DBInstanceStatus'), region, _tags(db.get('TagList')))
+            graph.add_edge(arn, db.get('DBSubnetGroup', {}).get('VpcId'))
+            for sg in db.get('VpcSecurityGroups', []):
+                graph.add_edge(arn, sg['VpcSecurityGroupId'])
+
+    def _discover_lambda(self, lambda_client, graph: ResourceDependencyGraph, region: str):
+        """Lambda functions and their VPC attachments"""
+        for function in _paginate(lambda_client, 'list_functions', 'Functions'):
+            arn = function['FunctionArn']
+            self._node(graph, arn, 'Lambda Function', function.get('FunctionName'),
+                       function.get('State', 'active'), region)
+            vpc_config = function.get('VpcConfig') or {}
+            graph.add_edge(arn, vpc_config.get('VpcId'))
+            for sg in vpc_config.get('SecurityGroupIds', []):
+                graph.add_edge(arn, sg)
+
+    def _apply_tagging_api(self, tagging, graph: ResourceDependencyGraph, resource_types: List[str]):
+        """Fetch tags for many resources per call via the Resource Groups Tagging API"""
+        for mapping in _paginate(tagging, 'get_resources', 'ResourceTagMappingList',
+                                 ResourceTypeFilters=resource_types):
+            graph.tag(mapping['ResourceARN'], _tags(mapping.get('Tags')))
+
+    def discover_cloudfront(self, graph: ResourceDependencyGraph):
+        """CloudFront distributions, linked to load balancer / S3 origins by DNS name"""
+        session = self._thread_session()
+        cloudfront = session.client('cloudfront')
+        lb_by_dns = {
+            node.attributes['dns_name']: node_id
+            for node_id, node in graph.nodes.items() if node.attributes.get('dns_name')
+        }
+
+        for page in cloudfront.get_paginator('list_distributions').paginate():
+            for dist in page.get('DistributionList', {}).get('Items', []):
+                self._node(graph, dist['ARN'], 'CloudFront Distribution', dist['Id'],
+                           dist.get('Status'), 'global')
+                for origin in dist.get('Origins', {}).get('Items', []):
+                    domain = origin.get('DomainName', '').lower()
+                    if domain in lb_by_dns:
+                        graph.add_edge(dist['ARN'], lb_by_dns[domain])
+                    elif '.s3.' in domain or domain.endswith('.s3.amazonaws.com'):
+                        bucket = domain.split('.s3')[0]
+                        self._node(graph, f"s3:{bucket}", 'S3 Origin', bucket, 'active', 'global')
+                        graph.add_edge(dist['ARN'], f"s3:{bucket}")
+
+        self._apply_tagging_api(session.client('resourcegroupstaggingapi', region_name='us-east-1'),
+                                graph, ['cloudfront:distribution'])
+
+
+def get_application_dependencies(application_name: str, session, region: str) -> List[Dict]:
+    """
+    Query AWS to build the dependency tree for an application
+
+    Args:
+        application_name: Value of the 'Application' tag
+        session: boto3 Session
+        region: AWS region
+
+    Returns:
+        Dependency tree rows (Resource, Type, Status, Depends On, Critical)
+    """
+    graph = DependencyGraphBuilder(session).build([region])
+    return graph.tree(application_name)
+
+
+@st.cache_resource(ttl=600, max_entries=16)
+def _dependency_graph(scope: str, account_name: str, regions: Tuple[str, ...],
+                      _account_mgr) -> Optional[ResourceDependencyGraph]:
+    """Dependency graph for one (credential scope, account, regions)"""
+    from config_settings import AppConfig
+
+    session = _account_mgr.get_session(account_name)
+    if session is None:
+        return None
+    account_ids = {a.account_name: a.account_id for a in AppConfig.load_aws_accounts()}
+    return DependencyGraphBuilder(session, account_ids.get(account_name, '')).build(list(regions))
+
+
+def get_dependency_graph(account_mgr, account_name: str, regions: Tuple[str, ...]) -> Optional[ResourceDependencyGraph]:
+    """
+    Get cached dependency graph for an account
+
+    Discovery runs once per (credentials, account, regions) every 10
+    minutes; the dependencies tab renders trees from this cached graph.
+    """
+    from aws_cost_cube import credential_scope
+    return _dependency_graph(credential_scope(account_mgr), account_name, regions, account_mgr)
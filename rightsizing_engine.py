@@ -0,0 +1,738 @@
+"""
+Rightsizing Engine
+Utilization percentiles joined with a compact instance spec / price table
+
+Features:
+- One spec table (vCPU, memory, network, on-demand price, burst baseline) for
+  EC2, RDS and Azure VM sizes; also the price source for cost estimates
+- Bulk utilization: CloudWatch GetMetricData (hundreds of queries per call) and
+  the Azure Monitor metrics batch engine, hourly over 14-30 days
+- Percentiles for every instance computed at once over an (instance x hour) matrix
+- Vectorized matching: every instance scored against every size of its platform
+  in one boolean / price matrix, cheapest fitting size wins
+- Confidence score per recommendation (coverage, history, spikiness, memory visibility)
+- Results persisted (parquet when pyarrow is installed, pickle otherwise)
+"""
+
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+HOURS_PER_MONTH = 730
+GIB = 2 ** 30
+
+# (platform, type, vCPU, memory GiB, network Gbps, on-demand $/hour, burst baseline share of vCPU or None)
+# Linux on-demand list prices, us-east-1 / East US
+_SPECS = [
+    ('ec2', 't2.micro', 1, 1, 0.3, 0.0116, 0.10),
+    ('ec2', 't2.small', 1, 2, 0.3, 0.023, 0.20),
+    ('ec2', 't2.medium', 2, 4, 0.7, 0.0464, 0.20),
+    ('ec2', 't3.micro', 2, 1, 5, 0.0104, 0.10),
+    ('ec2', 't3.small', 2, 2, 5, 0.0208, 0.20),
+    ('ec2', 't3.medium', 2, 4, 5, 0.0416, 0.20),
+    ('ec2', 't3.large', 2, 8, 5, 0.0832, 0.30),
+    ('ec2', 't3.xlarge', 4, 16, 5, 0.1664, 0.40),
+    ('ec2', 't3.2xlarge', 8, 32, 5, 0.3328, 0.40),
+    ('ec2', 'm5.large', 2, 8, 10, 0.096, None),
+    ('ec2', 'm5.xlarge', 4, 16, 10, 0.192, None),
+    ('ec2', 'm5.2xlarge', 8, 32, 10, 0.384, None),
+    ('ec2', 'm5.4xlarge', 16, 64, 10, 0.768, None),
+    ('ec2', 'm5.8xlarge', 32, 128, 10, 1.536, None),
+    ('ec2', 'm5.12xlarge', 48, 192, 12, 2.304, None),
+    ('ec2', 'm6i.large', 2, 8, 12.5, 0.096, None),
+    ('ec2', 'm6i.xlarge', 4, 16, 12.5, 0.192, None),
+    ('ec2', 'm6i.2xlarge', 8, 32, 12.5, 0.384, None),
+    ('ec2', 'm6i.4xlarge', 16, 64, 12.5, 0.768, None),
+    ('ec2', 'm6i.8xlarge', 32, 128, 12.5, 1.536, None),
+    ('ec2', 'c5.large', 2, 4, 10, 0.085, None),
+    ('ec2', 'c5.xlarge', 4, 8, 10, 0.17, None),
+    ('ec2', 'c5.2xlarge', 8, 16, 10, 0.34, None),
+    ('ec2', 'c5.4xlarge', 16, 32, 10, 0.68, None),
+    ('ec2', 'c5.9xlarge', 36, 72, 10, 1.53, None),
+    ('ec2', 'c6i.large', 2, 4, 12.5, 0.085, None),
+    ('ec2', 'c6i.xlarge', 4, 8, 12.5, 0.17, None),
+    ('ec2', 'c6i.2xlarge', 8, 16, 12.5, 0.34, None),
+    ('ec2', 'c6i.4xlarge', 16, 32, 12.5, 0.68, None),
+    ('ec2', 'c6i.8xlarge', 32, 64, 12.5, 1.36, None),
+    ('ec2', 'r5.large', 2, 16, 10, 0.126, None),
+    ('ec2', 'r5.xlarge', 4, 32, 10, 0.252, None),
+    ('ec2', 'r5.2xlarge', 8, 64, 10, 0.504, None),
+    ('ec2', 'r5.4xlarge', 16, 128, 10, 1.008, None),
+    ('ec2', 'r5.8xlarge', 32, 256, 10, 2.016, None),
+    ('ec2', 'r6i.large', 2, 16, 12.5, 0.126, None),
+    ('ec2', 'r6i.xlarge', 4, 32, 12.5, 0.252, None),
+    ('ec2', 'r6i.2xlarge', 8, 64, 12.5, 0.504, None),
+    ('ec2', 'r6i.4xlarge', 16, 128, 12.5, 1.008, None),
+    ('rds', 'db.t3.micro', 2, 1, 5, 0.017, 0.10),
+    ('rds', 'db.t3.small', 2, 2, 5, 0.034, 0.20),
+    ('rds', 'db.t3.medium', 2, 4, 5, 0.068, 0.20),
+    ('rds', 'db.t3.large', 2, 8, 5, 0.136, 0.30),
+    ('rds', 'db.t3.xlarge', 4, 16, 5, 0.272, 0.40),
+    ('rds', 'db.t3.2xlarge', 8, 32, 5, 0.544, 0.40),
+    ('rds', 'db.m5.large', 2, 8, 10, 0.192, None),
+    ('rds', 'db.m5.xlarge', 4, 16, 10, 0.384, None),
+    ('rds', 'db.m5.2xlarge', 8, 32, 10, 0.768, None),
+    ('rds', 'db.m5.4xlarge', 16, 64, 10, 1.536, None),
+    ('rds', 'db.r5.large', 2, 16, 10, 0.24, None),
+    ('rds', 'db.r5.xlarge', 4, 32, 10, 0.48, None),
+    ('rds', 'db.r5.2xlarge', 8, 64, 10, 0.96, None),
+    ('rds', 'db.r5.4xlarge', 16, 128, 10, 1.92, None),
+    ('azure', 'Standard_B1s', 1, 1, 0.5, 0.0104, 0.10),
+    ('azure', 'Standard_B2s', 2, 4, 1, 0.0416, 0.20),
+    ('azure', 'Standard_B2ms', 2, 8, 1, 0.0832, 0.30),
+    ('azure', 'Standard_B4ms', 4, 16, 2, 0.166, 0.225),
+    ('azure', 'Standard_B8ms', 8, 32, 4, 0.333, 0.169),
+    ('azure', 'Standard_D2s_v3', 2, 8, 1, 0.096, None),
+    ('azure', 'Standard_D4s_v3', 4, 16, 2, 0.192, None),
+    ('azure', 'Standard_D8s_v3', 8, 32, 4, 0.384, None),
+    ('azure', 'Standard_D16s_v3', 16, 64, 8, 0.768, None),
+    ('azure', 'Standard_D2s_v5', 2, 8, 12.5, 0.096, None),
+    ('azure', 'Standard_D4s_v5', 4, 16, 12.5, 0.192, None),
+    ('azure', 'Standard_D8s_v5', 8, 32, 12.5, 0.384, None),
+    ('azure', 'Standard_D16s_v5', 16, 64, 12.5, 0.768, None),
+    ('azure', 'Standard_D32s_v5', 32, 128, 16, 1.536, None),
+    ('azure', 'Standard_E2s_v5', 2, 16, 12.5, 0.126, None),
+    ('azure', 'Standard_E4s_v5', 4, 32, 12.5, 0.252, None),
+    ('azure', 'Standard_E8s_v5', 8, 64, 12.5, 0.504, None),
+    ('azure', 'Standard_E16s_v5', 16, 128, 12.5, 1.008, None),
+    ('azure', 'Standard_F2s_v2', 2, 4, 5, 0.0846, None),
+    ('azure', 'Standard_F4s_v2', 4, 8, 10, 0.169, None),
+    ('azure', 'Standard_F8s_v2', 8, 16, 12.5, 0.338, None),
+    ('azure', 'Standard_F16s_v2', 16, 32, 12.5, 0.677, None),
+]
+
+INSTANCE_SPECS = pd.DataFrame(_SPECS, columns=['platform', 'type', 'vcpu', 'memory_gib', 'network_gbps',
+                                               'hourly', 'baseline'])
+# Family: EC2 / RDS type without its size (m5, db.r5); Azure size without its core count (Standard_D_v5)
+INSTANCE_SPECS['family'] = INSTANCE_SPECS['type'].str.rsplit('.', n=1).str[0].where(
+    INSTANCE_SPECS['platform'] != 'azure', INSTANCE_SPECS['type'].str.replace(r'(?<=_[A-Z])\d+m?s?', '', regex=True))
+INSTANCE_SPECS['baseline'] = INSTANCE_SPECS['baseline'].astype('float64')
+_SPEC_INDEX = INSTANCE_SPECS.set_index('type')
+
+# Actions that change nothing (no recommendation to list)
+NO_CHANGE = ('Keep', 'Insufficient data', 'Unknown type')
+
+UTILIZATION_COLUMNS = ['resource_id', 'name', 'platform', 'scope', 'region', 'instance_type', 'days', 'samples',
+                       'cpu_mean', 'cpu_p95', 'cpu_p99', 'mem_p95', 'net_p95_gbps']
+
+
+def hourly_price(instance_type: str, default: float = 0.10) -> float:
+    """On-demand $/hour of an instance type from the spec table"""
+    if instance_type in _SPEC_INDEX.index:
+        return float(_SPEC_INDEX.at[instance_type, 'hourly'])
+    return default
+
+
+def _nanquantiles(matrix: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Row quantiles ignoring NaN (nearest rank; NaN for rows without values)
+
+    Sort-based: one sort of the matrix serves every quantile.
+    """
+    ordered = np.sort(matrix, axis=1)
+    count = np.sum(~np.isnan(ordered), axis=1)
+    out = np.full((len(quantiles), matrix.shape[0]), np.nan)
+    rows = np.arange(matrix.shape[0])
+    for i, q in enumerate(quantiles):
+        rank = np.clip(np.ceil(q * count).astype(int) - 1, 0, max(matrix.shape[1] - 1, 0))
+        out[i] = np.where(count > 0, ordered[rows, rank] if matrix.shape[1] else np.nan, np.nan)
+    return out
+
+
+def build_utilization(inventory: pd.DataFrame, cpu: np.ndarray, memory: np.ndarray, network_gbps: np.ndarray,
+                      days: int) -> pd.DataFrame:
+    """
+    Utilization frame from hourly (instance x hour) matrices aligned with inventory rows
+
+    Args:
+        inventory: resource_id, name, platform, scope, region, instance_type
+        cpu: CPU % (hourly maximum)
+        memory: Memory used % (all NaN where no memory metric is published)
+        network_gbps: Network in + out, Gbps
+        days: Days covered
+
+    Returns:
+        DataFrame with UTILIZATION_COLUMNS
+    """
+    cpu_p95, cpu_p99 = _nanquantiles(cpu, [0.95, 0.99])
+    samples = np.sum(~np.isnan(cpu), axis=1)
+    cpu_mean = np.where(samples > 0, np.nansum(cpu, axis=1) / np.maximum(samples, 1), np.nan)
+    frame = inventory[['resource_id', 'name', 'platform', 'scope', 'region', 'instance_type']].reset_index(drop=True)
+    return frame.assign(
+        days=days,
+        samples=samples,
+        cpu_mean=cpu_mean,
+        cpu_p95=cpu_p95,
+        cpu_p99=cpu_p99,
+        mem_p95=_nanquantiles(memory, [0.95])[0],
+        net_p95_gbps=_nanquantiles(network_gbps, [0.95])[0]
+    )[UTILIZATION_COLUMNS]
+
+
+class RightsizingEngine:
+    """
+    Cheapest fitting size per instance.
+
+    For each instance, required capacity is its observed p95 scaled to a target
+    utilization (memory falls back to the current size when not observed).
+    All sizes of the instance's platform are tested at once; burstable sizes
+    must also cover the mean CPU within their baseline. Ties prefer the current
+    family.
+    """
+
+    def __init__(self, specs: pd.DataFrame = INSTANCE_SPECS, cpu_target: float = 70.0, mem_target: float = 80.0,
+                 net_target: float = 70.0, min_savings: float = 5.0):
+        """
+        Initialize engine
+
+        Args:
+            specs: Spec / price table (INSTANCE_SPECS layout)
+            cpu_target: Target p95 CPU % on the recommended size
+            mem_target: Target p95 memory % on the recommended size
+            net_target: Target p95 network % of the recommended size's bandwidth
+            min_savings: Monthly savings below which an instance is kept as is
+        """
+        self.specs = specs.reset_index(drop=True)
+        self.cpu_target = cpu_target
+        self.mem_target = mem_target
+        self.net_target = net_target
+        self.min_savings = min_savings
+
+    @staticmethod
+    def confidence(utilization: pd.DataFrame) -> np.ndarray:
+        """
+        0-1 confidence per instance
+
+        Product of: sample coverage of the window, history length (30 days = full),
+        spikiness (gap between p99 and p95 CPU) and memory visibility.
+        """
+        coverage = np.clip(utilization['samples'] / (utilization['days'] * 24), 0, 1)
+        history = 0.5 + 0.5 * np.clip(utilization['days'] / 30, 0, 1)
+        spikiness = np.clip(1 - (utilization['cpu_p99'] - utilization['cpu_p95']).fillna(100) / 50, 0.2, 1)
+        memory = np.where(utilization['mem_p95'].notna(), 1.0, 0.7)
+        return np.round((coverage * history * spikiness * memory).to_numpy(dtype='float64'), 2)
+
+    def recommend(self, utilization: pd.DataFrame) -> pd.DataFrame:
+        """
+        Recommend a size for every instance
+
+        Args:
+            utilization: Frame with UTILIZATION_COLUMNS
+
+        Returns:
+            utilization columns plus recommended_type, action (Downsize, Change family,
+            Upsize, Keep, Insufficient data, Unknown type), current_monthly,
+            recommended_monthly, monthly_savings, confidence, priority
+
+        Instances without CPU samples get 'Insufficient data'; instances that fit
+        no size and already run the largest one of their family are kept.
+        Instances whose type is not in the spec table get 'Unknown type' (no
+        price, confidence 0) so they stay visible instead of being dropped.
+        """
+        frames = []
+        for platform, group in utilization.groupby('platform', sort=False):
+            specs = self.specs[self.specs['platform'] == platform]
+            current = specs.set_index('type').reindex(group['instance_type'])
+            known = current['vcpu'].notna().to_numpy()
+            if not known.all():
+                unknown = group[~known]
+                frames.append(unknown.assign(
+                    recommended_type=unknown['instance_type'].to_numpy(),
+                    action='Unknown type',
+                    current_monthly=np.nan,
+                    recommended_monthly=np.nan,
+                    monthly_savings=0.0
+                ))
+            group, current = group[known], current[known]
+            if group.empty:
+                continue
+
+            no_data = (group['samples'].to_numpy() == 0) | group['cpu_p95'].isna().to_numpy()
+            vcpu = current['vcpu'].to_numpy()
+            memory = current['memory_gib'].to_numpy()
+            need_cpu = vcpu * np.nan_to_num(group['cpu_p95'].to_numpy(), nan=100.0) / self.cpu_target
+            need_mem = np.where(group['mem_p95'].notna(), memory * group['mem_p95'].to_numpy() / self.mem_target, memory)
+            need_net = np.nan_to_num(group['net_p95_gbps'].to_numpy()) * 100 / self.net_target
+            mean_cpu = vcpu * np.nan_to_num(group['cpu_mean'].to_numpy(), nan=100.0) / 100
+
+            # (instance x size) fit matrix
+            size_vcpu = specs['vcpu'].to_numpy()[None, :]
+            baseline = specs['baseline'].to_numpy()[None, :]
+            fits = ((size_vcpu >= need_cpu[:, None])
+                    & (specs['memory_gib'].to_numpy()[None, :] >= need_mem[:, None])
+                    & (specs['network_gbps'].to_numpy()[None, :] >= need_net[:, None])
+                    & (np.isnan(baseline) | (baseline * size_vcpu >= mean_cpu[:, None])))
+            same_family = specs['family'].to_numpy()[None, :] == current['family'].to_numpy()[:, None]
+            # Cheapest fit; a tiny premium on other families keeps equal-price moves in family
+            price = np.where(fits, specs['hourly'].to_numpy()[None, :] * np.where(same_family, 1.0, 1.0001), np.inf)
+            best = np.argmin(price, axis=1)
+            any_fit = np.isfinite(price[np.arange(len(group)), best])
+            # Nothing fits: largest size of the family as the upsize target
+            largest = np.argmax(np.where(same_family, size_vcpu * 1000 + specs['memory_gib'].to_numpy()[None, :], -1), axis=1)
+            best = np.where(any_fit, best, largest)
+
+            recommended = specs.iloc[best]
+            current_monthly = current['hourly'].to_numpy() * HOURS_PER_MONTH
+            recommended_monthly = recommended['hourly'].to_numpy() * HOURS_PER_MONTH
+            savings = current_monthly - recommended_monthly
+            larger = (recommended['vcpu'].to_numpy() > vcpu) | (recommended['memory_gib'].to_numpy() > memory)
+            # Upsize only happens when the current size does not fit (otherwise it is a candidate itself)
+            action = np.select(
+                [no_data,
+                 ~any_fit & ~larger,
+                 savings <= -self.min_savings,
+                 np.abs(savings) < self.min_savings,
+                 recommended['family'].to_numpy() != current['family'].to_numpy()],
+                ['Insufficient data', 'Keep', 'Upsize', 'Keep', 'Change family'], 'Downsize')
+            hold = np.isin(action, NO_CHANGE)
+            frames.append(group.assign(
+                recommended_type=np.where(hold, current.index.to_numpy(), recommended['type'].to_numpy()),
+                action=action,
+                current_monthly=current_monthly,
+                recommended_monthly=np.where(hold, current_monthly, recommended_monthly),
+                monthly_savings=np.where(hold, 0.0, savings)
+            ))
+
+        if not frames:
+            return pd.DataFrame(columns=UTILIZATION_COLUMNS + ['recommended_type', 'action', 'current_monthly',
+                                                               'recommended_monthly', 'monthly_savings',
+                                                               'confidence', 'priority'])
+        results = pd.concat(frames, ignore_index=True)
+        results['confidence'] = np.where(results['action'] == 'Unknown type', 0.0, self.confidence(results))
+        results['priority'] = np.select(
+            [(results['action'] == 'Upsize') & (results['cpu_p95'] >= 90),
+             (results['monthly_savings'] >= 100) & (results['confidence'] >= 0.7),
+             results['monthly_savings'] >= 25],
+            ['High', 'High', 'Medium'], 'Low')
+        return results.sort_values('monthly_savings', ascending=False, ignore_index=True)
+
+
+# ============= UTILIZATION SOURCES =============
+
+class CloudWatchUtilizationSource:
+    """EC2 and RDS utilization from CloudWatch GetMetricData, hourly, many instances per call"""
+
+    QUERIES_PER_CALL = 100  # 100 x 720 hourly points stays under the per-call datapoint limit
+    METRICS = ('cpu', 'netin', 'netout', 'mem', 'free')
+
+    def __init__(self, sessions: Callable[[], List[Tuple[str, str, object]]], days: int = 30, max_workers: int = 8):
+        """
+        Initialize source
+
+        Args:
+            sessions: Callable () -> (account name, region, boto3 session) per account / region
+                to scan; called on every pull so assumed-role credentials are current
+            days: Look-back window (14-30 days)
+            max_workers: Concurrent GetMetricData calls
+        """
+        self.sessions = sessions
+        self.days = days
+        self.max_workers = max_workers
+
+    @staticmethod
+    def _agent_dimensions(session, region: str) -> Dict[str, List[Dict]]:
+        """
+        InstanceId -> dimension set of its CloudWatch agent mem_used_percent metric
+
+        The agent appends ImageId / InstanceType (and AutoScalingGroupName) to
+        InstanceId by default, and MetricStat only matches an exact dimension
+        set, so the sets are looked up once per region. The smallest set
+        containing InstanceId wins. Without ListMetrics access no memory is read.
+        """
+        found: Dict[str, List[Dict]] = {}
+        try:
+            cloudwatch = session.client('cloudwatch', region_name=region)
+            for page in cloudwatch.get_paginator('list_metrics').paginate(
+                    Namespace='CWAgent', MetricName='mem_used_percent'):
+                for metric in page['Metrics']:
+                    dimensions = metric.get('Dimensions', [])
+                    instance_id = next((d['Value'] for d in dimensions if d['Name'] == 'InstanceId'), None)
+                    if instance_id and len(dimensions) < len(found.get(instance_id, dimensions + [None])):
+                        found[instance_id] = dimensions
+        except Exception:
+            return {}
+        return found
+
+    @staticmethod
+    def _inventory(scope: str, region: str, session) -> List[Dict]:
+        """Running EC2 instances and available RDS instances in one account / region"""
+        rows = []
+        agent_dimensions = CloudWatchUtilizationSource._agent_dimensions(session, region)
+        ec2 = session.client('ec2', region_name=region)
+        for page in ec2.get_paginator('describe_instances').paginate(
+                Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    name = next((t['Value'] for t in instance.get('Tags', []) if t['Key'] == 'Name'), instance['InstanceId'])
+                    rows.append({'resource_id': instance['InstanceId'], 'name': name, 'platform': 'ec2',
+                                 'scope': scope, 'region': region, 'instance_type': instance['InstanceType'],
+                                 'mem_dimensions': agent_dimensions.get(instance['InstanceId'])})
+        rds = session.client('rds', region_name=region)
+        for page in rds.get_paginator('describe_db_instances').paginate():
+            for db in page['DBInstances']:
+                if db['DBInstanceStatus'] == 'available':
+                    rows.append({'resource_id': db['DBInstanceIdentifier'], 'name': db['DBInstanceIdentifier'],
+                                 'platform': 'rds', 'scope': scope, 'region': region,
+                                 'instance_type': db['DBInstanceClass']})
+        return rows
+
+    @staticmethod
+    def _queries(row: Dict, index: int) -> List[Dict]:
+        """
+        GetMetricData queries for one instance (ids encode row index and metric)
+
+        EC2 memory is queried only when the CloudWatch agent reports it, with
+        the agent's own dimension set (row['mem_dimensions']).
+        """
+        if row['platform'] == 'ec2':
+            instance = [{'Name': 'InstanceId', 'Value': row['resource_id']}]
+            metrics = [('cpu', 'AWS/EC2', 'CPUUtilization', 'Maximum', instance),
+                       ('netin', 'AWS/EC2', 'NetworkIn', 'Sum', instance),
+                       ('netout', 'AWS/EC2', 'NetworkOut', 'Sum', instance)]
+            if row.get('mem_dimensions'):
+                metrics.append(('mem', 'CWAgent', 'mem_used_percent', 'Maximum', row['mem_dimensions']))
+        else:
+            namespace, instance = 'AWS/RDS', [{'Name': 'DBInstanceIdentifier', 'Value': row['resource_id']}]
+            metrics = [('cpu', namespace, 'CPUUtilization', 'Maximum', instance),
+                       ('netin', namespace, 'NetworkReceiveThroughput', 'Average', instance),
+                       ('netout', namespace, 'NetworkTransmitThroughput', 'Average', instance),
+                       ('free', namespace, 'FreeableMemory', 'Minimum', instance)]
+        return [{
+            'Id': f"{metric}_{index}",
+            'MetricStat': {
+                'Metric': {'Namespace': ns, 'MetricName': name, 'Dimensions': dimensions},
+                'Period': 3600,
+                'Stat': stat
+            },
+            'ReturnData': True
+        } for metric, ns, name, stat, dimensions in metrics]
+
+    def _fetch(self, session, region: str, queries: List[Dict], start: datetime, end: datetime) -> Dict[str, Tuple]:
+        """Query id -> (datetime64[s] UTC timestamps, float32 values), following NextToken"""
+        client = session.client('cloudwatch', region_name=region)
+        pages = {}
+        kwargs = {'MetricDataQueries': queries, 'StartTime': start, 'EndTime': end, 'ScanBy': 'TimestampAscending'}
+        while True:
+            response = client.get_metric_data(**kwargs)
+            for result in response['MetricDataResults']:
+                timestamps = pd.to_datetime(result['Timestamps'], utc=True).tz_localize(None)
+                timestamps_list, values_list = pages.setdefault(result['Id'], ([], []))
+                timestamps_list.append(timestamps.values.astype('datetime64[s]'))
+                values_list.append(np.asarray(result['Values'], dtype='float32'))
+            if not response.get('NextToken'):
+                break
+            kwargs['NextToken'] = response['NextToken']
+        return {query_id: (np.concatenate(timestamps), np.concatenate(values))
+                for query_id, (timestamps, values) in pages.items()}
+
+    def _reduce(self, rows: List[Dict], results: Dict[str, Tuple], start: datetime) -> pd.DataFrame:
+        """Utilization frame for one batch of instances from its GetMetricData results"""
+        hours = self.days * 24
+        inventory = pd.DataFrame(rows, columns=['resource_id', 'name', 'platform', 'scope', 'region', 'instance_type'])
+        matrices = {metric: np.full((len(rows), hours), np.nan, dtype='float32') for metric in self.METRICS}
+        origin = np.datetime64(start.replace(tzinfo=None), 's')
+        for query_id, (timestamps, values) in results.items():
+            metric, row = query_id.rsplit('_', 1)
+            slots = (timestamps - origin) // np.timedelta64(3600, 's')
+            keep = (slots >= 0) & (slots < hours)
+            matrices[metric][int(row), slots[keep]] = values[keep]
+
+        rds = (inventory['platform'] == 'rds').to_numpy()
+        memory_gib = INSTANCE_SPECS.set_index('type')['memory_gib'].reindex(inventory['instance_type']).to_numpy()
+        memory = np.where(rds[:, None], 100 * (1 - matrices['free'] / (memory_gib[:, None] * GIB)), matrices['mem'])
+        # EC2 reports bytes per hour (Sum), RDS bytes per second (Average)
+        bytes_per_second = np.where(rds[:, None], matrices['netin'] + matrices['netout'],
+                                    (matrices['netin'] + matrices['netout']) / 3600)
+        return build_utilization(inventory, matrices['cpu'], memory, bytes_per_second * 8 / 1e9, self.days)
+
+    def __call__(self) -> pd.DataFrame:
+        """
+        Utilization frame for every instance in every account / region
+
+        Each GetMetricData call covers whole instances and is reduced to
+        percentiles as soon as it returns, so only one batch of hourly
+        matrices per worker is held at a time.
+        """
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=self.days)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            scanned = list(pool.map(lambda s: (s, self._inventory(*s)), self.sessions()))
+        per_call = self.QUERIES_PER_CALL // 4  # four metrics per instance
+        batches = [(session, region, rows[i:i + per_call])
+                   for (_, region, session), rows in scanned for i in range(0, len(rows), per_call)]
+
+        def run(batch):
+            session, region, rows = batch
+            queries = [q for i, row in enumerate(rows) for q in self._queries(row, i)]
+            return self._reduce(rows, self._fetch(session, region, queries, start, end), start)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            frames = list(pool.map(run, batches))
+        if not frames:
+            return self._reduce([], {}, start)
+        return pd.concat(frames, ignore_index=True)
+
+
+class AzureMonitorUtilizationSource:
+    """Azure VM utilization from the inventory snapshot and the batched metrics engine"""
+
+    def __init__(self, inventory, metrics_engine, days: int = 30):
+        """
+        Initialize source
+
+        Args:
+            inventory: AzureInventoryEngine (VM list and sizes)
+            metrics_engine: BatchedMetricsEngine
+            days: Look-back window (14-30 days)
+        """
+        self.inventory = inventory
+        self.metrics_engine = metrics_engine
+        self.days = days
+
+    def __call__(self) -> pd.DataFrame:
+        """Utilization frame for every VM"""
+        vms = self.inventory.resources_by_type('microsoft.compute/virtualmachines')
+        inventory = pd.DataFrame([{
+            'resource_id': vm['id'].lower(),
+            'name': vm['name'],
+            'platform': 'azure',
+            'scope': vm.get('subscriptionId', ''),
+            'region': vm.get('location', ''),
+            'instance_type': ((vm.get('properties') or {}).get('hardwareProfile') or {}).get('vmSize', '')
+        } for vm in vms], columns=['resource_id', 'name', 'platform', 'scope', 'region', 'instance_type'])
+        resources = list(zip(inventory['resource_id'], inventory['region']))
+        timespan, interval = timedelta(days=self.days), timedelta(hours=1)
+
+        def matrix(metric: str, aggregation: str) -> np.ndarray:
+            results = self.metrics_engine.fetch(resources, [metric], timespan, interval, aggregation)
+            ids, _, values = self.metrics_engine.to_matrix(results, metric)
+            out = np.full((len(inventory), self.days * 24), np.nan)
+            if len(ids):
+                rows = pd.Index(inventory['resource_id']).get_indexer([i.lower() for i in ids])
+                width = min(values.shape[1], out.shape[1])
+                out[rows[rows >= 0], -width:] = values[rows >= 0, -width:]
+            return out
+
+        cpu = matrix('Percentage CPU', 'Maximum')
+        available = matrix('Available Memory Bytes', 'Minimum')
+        network = matrix('Network In Total', 'Total') + matrix('Network Out Total', 'Total')
+        memory_gib = INSTANCE_SPECS.set_index('type')['memory_gib'].reindex(inventory['instance_type']).to_numpy()
+        memory = 100 * (1 - available / (memory_gib[:, None] * GIB))
+        return build_utilization(inventory, cpu, memory, network * 8 / 3600 / 1e9, self.days)
+
+
+class DemoUtilizationSource:
+    """Deterministic synthetic fleet with hourly utilization"""
+
+    def __init__(self, platforms: Sequence[str] = ('ec2', 'rds'), count: int = 600, days: int = 30, seed: int = 5):
+        self.platforms = list(platforms)
+        self.count = count
+        self.days = days
+        self.seed = seed
+
+    def __call__(self) -> pd.DataFrame:
+        rng = np.random.default_rng(self.seed)
+        specs = INSTANCE_SPECS[INSTANCE_SPECS['platform'].isin(self.platforms)].reset_index(drop=True)
+        picks = specs.iloc[rng.integers(0, len(specs), self.count)].reset_index(drop=True)
+        scopes = {'ec2': ['Production', 'Staging', 'Development'], 'rds': ['Production', 'Staging'],
+                  'azure': ['Production', 'Development']}
+        inventory = pd.DataFrame({
+            'resource_id': [f"{p}-{i:05d}" for i, p in enumerate(picks['platform'])],
+            'name': [f"{'db' if p == 'rds' else 'app'}-{i:05d}" for i, p in enumerate(picks['platform'])],
+            'platform': picks['platform'],
+            'scope': [scopes[p][i % len(scopes[p])] for i, p in enumerate(picks['platform'])],
+            'region': np.where(picks['platform'] == 'azure', 'eastus', 'us-east-1'),
+            'instance_type': picks['type']
+        })
+
+        hours = self.days * 24
+        # Most fleets are over-provisioned: typical load 5-40%, a few hot instances
+        level = rng.beta(1.4, 6, self.count) * 100
+        hot = rng.random(self.count) < 0.05
+        level = np.where(hot, rng.uniform(75, 95, self.count), level)
+        daily = 1 + 0.25 * np.sin(np.arange(hours) * 2 * np.pi / 24)[None, :]
+        noise = rng.gamma(16, 1 / 16, (self.count, hours))
+        cpu = np.clip(level[:, None] * daily * noise, 0, 100)
+        memory = np.clip(rng.uniform(15, 70, self.count)[:, None] + rng.normal(0, 3, (self.count, hours)), 0, 100)
+        # EC2 memory needs the CloudWatch agent; roughly a third of instances lack it
+        memory[(inventory['platform'] == 'ec2').to_numpy() & (rng.random(self.count) < 0.35)] = np.nan
+        network = picks['network_gbps'].to_numpy()[:, None] * rng.beta(1.2, 30, (self.count, 1)) * noise
+        # Some instances were launched mid-window or missed samples
+        missing = rng.random((self.count, hours)) < rng.choice([0.0, 0.02, 0.4], self.count, p=[0.7, 0.2, 0.1])[:, None]
+        cpu[missing] = np.nan
+        return build_utilization(inventory, cpu, memory, network, self.days)
+
+
+# ============= SERVICE =============
+
+class RightsizingService:
+    """
+    Runs the rightsizing pass over a utilization source and persists the results.
+
+    Results are recomputed when older than ttl; the persisted copy serves
+    restarts without re-pulling metrics. A failed pull keeps the last results.
+    """
+
+    def __init__(self, source, engine: Optional[RightsizingEngine] = None, path: Optional[str] = None,
+                 ttl: float = 24 * 3600, retry_after: float = 15 * 60):
+        """
+        Initialize service
+
+        Args:
+            source: Callable () -> utilization frame
+            engine: Rightsizing engine (default settings when None)
+            path: File to persist results in (memory only if None)
+            ttl: Seconds between automatic refreshes
+            retry_after: Seconds to wait after a failed pull before trying again
+        """
+        self.source = source
+        self.engine = engine or RightsizingEngine()
+        self.path = path
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.last_error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self.refresh_lock = threading.Lock()
+        self.frame: Optional[pd.DataFrame] = None
+        self.refreshed_at = 0.0
+        self._load()
+
+    def refresh(self, force: bool = False) -> pd.DataFrame:
+        """
+        Current results (recomputed when stale or forced)
+
+        A failed pull (e.g. expired credentials or throttling) is recorded in
+        last_error and not retried for retry_after unless forced; the last
+        results (empty before the first success) are served meanwhile.
+        """
+        with self.refresh_lock:
+            now = time.time()
+            stale = force or self.frame is None or now - self.refreshed_at > self.ttl
+            if stale and (force or self.failed_at is None or now - self.failed_at >= self.retry_after):
+                try:
+                    self.frame = self.engine.recommend(self.source())
+                    self.refreshed_at = time.time()
+                    self.last_error, self.failed_at = None, None
+                    self._save()
+                except Exception as e:
+                    self.last_error, self.failed_at = str(e), now
+            if self.frame is None:
+                self.frame = self.engine.recommend(pd.DataFrame(columns=UTILIZATION_COLUMNS))
+            return self.frame
+
+    def recommendations(self, scope: Optional[str] = None, min_confidence: float = 0.0) -> pd.DataFrame:
+        """Actionable recommendations (everything but Keep / Insufficient data), highest savings first"""
+        frame = self.refresh()
+        mask = ~frame['action'].isin(NO_CHANGE) & (frame['confidence'] >= min_confidence)
+        if scope:
+            mask &= frame['scope'].str.lower() == scope.lower()
+        return frame[mask]
+
+    def summary(self, scope: Optional[str] = None) -> Dict:
+        """Instance counts and savings by action"""
+        frame = self.refresh()
+        if scope:
+            frame = frame[frame['scope'].str.lower() == scope.lower()]
+        savings = frame[frame['monthly_savings'] > 0]
+        return {
+            'instances': len(frame),
+            'actionable': int((~frame['action'].isin(NO_CHANGE)).sum()),
+            'insufficient_data': int((frame['action'] == 'Insufficient data').sum()),
+            'unknown_type': int((frame['action'] == 'Unknown type').sum()),
+            'monthly_savings': float(savings['monthly_savings'].sum()),
+            'high_confidence_savings': float(savings.loc[savings['confidence'] >= 0.7, 'monthly_savings'].sum()),
+            'upsize': int((frame['action'] == 'Upsize').sum()),
+            'by_action': frame.groupby('action')['monthly_savings'].agg(['count', 'sum']).to_dict('index'),
+            'refreshed_at': datetime.fromtimestamp(self.refreshed_at) if self.refreshed_at else None,
+            'last_error': self.last_error
+        }
+
+    def _save(self):
+        """Persist results (caller holds the lock)"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        frame = self.frame.assign(refreshed_at=self.refreshed_at)
+        if PARQUET_AVAILABLE:
+            frame.to_parquet(tmp)
+        else:
+            frame.to_pickle(tmp)
+        os.replace(tmp, self.path)
+
+    def _load(self):
+        """Load persisted results if present"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        frame = pd.read_parquet(self.path) if PARQUET_AVAILABLE else pd.read_pickle(self.path)
+        self.refreshed_at = float(frame['refreshed_at'].iloc[0]) if len(frame) else 0.0
+        self.frame = frame.drop(columns='refreshed_at')
+
+
+def _results_path(provider: str, scope: str) -> Optional[str]:
+    """Results file under RIGHTSIZING_PATH for the available format"""
+    directory = os.environ.get('RIGHTSIZING_PATH')
+    if not directory:
+        return None
+    name = f"rightsizing_{provider}_{scope}"
+    return os.path.join(directory, f"{name}.parquet" if PARQUET_AVAILABLE else f"{name}.pkl")
+
+
+@st.cache_resource
+def _rightsizing_service(provider: str, scope: str, _account_mgr) -> RightsizingService:
+    """Rightsizing service for one provider and credential scope"""
+    if provider == 'azure':
+        from azure_resource_graph import get_azure_inventory
+        from azure_monitor_metrics import get_metrics_engine
+        inventory, engine = get_azure_inventory(), get_metrics_engine()
+        if inventory is None or engine is None:
+            return RightsizingService(DemoUtilizationSource(['azure'], count=300))
+        return RightsizingService(AzureMonitorUtilizationSource(inventory, engine), path=_results_path(provider, scope))
+
+    if scope == 'demo':
+        return RightsizingService(DemoUtilizationSource())
+    from config_settings import AppConfig
+
+    def sessions() -> List[Tuple[str, str, object]]:
+        # Resolved on every pull: assumed-role credentials expire after an hour
+        resolved = []
+        for account in AppConfig.load_aws_accounts():
+            session = _account_mgr.get_session_with_region(account.account_name, account.region)
+            if session is not None:
+                resolved.append((account.account_name, account.region, session))
+        return resolved
+
+    return RightsizingService(CloudWatchUtilizationSource(sessions), path=_results_path(provider, scope))
+
+
+def get_rightsizing_service(provider: str = 'aws') -> RightsizingService:
+    """
+    Get the rightsizing service for 'aws' (EC2 + RDS) or 'azure' (VMs)
+
+    One service per credential scope, so sessions never share another
+    account's results. Falls back to a synthetic fleet without cloud access.
+    RIGHTSIZING_PATH persists results between restarts.
+    """
+    if provider == 'azure':
+        from azure_resource_graph import get_azure_inventory
+        from azure_monitor_metrics import get_metrics_engine
+        live = get_azure_inventory() is not None and get_metrics_engine() is not None
+        return _rightsizing_service(provider, 'live' if live else 'demo', None)
+
+    from core_account_manager import get_account_manager
+    from aws_cost_cube import credential_scope
+    account_mgr = get_account_manager()
+    return _rightsizing_service(provider, credential_scope(account_mgr), account_mgr)
@@ -0,0 +1,565 @@
+"""
+Security Group Rule Analyzer
+Normalized, indexed view of security group rules across accounts and regions
+
+Features:
+- Normalizes IpPermissions into one rule per (protocol, port range, source)
+- Port interval trees per protocol for stabbing / overlap queries
+- CIDR index (hash per prefix length + sorted ranges) for containment queries
+- Exposure queries ("which groups expose 22/tcp to 0.0.0.0/0"), tcp and udp,
+  including all-traffic and all-ports rules
+- ENI reachability ("what can reach this ENI")
+- Redundant / shadowed rule detection
+- Paginated multi-account, multi-region collection
+"""
+
+import streamlit as st
+import ipaddress
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+ALL_PROTOCOLS = '-1'
+MAX_PORT = 65535
+
+# Ports commonly flagged when open to the internet
+SENSITIVE_PORTS = {
+    22: 'SSH', 3389: 'RDP', 3306: 'MySQL', 5432: 'PostgreSQL', 1433: 'SQL Server',
+    1521: 'Oracle', 27017: 'MongoDB', 6379: 'Redis', 9200: 'Elasticsearch', 23: 'Telnet'
+}
+
+PROTOCOL_NAMES = {'6': 'tcp', '17': 'udp', '1': 'icmp', '58': 'icmpv6'}
+
+# Port-based protocols checked by the internet exposure report
+EXPOSURE_PROTOCOLS = ('tcp', 'udp')
+
+@dataclass
+class NormalizedRule:
+    """A single security group rule with one source"""
+    rule_id: int
+    account_id: str
+    region: str
+    vpc_id: Optional[str]
+    group_id: str
+    group_name: str
+    direction: str  # 'ingress' or 'egress'
+    protocol: str  # 'tcp', 'udp', 'icmp', ... or '-1'
+    from_port: int
+    to_port: int
+    source: str  # CIDR, security group ID or prefix list ID
+    source_type: str  # 'cidr4', 'cidr6', 'sg', 'prefix_list'
+    description: str = ''
+    # Address range of a CIDR source (inclusive integers)
+    range_start: int = 0
+    range_end: int = 0
+    prefix_len: int = 0
+
+    @property
+    def port_label(self) -> str:
+        """Human-readable port range"""
+        if self.protocol == ALL_PROTOCOLS:
+            return 'All'
+        if self.from_port == self.to_port:
+            return str(self.from_port)
+        if self.from_port == 0 and self.to_port == MAX_PORT:
+            return 'All'
+        return f"{self.from_port}-{self.to_port}"
+
+    def to_dict(self) -> Dict:
+        """Row for display"""
+        return {
+            'Account': self.account_id,
+            'Region': self.region,
+            'VPC': self.vpc_id,
+            'Group ID': self.group_id,
+            'Group Name': self.group_name,
+            'Direction': self.direction,
+            'Protocol': 'All' if self.protocol == ALL_PROTOCOLS else self.protocol,
+            'Ports': self.port_label,
+            'Source': self.source,
+            'Description': self.description
+        }
+
+
+class IntervalTree:
+    """Static centered interval tree over inclusive integer intervals"""
+
+    def __init__(self, intervals: List[Tuple[int, int, int]]):
+        """
+        Build tree
+
+        Args:
+            intervals: List of (start, end, item_id)
+        """
+        self.root = self._build(intervals)
+        self.size = len(intervals)
+
+    def _build(self, intervals):
+        """Recursively build a node: (center, by_start, by_end, left, right)"""
+        if not intervals:
+            return None
+        points = sorted(p for s, e, _ in intervals for p in (s, e))
+        center = points[len(points) // 2]
+
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        by_start = sorted(here, key=lambda i: i[0])
+        by_end = sorted(here, key=lambda i: -i[1])
+        return (center, by_start, by_end, self._build(left), self._build(right))
+
+    def stab(self, point: int) -> List[int]:
+        """IDs of intervals containing point"""
+        return self.overlap(point, point)
+
+    def overlap(self, lo: int, hi: int) -> List[int]:
+        """IDs of intervals overlapping [lo, hi]"""
+        result = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            center, by_start, by_end, left, right = node
+            if hi < center:
+                for start, _, item in by_start:
+                    if start > hi:
+                        break
+                    result.append(item)
+                stack.append(left)
+            elif lo > center:
+                for _, end, item in by_end:
+                    if end < lo:
+                        break
+                    result.append(item)
+                stack.append(right)
+            else:
+                result.extend(item for _, _, item in by_start)
+                stack.append(left)
+                stack.append(right)
+        return result
+
+
+class CidrIndex:
+    """
+    CIDR containment index
+
+    Prefixes are stored in a hash table per prefix length, so "which rules
+    contain address/prefix X" is at most one lookup per distinct prefix
+    length (<= 33 for IPv4). A sorted range array answers "which rules fall
+    inside prefix X" with binary search.
+    """
+
+    def __init__(self, bits: int):
+        """
+        Initialize index
+
+        Args:
+            bits: Address width (32 for IPv4, 128 for IPv6)
+        """
+        self.bits = bits
+        self._by_length: Dict[int, Dict[int, List[int]]] = {}
+        self._ranges: List[Tuple[int, int, int]] = []
+        self._starts: List[int] = []
+        self._sorted = True
+
+    def add(self, network: int, prefix_len: int, end: int, item: int):
+        """Add a prefix (network address as int) for item"""
+        key = network >> (self.bits - prefix_len) if prefix_len else 0
+        self._by_length.setdefault(prefix_len, {}).setdefault(key, []).append(item)
+        self._ranges.append((network, end, item))
+        self._sorted = False
+
+    def containing(self, network: int, prefix_len: int) -> List[int]:
+        """Items whose prefix contains the given prefix"""
+        result = []
+        for length, table in self._by_length.items():
+            if length <= prefix_len:
+                key = network >> (self.bits - length) if length else 0
+                result.extend(table.get(key, []))
+        return result
+
+    def within(self, network: int, end: int) -> List[int]:
+        """Items whose prefix lies inside [network, end]"""
+        if not self._sorted:
+            self._ranges.sort()
+            self._starts = [r[0] for r in self._ranges]
+            self._sorted = True
+        lo = bisect_left(self._starts, network)
+        hi = bisect_right(self._starts, end)
+        return [item for _, r_end, item in self._ranges[lo:hi] if r_end <= end]
+
+
+class SecurityGroupRuleAnalyzer:
+    """
+    Rule analysis engine over normalized security group rules.
+
+    Build once per collection (cached), then run exposure, reachability and
+    redundancy queries against the indexes instead of re-walking raw
+    IpPermissions.
+    """
+
+    def __init__(self):
+        """Initialize empty analyzer"""
+        self.rules: List[NormalizedRule] = []
+        self.groups: Dict[str, Dict] = {}
+        self.enis: Dict[str, Dict] = {}
+        self._port_trees: Dict[Tuple[str, str], IntervalTree] = {}
+        self._cidr4 = CidrIndex(32)
+        self._cidr6 = CidrIndex(128)
+        self._by_group: Dict[Tuple[str, str], List[int]] = {}
+        self._by_source_group: Dict[str, List[int]] = {}
+        self._enis_by_group: Dict[str, List[str]] = {}
+
+    # ============= INGESTION =============
+
+    def add_security_groups(self, security_groups: List[Dict], account_id: str = '', region: str = ''):
+        """
+        Normalize raw describe_security_groups entries
+
+        Accepts either the raw EC2 shape (GroupId, IpPermissions, ...) or the
+        VPCManager.list_security_groups shape (group_id, ingress_rules, ...).
+        """
+        for sg in security_groups:
+            group_id = sg.get('GroupId') or sg.get('group_id')
+            group_name = sg.get('GroupName') or sg.get('group_name', '')
+            vpc_id = sg.get('VpcId') or sg.get('vpc_id')
+            self.groups[group_id] = {
+                'group_id': group_id, 'group_name': group_name, 'vpc_id': vpc_id,
+                'account_id': account_id or sg.get('OwnerId', ''), 'region': region
+            }
+            for direction, permissions in (
+                ('ingress', sg.get('IpPermissions', sg.get('ingress_rules', []))),
+                ('egress', sg.get('IpPermissionsEgress', sg.get('egress_rules', [])))
+            ):
+                for permission in permissions or []:
+                    self._add_permission(permission, direction, group_id, group_name,
+                                         vpc_id, self.groups[group_id]['account_id'], region)
+        self._port_trees = {}
+
+    def add_network_interfaces(self, interfaces: List[Dict]):
+        """Register ENIs (raw describe_network_interfaces entries) for reachability queries"""
+        for eni in interfaces:
+            eni_id = eni['NetworkInterfaceId']
+            group_ids = [g['GroupId'] for g in eni.get('Groups', [])]
+            self.enis[eni_id] = {
+                'eni_id': eni_id,
+                'private_ip': eni.get('PrivateIpAddress'),
+                'public_ip': (eni.get('Association') or {}).get('PublicIp'),
+                'vpc_id': eni.get('VpcId'),
+                'group_ids': group_ids,
+                'description': eni.get('Description', '')
+            }
+            for group_id in group_ids:
+                self._enis_by_group.setdefault(group_id, []).append(eni_id)
+
+    def _add_permission(self, permission: Dict, direction: str, group_id: str, group_name: str,
+                        vpc_id: Optional[str], account_id: str, region: str):
+        """Split one IpPermission into one NormalizedRule per source"""
+        protocol = str(permission.get('IpProtocol', ALL_PROTOCOLS)).lower()
+        protocol = PROTOCOL_NAMES.get(protocol, protocol)
+        if protocol == ALL_PROTOCOLS:
+            from_port, to_port = 0, MAX_PORT
+        else:
+            from_port = permission.get('FromPort', 0)
+            to_port = permission.get('ToPort', MAX_PORT)
+            if from_port is None or from_port < 0:
+                from_port = 0
+            if to_port is None or to_port < 0:
+                to_port = MAX_PORT
+
+        base = dict(account_id=account_id, region=region, vpc_id=vpc_id, group_id=group_id,
+                    group_name=group_name, direction=direction, protocol=protocol,
+                    from_port=from_port, to_port=to_port)
+
+        for ip_range in permission.get('IpRanges', []):
+            self._add_cidr_rule(base, ip_range['CidrIp'], ip_range.get('Description', ''))
+        for ip_range in permission.get('Ipv6Ranges', []):
+            self._add_cidr_rule(base, ip_range['CidrIpv6'], ip_range.get('Description', ''))
+        for pair in permission.get('UserIdGroupPairs', []):
+            rule = self._append(NormalizedRule(rule_id=len(self.rules), source=pair['GroupId'],
+                                               source_type='sg', description=pair.get('Description', ''),
+                                               **base))
+            self._by_source_group.setdefault(pair['GroupId'], []).append(rule.rule_id)
+        for prefix_list in permission.get('PrefixListIds', []):
+            self._append(NormalizedRule(rule_id=len(self.rules), source=prefix_list['PrefixListId'],
+                                        source_type='prefix_list',
+                                        description=prefix_list.get('Description', ''), **base))
+
+    def _add_cidr_rule(self, base: Dict, cidr: str, description: str):
+        """Add a CIDR-sourced rule to the rule list and CIDR index"""
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            return
+        rule = self._append(NormalizedRule(
+            rule_id=len(self.rules), source=str(network),
+            source_type='cidr4' if network.version == 4 else 'cidr6',
+            description=description,
+            range_start=int(network.network_address),
+            range_end=int(network.broadcast_address),
+            prefix_len=network.prefixlen, **base
+        ))
+        index = self._cidr4 if network.version == 4 else self._cidr6
+        index.add(rule.range_start, rule.prefix_len, rule.range_end, rule.rule_id)
+
+    def _append(self, rule: NormalizedRule) -> NormalizedRule:
+        """Append rule and index it by (group, direction)"""
+        self.rules.append(rule)
+        self._by_group.setdefault((rule.group_id, rule.direction), []).append(rule.rule_id)
+        return rule
+
+    def _port_tree(self, direction: str, protocol: str) -> IntervalTree:
+        """Port interval tree for (direction, protocol), built lazily"""
+        key = (direction, protocol)
+        if key not in self._port_trees:
+            self._port_trees[key] = IntervalTree([
+                (r.from_port, r.to_port, r.rule_id) for r in self.rules
+                if r.direction == direction and r.protocol == protocol
+            ])
+        return self._port_trees[key]
+
+    # ============= QUERIES =============
+
+    def rules_allowing(self, port: int, protocol: str = 'tcp', direction: str = 'ingress',
+                       to_port: Optional[int] = None) -> Set[int]:
+        """Rule IDs whose port range overlaps [port, to_port] for protocol (incl. all-traffic rules)"""
+        hi = port if to_port is None else to_port
+        ids = set(self._port_tree(direction, protocol).overlap(port, hi))
+        if protocol != ALL_PROTOCOLS:
+            ids.update(self._port_tree(direction, ALL_PROTOCOLS).overlap(port, hi))
+        return ids
+
+    def rules_from_cidr(self, cidr: str) -> Set[int]:
+        """Rule IDs whose CIDR source contains cidr"""
+        network = ipaddress.ip_network(cidr, strict=False)
+        index = self._cidr4 if network.version == 4 else self._cidr6
+        return set(index.containing(int(network.network_address), network.prefixlen))
+
+    def rules_within_cidr(self, cidr: str) -> Set[int]:
+        """Rule IDs whose CIDR source lies inside cidr (e.g. all rules sourcing a VPC range)"""
+        network = ipaddress.ip_network(cidr, strict=False)
+        index = self._cidr4 if network.version == 4 else self._cidr6
+        return set(index.within(int(network.network_address), int(network.broadcast_address)))
+
+    def exposed(self, port: int, protocol: str = 'tcp', cidr: str = '0.0.0.0/0',
+                direction: str = 'ingress') -> List[NormalizedRule]:
+        """
+        Rules exposing port/protocol to cidr
+
+        Example: exposed(22, 'tcp', '0.0.0.0/0') lists every rule that opens
+        SSH to the whole internet.
+        """
+        by_cidr = self.rules_from_cidr(cidr)
+        if not by_cidr:
+            return []
+        by_port = self.rules_allowing(port, protocol, direction)
+        return [self.rules[i] for i in sorted(by_cidr & by_port)]
+
+    def internet_exposure(self, ports: Optional[Dict[int, str]] = None) -> List[Dict]:
+        """
+        Ingress rules open to 0.0.0.0/0 or ::/0, one row per rule
+
+        A rule is reported when it reaches a sensitive port over tcp or udp
+        (all-traffic rules included), or when it opens every port.
+        """
+        ports = ports or SENSITIVE_PORTS
+        hits: Dict[int, Set[int]] = {}
+        for cidr in ('0.0.0.0/0', '::/0'):
+            for protocol in EXPOSURE_PROTOCOLS:
+                for port in ports:
+                    for rule in self.exposed(port, protocol, cidr):
+                        hits.setdefault(rule.rule_id, set()).add(port)
+            for rule_id in self.rules_from_cidr(cidr):
+                if self._opens_all_ports(self.rules[rule_id]):
+                    hits.setdefault(rule_id, set())
+
+        rows = []
+        for rule_id in sorted(hits):
+            rule = self.rules[rule_id]
+            row = rule.to_dict()
+            if self._opens_all_ports(rule):
+                row['Exposed Port'] = 'All'
+                row['Service'] = 'All traffic' if rule.protocol == ALL_PROTOCOLS else f"All {rule.protocol} ports"
+            else:
+                row['Exposed Port'] = ', '.join(str(p) for p in sorted(hits[rule_id]))
+                row['Service'] = ', '.join(ports[p] for p in sorted(hits[rule_id]))
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def _opens_all_ports(rule: NormalizedRule) -> bool:
+        """True for ingress all-traffic rules and tcp/udp rules spanning every port"""
+        if rule.direction != 'ingress':
+            return False
+        if rule.protocol == ALL_PROTOCOLS:
+            return True
+        return rule.protocol in EXPOSURE_PROTOCOLS and rule.from_port == 0 and rule.to_port == MAX_PORT
+
+    def can_reach_eni(self, eni_id: str, port: Optional[int] = None,
+                      protocol: str = 'tcp') -> List[Dict]:
+        """
+        Ingress sources that can reach an ENI
+
+        Args:
+            eni_id: Network interface ID
+            port: Optional port filter
+            protocol: Protocol used with port
+
+        Returns:
+            List of dicts with rule and, for SG-referenced sources, the
+            ENIs in the referenced group
+        """
+        eni = self.enis.get(eni_id)
+        if not eni:
+            return []
+
+        port_ids = self.rules_allowing(port, protocol) if port is not None else None
+        result = []
+        for group_id in eni['group_ids']:
+            for rule_id in self._by_group.get((group_id, 'ingress'), []):
+                if port_ids is not None and rule_id not in port_ids:
+                    continue
+                rule = self.rules[rule_id]
+                result.append({
+                    'rule': rule,
+                    'source_enis': self._enis_by_group.get(rule.source, []) if rule.source_type == 'sg' else []
+                })
+        return result
+
+    def referencing_rules(self, group_id: str) -> List[NormalizedRule]:
+        """Rules in other groups that reference group_id as a source"""
+        return [self.rules[i] for i in self._by_source_group.get(group_id, [])]
+
+    def redundant_rules(self) -> List[Dict]:
+        """
+        Rules fully covered by another rule of the same group and direction
+
+        Security groups are allow-only, so a rule whose protocol, port range
+        and source are all contained in a sibling rule never changes the
+        effective policy. Comparison is per (group, direction), so cost grows
+        with rules-per-group, not total rules.
+        """
+        findings = []
+        for (group_id, direction), rule_ids in self._by_group.items():
+            rules = [self.rules[i] for i in rule_ids]
+            if len(rules) < 2:
+                continue
+            for rule in rules:
+                for other in rules:
+                    if other.rule_id == rule.rule_id or not self._covers(other, rule):
+                        continue
+                    # Identical rules: only report the later one
+                    if self._covers(rule, other) and other.rule_id > rule.rule_id:
+                        continue
+                    findings.append({
+                        'Group ID': group_id,
+                        'Group Name': rule.group_name,
+                        'Account': rule.account_id,
+                        'Region': rule.region,
+                        'Direction': direction,
+                        'Redundant Rule': f"{rule.protocol}/{rule.port_label} from {rule.source}",
+                        'Covered By': f"{other.protocol}/{other.port_label} from {other.source}",
+                        'Kind': 'duplicate' if self._covers(rule, other) else 'shadowed'
+                    })
+                    break
+        return findings
+
+    @staticmethod
+    def _covers(outer: NormalizedRule, inner: NormalizedRule) -> bool:
+        """True if outer allows everything inner allows"""
+        if outer.protocol != ALL_PROTOCOLS and outer.protocol != inner.protocol:
+            return False
+        if outer.from_port > inner.from_port or outer.to_port < inner.to_port:
+            return False
+        if outer.source_type in ('cidr4', 'cidr6') and outer.source_type == inner.source_type:
+            return outer.range_start <= inner.range_start and outer.range_end >= inner.range_end
+        return outer.source_type == inner.source_type and outer.source == inner.source
+
+    def summary(self) -> Dict:
+        """Counts for dashboard metrics"""
+        return {
+            'groups': len(self.groups),
+            'rules': len(self.rules),
+            'enis': len(self.enis),
+            'internet_exposed_rules': sum(
+                1 for i in self.rules_from_cidr('0.0.0.0/0') | self.rules_from_cidr('::/0')
+                if self.rules[i].direction == 'ingress'
+            )
+        }
+
+
+# ============================================================================
+# COLLECTION
+# ============================================================================
+
+def describe_region(session, account_id: str, region: str) -> Tuple[List[Dict], List[Dict]]:
+    """Paginated describe_security_groups + describe_network_interfaces for one region"""
+    ec2 = session.client('ec2', region_name=region)
+    groups, interfaces = [], []
+    for page in ec2.get_paginator('describe_security_groups').paginate():
+        groups.extend(page.get('SecurityGroups', []))
+    for page in ec2.get_paginator('describe_network_interfaces').paginate():
+        interfaces.extend(page.get('NetworkInterfaces', []))
+    return groups, interfaces
+
+
+def build_analyzer(account_mgr, account_names: Tuple[str, ...], regions: Tuple[str, ...],
+                   max_workers: int = 8) -> Tuple[SecurityGroupRuleAnalyzer, List[str]]:
+    """
+    Collect and index rules for every (account, region) concurrently
+
+    Returns:
+        Tuple of (analyzer, errors)
+    """
+    from config_settings import AppConfig
+
+    account_ids = {a.account_name: a.account_id for a in AppConfig.load_aws_accounts()}
+    analyzer = SecurityGroupRuleAnalyzer()
+    errors = []
+
+    def fetch(job):
+        account_name, region = job
+        session = account_mgr.get_session_with_region(account_name, region)
+        if not session:
+            raise RuntimeError(f"No session for {account_name}")
+        return describe_region(session, account_ids.get(account_name, account_name), region)
+
+    jobs = [(a, r) for a in account_names for r in regions]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs) or 1))) as pool:
+        futures = {pool.submit(fetch, job): job for job in jobs}
+        for future, (account_name, region) in futures.items():
+            try:
+                groups, interfaces = future.result()
+                analyzer.add_security_groups(groups, account_ids.get(account_name, account_name), region)
+                analyzer.add_network_interfaces(interfaces)
+            except Exception as e:
+                errors.append(f"{account_name}/{region}: {e}")
+
+    return analyzer, errors
+
+
+@st.cache_resource(ttl=300, max_entries=16)
+def _security_group_analyzer(scope: str, account_names: Tuple[str, ...], regions: Tuple[str, ...],
+                             _account_mgr) -> Tuple[SecurityGroupRuleAnalyzer, List[str]]:
+    """Analyzer for one credential scope, accounts and regions"""
+    return build_analyzer(_account_mgr, account_names, regions)
+
+
+def get_security_group_analyzer(account_mgr, account_names: Tuple[str, ...],
+                                regions: Tuple[str, ...]) -> Tuple[SecurityGroupRuleAnalyzer, List[str]]:
+    """Get cached analyzer for the given accounts and regions (keyed on the current credentials)"""
+    from aws_cost_cube import credential_scope
+    return _security_group_analyzer(credential_scope(account_mgr), account_names, regions, account_mgr)
+
+
+def clear_security_group_analyzers():
+    """Drop cached analyzers (after security group changes)"""
+    _security_group_analyzer.clear()
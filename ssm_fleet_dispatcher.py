@@ -0,0 +1,289 @@
+"""
+SSM Fleet Command Dispatcher
+Run Command at fleet scale across accounts and regions
+
+Features:
+- Chunks explicit instance targets into SendCommand calls of at most 50 IDs
+- Tag-based Targets for groups that are too large to enumerate
+- Concurrent fan-out per (account, region) with adaptive (throttle-aware) retries
+- Bulk progress tracking via ListCommands counts and paged ListCommandInvocations
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+# SendCommand accepts at most 50 explicit InstanceIds per call
+MAX_INSTANCE_IDS = 50
+
+# Adaptive retry mode adds client-side rate limiting when SSM throttles
+SSM_CLIENT_CONFIG = Config(retries={'max_attempts': 10, 'mode': 'adaptive'})
+
+TERMINAL_STATUSES = {'Success', 'Failed', 'TimedOut', 'Cancelled', 'Undeliverable', 'Terminated',
+                     'DeliveryTimedOut', 'ExecutionTimedOut', 'Incomplete', 'RateExceeded', 'AccessDenied'}
+
+
+@dataclass
+class CommandBatch:
+    """One SendCommand call: up to 50 instance IDs, or a tag target"""
+    account_id: str
+    region: str
+    instance_ids: List[str] = field(default_factory=list)
+    targets: List[Dict] = field(default_factory=list)
+    command_id: Optional[str] = None
+    error: Optional[str] = None  # SendCommand failure (batch never sent)
+    poll_error: Optional[str] = None  # last failed status poll (retried on the next poll)
+    target_count: int = 0
+    completed_count: int = 0
+    error_count: int = 0
+    status: str = 'Pending'
+
+
+@dataclass
+class FleetCommand:
+    """A document run across the fleet, split into batches"""
+    document_name: str
+    parameters: Dict[str, List[str]]
+    comment: str
+    batches: List[CommandBatch]
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    invocations: Dict[Tuple[str, str], Dict] = field(default_factory=dict)
+    last_poll: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        """True when every sent batch reached a terminal status"""
+        return all(b.error or b.status in TERMINAL_STATUSES for b in self.batches)
+
+    def summary(self) -> Dict:
+        """Aggregate progress across batches"""
+        sent = [b for b in self.batches if b.command_id]
+        targets = sum(b.target_count or len(b.instance_ids) for b in sent)
+        completed = sum(b.completed_count for b in sent)
+        errors = sum(b.error_count for b in sent)
+        statuses: Dict[str, int] = {}
+        for invocation in self.invocations.values():
+            statuses[invocation['status']] = statuses.get(invocation['status'], 0) + 1
+        return {
+            'batches': len(self.batches),
+            'sent': len(sent),
+            'failed_to_send': sum(1 for b in self.batches if b.error),
+            'poll_errors': [f"{b.account_id}/{b.region}: {b.poll_error}" for b in self.batches if b.poll_error],
+            'targets': targets,
+            'completed': completed,
+            'errors': errors,
+            'progress': completed / targets if targets else 0.0,
+            'invocation_statuses': statuses,
+            'done': self.done
+        }
+
+    def by_location(self) -> List[Dict]:
+        """Progress rows per (account, region)"""
+        rows: Dict[Tuple[str, str], Dict] = {}
+        for batch in self.batches:
+            row = rows.setdefault((batch.account_id, batch.region), {
+                'Account': batch.account_id, 'Region': batch.region, 'Commands': 0,
+                'Targets': 0, 'Completed': 0, 'Errors': 0, 'Send Failures': 0
+            })
+            row['Commands'] += 1 if batch.command_id else 0
+            row['Targets'] += batch.target_count or len(batch.instance_ids)
+            row['Completed'] += batch.completed_count
+            row['Errors'] += batch.error_count
+            row['Send Failures'] += 1 if batch.error else 0
+        return list(rows.values())
+
+
+def chunk(instance_ids: List[str], size: int = MAX_INSTANCE_IDS) -> List[List[str]]:
+    """Split instance IDs into SendCommand-sized chunks (deduplicated, order kept)"""
+    unique = list(dict.fromkeys(instance_ids))
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+def account_session_provider(account_mgr) -> Callable[[str], Optional[object]]:
+    """Session lookup by account ID using the configured account roles"""
+    from config_settings import AppConfig
+    accounts = {a.account_id: a for a in AppConfig.load_aws_accounts()}
+
+    def provider(account_id: str):
+        account = accounts.get(account_id)
+        if not account or account_mgr is None:
+            return None
+        assumed = account_mgr.assume_role(account.account_id, account.account_name, account.role_arn)
+        return assumed.session if assumed else None
+    return provider
+
+
+class FleetCommandDispatcher:
+    """
+    Fleet-scale Run Command dispatcher.
+
+    Sessions are resolved once per account on the calling thread (role
+    assumption may report errors through Streamlit); SendCommand and
+    polling calls then run concurrently per (account, region) with one
+    SSM client each.
+    """
+
+    def __init__(self, session_provider: Callable[[str], Optional[object]], max_workers: int = 8,
+                 max_concurrency: str = '10%', max_errors: str = '5%'):
+        """
+        Initialize dispatcher
+
+        Args:
+            session_provider: Returns a boto3 Session for an account ID (None if unavailable)
+            max_workers: Concurrent (account, region) groups
+            max_concurrency: SSM MaxConcurrency per command (rollout rate)
+            max_errors: SSM MaxErrors per command (stop threshold)
+        """
+        self.session_provider = session_provider
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.max_errors = max_errors
+        self._sessions: Dict[str, Optional[object]] = {}
+        self._clients: Dict[Tuple[str, str], object] = {}
+        self.lock = threading.Lock()
+
+    def _resolve_sessions(self, account_ids: List[str]):
+        """Resolve sessions sequentially on the calling thread"""
+        for account_id in account_ids:
+            if account_id not in self._sessions:
+                self._sessions[account_id] = self.session_provider(account_id)
+
+    def _client(self, account_id: str, region: str):
+        """SSM client per (account, region), created once"""
+        key = (account_id, region)
+        with self.lock:
+            if key not in self._clients:
+                session = self._sessions.get(account_id)
+                if session is None:
+                    raise RuntimeError(f"No session for account {account_id}")
+                self._clients[key] = session.client('ssm', region_name=region, config=SSM_CLIENT_CONFIG)
+            return self._clients[key]
+
+    # ============= DISPATCH =============
+
+    def plan(self, instances: Dict[Tuple[str, str], List[str]],
+             tag_targets: Optional[Dict[Tuple[str, str], List[Dict]]] = None) -> List[CommandBatch]:
+        """
+        Build batches
+
+        Args:
+            instances: (account_id, region) -> instance IDs (chunked by 50)
+            tag_targets: (account_id, region) -> SSM Targets, e.g.
+                         [{'Key': 'tag:PatchGroup', 'Values': ['prod']}]; used instead
+                         of the instance list for that location
+
+        Returns:
+            Command batches
+        """
+        tag_targets = tag_targets or {}
+        batches = []
+        for location, targets in tag_targets.items():
+            batches.append(CommandBatch(location[0], location[1], targets=targets))
+        for location, instance_ids in instances.items():
+            if location in tag_targets:
+                continue
+            for ids in chunk(instance_ids):
+                batches.append(CommandBatch(location[0], location[1], instance_ids=ids))
+        return batches
+
+    def dispatch(self, document_name: str, instances: Dict[Tuple[str, str], List[str]],
+                 parameters: Optional[Dict[str, List[str]]] = None, comment: str = '',
+                 tag_targets: Optional[Dict[Tuple[str, str], List[Dict]]] = None,
+                 timeout_seconds: int = 3600) -> FleetCommand:
+        """
+        Send a document to the fleet
+
+        Returns:
+            FleetCommand with one batch per SendCommand call
+        """
+        batches = self.plan(instances, tag_targets)
+        command = FleetCommand(document_name, parameters or {}, comment, batches)
+        self._resolve_sessions(sorted({b.account_id for b in batches}))
+
+        def send(batch: CommandBatch):
+            try:
+                params = {
+                    'DocumentName': document_name,
+                    'MaxConcurrency': self.max_concurrency,
+                    'MaxErrors': self.max_errors,
+                    'TimeoutSeconds': timeout_seconds
+                }
+                if batch.targets:
+                    params['Targets'] = batch.targets
+                else:
+                    params['InstanceIds'] = batch.instance_ids
+                if parameters:
+                    params['Parameters'] = parameters
+                if comment:
+                    params['Comment'] = comment[:100]
+                response = self._client(batch.account_id, batch.region).send_command(**params)
+                batch.command_id = response['Command']['CommandId']
+                batch.target_count = response['Command'].get('TargetCount', 0)
+                batch.status = response['Command'].get('Status', 'Pending')
+            except Exception as e:
+                batch.error = str(e)
+                batch.status = 'SendFailed'
+
+        self._run_by_location(batches, lambda group: [send(b) for b in group])
+        return command
+
+    def _run_by_location(self, batches: List[CommandBatch], work: Callable[[List[CommandBatch]], object]):
+        """Run work per (account, region) group concurrently; batches within a group run in order"""
+        groups: Dict[Tuple[str, str], List[CommandBatch]] = {}
+        for batch in batches:
+            groups.setdefault((batch.account_id, batch.region), []).append(batch)
+        if not groups:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(groups)))) as pool:
+            list(pool.map(work, groups.values()))
+
+    # ============= TRACKING =============
+
+    def poll(self, command: FleetCommand, details: bool = True) -> Dict:
+        """
+        Refresh progress
+
+        Uses one ListCommands call per batch for counts and, with details,
+        paged ListCommandInvocations (50 instances per page) for
+        per-instance status - never one GetCommandInvocation per instance.
+
+        Returns:
+            Updated command summary
+        """
+        self._resolve_sessions(sorted({b.account_id for b in command.batches}))
+        pending = [b for b in command.batches if b.command_id and b.status not in TERMINAL_STATUSES]
+
+        def refresh(group: List[CommandBatch]):
+            for batch in group:
+                try:
+                    client = self._client(batch.account_id, batch.region)
+                    listed = client.list_commands(CommandId=batch.command_id).get('Commands', [])
+                    if listed:
+                        batch.status = listed[0].get('Status', batch.status)
+                        batch.target_count = listed[0].get('TargetCount', batch.target_count)
+                        batch.completed_count = listed[0].get('CompletedCount', 0)
+                        batch.error_count = listed[0].get('ErrorCount', 0)
+                    if details:
+                        paginator = client.get_paginator('list_command_invocations')
+                        for page in paginator.paginate(CommandId=batch.command_id, Details=False):
+                            for invocation in page.get('CommandInvocations', []):
+                                with self.lock:
+                                    command.invocations[(batch.command_id, invocation['InstanceId'])] = {
+                                        'account_id': batch.account_id,
+                                        'region': batch.region,
+                                        'instance_id': invocation['InstanceId'],
+                                        'instance_name': invocation.get('InstanceName', ''),
+                                        'status': invocation.get('Status', 'Unknown'),
+                                        'status_details': invocation.get('StatusDetails', '')
+                                    }
+                    batch.poll_error = None
+                except Exception as e:
+                    # Transient (throttling, expired credentials): keep the batch pending for the next poll
+                    batch.poll_error = str(e)
+
+        self._run_by_location(pending, refresh)
+        command.last_poll = datetime.now(timezone.utc)
+        return command.summary()
@@ -0,0 +1,464 @@
+"""
+SSM Inventory Store
+Paginated SSM inventory and patch compliance ingestion into a local SQLite store
+
+Features:
+- Full pagination of GetInventory per inventory type (no single-page truncation)
+- Schema-typed tables for AWS:InstanceInformation, AWS:Application and AWS:PatchSummary
+- Incremental sync: only entities captured since the last sync are listed; a periodic
+  full pass prunes instances that stopped reporting
+- One SQLite file per credential scope
+- Indexed package/version queries ("instances with package X below version Y")
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import streamlit as st
+import pandas as pd
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import ClientError
+
+
+def _int(value) -> Optional[int]:
+    """Inventory numbers arrive as strings"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _str(value) -> Optional[str]:
+    """Text attribute (None stays NULL)"""
+    return None if value is None else str(value)
+
+
+# Inventory type -> table, key columns and (column, inventory attribute, converter)
+INVENTORY_SCHEMAS: Dict[str, Dict] = {
+    'AWS:InstanceInformation': {
+        'table': 'instances',
+        'key': ['instance_id'],
+        'columns': [
+            ('computer_name', 'ComputerName', _str),
+            ('platform_name', 'PlatformName', _str),
+            ('platform_version', 'PlatformVersion', _str),
+            ('platform_type', 'PlatformType', _str),
+            ('agent_version', 'AgentVersion', _str),
+            ('ip_address', 'IpAddress', _str),
+            ('instance_status', 'InstanceStatus', _str),
+            ('resource_type', 'ResourceType', _str)
+        ]
+    },
+    'AWS:Application': {
+        'table': 'applications',
+        'key': ['instance_id', 'name', 'architecture'],
+        'columns': [
+            ('name', 'Name', _str),
+            ('version', 'Version', _str),
+            ('architecture', 'Architecture', lambda v: v or ''),
+            ('publisher', 'Publisher', _str),
+            ('package_id', 'PackageId', _str),
+            ('install_time', 'InstalledTime', _str)
+        ]
+    },
+    'AWS:PatchSummary': {
+        'table': 'patch_summary',
+        'key': ['instance_id'],
+        'columns': [
+            ('baseline_id', 'BaselineId', _str),
+            ('patch_group', 'PatchGroup', _str),
+            ('operation', 'Operation', _str),
+            ('operation_end_time', 'OperationEndTime', _str),
+            ('installed', 'InstalledCount', _int),
+            ('installed_other', 'InstalledOtherCount', _int),
+            ('installed_pending_reboot', 'InstalledPendingRebootCount', _int),
+            ('installed_rejected', 'InstalledRejectedCount', _int),
+            ('missing', 'MissingCount', _int),
+            ('failed', 'FailedCount', _int),
+            ('not_applicable', 'NotApplicableCount', _int)
+        ]
+    }
+}
+
+
+_VERSION_TOKEN = re.compile(r'\d+|[A-Za-z]+')
+
+# Alphabetic segments that mark a pre-release (sort below the release itself)
+PRERELEASE_TAGS = {'dev', 'a', 'alpha', 'b', 'beta', 'c', 'pre', 'preview', 'rc'}
+
+# Segment ranks: pre-release tag < end of version < other alphabetic < numeric
+_PRERELEASE, _END, _ALPHA, _NUMERIC = range(4)
+
+
+def version_key(version: Optional[str]) -> Tuple:
+    """
+    Sort key for package versions (epoch aware; numeric segments compare as numbers)
+
+    '1.9.9' < '1.9.13' < '1:0.1'; pre-release tags sort below the release
+    ('3.0.7rc1' < '3.0.7' < '3.0.7.1'), other alphabetic segments above it
+    ('1.0.2' < '1.0.2k' < '1.0.2.1').
+    """
+    if not version:
+        return ()
+    epoch, _, rest = version.partition(':') if ':' in version else ('0', '', version)
+    parts = [(_NUMERIC, int(epoch) if epoch.isdigit() else 0)]
+    for token in _VERSION_TOKEN.findall(rest):
+        if token.isdigit():
+            parts.append((_NUMERIC, int(token)))
+        else:
+            token = token.lower()
+            parts.append((_PRERELEASE if token in PRERELEASE_TAGS else _ALPHA, token))
+    parts.append((_END, ''))
+    return tuple(parts)
+
+
+def compare_versions(left: Optional[str], right: Optional[str]) -> int:
+    """-1, 0 or 1 as left is lower than, equal to or higher than right"""
+    a, b = version_key(left), version_key(right)
+    return (a > b) - (a < b)
+
+
+class SSMInventoryStore:
+    """
+    Local query store for SSM inventory.
+
+    One SQLite connection is shared (guarded by a lock); the store
+    registers a VERCMP() SQL function so version filters run inside the
+    query against the (name, version) index.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize store
+
+        Args:
+            db_path: SQLite file (default ~/.cloudidp/ssm_inventory.db, ':memory:' for none)
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 'ssm_inventory.db')
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.create_function('VERCMP', 2, compare_versions, deterministic=True)
+        self._initialize_database()
+
+    def _initialize_database(self):
+        """Create schema-typed tables"""
+        sql_types = {_int: 'INTEGER'}
+        with self.lock, self.conn:
+            for schema in INVENTORY_SCHEMAS.values():
+                columns = {'instance_id': 'TEXT NOT NULL', 'account_id': 'TEXT', 'region': 'TEXT'}
+                for column, _, convert in schema['columns']:
+                    columns.setdefault(column, sql_types.get(convert, 'TEXT'))
+                columns['capture_time'] = 'TEXT'
+                ddl = ', '.join(f'{name} {kind}' for name, kind in columns.items())
+                self.conn.execute(f"CREATE TABLE IF NOT EXISTS {schema['table']} "
+                                  f"({ddl}, PRIMARY KEY ({', '.join(schema['key'])}))")
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_applications_name '
+                              'ON applications (name COLLATE NOCASE, version)')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS capture_times (
+                    instance_id TEXT NOT NULL,
+                    type_name TEXT NOT NULL,
+                    capture_time TEXT,
+                    PRIMARY KEY (instance_id, type_name)
+                )
+            ''')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    account_id TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    type_name TEXT NOT NULL,
+                    synced_at TEXT,
+                    instances INTEGER,
+                    changed INTEGER,
+                    full_synced_at TEXT,
+                    PRIMARY KEY (account_id, region, type_name)
+                )
+            ''')
+
+    # ============= WRITE =============
+
+    def capture_times(self, type_name: str, instance_ids: List[str]) -> Dict[str, str]:
+        """Stored CaptureTime per instance for one inventory type"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT instance_id, capture_time FROM capture_times WHERE type_name = ?', (type_name,)
+            ).fetchall()
+        wanted = set(instance_ids)
+        return {instance_id: captured for instance_id, captured in rows if instance_id in wanted}
+
+    def replace(self, type_name: str, account_id: str, region: str,
+                entities: List[Tuple[str, str, List[Dict]]]):
+        """
+        Replace inventory rows for changed instances
+
+        Args:
+            type_name: Inventory type (key of INVENTORY_SCHEMAS)
+            account_id: Owning account
+            region: Region
+            entities: (instance_id, capture_time, content rows) per changed instance
+        """
+        schema = INVENTORY_SCHEMAS[type_name]
+        names = ['instance_id', 'account_id', 'region'] + [c for c, _, _ in schema['columns']] + ['capture_time']
+        insert = (f"INSERT OR REPLACE INTO {schema['table']} ({', '.join(names)}) "
+                  f"VALUES ({', '.join('?' * len(names))})")
+
+        rows = []
+        for instance_id, captured, content in entities:
+            for item in content:
+                rows.append([instance_id, account_id, region]
+                            + [convert(item.get(attribute)) for _, attribute, convert in schema['columns']]
+                            + [captured])
+
+        with self.lock, self.conn:
+            self.conn.executemany(f"DELETE FROM {schema['table']} WHERE instance_id = ?",
+                                  [(instance_id,) for instance_id, _, _ in entities])
+            self.conn.executemany(insert, rows)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO capture_times (instance_id, type_name, capture_time) VALUES (?, ?, ?)',
+                [(instance_id, type_name, captured) for instance_id, captured, _ in entities]
+            )
+
+    def prune(self, type_name: str, account_id: str, region: str, seen: List[str]) -> int:
+        """Drop rows of instances no longer reported for an account/region"""
+        table = INVENTORY_SCHEMAS[type_name]['table']
+        with self.lock, self.conn:
+            stored = {r[0] for r in self.conn.execute(
+                f'SELECT DISTINCT instance_id FROM {table} WHERE account_id = ? AND region = ?',
+                (account_id, region))}
+            gone = [(instance_id,) for instance_id in stored - set(seen)]
+            self.conn.executemany(f'DELETE FROM {table} WHERE instance_id = ?', gone)
+            self.conn.executemany('DELETE FROM capture_times WHERE instance_id = ? AND type_name = ?',
+                                  [(instance_id, type_name) for (instance_id,) in gone])
+        return len(gone)
+
+    def record_sync(self, account_id: str, region: str, type_name: str, instances: int, changed: int,
+                    started_at: datetime, full: bool = True):
+        """Remember when a location/type was last synced (and last fully listed)"""
+        synced_at = started_at.isoformat()
+        with self.lock, self.conn:
+            self.conn.execute('''
+                INSERT INTO sync_state VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (account_id, region, type_name) DO UPDATE SET
+                    synced_at = excluded.synced_at, instances = excluded.instances,
+                    changed = excluded.changed,
+                    full_synced_at = COALESCE(excluded.full_synced_at, sync_state.full_synced_at)
+            ''', (account_id, region, type_name, synced_at, instances, changed, synced_at if full else None))
+
+    def sync_times(self, account_id: str, region: str,
+                   type_name: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """(last sync, last full sync) start times of a location/type"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT synced_at, full_synced_at FROM sync_state '
+                'WHERE account_id = ? AND region = ? AND type_name = ?',
+                (account_id, region, type_name)
+            ).fetchone()
+        return tuple(datetime.fromisoformat(v) if v else None for v in (row or (None, None)))
+
+    # ============= QUERIES =============
+
+    def query(self, sql: str, params: Tuple = ()) -> pd.DataFrame:
+        """Run a read query"""
+        with self.lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def instances_with_package_below(self, package: str, version: str,
+                                     platform: Optional[str] = None) -> pd.DataFrame:
+        """
+        Instances with an installed package older than a version
+
+        Args:
+            package: Package name (exact, case-insensitive)
+            version: Fixed version; rows with a lower installed version are returned
+            platform: Optional platform name filter (substring, e.g. 'Ubuntu')
+        """
+        sql = '''
+            SELECT a.instance_id, i.computer_name, i.platform_name, i.platform_version,
+                   a.account_id, a.region, a.name AS package, a.version, a.architecture
+            FROM applications a
+            LEFT JOIN instances i ON i.instance_id = a.instance_id
+            WHERE a.name = ? COLLATE NOCASE AND VERCMP(a.version, ?) < 0
+        '''
+        params: Tuple = (package, version)
+        if platform:
+            sql += ' AND i.platform_name LIKE ?'
+            params += (f'%{platform}%',)
+        return self.query(sql + ' ORDER BY a.account_id, a.region, a.instance_id', params)
+
+    def package_versions(self, package: str) -> pd.DataFrame:
+        """Installed version distribution of a package"""
+        return self.query('''
+            SELECT version, COUNT(DISTINCT instance_id) AS instances
+            FROM applications WHERE name = ? COLLATE NOCASE
+            GROUP BY version ORDER BY instances DESC
+        ''', (package,))
+
+    def instances(self, platform_type: Optional[str] = None) -> pd.DataFrame:
+        """Managed instances, optionally of one platform type ('Windows' / 'Linux')"""
+        sql = 'SELECT * FROM instances'
+        params: Tuple = ()
+        if platform_type:
+            sql += ' WHERE platform_type = ?'
+            params = (platform_type,)
+        return self.query(sql + ' ORDER BY computer_name', params)
+
+    def patch_compliance(self) -> pd.DataFrame:
+        """Patch state per instance, non-compliant (missing or failed) first"""
+        return self.query('''
+            SELECT p.instance_id, i.computer_name, i.platform_name, p.account_id, p.region,
+                   p.baseline_id, p.missing, p.failed, p.installed_pending_reboot, p.installed,
+                   p.operation, p.operation_end_time,
+                   CASE WHEN COALESCE(p.missing, 0) + COALESCE(p.failed, 0) > 0
+                        THEN 'NON_COMPLIANT' ELSE 'COMPLIANT' END AS compliance
+            FROM patch_summary p
+            LEFT JOIN instances i ON i.instance_id = p.instance_id
+            ORDER BY (COALESCE(p.missing, 0) + COALESCE(p.failed, 0)) DESC, p.instance_id
+        ''')
+
+    def summary(self) -> Dict[str, int]:
+        """Row counts for dashboards"""
+        with self.lock:
+            instances, windows = self.conn.execute(
+                "SELECT COUNT(*), SUM(platform_type = 'Windows') FROM instances").fetchone()
+            packages = self.conn.execute('SELECT COUNT(*) FROM applications').fetchone()[0]
+            non_compliant = self.conn.execute(
+                'SELECT COUNT(*) FROM patch_summary WHERE COALESCE(missing, 0) + COALESCE(failed, 0) > 0'
+            ).fetchone()[0]
+            last_sync = self.conn.execute('SELECT MAX(synced_at) FROM sync_state').fetchone()[0]
+        return {
+            'instances': instances or 0,
+            'windows': windows or 0,
+            'linux': (instances or 0) - (windows or 0),
+            'packages': packages,
+            'non_compliant': non_compliant,
+            'last_sync': last_sync
+        }
+
+    def is_empty(self) -> bool:
+        """True if nothing has been synced"""
+        return self.summary()['instances'] == 0
+
+
+class SSMInventoryIngester:
+    """
+    Fully paginated GetInventory ingestion.
+
+    Each inventory type is listed separately (ResultAttributes) so pages
+    carry only that type's content. Incremental syncs filter on the type's
+    CaptureTime, so only entities captured since the previous sync are
+    listed; every FULL_SYNC_INTERVAL the whole fleet is listed once to prune
+    instances that stopped reporting. Instances whose CaptureTime matches
+    the stored one are skipped either way.
+    """
+
+    FULL_SYNC_INTERVAL = timedelta(hours=24)
+    # Agent clocks and upload delay: incremental windows overlap the previous sync by this much
+    CAPTURE_SKEW = timedelta(hours=1)
+
+    def __init__(self, store: SSMInventoryStore, page_size: int = 50):
+        """
+        Initialize ingester
+
+        Args:
+            store: Target store
+            page_size: GetInventory MaxResults (API maximum is 50)
+        """
+        self.store = store
+        self.page_size = page_size
+
+    def _entities(self, ssm_client, type_name: str, since: Optional[datetime] = None):
+        """Yield (instance_id, capture_time, content) for every entity of one type (captured after since)"""
+        paginator = ssm_client.get_paginator('get_inventory')
+        filters = []
+        if since is not None:
+            filters.append({'Key': f'{type_name}.CaptureTime', 'Type': 'GreaterThan',
+                            'Values': [since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')]})
+        pages = paginator.paginate(
+            Filters=filters,
+            ResultAttributes=[{'TypeName': type_name}],
+            PaginationConfig={'PageSize': self.page_size}
+        )
+        for page in pages:
+            for entity in page.get('Entities', []):
+                data = entity.get('Data', {}).get(type_name)
+                if data is not None:
+                    yield entity['Id'], data.get('CaptureTime', ''), data.get('Content', [])
+
+    def sync(self, session, account_id: str, region: str,
+             type_names: Optional[List[str]] = None,
+             progress: Optional[Callable[[str, int], None]] = None,
+             full: Optional[bool] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Sync inventory for one account/region
+
+        Args:
+            session: boto3 session for the account
+            account_id: Account ID stored with the rows
+            region: Region to sync
+            type_names: Inventory types (defaults to all schema types)
+            progress: Optional callback(type_name, instances_seen)
+            full: Force (True) or skip (False) the full listing; by default a type is
+                fully listed when its last full sync is older than FULL_SYNC_INTERVAL
+
+        Returns:
+            Per type: instances seen, changed (rewritten), removed and whether the pass was full
+        """
+        ssm = session.client('ssm', region_name=region)
+        results = {}
+        for type_name in type_names or list(INVENTORY_SCHEMAS):
+            started_at = datetime.now(timezone.utc)
+            last_sync, last_full = self.store.sync_times(account_id, region, type_name)
+            full_pass = full if full is not None else (
+                last_full is None or started_at - last_full > self.FULL_SYNC_INTERVAL)
+            if last_sync is None:
+                full_pass = True
+
+            entities = None
+            if not full_pass:
+                try:
+                    entities = list(self._entities(ssm, type_name, last_sync - self.CAPTURE_SKEW))
+                except ClientError as e:
+                    # Types without a filterable CaptureTime fall back to a full listing
+                    if e.response.get('Error', {}).get('Code') not in ('ValidationException', 'InvalidFilter',
+                                                                       'InvalidFilterKey', 'InvalidTypeNameException'):
+                        raise
+                    full_pass = True
+            if entities is None:
+                entities = list(self._entities(ssm, type_name))
+
+            stored = self.store.capture_times(type_name, [e[0] for e in entities])
+            changed = [e for e in entities if not e[1] or stored.get(e[0]) != e[1]]
+            if changed:
+                self.store.replace(type_name, account_id, region, changed)
+            removed = self.store.prune(type_name, account_id, region, [e[0] for e in entities]) if full_pass else 0
+            self.store.record_sync(account_id, region, type_name, len(entities), len(changed),
+                                   started_at, full_pass)
+            results[type_name] = {'instances': len(entities), 'changed': len(changed),
+                                  'removed': removed, 'full': full_pass}
+            if progress:
+                progress(type_name, len(entities))
+        return results
+
+
+@st.cache_resource
+def _inventory_store(scope: str) -> SSMInventoryStore:
+    """Inventory store for one credential scope (<db>_<scope>.db next to the base path)"""
+    path = os.environ.get('SSM_INVENTORY_DB')
+    if path == ':memory:':
+        return SSMInventoryStore(path)
+    path = Path(path) if path else Path.home() / '.cloudidp' / 'ssm_inventory.db'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return SSMInventoryStore(str(path.with_name(f'{path.stem}_{scope}{path.suffix}')))
+
+
+def get_inventory_store(account_mgr=None) -> SSMInventoryStore:
+    """Get the inventory store of the current credentials (SSM_INVENTORY_DB overrides the base path)"""
+    from aws_cost_cube import credential_scope
+    return _inventory_store(credential_scope(account_mgr))
@@ -0,0 +1,470 @@
+"""
+SSM Parameter Store Access Layer
+Batched, cached reads and rate-limited bulk writes for Parameter Store
+
+Features:
+- GetParameters batching (10 names per call) with concurrent batches
+- Hierarchical cache: whole paths are loaded once via GetParametersByPath
+- Version-aware invalidation using DescribeParameters metadata (no values fetched)
+- Bulk PutParameter / DeleteParameters with controlled concurrency and TPS
+"""
+
+import time
+import threading
+import streamlit as st
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+# GetParameters and DeleteParameters accept at most 10 names per call
+MAX_NAMES_PER_CALL = 10
+
+# PutParameter default (standard throughput) limit is a few TPS per account/region
+DEFAULT_WRITE_TPS = 3.0
+
+SSM_CLIENT_CONFIG = Config(retries={'max_attempts': 10, 'mode': 'adaptive'})
+
+
+@dataclass
+class CachedParameter:
+    """Cached parameter value with the version it was read at"""
+    name: str
+    value: Optional[str]
+    type: str
+    version: int
+    fetched_at: float
+    last_modified: Any = None
+    arn: Optional[str] = None
+
+
+def _covers(path: str, recursive: bool, name: str) -> bool:
+    """True if a GetParametersByPath load of path returns name"""
+    base = path.rstrip('/')
+    if recursive:
+        return name.startswith(base + '/')
+    return (name.rsplit('/', 1)[0] or '/') == (base or '/')
+
+
+class ParameterCache:
+    """
+    Parameter cache for one account/region scope.
+
+    Entries are keyed by full name; a path counts as loaded when it was
+    fetched with GetParametersByPath, so lookups under it are answered
+    from memory (including "not found") until the path expires.
+    SecureString entries hold decrypted values and are only served to
+    decrypting reads. Non-decrypting path loads are kept as listings
+    (SecureString values stripped) for later non-decrypting listings.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """
+        Initialize cache
+
+        Args:
+            ttl: Seconds before entries and loaded paths are re-read
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[str, CachedParameter] = {}
+        self.loaded_paths: Dict[Tuple[str, bool], float] = {}
+        self.listings: Dict[Tuple[str, bool], Tuple[float, List[CachedParameter]]] = {}
+        self.missing: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, fetched_at: float) -> bool:
+        """True if a fetch time is within the TTL"""
+        return time.time() - fetched_at < self.ttl
+
+    def _path_loaded(self, name: str) -> bool:
+        """True if a fresh path load covers name"""
+        return any(self._fresh(fetched_at) and _covers(path, recursive, name)
+                   for (path, recursive), fetched_at in self.loaded_paths.items())
+
+    def get(self, name: str, with_decryption: bool = True) -> Tuple[bool, Optional[CachedParameter]]:
+        """
+        Look up a name
+
+        Args:
+            name: Parameter name
+            with_decryption: Caller decrypts (a cached SecureString is a miss otherwise)
+
+        Returns:
+            (known, entry) - known is False when the name must be fetched;
+            entry is None for names known not to exist
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if (entry is not None and self._fresh(entry.fetched_at)
+                    and (with_decryption or entry.type != 'SecureString')):
+                self.hits += 1
+                return True, entry
+            if entry is None and (self._fresh(self.missing.get(name, 0.0)) or self._path_loaded(name)):
+                self.hits += 1
+                return True, None
+            self.misses += 1
+            return False, None
+
+    def put(self, entry: CachedParameter):
+        """Store an entry unless a newer version is already cached"""
+        with self.lock:
+            current = self.entries.get(entry.name)
+            if current is None or entry.version >= current.version:
+                self.entries[entry.name] = entry
+            self.missing.pop(entry.name, None)
+
+    def put_missing(self, name: str):
+        """Remember that a name does not exist"""
+        with self.lock:
+            self.entries.pop(name, None)
+            self.missing[name] = time.time()
+
+    def mark_path(self, path: str, recursive: bool, names: Iterable[str]):
+        """Record a complete path load (cached names it did not return are dropped)"""
+        present = set(names)
+        with self.lock:
+            for name in [n for n in self.entries if _covers(path, recursive, n) and n not in present]:
+                del self.entries[name]
+            self.loaded_paths[(path, recursive)] = time.time()
+
+    def put_listing(self, path: str, recursive: bool, entries: List[CachedParameter]):
+        """Record a complete non-decrypting path load (SecureString values are not kept)"""
+        listing = [replace(e, value=None) if e.type == 'SecureString' else e for e in entries]
+        with self.lock:
+            self.listings[(path, recursive)] = (time.time(), listing)
+
+    def path_entries(self, path: str, recursive: bool, with_decryption: bool = True) -> Optional[List[CachedParameter]]:
+        """
+        Cached entries under a loaded path
+
+        Non-decrypting callers get SecureString entries without values.
+        Returns None if the path is not loaded or stale.
+        """
+        with self.lock:
+            fetched_at = self.loaded_paths.get((path, recursive))
+            if fetched_at is not None and self._fresh(fetched_at):
+                entries = [e for n, e in self.entries.items() if _covers(path, recursive, n)]
+                self.hits += 1
+                if with_decryption:
+                    return entries
+                return [replace(e, value=None) if e.type == 'SecureString' else e for e in entries]
+            fetched_at, listing = self.listings.get((path, recursive), (None, None))
+            if not with_decryption and fetched_at is not None and self._fresh(fetched_at):
+                self.hits += 1
+                return list(listing)
+            self.misses += 1
+            return None
+
+    def invalidate(self, name: str, version: Optional[int] = None):
+        """
+        Drop a name (or only a cached version older than version)
+
+        Loaded paths covering the name are dropped too, since their
+        "complete" view no longer holds.
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and (version is None or entry.version < version):
+                del self.entries[name]
+            self.missing.pop(name, None)
+            for key in [k for k in self.loaded_paths if _covers(k[0], k[1], name)]:
+                del self.loaded_paths[key]
+            self._drop_listings(name)
+
+    def written(self, entry: CachedParameter):
+        """Cache a value just written (listings covering it no longer hold)"""
+        self.put(entry)
+        with self.lock:
+            self._drop_listings(entry.name)
+
+    def _drop_listings(self, name: str):
+        """Forget listings covering a name (caller holds the lock)"""
+        for key in [k for k in self.listings if _covers(k[0], k[1], name)]:
+            del self.listings[key]
+
+    def invalidate_path(self, path: str):
+        """Drop everything under a path"""
+        with self.lock:
+            for name in [n for n in self.entries if _covers(path, True, n)]:
+                del self.entries[name]
+            for name in [n for n in self.missing if _covers(path, True, n)]:
+                del self.missing[name]
+            for key in [k for k in self.loaded_paths if _covers(path, True, k[0]) or k[0] == path]:
+                del self.loaded_paths[key]
+            for key in [k for k in self.listings if _covers(path, True, k[0]) or k[0] == path]:
+                del self.listings[key]
+
+    def cached_version(self, name: str) -> Optional[int]:
+        """Version currently cached for a name"""
+        with self.lock:
+            entry = self.entries.get(name)
+            return entry.version if entry else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'loaded_paths': len(self.loaded_paths),
+            'listings': len(self.listings),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+class RateLimiter:
+    """Token bucket shared by writer threads"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Requests per second
+            burst: Requests allowed back to back
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ParameterStore:
+    """
+    Batched Parameter Store access for one account/region.
+
+    Reads go through the cache first; misses are fetched 10 names per
+    GetParameters call with batches running concurrently. Writes are
+    spread over a small pool and paced by a token bucket so bulk updates
+    stay under the PutParameter TPS limit.
+    """
+
+    def __init__(self, session, region: Optional[str] = None, cache: Optional[ParameterCache] = None,
+                 max_workers: int = 8, write_workers: int = 2, write_tps: float = DEFAULT_WRITE_TPS):
+        """
+        Initialize parameter store access
+
+        Args:
+            session: boto3 session
+            region: Region (defaults to the session region)
+            cache: Shared cache for this account/region (a private one if None)
+            max_workers: Concurrent GetParameters batches
+            write_workers: Concurrent writers
+            write_tps: Write requests per second across writers
+        """
+        self.ssm = session.client('ssm', region_name=region, config=SSM_CLIENT_CONFIG)
+        self.cache = cache or ParameterCache()
+        self.max_workers = max_workers
+        self.write_workers = write_workers
+        self.limiter = RateLimiter(write_tps)
+
+    @staticmethod
+    def _entry(param: Dict) -> CachedParameter:
+        """Cache entry from an API parameter"""
+        return CachedParameter(
+            name=param['Name'],
+            value=param.get('Value'),
+            type=param.get('Type', 'String'),
+            version=param.get('Version', 0),
+            fetched_at=time.time(),
+            last_modified=param.get('LastModifiedDate'),
+            arn=param.get('ARN')
+        )
+
+    def _remember(self, entry: CachedParameter, with_decryption: bool):
+        """Cache an entry (encrypted SecureString values are never cached)"""
+        if with_decryption or entry.type != 'SecureString':
+            self.cache.put(entry)
+
+    # ============= READ =============
+
+    def get_entries(self, names: List[str], with_decryption: bool = True) -> Dict[str, Optional[CachedParameter]]:
+        """
+        Parameters with metadata for many names (None for names that do not exist)
+
+        Args:
+            names: Parameter names
+            with_decryption: Decrypt SecureString values
+
+        Returns:
+            Dict name -> CachedParameter or None
+        """
+        entries: Dict[str, Optional[CachedParameter]] = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            known, entry = self.cache.get(name, with_decryption)
+            if known:
+                entries[name] = entry
+            else:
+                missing.append(name)
+
+        batches = [missing[i:i + MAX_NAMES_PER_CALL] for i in range(0, len(missing), MAX_NAMES_PER_CALL)]
+
+        def fetch(batch: List[str]) -> Dict[str, Optional[CachedParameter]]:
+            response = self.ssm.get_parameters(Names=batch, WithDecryption=with_decryption)
+            found = {}
+            for param in response.get('Parameters', []):
+                entry = self._entry(param)
+                self._remember(entry, with_decryption)
+                found[entry.name] = entry
+            for name in response.get('InvalidParameters', []):
+                self.cache.put_missing(name)
+                found[name] = None
+            return found
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(batches)))) as pool:
+                for found in pool.map(fetch, batches):
+                    entries.update(found)
+        return {name: entries.get(name) for name in names}
+
+    def get_many(self, names: List[str], with_decryption: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Values for many names (None for names that do not exist)
+
+        Args:
+            names: Parameter names
+            with_decryption: Decrypt SecureString values
+
+        Returns:
+            Dict name -> value
+        """
+        return {name: entry.value if entry else None
+                for name, entry in self.get_entries(names, with_decryption).items()}
+
+    def get(self, name: str, default: Optional[str] = None, with_decryption: bool = True) -> Optional[str]:
+        """Single value (served from the cache when possible)"""
+        value = self.get_many([name], with_decryption)[name]
+        return default if value is None else value
+
+    def get_path_entries(self, path: str, recursive: bool = True,
+                         with_decryption: bool = True) -> List[CachedParameter]:
+        """All parameters with metadata under a path (one paginated load, then memory)"""
+        cached = self.cache.path_entries(path, recursive, with_decryption)
+        if cached is not None:
+            return cached
+
+        paginator = self.ssm.get_paginator('get_parameters_by_path')
+        entries = []
+        for page in paginator.paginate(Path=path, Recursive=recursive, WithDecryption=with_decryption):
+            for param in page.get('Parameters', []):
+                entry = self._entry(param)
+                self._remember(entry, with_decryption)
+                entries.append(entry)
+        # Only a decrypting load holds every value, SecureStrings included
+        if with_decryption:
+            self.cache.mark_path(path, recursive, [e.name for e in entries])
+        else:
+            self.cache.put_listing(path, recursive, entries)
+        return entries
+
+    def get_path(self, path: str, recursive: bool = True, with_decryption: bool = True) -> Dict[str, str]:
+        """
+        All parameters under a path (one paginated load, then memory)
+
+        Returns:
+            Dict full name -> value
+        """
+        return {e.name: e.value for e in self.get_path_entries(path, recursive, with_decryption)}
+
+    def refresh_versions(self, path: str, recursive: bool = True) -> List[str]:
+        """
+        Re-read only parameters whose version changed under a path
+
+        Uses DescribeParameters (metadata, 50 per page) and compares
+        versions with the cache; changed names are re-fetched in batches.
+
+        Returns:
+            Names that were refreshed
+        """
+        paginator = self.ssm.get_paginator('describe_parameters')
+        option = 'Recursive' if recursive else 'OneLevel'
+        stale = []
+        for page in paginator.paginate(ParameterFilters=[{'Key': 'Path', 'Option': option, 'Values': [path]}]):
+            for meta in page.get('Parameters', []):
+                cached = self.cache.cached_version(meta['Name'])
+                if cached is None or cached < meta.get('Version', 0):
+                    self.cache.invalidate(meta['Name'], meta.get('Version'))
+                    stale.append(meta['Name'])
+        if stale:
+            self.get_many(stale)
+        return stale
+
+    # ============= WRITE =============
+
+    def put_many(self, parameters: Dict[str, Any], overwrite: bool = True,
+                 parameter_type: str = 'String') -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk create/update, paced to the write TPS
+
+        Args:
+            parameters: name -> value, or name -> dict with Value and optional
+                        Type, Description, KeyId
+            overwrite: Overwrite existing parameters
+            parameter_type: Default type for plain values
+
+        Returns:
+            Per name: {'success': True, 'version': n} or {'success': False, 'error': ...}
+        """
+        def write(item: Tuple[str, Any]) -> Tuple[str, Dict[str, Any]]:
+            name, spec = item
+            params = dict(spec) if isinstance(spec, dict) else {'Value': spec}
+            params.setdefault('Type', parameter_type)
+            params.update({'Name': name, 'Overwrite': overwrite})
+            try:
+                self.limiter.acquire()
+                version = self.ssm.put_parameter(**params).get('Version', 1)
+                self.cache.written(CachedParameter(name, params['Value'], params['Type'], version, time.time()))
+                return name, {'success': True, 'version': version}
+            except Exception as e:
+                self.cache.invalidate(name)
+                return name, {'success': False, 'error': str(e)}
+
+        if not parameters:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.write_workers, len(parameters)))) as pool:
+            return dict(pool.map(write, parameters.items()))
+
+    def delete_many(self, names: List[str]) -> Dict[str, Any]:
+        """Bulk delete (10 names per DeleteParameters call)"""
+        deleted, invalid, errors = [], [], []
+        for i in range(0, len(names), MAX_NAMES_PER_CALL):
+            batch = names[i:i + MAX_NAMES_PER_CALL]
+            try:
+                self.limiter.acquire()
+                response = self.ssm.delete_parameters(Names=batch)
+                deleted.extend(response.get('DeletedParameters', []))
+                invalid.extend(response.get('InvalidParameters', []))
+            except Exception as e:
+                errors.append(str(e))
+            for name in batch:
+                self.cache.invalidate(name)
+        return {
+            'success': not errors,
+            'deleted_count': len(deleted),
+            'invalid_count': len(invalid),
+            'errors': errors
+        }
+
+
+@st.cache_resource
+def get_parameter_cache(scope: str) -> ParameterCache:
+    """Get process-wide cache for an account/region scope (e.g. '123456789012/us-east-1')"""
+    return ParameterCache()
@@ -47,9 +47,14 @@ Cloud Security:
 import streamlit as st
 import pandas as pd
 import json
-from typing import Dict, List, Any, Optional
+import time
+import threading
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from collections import OrderedDict
 import requests
 
 # ============================================================================
@@ -59,12 +64,26 @@ import requests
 class VulnerabilityScannerPlugin(ABC):
     """Base class for all vulnerability scanner plugins"""
     
+    # Target keys this scanner can act on (see accepts)
+    TARGET_KEYS: Tuple[str, ...] = ()
+    
+    # Results depend only on image content + DB version, so they can be cached by digest
+    CACHEABLE = False
+    
+    # Seconds a DB version reported by the scanner is reused before asking again
+    DB_VERSION_TTL = 3600
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.name = self.__class__.__name__
         self.enabled = config.get('enabled', True)
         self.api_url = config.get('api_url', '')
         self.api_key = config.get('api_key', '')
+        self.max_concurrency = config.get('max_concurrency', 4)
+        self.timeout = config.get('timeout', 300)
+        self.cache: Optional['ScanResultCache'] = None
+        self._db_version: Optional[str] = None
+        self._db_version_at = 0.0
     
     @abstractmethod
     def scan(self, target: Dict[str, Any]) -> Dict[str, Any]:
@@ -84,6 +103,48 @@ class VulnerabilityScannerPlugin(ABC):
     def validate_config(self) -> bool:
         """Validate scanner configuration"""
         return self.enabled and bool(self.api_url)
+    
+    def accepts(self, target: Dict[str, Any]) -> bool:
+        """True if this scanner can scan the target"""
+        return any(target.get(key) for key in self.TARGET_KEYS)
+    
+    def fetch_db_version(self) -> str:
+        """Current vulnerability DB version reported by the scanner ('' if it reports none)"""
+        return ''
+    
+    def db_version(self) -> str:
+        """
+        Vulnerability database version the results are valid for
+        
+        A configured 'db_version' wins; otherwise the scanner is asked at most
+        every DB_VERSION_TTL seconds (keeping the last known version if it is
+        unreachable). Scanners that report no version use the UTC date, so
+        their cached results expire daily.
+        """
+        if self.config.get('db_version'):
+            return str(self.config['db_version'])
+        now = time.time()
+        if self._db_version is None or now - self._db_version_at > self.DB_VERSION_TTL:
+            try:
+                self._db_version = self.fetch_db_version() or self._db_version
+            except Exception:
+                pass
+            self._db_version_at = now
+        return self._db_version or time.strftime('%Y-%m-%d', time.gmtime())
+    
+    def cached_scan(self, target: Dict[str, Any]) -> Dict[str, Any]:
+        """Scan, serving unchanged images from the attached result cache"""
+        digest = target.get('digest')
+        if not (self.CACHEABLE and self.cache is not None and digest):
+            return self.scan(target)
+        
+        db_version = self.db_version()
+        self.cache.sync_db_version(self.name, db_version)
+        result = self.cache.get(self.name, digest, db_version, target.get('layers'))
+        if result is None:
+            result = self.scan(target)
+            self.cache.put(self.name, digest, db_version, result, target.get('layers'))
+        return result
 
 # ============================================================================
 # CONTAINER SCANNING PLUGINS
@@ -92,6 +153,9 @@ class VulnerabilityScannerPlugin(ABC):
 class TrivyScanner(VulnerabilityScannerPlugin):
     """Trivy container vulnerability scanner"""
     
+    TARGET_KEYS = ('image',)
+    CACHEABLE = True
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Trivy',
@@ -104,6 +168,12 @@ class TrivyScanner(VulnerabilityScannerPlugin):
             'license': 'Apache 2.0'
         }
     
+    def fetch_db_version(self) -> str:
+        """Vulnerability DB build (UpdatedAt) from the Trivy server's /version endpoint"""
+        response = requests.get(f"{self.api_url.rstrip('/')}/version", timeout=5)
+        response.raise_for_status()
+        return str((response.json().get('VulnerabilityDB') or {}).get('UpdatedAt') or '')
+    
     def scan(self, target: Dict[str, Any]) -> Dict[str, Any]:
         """Scan container image with Trivy"""
         image = target.get('image', '')
@@ -155,6 +225,9 @@ class TrivyScanner(VulnerabilityScannerPlugin):
 class SnykScanner(VulnerabilityScannerPlugin):
     """Snyk container and dependency scanner"""
     
+    TARGET_KEYS = ('image',)
+    CACHEABLE = True
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Snyk',
@@ -183,6 +256,8 @@ class SnykScanner(VulnerabilityScannerPlugin):
 class AWSInspectorV2Scanner(VulnerabilityScannerPlugin):
     """AWS Inspector v2 scanner"""
     
+    TARGET_KEYS = ('resource_arn', 'image')
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'AWS Inspector v2',
@@ -212,6 +287,8 @@ class AWSInspectorV2Scanner(VulnerabilityScannerPlugin):
 class OPAScanner(VulnerabilityScannerPlugin):
     """Open Policy Agent scanner"""
     
+    TARGET_KEYS = ('resource',)
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Open Policy Agent (OPA)',
@@ -244,6 +321,8 @@ class OPAScanner(VulnerabilityScannerPlugin):
 class KICSScanner(VulnerabilityScannerPlugin):
     """KICS Infrastructure as Code scanner"""
     
+    TARGET_KEYS = ('iac_path',)
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'KICS',
@@ -283,6 +362,12 @@ class WindowsServerScanner(VulnerabilityScannerPlugin):
         'Windows Server 2012 R2': {'build': '9600', 'eol': '2023-10-10'}
     }
     
+    TARGET_KEYS = ('instance_id',)
+    
+    def accepts(self, target: Dict[str, Any]) -> bool:
+        """Windows instances only"""
+        return bool(target.get('instance_id')) and 'windows' in target.get('os_version', target.get('platform', '')).lower()
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Windows Server Scanner',
@@ -356,6 +441,13 @@ class LinuxDistributionScanner(VulnerabilityScannerPlugin):
         'AlmaLinux 9': {'package_manager': 'dnf', 'eol': '2032-05-31'}
     }
     
+    TARGET_KEYS = ('instance_id',)
+    
+    def accepts(self, target: Dict[str, Any]) -> bool:
+        """Linux instances only"""
+        platform = target.get('os_version', target.get('platform', ''))
+        return bool(target.get('instance_id')) and 'windows' not in platform.lower()
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Linux Distribution Scanner',
@@ -417,6 +509,8 @@ class LinuxDistributionScanner(VulnerabilityScannerPlugin):
 class KubeBenchScanner(VulnerabilityScannerPlugin):
     """CIS Kubernetes Benchmark scanner"""
     
+    TARGET_KEYS = ('cluster_name',)
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'kube-bench',
@@ -450,6 +544,8 @@ class KubeBenchScanner(VulnerabilityScannerPlugin):
 class FalcoScanner(VulnerabilityScannerPlugin):
     """Falco runtime security scanner"""
     
+    TARGET_KEYS = ('cluster_name',)
+    
     def get_metadata(self) -> Dict[str, Any]:
         return {
             'name': 'Falco',
@@ -480,8 +576,9 @@ class FalcoScanner(VulnerabilityScannerPlugin):
 class PluginRegistry:
     """Central registry for all scanner plugins"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional['ScanResultCache'] = None):
         self.plugins: Dict[str, VulnerabilityScannerPlugin] = {}
+        self.cache = cache
         self._register_default_plugins()
     
     def _register_default_plugins(self):
@@ -532,6 +629,8 @@ class PluginRegistry:
     
     def register(self, name: str, plugin: VulnerabilityScannerPlugin):
         """Register a new plugin"""
+        if plugin.CACHEABLE and self.cache is not None:
+            plugin.cache = self.cache
         self.plugins[name] = plugin
     
     def get_plugin(self, name: str) -> Optional[VulnerabilityScannerPlugin]:
@@ -553,6 +652,502 @@ class PluginRegistry:
             if plugin.get_metadata().get('category') == category
         }
 
+# ============================================================================
+# SCAN RESULT CACHE
+# ============================================================================
+
+def _layer_of(item: Dict[str, Any]) -> Optional[str]:
+    """Layer digest a finding/package was attributed to (Trivy 'Layer.Digest' or normalized key)"""
+    return item.get('layer_digest') or (item.get('Layer') or {}).get('Digest')
+
+
+def _package_names(items: List[Dict[str, Any]]) -> frozenset:
+    """Package names from finding or package dicts"""
+    return frozenset(i.get('package') or i.get('name') or i.get('PkgName') for i in items) - {None}
+
+
+@dataclass
+class CacheEntry:
+    """Cached scan output valid for one scanner DB version"""
+    db_version: str
+    result: Dict[str, Any]
+    packages: Optional[frozenset] = None  # full package inventory, when the scanner reported one
+
+
+class ScanResultCache:
+    """
+    Content-addressed scan result cache.
+
+    Results are stored by (scanner, image digest) and, when the scan
+    attributes every finding to a layer, by (scanner, layer digest) too -
+    so an image whose layers were all scanned before (retag, rebuilt
+    manifest, multi-arch variant) is served without a scan. Every entry
+    is stamped with the scanner DB version; a DB update only drops the
+    entries whose package inventory intersects the changed packages.
+    """
+    
+    def __init__(self, max_images: int = 10000, max_layers: int = 50000):
+        """
+        Initialize cache
+        
+        Args:
+            max_images: Image entries retained (LRU)
+            max_layers: Layer entries retained (LRU)
+        """
+        self.max_images = max_images
+        self.max_layers = max_layers
+        self.images: 'OrderedDict[Tuple[str, str], CacheEntry]' = OrderedDict()
+        self.layers: 'OrderedDict[Tuple[str, str], CacheEntry]' = OrderedDict()
+        self.stats = {'image_hits': 0, 'layer_hits': 0, 'misses': 0, 'stale': 0}
+        self.db_versions: Dict[str, str] = {}
+        self.lock = threading.Lock()
+    
+    def get(self, scanner: str, digest: str, db_version: str,
+            layers: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a scan result
+        
+        Args:
+            scanner: Scanner name
+            digest: Image manifest digest (sha256:...)
+            db_version: Current scanner DB version
+            layers: Image layer digests, for layer-level reuse
+        
+        Returns:
+            Cached result (with 'cached' set to 'image' or 'layers') or None
+        """
+        with self.lock:
+            entry = self.images.get((scanner, digest))
+            if entry is not None:
+                if entry.db_version == db_version:
+                    self.images.move_to_end((scanner, digest))
+                    self.stats['image_hits'] += 1
+                    return dict(entry.result, cached='image')
+                del self.images[(scanner, digest)]
+                self.stats['stale'] += 1
+            
+            layer_entries = [self.layers.get((scanner, layer)) for layer in layers or []]
+            if layer_entries and all(e is not None and e.db_version == db_version for e in layer_entries):
+                findings = [f for e in layer_entries for f in e.result['vulnerabilities']]
+                packages = [e.packages for e in layer_entries]
+                result = {
+                    'scanner': layer_entries[0].result.get('scanner', scanner),
+                    'target': digest,
+                    'scan_time': min(e.result.get('scan_time', '') for e in layer_entries),
+                    'vulnerabilities': findings
+                }
+                self._store(self.images, (scanner, digest), CacheEntry(
+                    db_version, result,
+                    frozenset().union(*packages) if all(p is not None for p in packages) else None
+                ), self.max_images)
+                self.stats['layer_hits'] += 1
+                return dict(result, cached='layers')
+            
+            self.stats['misses'] += 1
+            return None
+    
+    def put(self, scanner: str, digest: str, db_version: str, result: Dict[str, Any],
+            layers: Optional[List[str]] = None):
+        """Store a fresh scan result by image digest (and per layer when attributable)"""
+        findings = result.get('vulnerabilities') or []
+        inventory = result.get('packages')
+        
+        with self.lock:
+            self._store(self.images, (scanner, digest), CacheEntry(
+                db_version, result, _package_names(inventory) if inventory is not None else None
+            ), self.max_images)
+            
+            # Layer entries are only sound if no finding is left unattributed
+            if not layers or any(_layer_of(f) not in layers for f in findings):
+                return
+            for layer in layers:
+                layer_findings = [f for f in findings if _layer_of(f) == layer]
+                layer_packages = (_package_names([p for p in inventory if _layer_of(p) == layer])
+                                  if inventory is not None else None)
+                self._store(self.layers, (scanner, layer), CacheEntry(
+                    db_version,
+                    {'scanner': result.get('scanner', scanner), 'scan_time': result.get('scan_time', ''),
+                     'vulnerabilities': layer_findings},
+                    layer_packages
+                ), self.max_layers)
+    
+    @staticmethod
+    def _store(store: OrderedDict, key: Tuple[str, str], entry: CacheEntry, limit: int):
+        """Insert with LRU eviction (caller holds the lock)"""
+        store[key] = entry
+        store.move_to_end(key)
+        while len(store) > limit:
+            store.popitem(last=False)
+    
+    def sync_db_version(self, scanner: str, db_version: str,
+                        changed_packages: Optional[set] = None) -> Optional[Dict[str, int]]:
+        """
+        Invalidate a scanner's entries once when its DB version changes
+        
+        Returns:
+            invalidate counts, or None if the version is unchanged
+        """
+        with self.lock:
+            if self.db_versions.get(scanner) == db_version:
+                return None
+            self.db_versions[scanner] = db_version
+        return self.invalidate(scanner, db_version, changed_packages)
+    
+    def invalidate(self, scanner: str, db_version: str, changed_packages: Optional[set] = None) -> Dict[str, int]:
+        """
+        Apply a scanner DB update
+        
+        Entries whose package inventory is known and does not intersect
+        changed_packages are re-stamped with the new version; all other
+        entries of the scanner from older versions are dropped.
+        
+        Args:
+            scanner: Scanner name
+            db_version: New DB version
+            changed_packages: Packages whose advisories changed (None = all)
+        
+        Returns:
+            Dict with kept and dropped counts
+        """
+        kept = dropped = 0
+        with self.lock:
+            for store in (self.images, self.layers):
+                for key, entry in list(store.items()):
+                    if key[0] != scanner or entry.db_version == db_version:
+                        continue
+                    if changed_packages is not None and entry.packages is not None \
+                            and not entry.packages & changed_packages:
+                        entry.db_version = db_version
+                        kept += 1
+                    else:
+                        del store[key]
+                        dropped += 1
+        return {'kept': kept, 'dropped': dropped}
+    
+    def summary(self) -> Dict[str, Any]:
+        """Entry counts, hit counters and hit rate"""
+        with self.lock:
+            hits = self.stats['image_hits'] + self.stats['layer_hits']
+            lookups = hits + self.stats['misses'] + self.stats['stale']
+            return dict(self.stats, images=len(self.images), layers=len(self.layers),
+                        db_versions=dict(self.db_versions), hit_rate=hits / lookups if lookups else 0.0)
+
+
+@st.cache_resource
+def get_scan_result_cache() -> ScanResultCache:
+    """Get process-wide scan result cache (shared across sessions and reruns)"""
+    return ScanResultCache()
+
+
+def resolve_ecr_targets(ecr_client, repositories: List[str]) -> List[Dict[str, Any]]:
+    """
+    Resolve ECR repositories to digest-addressed scan targets
+    
+    Uses the most recently pushed image of each repository and reads its
+    manifest for layer digests. Repositories that cannot be resolved are
+    returned as plain image targets (scanned, not cached).
+    
+    Returns:
+        Targets with image, digest and layers
+    """
+    manifest_types = [
+        'application/vnd.docker.distribution.manifest.v2+json',
+        'application/vnd.oci.image.manifest.v1+json'
+    ]
+    targets = []
+    for repository in repositories:
+        try:
+            images = []
+            paginator = ecr_client.get_paginator('describe_images')
+            for page in paginator.paginate(repositoryName=repository):
+                images.extend(page.get('imageDetails', []))
+            if not images:
+                continue
+            latest = max(images, key=lambda i: i['imagePushedAt'].timestamp() if i.get('imagePushedAt') else 0)
+            digest = latest['imageDigest']
+            tag = (latest.get('imageTags') or [digest])[0]
+            
+            response = ecr_client.batch_get_image(
+                repositoryName=repository,
+                imageIds=[{'imageDigest': digest}],
+                acceptedMediaTypes=manifest_types
+            )
+            layers = []
+            for image in response.get('images', []):
+                manifest = json.loads(image.get('imageManifest', '{}'))
+                layers = [layer['digest'] for layer in manifest.get('layers', [])]
+            
+            targets.append({'image': f"{repository}:{tag}" if tag != digest else f"{repository}@{digest}",
+                            'digest': digest, 'layers': layers})
+        except Exception:
+            targets.append({'image': repository})
+    return targets
+
+
+# ============================================================================
+# SCAN ORCHESTRATION & RESULT FUSION
+# ============================================================================
+
+SEVERITY_RANK = {'CRITICAL': 4, 'HIGH': 3, 'MEDIUM': 2, 'LOW': 1, 'INFORMATIONAL': 0, 'UNKNOWN': 0}
+
+# Vendor severity labels mapped onto the common scale
+SEVERITY_ALIASES = {'IMPORTANT': 'HIGH', 'MODERATE': 'MEDIUM', 'INFO': 'INFORMATIONAL'}
+
+# Result keys holding finding lists, across scanner output formats
+FINDING_KEYS = ('vulnerabilities', 'vulnerable_packages', 'missing_patches', 'findings', 'policy_violations', 'alerts')
+
+# Target keys identifying the scanned asset, in priority order
+ASSET_KEYS = ('image', 'resource_arn', 'instance_id', 'cluster_name', 'iac_path', 'resource')
+
+
+def asset_id(target: Dict[str, Any]) -> str:
+    """Stable asset identifier for a scan target"""
+    for key in ASSET_KEYS:
+        if target.get(key):
+            return str(target[key])
+    return json.dumps(target, sort_keys=True)
+
+
+def normalize_severity(severity: Optional[str]) -> str:
+    """Map a scanner severity label onto CRITICAL/HIGH/MEDIUM/LOW/INFORMATIONAL/UNKNOWN"""
+    label = str(severity or 'UNKNOWN').upper()
+    label = SEVERITY_ALIASES.get(label, label)
+    return label if label in SEVERITY_RANK else 'UNKNOWN'
+
+
+def normalize_findings(result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Flatten a scanner result into (cve_id, package) findings
+
+    Handles Trivy/Snyk style vulnerability lists, OS scanner package and
+    patch lists (one finding per listed CVE) and Inspector v2 findings.
+    Findings without a CVE use their rule/patch identifier instead.
+    """
+    for key in FINDING_KEYS:
+        for item in result.get(key) or []:
+            if not isinstance(item, dict):
+                continue
+            details = item.get('packageVulnerabilityDetails') or {}
+            packages = details.get('vulnerablePackages') or [{}]
+            cve_ids = item.get('cve_ids') or [
+                item.get('cve_id') or details.get('vulnerabilityId') or item.get('id')
+                or item.get('query_id') or item.get('rule') or item.get('kb_id')
+            ]
+            for package_info in packages:
+                package = (item.get('package') or package_info.get('name') or item.get('kb_id')
+                           or item.get('resource') or '')
+                for cve_id in cve_ids:
+                    if not cve_id:
+                        continue
+                    yield {
+                        'cve_id': cve_id,
+                        'package': package,
+                        'severity': normalize_severity(item.get('severity')),
+                        'cvss_score': item.get('cvss_score') or item.get('inspectorScore'),
+                        'installed_version': (item.get('installed_version') or item.get('current_version')
+                                              or package_info.get('version')),
+                        'fixed_version': item.get('fixed_version') or package_info.get('fixedInVersion'),
+                        'description': item.get('description') or item.get('title', '')
+                    }
+
+
+class FindingFusion:
+    """
+    Deduplicated CVE x asset record set keyed on (cve_id, package, asset).
+
+    The same finding reported by several scanners is merged into one
+    record: highest severity and CVSS win, scanners are accumulated and
+    missing versions are filled in from whichever scanner reported them.
+    """
+    
+    def __init__(self):
+        self.records: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+    
+    def add(self, scanner: str, asset: str, result: Dict[str, Any]) -> int:
+        """
+        Merge one scanner result for an asset
+        
+        Returns:
+            Number of new (previously unseen) records
+        """
+        new = 0
+        with self.lock:
+            for finding in normalize_findings(result):
+                key = (finding['cve_id'], finding['package'], asset)
+                record = self.records.get(key)
+                if record is None:
+                    record = self.records[key] = dict(finding, asset=asset, scanners=[scanner],
+                                                      first_seen=result.get('scan_time'))
+                    new += 1
+                    continue
+                if scanner not in record['scanners']:
+                    record['scanners'].append(scanner)
+                if SEVERITY_RANK[finding['severity']] > SEVERITY_RANK[record['severity']]:
+                    record['severity'] = finding['severity']
+                if (finding['cvss_score'] or 0) > (record['cvss_score'] or 0):
+                    record['cvss_score'] = finding['cvss_score']
+                for field_name in ('installed_version', 'fixed_version', 'description'):
+                    if not record.get(field_name) and finding.get(field_name):
+                        record[field_name] = finding[field_name]
+        return new
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Fused records, most severe first"""
+        with self.lock:
+            records = [dict(r, scanners=', '.join(r['scanners'])) for r in self.records.values()]
+        records.sort(key=lambda r: (-SEVERITY_RANK[r['severity']], -(r['cvss_score'] or 0), r['cve_id']))
+        return records
+    
+    def summary(self) -> Dict[str, int]:
+        """Record counts by severity plus distinct CVEs and assets"""
+        with self.lock:
+            counts = {level: 0 for level in SEVERITY_RANK}
+            for record in self.records.values():
+                counts[record['severity']] += 1
+            counts['records'] = len(self.records)
+            counts['cves'] = len({key[0] for key in self.records})
+            counts['assets'] = len({key[2] for key in self.records})
+        return counts
+
+
+@dataclass
+class ScanEvent:
+    """Outcome of one plugin x target scan, delivered as soon as it finishes"""
+    plugin: str
+    asset: str
+    status: str  # 'ok', 'error' or 'timeout'
+    duration: float
+    new_records: int = 0
+    error: str = ''
+    result: Dict[str, Any] = field(default_factory=dict)
+
+
+class ScanOrchestrator:
+    """
+    Runs enabled plugins concurrently against a target set.
+
+    Each plugin has its own in-flight limit (max_concurrency) and per-scan
+    timeout; every job runs on its own daemon thread, started as slots free
+    up, and results are yielded as they complete while being fused into a
+    FindingFusion. The timeout counts from submission. A timed-out scan is
+    reported immediately, frees its slot and its late result is discarded
+    (the thread cannot be interrupted, but it no longer holds up queued jobs).
+    """
+    
+    def __init__(self, registry: 'PluginRegistry', max_workers: int = 32, poll_interval: float = 0.5):
+        """
+        Initialize orchestrator
+        
+        Args:
+            registry: Plugin registry
+            max_workers: Upper bound on concurrent scans across all plugins
+            poll_interval: Seconds between timeout checks
+        """
+        self.registry = registry
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.fusion = FindingFusion()
+        self.events: List[ScanEvent] = []
+    
+    def plan(self, targets: List[Dict[str, Any]], plugin_names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Targets accepted by each selected enabled plugin"""
+        plugins = self.registry.get_enabled_plugins()
+        if plugin_names is not None:
+            plugins = {name: p for name, p in plugins.items() if name in plugin_names}
+        jobs = {name: [t for t in targets if plugin.accepts(t)] for name, plugin in plugins.items()}
+        return {name: queue for name, queue in jobs.items() if queue}
+    
+    def run(self, targets: List[Dict[str, Any]], plugin_names: Optional[List[str]] = None) -> Iterator[ScanEvent]:
+        """
+        Scan targets with every applicable plugin, streaming events
+        
+        Args:
+            targets: Scan targets (dicts with image / instance_id / cluster_name / ...)
+            plugin_names: Restrict to these registry names (default: all enabled)
+        
+        Yields:
+            ScanEvent per plugin x target, in completion order
+        """
+        queues = {name: list(reversed(queue)) for name, queue in self.plan(targets, plugin_names).items()}
+        if not queues:
+            return
+        
+        plugins = self.registry.get_all_plugins()
+        limits = {name: max(1, plugins[name].max_concurrency) for name in queues}
+        in_flight = {name: 0 for name in queues}
+        jobs: Dict[Future, Tuple[str, str, float]] = {}
+        
+        def launch(plugin, target) -> Future:
+            future = Future()
+            
+            def work():
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    future.set_result(plugin.cached_scan(target))
+                except Exception as e:
+                    future.set_exception(e)
+            
+            threading.Thread(target=work, name=f"scan-{plugin.name}", daemon=True).start()
+            return future
+        
+        def fill():
+            for name, queue in queues.items():
+                while queue and in_flight[name] < limits[name] and len(jobs) < self.max_workers:
+                    target = queue.pop()
+                    jobs[launch(plugins[name], target)] = (name, asset_id(target), time.monotonic())
+                    in_flight[name] += 1
+        
+        try:
+            fill()
+            while jobs:
+                done, _ = wait(list(jobs), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                
+                for future in done:
+                    name, asset, submitted = jobs.pop(future)
+                    in_flight[name] -= 1
+                    duration = now - submitted
+                    try:
+                        result = future.result()
+                        event = ScanEvent(name, asset, 'ok', duration,
+                                          self.fusion.add(name, asset, result), result=result)
+                    except Exception as e:
+                        event = ScanEvent(name, asset, 'error', duration, error=str(e))
+                    self.events.append(event)
+                    yield event
+                
+                for future, (name, asset, submitted) in list(jobs.items()):
+                    if now - submitted > plugins[name].timeout:
+                        jobs.pop(future)
+                        future.cancel()
+                        in_flight[name] -= 1
+                        event = ScanEvent(name, asset, 'timeout', now - submitted,
+                                          error=f"Timed out after {plugins[name].timeout}s")
+                        self.events.append(event)
+                        yield event
+                
+                fill()
+        finally:
+            # Abandoned jobs (consumer stopped early) discard their results
+            for future in jobs:
+                future.cancel()
+    
+    def completed_assets(self) -> List[str]:
+        """Assets every applicable plugin scanned successfully (safe to treat as fully re-scanned)"""
+        status: Dict[str, bool] = {}
+        for event in self.events:
+            status[event.asset] = status.get(event.asset, True) and event.status == 'ok'
+        return [asset for asset, ok in status.items() if ok]
+    
+    def scan_all(self, targets: List[Dict[str, Any]], plugin_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Run to completion and return fused records"""
+        for _ in self.run(targets, plugin_names):
+            pass
+        return self.fusion.to_list()
+
+
 # ============================================================================
 # STREAMLIT UI COMPONENTS
 # ============================================================================
@@ -636,6 +1231,49 @@ class PluginUI:
         # Results table
         df = pd.DataFrame(results)
         st.dataframe(df, use_container_width=True)
+    
+    @staticmethod
+    def render_orchestrated_scan(registry: PluginRegistry, targets: List[Dict[str, Any]],
+                                 plugin_names: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Run a concurrent multi-scanner scan with live progress
+        
+        Returns:
+            (fused records, assets every applicable scanner completed without error or timeout)
+        """
+        orchestrator = ScanOrchestrator(registry)
+        total = sum(len(queue) for queue in orchestrator.plan(targets, plugin_names).values())
+        if not total:
+            st.warning("No enabled scanner accepts the selected targets")
+            return [], []
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        failures = []
+        
+        for completed, event in enumerate(orchestrator.run(targets, plugin_names), start=1):
+            progress_bar.progress(completed / total)
+            status_text.text(f"{event.plugin} → {event.asset}: {event.status} ({completed}/{total})")
+            if event.status != 'ok':
+                failures.append(event)
+        
+        progress_bar.empty()
+        status_text.empty()
+        
+        summary = orchestrator.fusion.summary()
+        st.success(f"✅ {total} scans complete: {summary['records']} unique findings "
+                   f"({summary['cves']} CVEs across {summary['assets']} assets)")
+        
+        cached = sum(1 for e in orchestrator.events if e.result.get('cached'))
+        if registry.cache is not None and cached:
+            st.caption(f"⚡ {cached} of {total} results served from the digest cache "
+                       f"(hit rate {registry.cache.summary()['hit_rate']:.0%})")
+        if failures:
+            with st.expander(f"⚠️ {len(failures)} scans failed or timed out"):
+                for event in failures:
+                    st.caption(f"{event.plugin} → {event.asset}: {event.error}")
+        
+        return orchestrator.fusion.to_list(), orchestrator.completed_assets()
 
 # ============================================================================
 # EXPORT
@@ -653,5 +1291,11 @@ __all__ = [
     'KubeBenchScanner',
     'FalcoScanner',
     'PluginRegistry',
-    'PluginUI'
+    'PluginUI',
+    'ScanResultCache',
+    'get_scan_result_cache',
+    'resolve_ecr_targets',
+    'FindingFusion',
+    'ScanEvent',
+    'ScanOrchestrator'
 ]
\ No newline at end of file
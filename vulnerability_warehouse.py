@@ -0,0 +1,289 @@
+"""
+Vulnerability Warehouse
+Persistent columnar store of CVE x asset findings with lifecycle tracking
+
+Features:
+- One row per (cve_id, package, asset) with first_seen / last_seen / fixed_at
+- Reopened findings keep their last fix time and a reopen count
+- Findings missing from a re-scan of their asset are closed automatically
+- Precomputed aggregates: severity x asset type x account, MTTR, aging, weekly trend
+- Parquet persistence when pyarrow is installed (pickle otherwise)
+"""
+
+import os
+import threading
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+SEVERITIES = ['CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'INFORMATIONAL', 'UNKNOWN']
+
+AGING_BUCKETS = [0, 7, 30, 90, np.inf]
+AGING_LABELS = ['0-7 days', '8-30 days', '31-90 days', '90+ days']
+
+COLUMNS = [
+    'cve_id', 'package', 'asset', 'asset_type', 'account_id', 'severity', 'cvss_score',
+    'scanners', 'fixed_version', 'first_seen', 'last_seen', 'fixed_at', 'last_fixed_at', 'reopen_count'
+]
+
+# Lifecycle columns maintained by the warehouse (never taken from scan records)
+LIFECYCLE = ('first_seen', 'last_seen', 'fixed_at', 'last_fixed_at', 'reopen_count')
+
+# Low-cardinality columns stored as categoricals
+CATEGORICAL = ['asset_type', 'account_id', 'severity', 'scanners']
+
+
+def _utc_naive(value: Optional[datetime] = None) -> pd.Timestamp:
+    """Timestamp as naive UTC (the warehouse stores naive UTC datetimes)"""
+    timestamp = pd.Timestamp(value or datetime.now(timezone.utc))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
+
+class VulnerabilityWarehouse:
+    """
+    Columnar vulnerability finding store.
+
+    Findings are kept in a DataFrame indexed by 'cve_id|package|asset'.
+    Each ingest upserts a scan batch with vectorized index operations,
+    closes findings that disappeared from re-scanned assets and rebuilds
+    the small aggregate tables the dashboards read.
+    """
+
+    def __init__(self, path: Optional[str] = None, trend_weeks: int = 8):
+        """
+        Initialize warehouse
+
+        Args:
+            path: Directory to persist findings in (None = in-memory only)
+            trend_weeks: Weeks covered by the open-findings trend
+        """
+        self.path = path
+        self.trend_weeks = trend_weeks
+        self.lock = threading.Lock()
+        self.findings = self._empty()
+        self.aggregates: Dict[str, object] = {}
+        self.updated_at: Optional[pd.Timestamp] = None
+        self._load()
+        self._rebuild_aggregates()
+
+    @staticmethod
+    def _empty() -> pd.DataFrame:
+        """Empty findings frame with the warehouse schema"""
+        frame = pd.DataFrame({column: pd.Series(dtype='object') for column in COLUMNS})
+        frame['cvss_score'] = frame['cvss_score'].astype('float64')
+        for column in ('first_seen', 'last_seen', 'fixed_at', 'last_fixed_at'):
+            frame[column] = pd.Series(dtype='datetime64[ns]')
+        frame['reopen_count'] = frame['reopen_count'].astype('int64')
+        frame.index.name = 'finding_key'
+        return frame
+
+    def is_empty(self) -> bool:
+        """True if no findings have been ingested"""
+        return self.findings.empty
+
+    # ============= INGEST =============
+
+    def ingest(self, records: List[Dict], asset_type: str, account_id: str,
+               scanned_assets: Optional[List[str]] = None,
+               scan_time: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Upsert one scan batch
+
+        Args:
+            records: Fused findings (cve_id, package, asset, severity, cvss_score, scanners, fixed_version)
+            asset_type: Asset type for records without their own (e.g. 'Container Image')
+            account_id: Account for records without their own
+            scanned_assets: Assets fully re-scanned in this batch; their open findings
+                            absent from records are marked fixed (defaults to assets in records)
+            scan_time: Batch timestamp (defaults to now)
+
+        Returns:
+            Dict with new, updated, fixed and reopened counts
+
+        A reopened finding keeps its first_seen; the fix it reverts moves to
+        last_fixed_at and reopen_count is incremented.
+        """
+        now = _utc_naive(scan_time)
+
+        batch = pd.DataFrame(records, columns=[c for c in COLUMNS if c not in LIFECYCLE])
+        batch['asset_type'] = batch['asset_type'].fillna(asset_type)
+        batch['account_id'] = batch['account_id'].fillna(account_id)
+        batch['package'] = batch['package'].fillna('')
+        batch['cvss_score'] = pd.to_numeric(batch['cvss_score'], errors='coerce')
+        batch.index = batch['cve_id'].astype(str) + '|' + batch['package'].astype(str) + '|' + batch['asset'].astype(str)
+        batch = batch[~batch.index.duplicated(keep='last')]
+        assets = set(scanned_assets) if scanned_assets is not None else set(batch['asset'])
+
+        with self.lock:
+            current = self.findings.copy()
+            for column in CATEGORICAL:
+                current[column] = current[column].astype('object')
+
+            seen = current.index.intersection(batch.index)
+            was_fixed = seen[current.loc[seen, 'fixed_at'].notna().to_numpy()]
+            reopened = len(was_fixed)
+            current.loc[was_fixed, 'last_fixed_at'] = current.loc[was_fixed, 'fixed_at']
+            current.loc[was_fixed, 'reopen_count'] += 1
+            mutable = ['severity', 'cvss_score', 'scanners', 'fixed_version']
+            current.loc[seen, mutable] = batch.loc[seen, mutable].values
+            current.loc[seen, 'last_seen'] = now
+            current.loc[seen, 'fixed_at'] = pd.NaT
+
+            closed = (current['asset'].isin(assets) & current['fixed_at'].isna()
+                      & ~current.index.isin(batch.index))
+            current.loc[closed, 'fixed_at'] = now
+
+            new = batch.loc[batch.index.difference(current.index)].copy()
+            new['first_seen'] = now
+            new['last_seen'] = now
+            new['fixed_at'] = pd.Series(pd.NaT, index=new.index, dtype='datetime64[ns]')
+            new['last_fixed_at'] = new['fixed_at']
+            new['reopen_count'] = 0
+
+            self.findings = self._compact(pd.concat([current, new[COLUMNS]]) if len(new) else current)
+            self.updated_at = now
+            self._rebuild_aggregates(now)
+            self._save()
+
+        return {'new': len(new), 'updated': len(seen), 'fixed': int(closed.sum()), 'reopened': reopened}
+
+    @staticmethod
+    def _compact(frame: pd.DataFrame) -> pd.DataFrame:
+        """Re-apply categorical dtypes after an upsert"""
+        for column in CATEGORICAL:
+            frame[column] = frame[column].astype('category')
+        frame.index.name = 'finding_key'
+        return frame
+
+    # ============= AGGREGATES =============
+
+    def _rebuild_aggregates(self, now: Optional[pd.Timestamp] = None):
+        """Recompute dashboard aggregates (small tables, read on every rerun)"""
+        now = now or _utc_naive()
+        frame = self.findings
+        is_open = frame['fixed_at'].isna().to_numpy()
+        open_findings = frame[is_open]
+        fixed = frame[~is_open]
+
+        matrix = (open_findings.groupby(['asset_type', 'account_id', 'severity'], observed=True)
+                  .size().unstack('severity', fill_value=0))
+        matrix = matrix.reindex(columns=SEVERITIES[:4] + [s for s in SEVERITIES[4:] if s in matrix.columns],
+                                fill_value=0)
+
+        resolution_days = (fixed['fixed_at'] - fixed['first_seen']).dt.total_seconds() / 86400
+        mttr = resolution_days.groupby(fixed['severity'], observed=True).mean().reindex(SEVERITIES[:4])
+
+        age_days = (now - open_findings['first_seen']).dt.total_seconds() / 86400
+        aging = pd.crosstab(
+            open_findings['severity'].astype('object'),
+            pd.cut(age_days, AGING_BUCKETS, labels=AGING_LABELS, include_lowest=True)
+        ).reindex(index=SEVERITIES[:4], columns=AGING_LABELS, fill_value=0)
+
+        # Open findings at the end of each week: first_seen <= t < fixed_at
+        week_ends = pd.date_range(end=now, periods=self.trend_weeks, freq='7D')
+        first = frame['first_seen'].to_numpy(dtype='datetime64[ns]').astype('int64')
+        fixed_at = frame['fixed_at'].to_numpy(dtype='datetime64[ns]')
+        fixed_at = np.where(np.isnat(fixed_at), np.iinfo('int64').max, fixed_at.astype('int64'))
+        ticks = week_ends.to_numpy(dtype='datetime64[ns]').astype('int64')
+        open_at = (first[:, None] <= ticks[None, :]) & (fixed_at[:, None] > ticks[None, :])
+        severity_codes = frame['severity'].astype('object').to_numpy()
+        trend = pd.DataFrame(
+            {severity: open_at[severity_codes == severity].sum(axis=0) for severity in SEVERITIES[:4]},
+            index=[w.strftime('%b %d') for w in week_ends]
+        )
+
+        top_cves = pd.DataFrame()
+        if not open_findings.empty:
+            severity_rank = open_findings['severity'].astype('object').map(
+                {s: len(SEVERITIES) - i for i, s in enumerate(SEVERITIES)})
+            top_cves = (open_findings.assign(rank=severity_rank)
+                        .groupby('cve_id', observed=True)
+                        .agg(rank=('rank', 'max'), cvss=('cvss_score', 'max'),
+                             assets=('asset', 'nunique'), fixed_version=('fixed_version', 'first'))
+                        .sort_values(['rank', 'cvss', 'assets'], ascending=False)
+                        .head(20))
+            top_rows = open_findings[open_findings['cve_id'].isin(top_cves.index)]
+            top_cves['asset_types'] = (top_rows.groupby('cve_id')['asset_type']
+                                       .agg(lambda s: ', '.join(sorted(set(s.astype(str))))))
+            top_cves['severity'] = top_cves['rank'].map({len(SEVERITIES) - i: s for i, s in enumerate(SEVERITIES)})
+
+        total = len(frame)
+        self.aggregates = {
+            'open': int(is_open.sum()),
+            'critical_open': int((open_findings['severity'] == 'CRITICAL').sum()),
+            'affected_assets': int(open_findings['asset'].nunique()),
+            'remediation_rate': (len(fixed) / total) if total else 0.0,
+            'severity_matrix': matrix,
+            'mttr_days': mttr,
+            'aging': aging,
+            'trend': trend,
+            'top_cves': top_cves
+        }
+
+    def open_findings(self) -> pd.DataFrame:
+        """Findings not yet fixed"""
+        return self.findings[self.findings['fixed_at'].isna()]
+
+    def severity_by_asset_type(self) -> pd.DataFrame:
+        """Open findings by asset type x severity (rolled up over accounts)"""
+        matrix = self.aggregates['severity_matrix']
+        if matrix.empty:
+            return matrix
+        return matrix.groupby(level='asset_type', observed=True).sum()
+
+    # ============= PERSISTENCE =============
+
+    def _file(self) -> Optional[str]:
+        """Findings file path for the available format"""
+        if not self.path:
+            return None
+        return os.path.join(self.path, 'findings.parquet' if PARQUET_AVAILABLE else 'findings.pkl')
+
+    def _save(self):
+        """Persist findings (caller holds the lock)"""
+        path = self._file()
+        if not path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        tmp = path + '.tmp'
+        if PARQUET_AVAILABLE:
+            self.findings.to_parquet(tmp)
+        else:
+            self.findings.to_pickle(tmp)
+        os.replace(tmp, path)
+
+    def _load(self):
+        """Load persisted findings if present"""
+        path = self._file()
+        if not path or not os.path.exists(path):
+            return
+        frame = pd.read_parquet(path) if PARQUET_AVAILABLE else pd.read_pickle(path)
+        # Files written before reopen tracking lack the last_fixed_at / reopen_count columns
+        frame = frame.reindex(columns=COLUMNS)
+        frame['last_fixed_at'] = pd.to_datetime(frame['last_fixed_at'])
+        frame['reopen_count'] = frame['reopen_count'].fillna(0).astype('int64')
+        self.findings = self._compact(frame)
+        self.updated_at = frame['last_seen'].max() if len(frame) else None
+
+
+@st.cache_resource
+def _vulnerability_warehouse(scope: str) -> VulnerabilityWarehouse:
+    """Warehouse for one credential scope (<VULN_WAREHOUSE_PATH>/<scope> when set)"""
+    base = os.environ.get('VULN_WAREHOUSE_PATH')
+    return VulnerabilityWarehouse(os.path.join(base, scope) if base else None)
+
+
+def get_vulnerability_warehouse(account_mgr=None) -> VulnerabilityWarehouse:
+    """Get the warehouse of the current credentials (persisted under VULN_WAREHOUSE_PATH when set)"""
+    from aws_cost_cube import credential_scope
+    return _vulnerability_warehouse(credential_scope(account_mgr))